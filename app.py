@@ -13,6 +13,8 @@ import firebase_admin
 from firebase_admin import credentials
 from firebase_admin import firestore
 from scripts.combine_swagger import combine_swagger_files
+from helper.metrics import InstrumentedQueuePool, init_metrics
+from helper.helpers import FastJSONProvider
 
 load_dotenv()
 
@@ -82,16 +84,24 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 FIREBASE_CREDENTIALS = os.getenv("FIREBASE_CREDENTIALS")
 
 app = Flask(__name__)
+# orjson-backed jsonify with the default provider's output format
+app.json = FastJSONProvider(app)
 app.config['SQLALCHEMY_DATABASE_URI']=f"postgresql://{DATABASE_USERNAME}:{DATABASE_PASSWORD}@{DATABASE_URL}"
 app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
     'pool_size': 10,
     'max_overflow': 10,
     'pool_timeout': 30,
     'pool_pre_ping': True,
+    'poolclass': InstrumentedQueuePool,
 }
 app_context = app.app_context()
 db = SQLAlchemy(app)
 
+# Attribute query count / DB time to each request and event handler
+from helper.query_stats import init_query_stats
+init_query_stats(app)
+init_metrics(app, db)
+
 # Initialize Firebase only if credentials are available
 if FIREBASE_CREDENTIALS:
     cred = credentials.Certificate(json.loads(FIREBASE_CREDENTIALS))
@@ -105,6 +115,14 @@ else:
     # No Firebase credentials available (e.g., in CI/CD or local testing)
     firestore_db = None
 
+# Drop feeds are written to Firestore in batches from one background thread
+from helper.firestore_writer import create_firestore_writer
+firestore_writer = create_firestore_writer(firestore_db)
+
+# Discord bot API calls and webhooks are delivered from a transactional outbox
+from helper.discord_outbox import init_discord_outbox
+discord_outbox = init_discord_outbox(app, db)
+
 migrate = Migrate(app, db)
 
 # Ensure swagger.json is generated at app startup
@@ -131,7 +149,7 @@ app.register_blueprint(swaggerui_blueprint, url_prefix=SWAGGER_URL)
 from models import models, stability_party_3, bingo, new_events
 
 # make app aware of all endpoints
-from endpoints import users, announcements, splits, applications, diary, ranks, raid_tier, discord_management
+from endpoints import users, announcements, splits, applications, diary, ranks, raid_tier, discord_management, metrics
 from endpoints.events import item_whitelist, submit, sp3_moderation, sp3_game, events, items, bingo
 from endpoints.v2 import events as v2_events, teams, triggers, tiles, tasks, challenges, actions, statuses, conquest
 
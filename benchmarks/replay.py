@@ -0,0 +1,265 @@
+"""
+Replay a submission workload against /events/submit and report throughput,
+latency percentiles, and queries and commits per submission.
+
+Usage:
+    python benchmarks/replay.py <workload.ndjson> [--url http://localhost:5000] [--concurrency 4]
+                                [--limit N] [--output result.json]
+                                [--baseline baseline.json] [--max-regression 10]
+
+Without --url the workload is replayed in-process through the Flask test client
+against the database in DATABASE_URL. With --url it is sent to a running server.
+Start that server with QUERY_STATS_HEADERS=1 so query and commit counts can be read
+from the response headers. Seed the database first with benchmarks/seed.py.
+
+--output writes the report as JSON; pass a previous report as --baseline to
+compare branches. The exit status is 1 if p95 latency or queries per submission
+regressed by more than --max-regression percent.
+"""
+
+import argparse
+import json
+import math
+import os
+import statistics
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the project root directory to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(project_root)
+
+from benchmarks.workload import load_workload
+
+# Metrics compared against a baseline; for each, lower is better
+COMPARED_METRICS = ("latency_ms.p50", "latency_ms.p95", "latency_ms.p99", "queries_per_submission.mean",
+                    "commits_per_submission.mean")
+# Metrics whose regression fails the run
+GATED_METRICS = ("latency_ms.p95", "queries_per_submission.mean")
+
+
+def percentile(sorted_values: list[float], pct: float) -> float | None:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def _summarize(values: list[float]) -> dict:
+    if not values:
+        return {"mean": None, "p50": None, "p95": None, "max": None}
+    ordered = sorted(values)
+    return {
+        "mean": round(statistics.fmean(ordered), 3),
+        "p50": percentile(ordered, 50),
+        "p95": percentile(ordered, 95),
+        "max": ordered[-1],
+    }
+
+
+def _rewrite_request_id(payload: dict, run_id: str) -> dict:
+    """Give every replayed submission a fresh request_id so reruns don't hit the duplicate guard."""
+    payload = dict(payload)
+    if payload.get("request_id"):
+        payload["request_id"] = f"{payload['request_id']}:{run_id}"
+    return payload
+
+
+def _make_sender(url: str | None):
+    """Return send(payload) -> (status_code, headers) for the chosen target."""
+    if url:
+        import requests
+        local = threading.local()
+
+        def send(payload):
+            session = getattr(local, "session", None)
+            if session is None:
+                session = local.session = requests.Session()
+            response = session.post(f"{url.rstrip('/')}/events/submit", json=payload, timeout=60)
+            return response.status_code, response.headers
+        return send
+
+    from app import app
+
+    def send(payload):
+        response = app.test_client().post("/events/submit", json=payload)
+        return response.status_code, response.headers
+    return send
+
+
+def _handler_snapshot() -> dict:
+    from event_handlers.event_handler import EventHandler
+    from helper.metrics import HANDLER_LATENCY, HANDLER_QUERIES
+    return {
+        h.__name__: (HANDLER_LATENCY.count(handler=h.__name__), HANDLER_LATENCY.sum(handler=h.__name__),
+                     HANDLER_QUERIES.value(handler=h.__name__))
+        for h in EventHandler.handlers
+    }
+
+
+def _handler_breakdown(before: dict, after: dict) -> dict:
+    """Mean time and queries per invocation of each handler between two snapshots."""
+    breakdown = {}
+    for name, (count, seconds, queries) in after.items():
+        prev_count, prev_seconds, prev_queries = before.get(name, (0, 0.0, 0))
+        calls = count - prev_count
+        if calls:
+            breakdown[name] = {
+                "calls": calls,
+                "mean_ms": round((seconds - prev_seconds) / calls * 1000, 3),
+                "queries_per_call": round((queries - prev_queries) / calls, 2),
+            }
+    return breakdown
+
+
+def run_replay(submissions: list[dict], url: str | None = None, concurrency: int = 1,
+               keep_request_ids: bool = False) -> dict:
+    """Replay submissions and return the benchmark report."""
+    send = _make_sender(url)
+    run_id = uuid.uuid4().hex[:8]
+    payloads = submissions if keep_request_ids else [_rewrite_request_id(p, run_id) for p in submissions]
+
+    def _one(payload):
+        start = time.perf_counter()
+        try:
+            status, headers = send(payload)
+        except Exception as e:
+            return {"latency_ms": round((time.perf_counter() - start) * 1000, 3), "error": str(e)}
+        return {
+            "latency_ms": round((time.perf_counter() - start) * 1000, 3),
+            "status": status,
+            "queries": int(headers["X-Query-Count"]) if "X-Query-Count" in headers else None,
+            "commits": int(headers["X-Commit-Count"]) if "X-Commit-Count" in headers else None,
+            "db_ms": float(headers["X-Query-Time-Ms"]) if "X-Query-Time-Ms" in headers else None,
+        }
+
+    if not url:
+        from app import app
+        headers_enabled = app.config.get("QUERY_STATS_HEADERS")
+        app.config["QUERY_STATS_HEADERS"] = True
+    handlers_before = None if url else _handler_snapshot()
+    wall_start = time.perf_counter()
+    try:
+        if concurrency > 1:
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                results = list(pool.map(_one, payloads))
+        else:
+            results = [_one(p) for p in payloads]
+    finally:
+        if not url:
+            app.config["QUERY_STATS_HEADERS"] = headers_enabled
+    wall_seconds = time.perf_counter() - wall_start
+    # Per-handler numbers come from the in-process metrics registry, so only for test-client runs
+    handlers = _handler_breakdown(handlers_before, _handler_snapshot()) if handlers_before is not None else None
+
+    errors = [r for r in results if "error" in r or r["status"] >= 400]
+    latencies = sorted(r["latency_ms"] for r in results)
+    queries = [r["queries"] for r in results if r.get("queries") is not None]
+    commits = [r["commits"] for r in results if r.get("commits") is not None]
+    db_ms = [r["db_ms"] for r in results if r.get("db_ms") is not None]
+
+    return {
+        "target": url or "test-client",
+        "concurrency": concurrency,
+        "submissions": len(results),
+        "errors": len(errors),
+        "wall_seconds": round(wall_seconds, 3),
+        "throughput_per_second": round(len(results) / wall_seconds, 2) if wall_seconds else None,
+        "latency_ms": {
+            "mean": round(statistics.fmean(latencies), 3) if latencies else None,
+            "p50": percentile(latencies, 50),
+            "p90": percentile(latencies, 90),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+            "max": latencies[-1] if latencies else None,
+        },
+        "queries_per_submission": _summarize(queries),
+        "commits_per_submission": _summarize(commits),
+        "db_ms_per_submission": _summarize(db_ms),
+        "handlers": handlers,
+    }
+
+
+def _lookup(report: dict, dotted: str):
+    value = report
+    for part in dotted.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def compare_reports(current: dict, baseline: dict, max_regression_pct: float) -> tuple[list[dict], bool]:
+    """
+    Compare current against baseline. Returns one row per metric and whether any
+    gated metric regressed by more than max_regression_pct.
+    """
+    rows, regressed = [], False
+    for metric in COMPARED_METRICS:
+        before, after = _lookup(baseline, metric), _lookup(current, metric)
+        if before is None or after is None:
+            continue
+        change_pct = ((after - before) / before * 100) if before else (0.0 if after == before else float("inf"))
+        failed = metric in GATED_METRICS and change_pct > max_regression_pct
+        regressed = regressed or failed
+        rows.append({"metric": metric, "baseline": before, "current": after,
+                     "change_pct": round(change_pct, 1), "regressed": failed})
+    return rows, regressed
+
+
+def _print_report(report: dict) -> None:
+    lat = report["latency_ms"]
+    q, c = report["queries_per_submission"], report["commits_per_submission"]
+    print(f"Replayed {report['submissions']} submissions against {report['target']} "
+          f"(concurrency {report['concurrency']}) in {report['wall_seconds']}s; {report['errors']} errors")
+    print(f"  throughput : {report['throughput_per_second']} submissions/s")
+    print(f"  latency ms : p50={lat['p50']:.1f} p90={lat['p90']:.1f} p95={lat['p95']:.1f} p99={lat['p99']:.1f} max={lat['max']:.1f}")
+    if q["mean"] is not None:
+        print(f"  queries    : mean={q['mean']} p95={q['p95']} max={q['max']}")
+        print(f"  commits    : mean={c['mean']} p95={c['p95']} max={c['max']}")
+    else:
+        print("  queries    : unavailable (start the server with QUERY_STATS_HEADERS=1)")
+    for name, row in (report.get("handlers") or {}).items():
+        print(f"  {name:<28} mean={row['mean_ms']:.1f}ms queries={row['queries_per_call']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a submission workload and report performance")
+    parser.add_argument("workload", help="NDJSON workload file")
+    parser.add_argument("--url", help="Base URL of a running server; default replays in-process")
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--limit", type=int, help="Only replay the first N submissions")
+    parser.add_argument("--keep-request-ids", action="store_true",
+                        help="Send captured request_ids unchanged (exercises the duplicate guard on reruns)")
+    parser.add_argument("--output", help="Write the JSON report here")
+    parser.add_argument("--baseline", help="Previous JSON report to compare against")
+    parser.add_argument("--max-regression", type=float, default=10.0,
+                        help="Fail if p95 latency or queries/submission regress by more than this percent")
+    args = parser.parse_args()
+
+    report = run_replay(load_workload(args.workload, args.limit), args.url, args.concurrency, args.keep_request_ids)
+    _print_report(report)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote report to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        rows, regressed = compare_reports(report, baseline, args.max_regression)
+        print("Comparison with baseline:")
+        for row in rows:
+            flag = "  REGRESSED" if row["regressed"] else ""
+            print(f"  {row['metric']:<32} {row['baseline']:>10} -> {row['current']:>10} ({row['change_pct']:+.1f}%){flag}")
+        if regressed:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""
+Micro-benchmark for SP3 SaveData decoding and encoding.
+
+Builds mid-game team blobs (a few dozen challenges of tile progress, a full item
+list, buffs and a roll in progress) and times, best of --repeat runs, the eager
+SaveData that decoded every key up front against the lazily decoded one:
+  - progress_read: from_dict and read the standings fields, as /events/<id>/progress does
+  - submission: from_dict, record a drop in tileProgress, award coins, to_dict
+  - round_trip: from_dict then to_dict, nothing changed
+Peak traced allocation for one pass over all teams, with their SaveData objects
+kept alive, is reported alongside.
+
+Usage:
+    python benchmarks/save_data.py [--teams 500] [--repeat 5] [--output result.json]
+
+No database connection is needed.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+import uuid
+
+# Add the project root directory to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(project_root)
+
+import app  # noqa: F401 - imports the endpoints (and through them save_data) in the usual order
+from event_handlers.stability_party.save_data import Equipment, RollState, SaveData
+
+
+class LegacySaveData:
+    """SaveData.from_dict / to_dict as they were before fields were decoded lazily."""
+
+    @staticmethod
+    def from_dict(data: dict) -> "LegacySaveData":
+        save_data = LegacySaveData()
+        save_data.previousTile = uuid.UUID(data["previousTile"]) if data.get("previousTile") else None
+        save_data.currentTile = uuid.UUID(data["currentTile"]) if data.get("currentTile") else None
+        save_data.currentChallenges = [uuid.UUID(challenge_id) if challenge_id else None for challenge_id in data.get("currentChallenges", [])]
+        save_data.stars = data.get("stars", 0)
+        save_data.coins = data.get("coins", 0)
+        save_data.islandId = uuid.UUID(data["islandId"]) if data.get("islandId") else None
+        save_data.islandLaps = data.get("islandLaps", 0)
+        save_data.itemList = data.get("itemList", [])
+        save_data.pendingItemActivation = data.get("pendingItemActivation", {})
+        save_data.equipment = Equipment.from_dict(data.get("equipment", {}) if "equipment" in data else {})
+        save_data.dice = data.get("dice", [])
+        save_data.modifier = data.get("modifier", 0)
+        save_data.isTileCompleted = data.get("isTileCompleted", False)
+        save_data.isRolling = data.get("isRolling", False)
+        save_data.buffs = data.get("buffs", [])
+        save_data.debuffs = data.get("debuffs", [])
+        save_data.textChannelId = data.get("textChannelId", "")
+        save_data.voiceChannelId = data.get("voiceChannelId", "")
+        save_data.tileProgress = {
+            challenge_id: {task_id: progress for task_id, progress in tasks.items()}
+            for challenge_id, tasks in data.get("tileProgress", {}).items()
+        }
+        save_data.roll_state = RollState.from_save_data(
+            event_id=data.get("event_id"),
+            team_id=data.get("team_id"),
+            save_data=data.get("roll_state", {})
+        ) if "roll_state" in data else None
+        return save_data
+
+    def to_dict(self) -> dict:
+        return {
+            "previousTile": str(self.previousTile) if self.previousTile else None,
+            "currentTile": str(self.currentTile) if self.currentTile else None,
+            "currentChallenges": [str(challenge_id) for challenge_id in self.currentChallenges],
+            "stars": self.stars,
+            "coins": self.coins,
+            "islandId": str(self.islandId) if self.islandId else None,
+            "islandLaps": self.islandLaps,
+            "itemList": self.itemList,
+            "pendingItemActivation": self.pendingItemActivation,
+            "equipment": self.equipment.to_dict() if self.equipment else None,
+            "dice": self.dice,
+            "modifier": self.modifier,
+            "isTileCompleted": self.isTileCompleted,
+            "isRolling": self.isRolling,
+            "buffs": self.buffs,
+            "debuffs": self.debuffs,
+            "textChannelId": self.textChannelId,
+            "voiceChannelId": self.voiceChannelId,
+            "tileProgress": {
+                challenge_id: {task_id: progress for task_id, progress in tasks.items()}
+                for challenge_id, tasks in self.tileProgress.items()
+            },
+            "roll_state": self.roll_state.to_dict() if self.roll_state else None,
+        }
+
+
+def build_blobs(count: int, seed: int = 1) -> list[dict]:
+    rng = random.Random(seed)
+    event_id = str(uuid.UUID(int=rng.getrandbits(128)))
+    tiles = [str(uuid.UUID(int=rng.getrandbits(128))) for _ in range(60)]
+    challenges = [str(uuid.UUID(int=rng.getrandbits(128))) for _ in range(40)]
+    blobs = []
+    for i in range(count):
+        path = rng.sample(tiles, 12)
+        blobs.append({
+            "previousTile": path[0],
+            "currentTile": path[-1],
+            "currentChallenges": rng.sample(challenges, 3),
+            "stars": rng.randint(0, 5),
+            "coins": rng.randint(0, 400),
+            "islandId": str(uuid.UUID(int=rng.getrandbits(128))),
+            "islandLaps": rng.randint(0, 3),
+            "itemList": [{"id": f"item_{n}", "name": f"Item {n}", "uses": 1, "data": {"rarity": "rare"}} for n in range(3)],
+            "pendingItemActivation": {},
+            "equipment": {"helmet": "helm", "armor": "", "weapon": "whip", "jewelry": "", "cape": "fire cape"},
+            "dice": [6, 6],
+            "modifier": 1,
+            "isTileCompleted": False,
+            "isRolling": True,
+            "buffs": [{"type": "sailing_ticket", "uses": 1}, {"type": "dice_modifier", "value": 2, "uses": 2}],
+            "debuffs": [],
+            "textChannelId": str(100000000000000000 + i),
+            "voiceChannelId": str(200000000000000000 + i),
+            "tileProgress": {c: {f"task-{t}": rng.randint(0, 5) for t in range(3)} for c in rng.sample(challenges, 30)},
+            "roll_state": {
+                "event_id": event_id,
+                "team_id": str(uuid.UUID(int=rng.getrandbits(128))),
+                "starting_tile_id": path[-1],  # RollState.from_dict restores it as the current tile
+                "current_tile_id": path[-1],
+                "roll_total_for_turn": 12,
+                "roll_remaining": 0,
+                "dice_results_for_roll": [5, 6],
+                "modifier_for_roll": 1,
+                "path_taken_this_turn": path,
+                "action_required": "complete",
+                "action_data": {"message": "Roll completed. You've reached your destination!"},
+            },
+        })
+    return blobs
+
+
+# Each case keeps its SaveData objects alive, as a request handling every team does,
+# so the traced peak reflects what they hold rather than one blob at a time
+def _progress_read(cls, blobs):
+    saves = [cls.from_dict(blob) for blob in blobs]
+    for save in saves:
+        (save.stars, save.coins, save.currentTile, save.islandId, save.isTileCompleted)
+    return saves
+
+
+def _submission(cls, blobs):
+    saves = [cls.from_dict(blob) for blob in blobs]
+    for save in saves:
+        progress = save.tileProgress[next(iter(save.tileProgress))]
+        progress["task-0"] += 1
+        save.coins += 5
+        save.to_dict()
+    return saves
+
+
+def _round_trip(cls, blobs):
+    saves = [cls.from_dict(blob) for blob in blobs]
+    for save in saves:
+        save.to_dict()
+    return saves
+
+
+CASES = {"progress_read": _progress_read, "submission": _submission, "round_trip": _round_trip}
+
+
+def best_of(repeat: int, fn) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def peak_kib(fn) -> float:
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def run_benchmark(teams: int = 500, repeat: int = 5) -> dict:
+    blobs = build_blobs(teams)
+    assert [LegacySaveData.from_dict(b).to_dict() for b in blobs[:5]] == [SaveData.from_dict(b).to_dict() for b in blobs[:5]]
+
+    results = {}
+    for name, case in CASES.items():
+        before = lambda: case(LegacySaveData, blobs)
+        after = lambda: case(SaveData, blobs)
+        before_ms, after_ms = best_of(repeat, before), best_of(repeat, after)
+        results[name] = {
+            "before_ms": round(before_ms, 2),
+            "after_ms": round(after_ms, 2),
+            "speedup": round(before_ms / after_ms, 2) if after_ms else None,
+            "before_peak_kib": round(peak_kib(before), 1),
+            "after_peak_kib": round(peak_kib(after), 1),
+        }
+    return {"teams": teams, "repeat": repeat, "results": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SP3 SaveData decoding and encoding")
+    parser.add_argument("--teams", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="Write the report as JSON to this file")
+    args = parser.parse_args()
+
+    report = run_benchmark(args.teams, args.repeat)
+    print(f"{args.teams} team blobs, best of {args.repeat}")
+    print(f"{'case':<16}{'before ms':>12}{'after ms':>12}{'speedup':>10}{'before KiB':>12}{'after KiB':>12}")
+    for name, row in report["results"].items():
+        print(f"{name:<16}{row['before_ms']:>12.2f}{row['after_ms']:>12.2f}{row['speedup']:>9.2f}x"
+              f"{row['before_peak_kib']:>12.1f}{row['after_peak_kib']:>12.1f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+"""
+Seed active bingo, conquest and Stability Party events sized like a live event,
+wired to the players and triggers that appear in a workload.
+
+Usage:
+    python benchmarks/seed.py <workload.ndjson> [--teams 12] [--seed 0]
+    python benchmarks/seed.py --reset
+
+Every seeded event is named with the "[bench]" prefix; --reset deletes them (and
+their SP3 challenge definitions) so a database can be re-seeded. Users and
+new-system triggers are looked up before being created and are left in place on
+reset, since real rows of the same name may already exist.
+
+Point DATABASE_URL at a migrated scratch database: the handlers only consider the
+first active event of each type, so seeding next to real active events skews results.
+"""
+
+import argparse
+import os
+import random
+import sys
+from datetime import datetime, timedelta, timezone
+
+# Add the project root directory to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(project_root)
+
+from app import app, db
+from models.models import Users, Events, EventTeams, EventTeamMemberMappings, EventChallenges, EventTasks, EventTriggers
+from models.new_events import Event, Team, TeamMember, Tile, Task, Challenge, Trigger, Region, Territory
+from models.stability_party_3 import SP3Regions, SP3EventTiles, SP3EventTileChallengeMapping
+
+BENCH_PREFIX = "[bench]"
+
+# Live-event cardinality
+BINGO_TILES = 25
+BINGO_TASKS_PER_TILE = 3
+CONQUEST_REGIONS = 6
+CONQUEST_TERRITORIES_PER_REGION = 8
+SP3_REGIONS = 4
+SP3_TILES_PER_REGION = 10
+
+# Fraction of the workload's distinct triggers that count towards some challenge
+CHALLENGE_TRIGGER_FRACTION = 0.5
+
+
+def _distinct_players(submissions: list[dict]) -> list[tuple[str, str]]:
+    seen = {}
+    for payload in submissions:
+        rsn = payload.get("rsn")
+        if rsn and rsn.lower() not in seen:
+            seen[rsn.lower()] = (rsn, str(payload.get("id") or f"bench-{rsn.lower()}"))
+    return list(seen.values())
+
+
+def _distinct_triggers(submissions: list[dict]) -> list[tuple[str, str | None, str]]:
+    seen = {}
+    for payload in submissions:
+        if not payload.get("trigger"):
+            continue
+        key = (payload["trigger"], payload.get("source"), "KC" if payload.get("type") == "KC" else "DROP")
+        seen.setdefault(key, None)
+    return list(seen)
+
+
+def _get_or_create_user(rsn: str, discord_id: str) -> Users:
+    user = Users.query.filter_by(discord_id=discord_id).first()
+    if user is None:
+        user = Users(discord_id=discord_id, runescape_name=rsn, is_active=True, is_member=True,
+                     timestamp=datetime.now(timezone.utc))
+        db.session.add(user)
+    return user
+
+
+def _get_or_create_trigger(name: str, source: str | None, trigger_type: str) -> Trigger:
+    trigger = Trigger.query.filter_by(name=name, source=source, type=trigger_type).first()
+    if trigger is None:
+        trigger = Trigger(name=name, source=source, type=trigger_type)
+        db.session.add(trigger)
+    return trigger
+
+
+def _chunk(items: list, parts: int) -> list[list]:
+    return [items[i::parts] for i in range(parts)]
+
+
+def seed_bingo(users: list[Users], triggers: list[Trigger], teams: int, rng: random.Random, start, end) -> Event:
+    event = Event(name=f"{BENCH_PREFIX} Bingo", type="bingo", start_date=start, end_date=end)
+    db.session.add(event)
+    db.session.flush()
+
+    for i, members in enumerate(_chunk(users, teams)):
+        team = Team(event_id=event.id, name=f"Bingo Team {i + 1}")
+        db.session.add(team)
+        db.session.flush()
+        db.session.add_all(TeamMember(team_id=team.id, user_id=u.id) for u in members)
+
+    trigger_cycle = 0
+    for index in range(BINGO_TILES):
+        tile = Tile(event_id=event.id, name=f"Tile {index + 1}", index=index)
+        db.session.add(tile)
+        db.session.flush()
+        for t in range(BINGO_TASKS_PER_TILE):
+            task = Task(tile_id=tile.id, name=f"Tile {index + 1} Task {t + 1}", require_all=False)
+            db.session.add(task)
+            db.session.flush()
+            # 1-3 alternative challenges per task
+            for _ in range(rng.randint(1, 3)):
+                trigger = triggers[trigger_cycle % len(triggers)]
+                trigger_cycle += 1
+                db.session.add(Challenge(task_id=task.id, trigger_id=trigger.id, quantity=rng.choice((1, 1, 2, 3, 5)), value=1))
+    return event
+
+
+def seed_conquest(users: list[Users], triggers: list[Trigger], teams: int, rng: random.Random, start, end) -> Event:
+    event = Event(name=f"{BENCH_PREFIX} Conquest", type="conquest", start_date=start, end_date=end)
+    db.session.add(event)
+    db.session.flush()
+
+    for i, members in enumerate(_chunk(users, teams)):
+        team = Team(event_id=event.id, name=f"Conquest Team {i + 1}")
+        db.session.add(team)
+        db.session.flush()
+        db.session.add_all(TeamMember(team_id=team.id, user_id=u.id) for u in members)
+
+    # Shuffle so territories don't share the bingo tiles' trigger order
+    shuffled = list(triggers)
+    rng.shuffle(shuffled)
+    trigger_cycle = 0
+    for r in range(CONQUEST_REGIONS):
+        region = Region(event_id=event.id, name=f"Region {r + 1}")
+        db.session.add(region)
+        db.session.flush()
+        for t in range(CONQUEST_TERRITORIES_PER_REGION):
+            trigger = shuffled[trigger_cycle % len(shuffled)]
+            trigger_cycle += 1
+            challenge = Challenge(task_id=None, trigger_id=trigger.id, quantity=rng.choice((1, 2, 3, 5, 10)), value=1)
+            db.session.add(challenge)
+            db.session.flush()
+            db.session.add(Territory(region_id=region.id, name=f"Region {r + 1} Territory {t + 1}",
+                                     challenge_id=challenge.id, display_order=t))
+    return event
+
+
+def seed_stability_party(players: list[tuple[str, str]], trigger_defs: list[tuple], teams: int,
+                         rng: random.Random, start, end) -> Events:
+    event = Events(name=f"{BENCH_PREFIX} Stability Party", type="STABILITY_PARTY", start_time=start,
+                   end_time=end, data={}, timestamp=datetime.now(timezone.utc))
+    db.session.add(event)
+    db.session.flush()
+
+    shuffled = list(trigger_defs)
+    rng.shuffle(shuffled)
+    trigger_cycle = 0
+
+    def _legacy_challenge(task_count: int) -> EventChallenges:
+        nonlocal trigger_cycle
+        task_ids = []
+        for _ in range(task_count):
+            name, source, trigger_type = shuffled[trigger_cycle % len(shuffled)]
+            trigger_cycle += 1
+            trigger = EventTriggers(trigger=name, source=source or "", type=trigger_type)
+            db.session.add(trigger)
+            db.session.flush()
+            task = EventTasks(triggers=[str(trigger.id)], quantity=rng.choice((1, 2, 3)), value=1)
+            db.session.add(task)
+            db.session.flush()
+            task_ids.append(str(task.id))
+        challenge = EventChallenges(type="OR", tasks=task_ids, value=1)
+        db.session.add(challenge)
+        db.session.flush()
+        return challenge
+
+    tiles_by_region = []
+    for r in range(SP3_REGIONS):
+        region = SP3Regions(event_id=event.id, name=f"Island {r + 1}",
+                            challenges=[str(_legacy_challenge(2).id)], data={})
+        db.session.add(region)
+        db.session.flush()
+        region_tiles = []
+        for t in range(SP3_TILES_PER_REGION):
+            tile = SP3EventTiles(event_id=event.id, region_id=region.id, name=f"Island {r + 1} Tile {t + 1}", data={})
+            db.session.add(tile)
+            db.session.flush()
+            db.session.add(SP3EventTileChallengeMapping(tile_id=tile.id, challenge_id=_legacy_challenge(2).id, type="TILE", data={}))
+            region_tiles.append(tile)
+        tiles_by_region.append((region, region_tiles))
+
+    for i, members in enumerate(_chunk(players, teams)):
+        region, region_tiles = tiles_by_region[i % len(tiles_by_region)]
+        tile = rng.choice(region_tiles)
+        team = EventTeams(event_id=event.id, name=f"Party Team {i + 1}", data={
+            "currentTile": str(tile.id),
+            "islandId": str(region.id),
+            "currentChallenges": [],
+            "tileProgress": {},
+            "dice": [6],
+        })
+        db.session.add(team)
+        db.session.flush()
+        db.session.add_all(
+            EventTeamMemberMappings(event_id=event.id, team_id=team.id, username=rsn, discord_id=discord_id)
+            for rsn, discord_id in members
+        )
+    return event
+
+
+def seed_events(submissions: list[dict], teams: int = 12, seed: int = 0) -> dict:
+    """
+    Create one active event of each type for the workload's players and triggers.
+    Commits and returns the created event ids.
+    """
+    rng = random.Random(seed)
+    players = _distinct_players(submissions)
+    trigger_defs = _distinct_triggers(submissions)
+    if not players or not trigger_defs:
+        raise ValueError("Workload has no players or triggers to seed from")
+
+    challenge_trigger_defs = rng.sample(trigger_defs, max(1, int(len(trigger_defs) * CHALLENGE_TRIGGER_FRACTION)))
+    teams = max(1, min(teams, len(players)))
+    now = datetime.now(timezone.utc)
+    start, end = now - timedelta(days=1), now + timedelta(days=30)
+
+    users = [_get_or_create_user(rsn, discord_id) for rsn, discord_id in players]
+    triggers = [_get_or_create_trigger(*definition) for definition in challenge_trigger_defs]
+    db.session.flush()
+
+    bingo = seed_bingo(users, triggers, teams, rng, start, end)
+    conquest = seed_conquest(users, triggers, teams, rng, start, end)
+    party = seed_stability_party(players, challenge_trigger_defs, teams, rng, start.replace(tzinfo=None), end.replace(tzinfo=None))
+    db.session.commit()
+
+    return {"bingo": str(bingo.id), "conquest": str(conquest.id), "stability_party": str(party.id),
+            "players": len(players), "triggers": len(trigger_defs), "challenge_triggers": len(triggers), "teams": teams}
+
+
+def reset_events() -> int:
+    """Delete every [bench] event. Returns the number of events removed."""
+    removed = 0
+    for event in Event.query.filter(Event.name.startswith(BENCH_PREFIX)).all():
+        # Conquest root challenges hang off territories, not tasks, so they don't cascade
+        territory_challenges = [t.challenge_id for t in Territory.query.join(Region).filter(Region.event_id == event.id) if t.challenge_id]
+        db.session.delete(event)
+        db.session.flush()
+        if territory_challenges:
+            Challenge.query.filter(Challenge.id.in_(territory_challenges)).delete(synchronize_session=False)
+        removed += 1
+
+    for event in Events.query.filter(Events.name.startswith(BENCH_PREFIX)).all():
+        challenge_ids = [m.challenge_id for m in SP3EventTileChallengeMapping.query.join(SP3EventTiles).filter(SP3EventTiles.event_id == event.id)]
+        for region in SP3Regions.query.filter_by(event_id=event.id):
+            challenge_ids.extend(region.challenges or [])
+        challenges = EventChallenges.query.filter(EventChallenges.id.in_(challenge_ids)).all() if challenge_ids else []
+        task_ids = [task_id for c in challenges for task_id in (c.tasks or [])]
+        tasks = EventTasks.query.filter(EventTasks.id.in_(task_ids)).all() if task_ids else []
+        trigger_ids = [trigger_id for t in tasks for trigger_id in (t.triggers or [])]
+
+        db.session.delete(event)
+        db.session.flush()
+        for model, ids in ((EventChallenges, [c.id for c in challenges]), (EventTasks, [t.id for t in tasks]), (EventTriggers, trigger_ids)):
+            if ids:
+                model.query.filter(model.id.in_(ids)).delete(synchronize_session=False)
+        removed += 1
+
+    db.session.commit()
+    return removed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed benchmark events for a workload")
+    parser.add_argument("workload", nargs="?", help="NDJSON workload file")
+    parser.add_argument("--teams", type=int, default=12)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--reset", action="store_true", help="Delete previously seeded [bench] events and exit")
+    args = parser.parse_args()
+
+    from benchmarks.workload import load_workload
+
+    with app.app_context():
+        removed = reset_events()
+        if removed:
+            print(f"Removed {removed} existing benchmark events")
+        if args.reset:
+            return
+        if not args.workload:
+            parser.error("workload is required unless --reset is given")
+        summary = seed_events(load_workload(args.workload), teams=args.teams, seed=args.seed)
+        print(f"Seeded benchmark events: {summary}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Micro-benchmark for row serialization and JSON response encoding.
+
+Builds transient Users rows (UUID, datetimes, Numeric, ARRAY and JSONB columns)
+and times, best of --repeat runs:
+  - serialize: the per-row mapper walk Serializer used to do vs the compiled plan
+  - encode: json.dumps(cls=ModelEncoder) vs dumps_json, and Flask's default
+    jsonify provider vs FastJSONProvider
+
+Usage:
+    python benchmarks/serializer.py [--rows 5000] [--repeat 5] [--output result.json]
+
+No database connection is needed.
+"""
+
+import argparse
+import decimal
+import json
+import os
+import sys
+import time
+import uuid
+from datetime import date, datetime, timezone
+
+# Add the project root directory to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(project_root)
+
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy.inspection import inspect
+
+from app import app
+from helper.helpers import FastJSONProvider, ModelEncoder, dumps_json, orjson
+from models.models import Users
+
+
+def legacy_serialize(row) -> dict:
+    """Serializer.serialize as it was before plans were compiled per model."""
+    data = {}
+    for column in inspect(row).mapper.columns:
+        value = getattr(row, column.key)
+        if isinstance(value, uuid.UUID):
+            value = str(value)
+        elif isinstance(value, (datetime, date)):
+            value = value.isoformat()
+        data[column.key] = value
+    return data
+
+
+def build_rows(count: int) -> list[Users]:
+    now = datetime.now(timezone.utc)
+    return [
+        Users(
+            id=uuid.uuid4(), discord_id=str(100000000000000000 + i), runescape_name=f"Player {i}",
+            discord_avatar_url="https://i.imgur.com/4LdSYto.jpeg", previous_names=[f"Old {i}"], alt_names=[],
+            is_member=True, is_admin=False, rank="Member", rank_points=decimal.Decimal("12.5"),
+            progression_data={"diaries": {"ardougne": "elite"}, "cas": i % 7}, achievements=["Quest Cape"],
+            join_date=now, timestamp=now, is_active=True, diary_points=decimal.Decimal(3),
+            event_points=decimal.Decimal(0), time_points=decimal.Decimal(i), split_points=decimal.Decimal(0),
+            raid_tier_points=decimal.Decimal(1), settings={"theme": "dark"},
+        )
+        for i in range(count)
+    ]
+
+
+def best_of(repeat: int, fn) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def run_benchmark(rows: int = 5000, repeat: int = 5) -> dict:
+    users = build_rows(rows)
+    assert [legacy_serialize(u) for u in users[:10]] == [u.serialize() for u in users[:10]]
+    payload = [u.serialize() for u in users]
+    # Raw values too, as jsonify sees them in endpoints that build dicts by hand
+    raw_payload = [{"id": u.id, "timestamp": u.timestamp, "rank_points": u.rank_points, "name": u.runescape_name} for u in users]
+
+    default_provider = DefaultJSONProvider(app)
+    fast_provider = FastJSONProvider(app)
+    cases = {
+        "serialize": (
+            lambda: [legacy_serialize(u) for u in users],
+            lambda: [u.serialize() for u in users],
+        ),
+        "model_encoder_dumps": (
+            lambda: json.dumps(payload, cls=ModelEncoder),
+            lambda: dumps_json(payload),
+        ),
+        "jsonify_serialized": (
+            lambda: default_provider.dumps(payload, separators=(",", ":")),
+            lambda: fast_provider.dumps(payload),
+        ),
+        "jsonify_raw_values": (
+            lambda: default_provider.dumps(raw_payload, separators=(",", ":")),
+            lambda: fast_provider.dumps(raw_payload),
+        ),
+    }
+
+    results = {}
+    with app.app_context():
+        for name, (before, after) in cases.items():
+            before_ms, after_ms = best_of(repeat, before), best_of(repeat, after)
+            results[name] = {
+                "before_ms": round(before_ms, 2),
+                "after_ms": round(after_ms, 2),
+                "speedup": round(before_ms / after_ms, 2) if after_ms else None,
+            }
+    return {"rows": rows, "repeat": repeat, "orjson": orjson is not None, "results": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark model serialization and JSON encoding")
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="Write the report as JSON to this file")
+    args = parser.parse_args()
+
+    report = run_benchmark(args.rows, args.repeat)
+    print(f"{args.rows} rows, best of {args.repeat}, orjson {'installed' if report['orjson'] else 'not installed'}")
+    print(f"{'case':<22}{'before ms':>12}{'after ms':>12}{'speedup':>10}")
+    for name, row in report["results"].items():
+        print(f"{name:<22}{row['before_ms']:>12.2f}{row['after_ms']:>12.2f}{row['speedup']:>9.2f}x")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
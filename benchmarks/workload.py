@@ -0,0 +1,116 @@
+"""
+Submission workloads for the replay benchmarks.
+
+A workload is an NDJSON file of /events/submit payloads, one per line, either as
+written by the live capture hook ({"captured_at": ..., "payload": {...}}) or as
+bare payload objects.
+
+Usage:
+    python benchmarks/workload.py synthesize --output workload.ndjson [--submissions 2000] [--players 120] [--seed 0]
+    python benchmarks/workload.py anonymize <input.ndjson> <output.ndjson> [--salt <salt>]
+
+`synthesize` builds a workload at live-event cardinality when no capture is
+available: a skewed mix of common and rare drops and kills from ~120 players.
+`anonymize` rewrites an existing capture with stable pseudonyms.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import uuid
+
+# Add the project root directory to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(project_root)
+
+from helper.submission_capture import CAPTURE_SALT, anonymize_submission
+
+
+def load_workload(path: str, limit: int | None = None) -> list[dict]:
+    """Read submission payloads from an NDJSON workload file."""
+    submissions = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            submissions.append(record["payload"] if "payload" in record else record)
+            if limit is not None and len(submissions) >= limit:
+                break
+    return submissions
+
+
+def write_workload(path: str, submissions: list[dict]) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        for payload in submissions:
+            f.write(json.dumps({"payload": payload}) + "\n")
+
+
+def synthesize_workload(submissions: int = 2000, players: int = 120, triggers: int = 200, seed: int = 0) -> list[dict]:
+    """
+    Generate a synthetic workload. Trigger popularity follows a Zipf-like curve,
+    so a handful of common drops dominate and most challenge triggers are rare,
+    like a live event.
+    """
+    rng = random.Random(seed)
+    player_pool = [(f"Bench Player {i}", str(900000000000000000 + i)) for i in range(players)]
+    sources = [f"Bench Boss {i}" for i in range(max(triggers // 10, 1))]
+    trigger_pool = []
+    for i in range(triggers):
+        if i % 5 == 0:
+            trigger_pool.append({"trigger": sources[i // 10 % len(sources)], "source": None, "type": "KC"})
+        else:
+            trigger_pool.append({"trigger": f"Bench Item {i}", "source": sources[i % len(sources)], "type": "LOOT"})
+    weights = [1 / (rank + 1) for rank in range(len(trigger_pool))]
+
+    workload = []
+    for _ in range(submissions):
+        rsn, discord_id = rng.choice(player_pool)
+        trigger = rng.choices(trigger_pool, weights=weights)[0]
+        quantity = 1 if trigger["type"] == "KC" else rng.choice((1, 1, 1, 2, 5))
+        workload.append({
+            "rsn": rsn,
+            "id": discord_id,
+            "trigger": trigger["trigger"],
+            "source": trigger["source"],
+            "quantity": quantity,
+            "totalValue": rng.randint(1, 5_000_000) * quantity,
+            "type": trigger["type"],
+            "img_path": None,
+            "request_id": str(uuid.UUID(int=rng.getrandbits(128))),
+        })
+    return workload
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create or anonymize submission workloads")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    synth = subparsers.add_parser("synthesize", help="Generate a synthetic workload")
+    synth.add_argument("--output", required=True)
+    synth.add_argument("--submissions", type=int, default=2000)
+    synth.add_argument("--players", type=int, default=120)
+    synth.add_argument("--triggers", type=int, default=200)
+    synth.add_argument("--seed", type=int, default=0)
+
+    anon = subparsers.add_parser("anonymize", help="Anonymize a captured workload")
+    anon.add_argument("input")
+    anon.add_argument("output")
+    anon.add_argument("--salt", default=CAPTURE_SALT)
+
+    args = parser.parse_args()
+    if args.command == "synthesize":
+        workload = synthesize_workload(args.submissions, args.players, args.triggers, args.seed)
+        write_workload(args.output, workload)
+        print(f"Wrote {len(workload)} submissions to {args.output}")
+    else:
+        workload = [anonymize_submission(p, args.salt) for p in load_workload(args.input)]
+        write_workload(args.output, workload)
+        print(f"Anonymized {len(workload)} submissions to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
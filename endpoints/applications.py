@@ -2,7 +2,7 @@ from app import app, db
 from helper.helpers import ModelEncoder
 from helper.time_utils import parse_time_to_seconds
 from helper.set_discord_role import *
-from helper.discord_helper import create_discord_text_channel, set_discord_nickname, send_discord_dm
+from helper.discord_helper import queue_discord_text_channel, set_discord_nickname, send_discord_dm
 from flask import request
 from models.models import ClanApplications, Users, RaidTierApplication, RaidTiers, RaidTierLog, ClanRanks, RankApplications
 from models.models import DiaryApplications, DiaryTasks, ClanPointsLog, DiaryCompletionLog
@@ -72,9 +72,9 @@ def create_application():
                 application.status = "Pending"
                 application.verdict_timestamp = None
                 application.verdict_reason = None
-                db.session.commit()
                 add_discord_role(user, "Applied")
                 remove_discord_roles(user, ["Guest", "Applicant"])
+                db.session.commit()
                 return "Application status updated to pending", 200
         elif application.status == "Rejected":
             if (datetime.datetime.now(datetime.timezone.utc) - application.verdict_timestamp).days < 30:
@@ -99,11 +99,11 @@ def create_application():
     user.is_active = True
     user.time_points = 0
 
-    db.session.commit()
     add_discord_role(user, "Applied")
     remove_discord_roles(user, ["Guest", "Applicant"])
     set_discord_nickname(user.discord_id, data.runescape_name)
-    create_discord_text_channel(channel_name=f"{data.runescape_name}-application", category="Applications", role_name_list=["Staff"], user_id_list=[data.user_id])
+    queue_discord_text_channel(channel_name=f"{data.runescape_name}-application", category="Applications", role_name_list=["Staff"], user_id_list=[data.user_id])
+    db.session.commit()
     return json.dumps(data.serialize(), cls=ModelEncoder)
 
 @app.route("/applications/<id>", methods=['GET'])
@@ -423,8 +423,8 @@ def accept_application_diary(id):
             new_diary_progress.time_split = None
             new_diary_progress.timestamp = datetime.datetime.now(datetime.timezone.utc)
             db.session.add(new_diary_progress)
-            db.session.commit()
             _notify_application_result("diary", id, "Accepted", application.user_id)
+            db.session.commit()
             return "Diary application accepted", 200
 
     for i, user_id in enumerate(users):
@@ -506,8 +506,8 @@ def accept_application_diary(id):
                 update_failed.append(user_id)
                 continue
 
-    db.session.commit()
     _notify_application_result("diary", id, "Accepted", application.user_id)
+    db.session.commit()
 
     return_json = {
         "successful": update_successful,
@@ -530,8 +530,8 @@ def reject_application_diary(id):
     application.verdict_reason = verdict_reason or "No reason provided"
     application.verdict_timestamp = datetime.datetime.now(datetime.timezone.utc)
 
-    db.session.commit()
     _notify_application_result("diary", id, "Rejected", application.user_id, application.verdict_reason)
+    db.session.commit()
     return "Application rejected", 200
 
 
@@ -665,8 +665,8 @@ def accept_application_raid_tier(id):
             message=f"Raid Tier: {target_raid_tier.tier_name} {target_raid_tier.tier_order}"
         )
 
-    db.session.commit()
     _notify_application_result("raidTier", id, "Accepted", application.user_id)
+    db.session.commit()
     return "Application accepted", 200
 
 
@@ -684,8 +684,8 @@ def reject_application_raid_tier(id):
     verdict_reason = body.get("verdict_reason") if body else None
     application.verdict_reason = verdict_reason or "No reason provided"
     application.verdict_timestamp = datetime.datetime.now(datetime.timezone.utc)
-    db.session.commit()
     _notify_application_result("raidTier", id, "Rejected", application.user_id, application.verdict_reason)
+    db.session.commit()
     return "Application rejected", 200
 
 @app.route("/applications/rank", methods=['GET'])
@@ -800,8 +800,8 @@ def accept_rank_application(id):
     # Add new rank discord role
     add_discord_roles(user, [user.rank])
 
-    db.session.commit()
     _notify_application_result("rank", id, "Accepted", application.user_id)
+    db.session.commit()
     return "Application accepted", 200
 
 @app.route("/applications/rank/<id>/reject", methods=['PUT'])
@@ -821,6 +821,6 @@ def reject_rank_application(id):
     verdict_reason = body.get("verdict_reason") if body else None
     application.verdict_reason = verdict_reason or "No reason provided"
     application.verdict_timestamp = datetime.datetime.now(datetime.timezone.utc)
-    db.session.commit()
     _notify_application_result("rank", id, "Rejected", application.user_id, application.verdict_reason)
+    db.session.commit()
     return "Application rejected", 200
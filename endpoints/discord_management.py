@@ -5,6 +5,9 @@ import os
 import requests
 from dotenv import load_dotenv
 from typing import Optional, List, Dict, Any
+from sqlalchemy import text
+from helper.discord_outbox import requeue_outbox_rows
+from helper.http_client import http_client
 
 load_dotenv()
 
@@ -44,7 +47,7 @@ def create_text_channel():
         }
         
         # Make API request
-        response = requests.post(url, json=json_data)
+        response = http_client().post(url, json=json_data)
         response.raise_for_status()
         
         channel_data = response.json()
@@ -97,7 +100,7 @@ def create_voice_channel():
         }
         
         # Make API request
-        response = requests.post(url, json=json_data)
+        response = http_client().post(url, json=json_data)
         response.raise_for_status()
         
         channel_data = response.json()
@@ -152,7 +155,7 @@ def create_role():
                 json_data[field] = data[field]
         
         # Make API request
-        response = requests.post(url, json=json_data)
+        response = http_client().post(url, json=json_data)
         response.raise_for_status()
         
         role_data = response.json()
@@ -197,7 +200,7 @@ def delete_role():
         }
         
         # Make API request
-        response = requests.delete(url, json=json_data)
+        response = http_client().delete(url, json=json_data)
         response.raise_for_status()
         
         return jsonify({
@@ -208,4 +211,55 @@ def delete_role():
         return jsonify({"error": f"Discord API error: {str(e)}"}), 500
     except Exception as e:
         logging.error(f"Error deleting role: {str(e)}")
-        return jsonify({"error": str(e)}), 500
\ No newline at end of file
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/discord/outbox", methods=['GET'])
+def get_discord_outbox():
+    """
+    List queued Discord calls, newest first. Defaults to dead-lettered rows.
+
+    Query params:
+        status: pending, sent or dead (default dead)
+        limit: max rows to return (default 50, max 500)
+    """
+    status = request.args.get("status", "dead")
+    if status not in ("pending", "sent", "dead"):
+        return jsonify({"error": "status must be one of pending, sent, dead"}), 400
+    try:
+        limit = min(int(request.args.get("limit", 50)), 500)
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+
+    rows = db.session.execute(text("""
+        SELECT id, target, method, url, rate_key, status, attempts, next_attempt_at, last_error, created_at, sent_at
+        FROM new_stability.discord_outbox
+        WHERE status = :status
+        ORDER BY id DESC
+        LIMIT :limit
+    """), {"status": status, "limit": limit}).mappings().all()
+    counts = dict(db.session.execute(text(
+        "SELECT status, COUNT(*) FROM new_stability.discord_outbox GROUP BY status"
+    )).all())
+
+    return jsonify({
+        "counts": {state: counts.get(state, 0) for state in ("pending", "sent", "dead")},
+        "data": [{
+            **row,
+            # Webhook urls carry their token; the rate key identifies them well enough
+            "url": row["url"] if row["target"] == "bot" else None,
+            "next_attempt_at": row["next_attempt_at"].isoformat() if row["next_attempt_at"] else None,
+            "created_at": row["created_at"].isoformat() if row["created_at"] else None,
+            "sent_at": row["sent_at"].isoformat() if row["sent_at"] else None,
+        } for row in rows],
+    }), 200
+
+
+@app.route("/discord/outbox/<int:outbox_id>/retry", methods=['POST'])
+def retry_discord_outbox(outbox_id):
+    """Re-queue a dead (or stuck pending) Discord call with a fresh attempt budget."""
+    if not requeue_outbox_rows([outbox_id], db.session):
+        db.session.rollback()
+        return jsonify({"error": "Outbox entry not found or already sent"}), 404
+    db.session.commit()
+    return jsonify({"message": "Outbox entry re-queued", "id": outbox_id}), 200
@@ -5,6 +5,7 @@ from models.models import EventChallenges, EventTasks, EventTriggers, Events, Ev
 from models.new_events import Event
 from datetime import datetime, timezone
 from helper.helpers import ModelEncoder
+from helper.query_stats import query_budget
 import json
 import logging
 
@@ -28,6 +29,7 @@ def get_bingo_teams():
     return jsonify(data), 200
 
 @app.route("/board", methods=['GET'])
+@query_budget(max_queries=25, max_ms=250)
 def get_bingo_board():
     # Find the latest bingo event
     event = Events.query.filter(
@@ -3,9 +3,21 @@ from flask import request, jsonify
 from models.models import Events, EventTeams
 from datetime import datetime, timezone
 from helper.helpers import ModelEncoder
+from event_handlers.stability_party.drop_log import event_drop_logs
 import json
 import logging
 
+def _serialize_with_drop_logs(events: list[Events]) -> list[dict]:
+    """Serialize events, filling Stability Party data["log"] from the drop totals table"""
+    logs = event_drop_logs([event.id for event in events if event.type == "STABILITY_PARTY"], db.session)
+    serialized = []
+    for event in events:
+        event_data = event.serialize()
+        if event.id in logs:
+            event_data["data"] = {**(event_data.get("data") or {}), "log": logs[event.id]}
+        serialized.append(event_data)
+    return serialized
+
 @app.route("/events", methods=['GET'])
 def get_events():
     """
@@ -41,7 +53,7 @@ def get_events():
         # Order by start time
         events = query.order_by(Events.start_time).all()
             
-        return json.dumps([event.serialize() for event in events], cls=ModelEncoder), 200
+        return json.dumps(_serialize_with_drop_logs(events), cls=ModelEncoder), 200
     except Exception as e:
         logging.error(f"Error getting events: {str(e)}")
         return jsonify({"error": str(e)}), 500
@@ -54,7 +66,7 @@ def get_event_by_id(event_id):
         if not event:
             return jsonify({"error": "Event not found"}), 404
             
-        event_data = event.serialize()
+        event_data = _serialize_with_drop_logs([event])[0]
         
         # Add status field and time remaining
         now = datetime.now(timezone.utc)
@@ -1,81 +1,23 @@
 from app import app, db
 from flask import request, jsonify
-from models.models import Events, EventTeams, EventTeamMemberMappings, EventTriggers, EventTasks, EventChallenges
-from models.stability_party_3 import SP3Regions, SP3EventTiles, SP3EventTileChallengeMapping
+from models.models import Events, EventTeams, EventTeamMemberMappings
+from models.stability_party_3 import SP3Regions, SP3EventTiles
 from event_handlers.stability_party.stability_party_handler import SaveData, is_shop_tile, is_star_tile, is_dock_tile
+from event_handlers.stability_party.board_graph import get_board_graph
+from event_handlers.stability_party.progress_loader import event_standings, load_progress
 import logging
 import json
 from datetime import datetime, timezone
 from helper.helpers import ModelEncoder
+from helper.query_stats import query_budget
 
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
 
 
-def get_tile_name(tile_id):
-    tile = SP3EventTiles.query.filter_by(id=tile_id).first()
-    return tile.name if tile else "Unknown Tile"
-
 def get_region_name(region_id):
     region = SP3Regions.query.filter_by(id=region_id).first()
     return region.name if region else "Unknown Region"
 
-def get_tile_description(tile_id):
-    tile = SP3EventTiles.query.filter_by(id=tile_id).first()
-    return tile.description if tile else "No description available"
-
-def get_challenge_progress_string(challenge_id, tile_progress):
-    challenge = EventChallenges.query.filter_by(id=challenge_id).first()
-    if not challenge:
-        return "Unknown challenge"
-
-    task_strings = []
-
-    tasks = challenge.tasks
-    for task_id in tasks:
-        task = EventTasks.query.filter_by(id=task_id).first()
-        if task:
-            triggers = task.triggers
-            trigger_list = []
-            for trigger_id in triggers:
-                trigger = EventTriggers.query.filter_by(id=trigger_id).first()
-                if trigger.type == "DROP":
-                    trigger_list.append(f"{trigger.trigger}{' from ' + trigger.source if trigger.source else ''}")
-                elif trigger.type == "KC":
-                    trigger_list.append(f"{trigger.trigger} KC")
-            triggers_message = " OR ".join(trigger_list)
-        
-            if str(challenge_id) in tile_progress:
-                progress = tile_progress[str(challenge_id)]
-                if task_id in progress:
-                    task_progress = progress[task_id]
-                    task_strings.append(f"{task_progress}/{task.quantity} {triggers_message}")
-                    continue
-            
-            task_strings.append(f"0/{task.quantity} {triggers_message}")
-
-    return task_strings
-
-def get_team_tile_challenges(save):
-    if save.currentChallenges:
-        return save.currentChallenges
-    
-    if save.currentTile:
-        challenges = SP3EventTileChallengeMapping.query.filter_by(
-            tile_id=save.currentTile,
-            type="TILE"
-        ).all()
-
-        return [challenge.challenge_id for challenge in challenges]
-    
-    return []
-
-def get_team_regional_challenges(save):
-    region = SP3Regions.query.filter_by(id=save.islandId).first()
-    if not region:
-        return []
-    
-    return region.challenges if region.challenges else []
-
 @app.route("/events/<event_id>/users/<discord_id>/team", methods=['GET'])
 def get_user_team(event_id, discord_id):
     """Get the team associated with a Discord ID"""
@@ -101,6 +43,7 @@ def get_user_team(event_id, discord_id):
         return jsonify({"error": str(e)}), 500
 
 @app.route("/events/<event_id>/teams/<team_id>/stats", methods=['GET'])
+@query_budget(max_queries=25, max_ms=250)
 def get_team_stats(event_id, team_id):
     """Get the current stats for a team"""
     try:
@@ -204,6 +147,7 @@ def get_team_stats(event_id, team_id):
         return jsonify({"error": str(e)}), 500
 
 @app.route("/events/<event_id>/teams/<team_id>/tile-progress", methods=['GET'])
+@query_budget(max_queries=25, max_ms=250)
 def get_team_tile_progress(event_id, team_id):
     """Get the current tile progress for a team"""
     try:
@@ -220,26 +164,16 @@ def get_team_tile_progress(event_id, team_id):
         # Get team data
         save = SaveData.from_dict(team.data)
 
-        tile_challenges = get_team_tile_challenges(save)
-        region_challenges = get_team_regional_challenges(save)
-
-        tile_progress = []
-        for challenge in tile_challenges:
-            progress_strings = get_challenge_progress_string(challenge, save.tileProgress)
-            for progress_string in progress_strings:
-                tile_progress.append(progress_string)
-
-        region_progress = []
-        for challenge in region_challenges:
-            progress_strings = get_challenge_progress_string(challenge, save.tileProgress)
-            for progress_string in progress_strings:
-                region_progress.append(progress_string)
+        progress = load_progress(event_id, [save])
+        tile_progress, region_progress = progress.team_progress(save)
+        tile = progress.graph.tile(save.currentTile)
+        region = progress.graph.region(save.islandId)
 
         response = {
             "team_name": team.name,
-            "current_tile": get_tile_name(save.currentTile),
-            "current_region": get_region_name(save.islandId),
-            "tile_description": get_tile_description(save.currentTile),
+            "current_tile": tile.name if tile else "Unknown Tile",
+            "current_region": region.name if region else "Unknown Region",
+            "tile_description": tile.description if tile else "No description available",
             "tile_progress": tile_progress,
             "region_progress": region_progress,
             "is_tile_completed": save.isTileCompleted,
@@ -252,6 +186,7 @@ def get_team_tile_progress(event_id, team_id):
         return jsonify({"error": str(e)}), 500
     
 @app.route("/events/<event_id>/teams/<team_id>/total-progress", methods=['GET'])
+@query_budget(max_queries=25, max_ms=250)
 def get_team_total_progress(event_id, team_id):
     """Get the total progress of a team in the event"""
     try:
@@ -268,38 +203,6 @@ def get_team_total_progress(event_id, team_id):
         # Get team data
         save = SaveData.from_dict(team.data)
 
-        def get_challenge_progress_string(challenge_id, tile_progress):
-            challenge = EventChallenges.query.filter_by(id=challenge_id).first()
-            if not challenge:
-                return "Unknown challenge"
-
-            task_strings = []
-
-            tasks = challenge.tasks
-            for task_id in tasks:
-                task = EventTasks.query.filter_by(id=task_id).first()
-                if task:
-                    triggers = task.triggers
-                    trigger_list = []
-                    for trigger_id in triggers:
-                        trigger = EventTriggers.query.filter_by(id=trigger_id).first()
-                        if trigger.type == "DROP":
-                            trigger_list.append(f"{trigger.trigger}{' from ' + trigger.source if trigger.source else ''}")
-                        elif trigger.type == "KC":
-                            trigger_list.append(f"{trigger.trigger} KC")
-                    triggers_message = " OR ".join(trigger_list)
-                
-                    if str(challenge_id) in tile_progress:
-                        progress = tile_progress[str(challenge_id)]
-                        if task_id in progress:
-                            task_progress = progress[task_id]
-                            task_strings.append(f"{task_progress}/{task.quantity} {triggers_message}")
-                            continue
-                    
-                    task_strings.append(f"0/{task.quantity} {triggers_message}")
-
-            return task_strings
-
         # Get all tile progress
         for challenge_id, tasks in save.tileProgress.items():
             for task_id, task_progress in tasks.items():
@@ -323,6 +226,7 @@ def get_team_total_progress(event_id, team_id):
         return jsonify({"error": str(e)}), 500
 
 @app.route("/events/<event_id>/progress", methods=['GET'])
+@query_budget(max_queries=25, max_ms=250)
 def get_event_progress(event_id):
     """Get the overall progress of the event including team standings"""
     try:
@@ -339,49 +243,10 @@ def get_event_progress(event_id):
             time_delta = end_time - now
             time_remaining = max(0, time_delta.total_seconds())
         
-        # Get all teams for this event
-        teams = EventTeams.query.filter_by(event_id=event_id).all()
-        
-        # Prepare team standings
-        standings = []
-        for team in teams:
-            save = SaveData.from_dict(team.data)
-            
-            # Get current tile information
-            current_tile = SP3EventTiles.query.filter_by(
-                event_id=event_id, 
-                tile_number=save.currentTile
-            ).first()
-            
-            # Get current region information  
-            current_region = SP3Regions.query.filter_by(
-                event_id=event_id,
-                id=save.islandId
-            ).first()
-            
-            region_name = current_region.name if current_region else "Unknown"
-            
-            standings.append({
-                "team_id": str(team.id),
-                "team_name": team.name,
-                "stars": save.stars,
-                "coins": save.coins,
-                "current_tile": save.currentTile,
-                "current_region": region_name,
-                "tile_completed": save.isTileCompleted
-            })
-        
-        # Sort by stars (descending) and then by coins (descending)
-        standings.sort(key=lambda x: (x["stars"], x["coins"]), reverse=True)
-        
-        # Add ranking to each team
-        for i, team in enumerate(standings):
-            team["rank"] = i + 1
-        
-        # Get event regions/islands
-        regions = SP3Regions.query.filter_by(event_id=event_id).all()
+        # Team standings and regions come from in-memory views kept current on writes
+        standings = event_standings(event_id)
         region_info = []
-        for region in regions:
+        for region in get_board_graph(event_id).regions.values():
             region_info.append({
                 "id": str(region.id),
                 "name": region.name,
@@ -397,7 +262,7 @@ def get_event_progress(event_id):
             "time_remaining_seconds": time_remaining,
             "regions": region_info,
             "team_standings": standings,
-            "total_teams": len(teams)
+            "total_teams": len(standings)
         }
         
         return jsonify(response), 200
@@ -3,6 +3,8 @@ from flask import request, jsonify
 from models.models import Events, EventTeams, EventTeamMemberMappings, Users
 from models.stability_party_3 import SP3Regions, SP3EventTiles, SP3EventTileChallengeMapping
 from event_handlers.stability_party.stability_party_handler import SaveData, save_team_data
+from event_handlers.stability_party.save_data import restore_team_data
+from event_handlers.stability_party.team_history import latest_version, team_state_at, team_versions
 from sqlalchemy.orm.attributes import flag_modified
 from helper.discord_helper import create_discord_role, create_discord_text_channel, create_discord_voice_channel
 from helper.set_discord_role import add_discord_role
@@ -280,11 +282,11 @@ def add_player_to_team(event_id, team_id):
             )
             db.session.add(alt_member)
 
-        db.session.commit()
-
         # FIXME: Add discord role using the role ID in the future
         add_discord_role(user, team.name)
 
+        db.session.commit()
+
         return jsonify({
             "message": "Player added to team successfully",
             "member_id": str(member.id),
@@ -405,7 +407,7 @@ def force_complete_tile(event_id, team_id):
         save.currentChallenges = []
         
         # Save the updated team data
-        save_team_data(team, save)
+        save_team_data(team, save, reason="moderation:complete_tile")
         
         return jsonify({"message": "Tile marked as completed successfully"}), 200
     except Exception as e:
@@ -441,7 +443,7 @@ def set_team_stars(event_id, team_id):
         save.stars = int(data["stars"])
         
         # Save the updated team data
-        save_team_data(team, save)
+        save_team_data(team, save, reason="moderation:stars", absolute=("stars",))
         
         return jsonify({"message": "Team stars updated successfully"}), 200
     except Exception as e:
@@ -477,7 +479,7 @@ def set_team_coins(event_id, team_id):
         save.coins = int(data["coins"])
         
         # Save the updated team data
-        save_team_data(team, save)
+        save_team_data(team, save, reason="moderation:coins", absolute=("coins",))
         
         return jsonify({"message": "Team coins updated successfully"}), 200
     except Exception as e:
@@ -523,7 +525,7 @@ def move_team_to_tile(event_id, team_id):
             save.currentChallenges = []
         
         # Save the updated team data
-        save_team_data(team, save)
+        save_team_data(team, save, reason="moderation:move_to_tile")
         
         tile = SP3EventTiles.query.filter_by(id=save.currentTile).first()
 
@@ -547,16 +549,66 @@ def undo_team_roll(event_id, team_id):
         if not team:
             return jsonify({"error": "Team not found or does not belong to this event"}), 404
         
-        # Load team data
-        save = SaveData.from_dict(team.data)
+        # The turn started with the version its roll was saved as; go back to the one before it
+        roll_version = latest_version(db.session, team.id, reason="roll")
+        if not roll_version or roll_version == 1:
+            return jsonify({"error": "No recorded roll to undo"}), 400
 
-        # TODO: Undo roll logic
-        
-        # Save the updated team data
-        save_team_data(team, save)
+        version = restore_team_data(team, roll_version - 1, reason=f"undo-roll:{roll_version}")
         
-        return jsonify({"message": "Team's last roll undone successfully"}), 200
+        return jsonify({"message": "Team's last roll undone successfully", "restored_version": roll_version - 1,
+                        "version": version}), 200
     except Exception as e:
         db.session.rollback()
         logging.error(f"Error undoing team roll: {str(e)}")
         return jsonify({"error": str(e)}), 500
+
+@app.route("/events/<event_id>/moderation/teams/<team_id>/history", methods=['GET'])
+def get_team_history(event_id, team_id):
+    """List a team's saved versions, newest first"""
+    try:
+        team = EventTeams.query.filter_by(id=team_id, event_id=event_id).first()
+        if not team:
+            return jsonify({"error": "Team not found or does not belong to this event"}), 404
+
+        limit = min(request.args.get("limit", 50, type=int), 500)
+        versions = team_versions(db.session, team.id, limit=limit, before_version=request.args.get("before", type=int))
+        return json.dumps({"team_id": str(team.id), "versions": versions}, cls=ModelEncoder), 200
+    except Exception as e:
+        logging.error(f"Error getting team history: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route("/events/<event_id>/moderation/teams/<team_id>/history/<int:version>", methods=['GET'])
+def get_team_version(event_id, team_id, version):
+    """Get a team's save data as of one version"""
+    try:
+        team = EventTeams.query.filter_by(id=team_id, event_id=event_id).first()
+        if not team:
+            return jsonify({"error": "Team not found or does not belong to this event"}), 404
+
+        data = team_state_at(db.session, team.id, version)
+        if data is None:
+            return jsonify({"error": f"Version {version} not found for this team"}), 404
+        return jsonify({"team_id": str(team.id), "version": version, "data": data}), 200
+    except Exception as e:
+        logging.error(f"Error getting team version: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route("/events/<event_id>/moderation/teams/<team_id>/history/<int:version>/restore", methods=['POST'])
+def restore_team_version(event_id, team_id, version):
+    """Put a team back to its save data as of one version"""
+    try:
+        team = EventTeams.query.filter_by(id=team_id, event_id=event_id).first()
+        if not team:
+            return jsonify({"error": "Team not found or does not belong to this event"}), 404
+
+        try:
+            new_version = restore_team_data(team, version)
+        except LookupError:
+            return jsonify({"error": f"Version {version} not found for this team"}), 404
+
+        return jsonify({"message": f"Team restored to version {version}", "version": new_version}), 200
+    except Exception as e:
+        db.session.rollback()
+        logging.error(f"Error restoring team version: {str(e)}")
+        return jsonify({"error": str(e)}), 500
@@ -1,5 +1,6 @@
 from app import app, db
 from helper.helpers import ModelEncoder
+from helper.submission_capture import capture_submission
 from flask import request
 from event_handlers.event_handler import EventHandler, EventSubmission  # Import the centralized event handler system
 import json
@@ -32,6 +33,8 @@ def submit_event():
     if data is None:
         return "No JSON received", 400
 
+    capture_submission(data)
+
     # Convert the incoming data to an EventSubmission object
     event_submission = EventSubmission(
         rsn=data.get("rsn"),
@@ -0,0 +1,13 @@
+from app import app
+from flask import Response, jsonify
+from helper.metrics import REGISTRY
+from helper.response_cache import response_cache
+
+@app.route("/metrics", methods=['GET'])
+def get_metrics():
+    return Response(REGISTRY.render(), mimetype="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.route("/metrics/cache", methods=['GET'])
+def get_response_cache_stats():
+    return jsonify(response_cache.stats()), 200
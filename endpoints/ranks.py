@@ -1,10 +1,12 @@
 from app import app, db
 from helper.helpers import ModelEncoder
+from helper.response_cache import cached_response
 from flask import request
 from models.models import ClanRanks
 import json
 
 @app.route("/ranks", methods=['GET'])
+@cached_response(tags=["ranks"])
 def get_all_ranks():
     ranks = ClanRanks.query.order_by(ClanRanks.rank_order).all()
     return json.dumps([rank.serialize() for rank in ranks], cls=ModelEncoder)
@@ -4,6 +4,7 @@ from flask import request, jsonify
 from models.models import Splits, Users
 import json
 import requests
+from helper.http_client import http_client
 from datetime import datetime, timezone
 from helper.clan_points_helper import increment_clan_points, PointTag
 import decimal
@@ -18,8 +19,11 @@ def create_split():
             'User-Agent': 'Stabilisite Backend',
             'From': 'stabilityosrs@gmail.com'
         }
-        mapping = requests.get(f"https://prices.runescape.wiki/api/v1/osrs/mapping", headers=headers)
-        if mapping.status_code != 200:
+        try:
+            mapping = http_client().get(f"https://prices.runescape.wiki/api/v1/osrs/mapping", headers=headers)
+        except requests.exceptions.RequestException:
+            mapping = None
+        if mapping is None or mapping.status_code != 200:
             return "Could not fetch item mapping from OSRS API. Please provide an item ID or try again later.", 500
         mapping = mapping.json()
         # mapping is an array of objects with id and name, sorted by name
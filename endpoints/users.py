@@ -1,5 +1,5 @@
 from app import app, db
-from helper.helpers import ModelEncoder
+from helper.helpers import ModelEncoder, dumps_json
 from helper.set_discord_role import add_discord_role, remove_discord_roles
 from flask import request
 from sqlalchemy import or_
@@ -18,7 +18,7 @@ def get_users():
     for row in users:
         if row.is_active:
             data.append(row.serialize())
-    return json.dumps(data, cls=ModelEncoder)
+    return dumps_json(data)
 
 @app.route("/users", methods=['POST'])
 def create_user():
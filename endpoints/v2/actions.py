@@ -1,8 +1,9 @@
-from app import app
+from app import app, db
 from flask import request, jsonify
 from models.new_events import Action
 from services.crud_service import CRUDService
 from services.action_processor import ActionProcessor
+from services.conquest_service import retract_player_action
 from helper.helpers import ModelEncoder
 import json
 import logging
@@ -22,13 +23,19 @@ def get_actions():
     if request.args.get('name'):
         filters['name'] = request.args.get('name')
 
-    actions, total = CRUDService.get_all(Action, filters=filters, page=page, per_page=per_page, order_by=order_by)
+    cursor = request.args.get('cursor')
+    total_mode = request.args.get('total', 'exact')
+    try:
+        actions, total, next_cursor = CRUDService.get_all(Action, filters=filters, page=page, per_page=per_page, order_by=order_by, cursor=cursor, total_mode=total_mode)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
     return jsonify({
         'data': [action.serialize() for action in actions],
         'total': total,
         'page': page,
-        'per_page': per_page
+        'per_page': per_page,
+        'next_cursor': next_cursor
     }), 200
 
 @app.route("/v2/actions/<id>", methods=['GET'])
@@ -104,6 +111,13 @@ def create_action():
 @app.route("/v2/actions/<id>", methods=['DELETE'])
 def delete_action(id):
     """Delete an action (also removes associated challenge proofs)"""
+    action = CRUDService.get_by_id(Action, id)
+    if not action:
+        return jsonify({'error': 'Action not found'}), 404
+
+    # Proofs cascade with the action, so pull it out of the conquest rollups first
+    retract_player_action(action.id, db.session)
+
     success = CRUDService.delete(Action, id)
     if not success:
         return jsonify({'error': 'Action not found'}), 404
@@ -1,12 +1,16 @@
-from app import app
+from app import app, db
 from flask import request, jsonify
 from models.new_events import Challenge
 from services.crud_service import CRUDService
+from services.challenge_tree import load_challenge_tree, load_event_challenge_trees
 from helper.helpers import ModelEncoder
+from helper.response_cache import cached_response
 import json
 import logging
+import uuid
 
 @app.route("/v2/challenges", methods=['GET'])
+@cached_response(tags=["challenges"])
 def get_challenges():
     """Get all challenges with optional filtering by task"""
     page = request.args.get('page', 1, type=int)
@@ -19,16 +23,23 @@ def get_challenges():
     if request.args.get('trigger_id'):
         filters['trigger_id'] = request.args.get('trigger_id')
 
-    challenges, total = CRUDService.get_all(Challenge, filters=filters, page=page, per_page=per_page)
+    cursor = request.args.get('cursor')
+    total_mode = request.args.get('total', 'exact')
+    try:
+        challenges, total, next_cursor = CRUDService.get_all(Challenge, filters=filters, page=page, per_page=per_page, cursor=cursor, total_mode=total_mode)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
     return jsonify({
         'data': [challenge.serialize() for challenge in challenges],
         'total': total,
         'page': page,
-        'per_page': per_page
+        'per_page': per_page,
+        'next_cursor': next_cursor
     }), 200
 
 @app.route("/v2/challenges/<id>", methods=['GET'])
+@cached_response(tags=["challenges", "tasks", "triggers"])
 def get_challenge(id):
     """Get a single challenge by ID"""
     challenge = CRUDService.get_by_id(Challenge, id)
@@ -104,17 +115,46 @@ def delete_challenge(id):
 
 @app.route("/v2/challenges/<id>/tree", methods=['GET'])
 def get_challenge_tree(id):
-    """Get complete challenge tree (parent and all descendants)"""
-    challenge = CRUDService.get_by_id(Challenge, id)
-    if not challenge:
+    """
+    Get complete challenge tree (parent and all descendants)
+
+    Query Parameters:
+    - team_id (optional): overlay the team's progress as a "status" on every node
+    """
+    team_id = request.args.get('team_id')
+    if not _is_uuid(id):
         return jsonify({'error': 'Challenge not found'}), 404
+    if team_id and not _is_uuid(team_id):
+        return jsonify({'error': 'Invalid team_id'}), 400
 
-    def build_tree(c):
-        """Recursively build challenge tree"""
-        node = c.serialize()
-        if c.children:
-            node['children'] = [build_tree(child) for child in c.children]
-        return node
+    tree = load_challenge_tree(id, db.session, team_id=team_id)
+    if tree is None:
+        return jsonify({'error': 'Challenge not found'}), 404
 
-    tree = build_tree(challenge)
     return json.dumps(tree, cls=ModelEncoder), 200
+
+@app.route("/v2/challenges/trees", methods=['GET'])
+def get_event_challenge_trees():
+    """
+    Get every task's challenge trees for an event, for the board editor
+
+    Query Parameters:
+    - event_id (required)
+    - team_id (optional): overlay the team's progress as a "status" on every node
+    """
+    event_id = request.args.get('event_id')
+    team_id = request.args.get('team_id')
+    if not event_id or not _is_uuid(event_id):
+        return jsonify({'error': 'Missing or invalid event_id'}), 400
+    if team_id and not _is_uuid(team_id):
+        return jsonify({'error': 'Invalid team_id'}), 400
+
+    tasks = load_event_challenge_trees(event_id, db.session, team_id=team_id)
+    return json.dumps({'data': tasks}, cls=ModelEncoder), 200
+
+def _is_uuid(value) -> bool:
+    try:
+        uuid.UUID(str(value))
+        return True
+    except ValueError:
+        return False
@@ -1,14 +1,15 @@
 import json
 import logging
 import queue
+import uuid
+from datetime import datetime, timezone
 
 from app import app, db
 from flask import Response, jsonify, request, stream_with_context
 from sqlalchemy import text
-from helper.helpers import ModelEncoder
-from models.models import Users
-from models.new_events import Action, Challenge, ChallengeProof, ChallengeStatus, Event, EventLog, Region, Team, Territory
-from services.conquest_service import sse_clients
+from helper.helpers import ModelEncoder, decode_cursor, encode_cursor
+from models.new_events import Challenge, Event, EventLog, Region, Team, Territory
+from services.conquest_service import broadcast_delta, load_conquest_state_at, recompute_event_control, sse_clients
 
 
 def _require_conquest_event(event_id):
@@ -201,8 +202,85 @@ def get_territory_progress(territory_id):
     return jsonify({'data': data}), 200
 
 
+TERRITORY_PROOFS_DEFAULT_LIMIT = 100
+TERRITORY_PROOFS_MAX_LIMIT = 1000
+
+# All proofs on a territory's leaf challenges (root, children, grandchildren), newest first.
+# Optional team and keyset filters are switched on by passing non-NULL parameters.
+_TERRITORY_PROOFS_SQL = """
+    SELECT
+        cp.id,
+        cp.img_path,
+        cp.created_at,
+        cs.team_id,
+        a.id          AS action_id,
+        a.name        AS action_name,
+        a.source      AS action_source,
+        a.type        AS action_type,
+        a.quantity    AS action_quantity,
+        a.value       AS action_value,
+        a.date        AS action_date,
+        u.id          AS player_id,
+        u.runescape_name
+    FROM new_stability.challenge_proofs cp
+    JOIN new_stability.challenge_statuses cs ON cs.id = cp.challenge_status_id
+    JOIN new_stability.actions a ON a.id = cp.action_id
+    LEFT JOIN users u ON u.id = a.player_id
+    WHERE cs.challenge_id IN (
+        SELECT id FROM new_stability.challenges
+        WHERE trigger_id IS NOT NULL AND (
+            id = :root_id
+            OR parent_challenge_id = :root_id
+            OR parent_challenge_id IN (
+                SELECT id FROM new_stability.challenges
+                WHERE parent_challenge_id = :root_id
+            )
+        )
+    )
+      AND (CAST(:team_id AS uuid) IS NULL OR cs.team_id = CAST(:team_id AS uuid))
+      AND (
+          CAST(:cursor_created_at AS timestamptz) IS NULL
+          OR (cp.created_at, cp.id) < (CAST(:cursor_created_at AS timestamptz), CAST(:cursor_id AS uuid))
+      )
+    ORDER BY cp.created_at DESC, cp.id DESC
+"""
+
+
+def _serialize_proof_row(row) -> dict:
+    proof_dict = {
+        'id': str(row.id),
+        'img_path': row.img_path,
+        'created_at': row.created_at.isoformat(),
+        'team_id': str(row.team_id),
+        'action': {
+            'id': str(row.action_id),
+            'name': row.action_name,
+            'source': row.action_source,
+            'type': row.action_type,
+            'quantity': row.action_quantity,
+            'value': row.action_value,
+            'date': row.action_date.isoformat() if row.action_date else None,
+        },
+    }
+    if row.player_id:
+        proof_dict['action']['player'] = {
+            'id': str(row.player_id),
+            'runescape_name': row.runescape_name,
+        }
+    return proof_dict
+
+
 @app.route('/v2/territories/<territory_id>/proofs', methods=['GET'])
 def get_territory_proofs(territory_id):
+    """
+    Proof feed for a territory, newest first.
+
+    Query params:
+      team_id  - only proofs for this team
+      limit    - page size (default 100, max 1000)
+      cursor   - next_cursor from the previous page
+      format   - 'ndjson' streams every matching proof (or `limit` of them) one per line
+    """
     territory = Territory.query.get(territory_id)
     if not territory:
         return jsonify({'error': 'Territory not found'}), 404
@@ -212,80 +290,66 @@ def get_territory_proofs(territory_id):
     if err:
         return err
 
-    if not territory.challenge_id:
-        return jsonify({'data': []}), 200
+    stream = request.args.get('format') == 'ndjson' or request.accept_mimetypes.best == 'application/x-ndjson'
 
-    team_id = request.args.get('team_id')
+    if not territory.challenge_id:
+        if stream:
+            return Response('', mimetype='application/x-ndjson')
+        return jsonify({'data': [], 'next_cursor': None}), 200
+
+    params = {
+        'root_id': str(territory.challenge_id),
+        'team_id': request.args.get('team_id'),
+        'cursor_created_at': None,
+        'cursor_id': None,
+    }
+
+    if params['team_id']:
+        try:
+            params['team_id'] = str(uuid.UUID(params['team_id']))
+        except ValueError:
+            return jsonify({'error': 'Invalid team_id'}), 400
 
-    root_id = str(territory.challenge_id)
-    leaf_ids = [
-        r.id for r in db.session.execute(text("""
-            SELECT id FROM new_stability.challenges
-            WHERE trigger_id IS NOT NULL AND (
-                id = :root_id
-                OR parent_challenge_id = :root_id
-                OR parent_challenge_id IN (
-                    SELECT id FROM new_stability.challenges
-                    WHERE parent_challenge_id = :root_id
-                )
+    cursor = request.args.get('cursor')
+    if cursor:
+        try:
+            created_at, proof_id = decode_cursor(cursor)
+            # Checked here so a well-formed but wrong cursor is a 400, not a failed CAST mid-query
+            params['cursor_created_at'] = datetime.fromisoformat(created_at)
+            params['cursor_id'] = str(uuid.UUID(proof_id))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'Invalid cursor'}), 400
+
+    limit = request.args.get('limit', type=int)
+
+    if stream:
+        sql = _TERRITORY_PROOFS_SQL + (" LIMIT :limit" if limit else "")
+        if limit:
+            params['limit'] = limit
+
+        def generate():
+            # Server-side cursor so memory stays flat however many proofs there are
+            result = db.session.execute(
+                text(sql).execution_options(stream_results=True, yield_per=500), params
             )
-        """), {"root_id": root_id}).fetchall()
-    ]
-
-    query = ChallengeStatus.query.filter(ChallengeStatus.challenge_id.in_(leaf_ids))
-    if team_id:
-        query = query.filter_by(team_id=team_id)
-    statuses = query.all()
-
-    status_ids = [cs.id for cs in statuses]
-    all_proofs = ChallengeProof.query.filter(
-        ChallengeProof.challenge_status_id.in_(status_ids)
-    ).all() if status_ids else []
-
-    action_ids = [p.action_id for p in all_proofs if p.action_id]
-    all_actions = Action.query.filter(Action.id.in_(action_ids)).all() if action_ids else []
-    actions_by_id = {a.id: a for a in all_actions}
-
-    player_ids = [a.player_id for a in all_actions if a.player_id]
-    all_players = Users.query.filter(Users.id.in_(player_ids)).all() if player_ids else []
-    players_by_id = {p.id: p for p in all_players}
-
-    proofs_by_status = {}
-    for proof in all_proofs:
-        sid = proof.challenge_status_id
-        if sid not in proofs_by_status:
-            proofs_by_status[sid] = []
-        proofs_by_status[sid].append(proof)
+            for row in result:
+                yield json.dumps(_serialize_proof_row(row)) + "\n"
 
-    data = []
-    for cs in statuses:
-        for proof in proofs_by_status.get(cs.id, []):
-            proof_dict = {
-                'id': str(proof.id),
-                'img_path': proof.img_path,
-                'created_at': proof.created_at.isoformat(),
-                'team_id': str(cs.team_id),
-            }
-            action = actions_by_id.get(proof.action_id)
-            if action:
-                proof_dict['action'] = {
-                    'id': str(action.id),
-                    'name': action.name,
-                    'source': action.source,
-                    'type': action.type,
-                    'quantity': action.quantity,
-                    'value': action.value,
-                    'date': action.date.isoformat() if action.date else None,
-                }
-                player = players_by_id.get(action.player_id)
-                if player:
-                    proof_dict['action']['player'] = {
-                        'id': str(player.id),
-                        'runescape_name': player.runescape_name,
-                    }
-            data.append(proof_dict)
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
 
-    return jsonify({'data': data}), 200
+    limit = min(max(limit or TERRITORY_PROOFS_DEFAULT_LIMIT, 1), TERRITORY_PROOFS_MAX_LIMIT)
+    params['limit'] = limit + 1
+    rows = db.session.execute(text(_TERRITORY_PROOFS_SQL + " LIMIT :limit"), params).fetchall()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+
+    return jsonify({
+        'data': [_serialize_proof_row(row) for row in rows],
+        'next_cursor': next_cursor,
+    }), 200
 
 
 # ---------------------------------------------------------------------------
@@ -299,54 +363,25 @@ def get_event_player_actions(event_id):
         return err
 
     # Start from team_members so players with no drops still appear.
-    # LEFT JOIN to action aggregates so they show up with an empty actions list.
+    # Per-player totals are maintained by conquest_handler in player_action_rollups,
+    # so this is a single indexed read rather than an aggregate over every proof.
     rows = db.session.execute(text("""
-        WITH action_agg AS (
-            SELECT
-                t.id              AS team_id,
-                u.runescape_name  AS player_name,
-                a.name            AS action_name,
-                a.source          AS action_source,
-                MAX(tr.img_path)  AS trigger_img,
-                SUM(a.quantity)   AS total_quantity
-            FROM new_stability.teams t
-            JOIN new_stability.challenge_statuses cs  ON cs.team_id = t.id
-            JOIN new_stability.challenge_proofs   cp  ON cp.challenge_status_id = cs.id
-            JOIN new_stability.actions             a  ON a.id = cp.action_id
-            JOIN users                             u  ON u.id = a.player_id
-            JOIN new_stability.challenges          ch ON ch.id = cs.challenge_id
-            LEFT JOIN new_stability.triggers       tr ON tr.id = ch.trigger_id
-            JOIN new_stability.territories        ter ON ter.challenge_id = ch.id
-                OR ter.challenge_id IN (
-                    SELECT parent_challenge_id FROM new_stability.challenges
-                    WHERE id = ch.id AND parent_challenge_id IS NOT NULL
-                )
-                OR ter.challenge_id IN (
-                    SELECT p.parent_challenge_id
-                    FROM new_stability.challenges c2
-                    JOIN new_stability.challenges p ON p.id = c2.parent_challenge_id
-                    WHERE c2.id = ch.id AND p.parent_challenge_id IS NOT NULL
-                )
-            JOIN new_stability.regions              r ON r.id = ter.region_id
-            WHERE t.event_id = :event_id
-              AND r.event_id = :event_id
-            GROUP BY t.id, u.runescape_name, a.name, a.source
-        )
         SELECT
             tm.team_id,
             u.runescape_name  AS player_name,
-            aa.action_name,
-            aa.action_source,
-            aa.trigger_img,
-            aa.total_quantity
+            par.action_name,
+            par.action_source,
+            par.img_path      AS trigger_img,
+            par.quantity      AS total_quantity
         FROM new_stability.team_members tm
         JOIN new_stability.teams t ON t.id = tm.team_id
         JOIN users u ON u.id = tm.user_id
-        LEFT JOIN action_agg aa
-               ON aa.team_id = tm.team_id
-              AND aa.player_name = u.runescape_name
+        LEFT JOIN new_stability.player_action_rollups par
+               ON par.event_id = t.event_id
+              AND par.team_id = tm.team_id
+              AND par.player_id = tm.user_id
         WHERE t.event_id = :event_id
-        ORDER BY u.runescape_name, aa.total_quantity DESC NULLS LAST
+        ORDER BY u.runescape_name, par.quantity DESC NULLS LAST
     """), {'event_id': event_id}).fetchall()
 
     teams = Team.query.filter_by(event_id=event_id).all()
@@ -413,6 +448,94 @@ def get_conquest_event_logs(event_id):
     }), 200
 
 
+# ---------------------------------------------------------------------------
+# Admin Recompute
+# ---------------------------------------------------------------------------
+
+@app.route('/v2/events/<event_id>/conquest/recompute', methods=['POST'])
+def recompute_conquest_control(event_id):
+    """
+    Re-evaluate control of every territory and region, green logs and team points
+    in one transaction. Use after admin corrections to challenge progress.
+    """
+    event, err = _require_conquest_event(event_id)
+    if err:
+        return err
+
+    try:
+        result = recompute_event_control(event.id, db.session)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logging.exception(f"[CONQUEST] recompute failed for event {event_id}: {e}")
+        return jsonify({'error': 'Recompute failed'}), 500
+
+    log_ids = result.pop('log_ids')
+    logs = EventLog.query.filter(EventLog.id.in_(log_ids)).order_by(EventLog.created_at).all() if log_ids else []
+    serialized = [log.serialize() for log in logs]
+    if serialized:
+        broadcast_delta(event.id, serialized)
+
+    return jsonify({**result, 'logs': serialized}), 200
+
+
+# ---------------------------------------------------------------------------
+# Point-in-time State
+# ---------------------------------------------------------------------------
+
+@app.route('/v2/events/<event_id>/conquest/state', methods=['GET'])
+def get_conquest_state_at(event_id):
+    """
+    Reconstruct who controlled what at a moment in time (default: now), from the
+    nearest checkpoint plus the event logs written after it.
+    """
+    event, err = _require_conquest_event(event_id)
+    if err:
+        return err
+
+    at_str = request.args.get('at')
+    if at_str:
+        try:
+            at = datetime.fromisoformat(at_str.replace('Z', '+00:00'))
+        except ValueError:
+            return jsonify({'error': 'Invalid at format. Use ISO format (e.g., 2026-05-03T12:00:00Z)'}), 400
+        if at.tzinfo is None:
+            at = at.replace(tzinfo=timezone.utc)
+    else:
+        at = datetime.now(timezone.utc)
+
+    result = load_conquest_state_at(event.id, at, db.session)
+    state = result['state']
+
+    regions = Region.query.filter_by(event_id=event.id).with_entities(Region.id).all()
+    region_ids = [r.id for r in regions]
+    territories = Territory.query.filter(
+        Territory.region_id.in_(region_ids)
+    ).with_entities(Territory.id, Territory.region_id).all() if region_ids else []
+    teams = Team.query.filter_by(event_id=event.id).with_entities(Team.id).all()
+
+    checkpoint_as_of = result['checkpoint_as_of']
+    return jsonify({
+        'at': at.isoformat(),
+        'checkpoint_as_of': checkpoint_as_of.isoformat() if checkpoint_as_of else None,
+        'logs_applied': result['logs_applied'],
+        'territories': [{
+            'id': str(t.id),
+            'region_id': str(t.region_id),
+            'controlling_team_id': state['territories'].get(str(t.id)),
+        } for t in territories],
+        'regions': [{
+            'id': str(r.id),
+            'controlling_team_id': state['regions'].get(str(r.id)),
+            'green_logged_teams': state['green_logs'].get(str(r.id), []),
+        } for r in regions],
+        'teams': [{
+            'id': str(t.id),
+            'points': state['points'].get(str(t.id), 0),
+        } for t in teams],
+    }), 200
+
+
 # ---------------------------------------------------------------------------
 # SSE Scoreboard Stream
 # ---------------------------------------------------------------------------
@@ -4,11 +4,14 @@ from flask import request, jsonify
 from models.new_events import Event, DailyRiddle, DailyRiddleSolution, TeamMember
 from models.models import Users
 from services.crud_service import CRUDService
+from services.event_definition import DefinitionError, clone_event, event_has_progress, export_event_definition, import_event_definition
 from helper.helpers import ModelEncoder
+from helper.response_cache import add_cache_tags, cached_response
 import json
 import logging
 
 @app.route("/v2/events", methods=['GET'])
+@cached_response(tags=["events"])
 def get_events_v2():
     """Get all events with optional filtering and pagination"""
     page = request.args.get('page', 1, type=int)
@@ -20,16 +23,23 @@ def get_events_v2():
     if request.args.get('name'):
         filters['name'] = request.args.get('name')
 
-    events, total = CRUDService.get_all(Event, filters=filters, page=page, per_page=per_page, order_by=order_by)
+    cursor = request.args.get('cursor')
+    total_mode = request.args.get('total', 'exact')
+    try:
+        events, total, next_cursor = CRUDService.get_all(Event, filters=filters, page=page, per_page=per_page, order_by=order_by, cursor=cursor, total_mode=total_mode)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
     return jsonify({
         'data': [event.serialize() for event in events],
         'total': total,
         'page': page,
-        'per_page': per_page
+        'per_page': per_page,
+        'next_cursor': next_cursor
     }), 200
 
 @app.route("/v2/events/active", methods=['GET'])
+@cached_response(tags=["events", "team_members"], ttl=60)
 def get_active_event():
     """Get the currently active bingo event with teams and tiles"""
     from models.new_events import Team, Tile, TeamMember
@@ -44,6 +54,8 @@ def get_active_event():
     if not event:
         return jsonify({"error": "No active event"}), 404
 
+    add_cache_tags(f"event:{event.id}")
+
     # Get related teams and tiles
     teams = Team.query.filter_by(event_id=event.id).order_by(Team.points.desc()).all()
     tiles = Tile.query.filter_by(event_id=event.id).order_by(Tile.index).all()
@@ -84,6 +96,7 @@ def get_active_event():
     return json.dumps(response, cls=ModelEncoder), 200
 
 @app.route("/v2/events/<id>", methods=['GET'])
+@cached_response(tags=["event:{id}", "team_members"])
 def get_event(id):
     """Get a single event by ID"""
     from models.new_events import Team, Tile, TeamMember
@@ -174,6 +187,98 @@ def delete_event(id):
 
     return jsonify({'message': 'Event deleted successfully'}), 200
 
+@app.route("/v2/events/<id>/definition", methods=['GET'])
+def get_event_definition(id):
+    """Export the event's tiles, tasks, challenges, triggers, regions and territories as one document"""
+    event = CRUDService.get_by_id(Event, id)
+    if not event:
+        return jsonify({'error': 'Event not found'}), 404
+
+    return jsonify(export_event_definition(event, db.session)), 200
+
+@app.route("/v2/events/<id>/definition", methods=['PUT'])
+def put_event_definition(id):
+    """
+    Replace the event's definition with an exported (or hand-written) document in one transaction.
+    Refuses with 409 once teams have progress unless force=true, since that progress is deleted.
+    """
+    event = CRUDService.get_by_id(Event, id)
+    if not event:
+        return jsonify({'error': 'Event not found'}), 404
+
+    data = request.get_json()
+    if not data:
+        return jsonify({'error': 'No JSON received'}), 400
+
+    force = request.args.get('force', 'false').lower() == 'true'
+    if not force and event_has_progress(event.id, db.session):
+        return jsonify({'error': 'Event already has team progress; pass force=true to replace its definition and discard it'}), 409
+
+    try:
+        summary = import_event_definition(event.id, data, db.session)
+        db.session.commit()
+    except DefinitionError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        logging.error(f"Error importing definition for event {id}: {e}")
+        return jsonify({'error': 'Failed to import event definition'}), 500
+
+    return jsonify(summary), 200
+
+@app.route("/v2/events/<id>/clone", methods=['POST'])
+def clone_event_v2(id):
+    """
+    Copy an event's board and map into a new event.
+
+    Request JSON (all optional):
+    {
+        "name": "New name",                  (default: "<name> (copy)")
+        "start_date": "2026-03-01T00:00:00Z", (other dates move with it unless given)
+        "end_date": "...",
+        "release_date": "...",
+        "include_teams": false,
+        "include_members": false             (requires include_teams)
+    }
+    """
+    if not CRUDService.get_by_id(Event, id):
+        return jsonify({'error': 'Event not found'}), 404
+
+    data = request.get_json(silent=True) or {}
+
+    for field in ('start_date', 'end_date', 'release_date'):
+        if data.get(field):
+            try:
+                datetime.fromisoformat(data[field].replace('Z', '+00:00'))
+            except (AttributeError, ValueError):
+                return jsonify({'error': f'Invalid {field} format. Use ISO format (e.g., 2026-02-20T12:00:00Z)'}), 400
+
+    try:
+        new_id = clone_event(
+            id, db.session,
+            name=data.get('name'),
+            start_date=data.get('start_date'),
+            end_date=data.get('end_date'),
+            release_date=data.get('release_date'),
+            include_teams=bool(data.get('include_teams', False)),
+            include_members=bool(data.get('include_members', False)),
+        )
+        if new_id is None:
+            db.session.rollback()
+            return jsonify({'error': 'Event not found'}), 404
+        db.session.commit()
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        logging.error(f"Error cloning event {id}: {e}")
+        return jsonify({'error': 'Failed to clone event'}), 500
+
+    event = CRUDService.get_by_id(Event, new_id)
+    return json.dumps(event.serialize(), cls=ModelEncoder), 201
+
 
 @app.route("/guess", methods=['POST'])
 def guess_riddle():
@@ -3,10 +3,12 @@ from flask import request, jsonify
 from models.new_events import Task, Challenge
 from services.crud_service import CRUDService
 from helper.helpers import ModelEncoder
+from helper.response_cache import cached_response
 import json
 import logging
 
 @app.route("/v2/tasks", methods=['GET'])
+@cached_response(tags=["tasks"])
 def get_tasks():
     """Get all tasks with optional filtering by tile"""
     page = request.args.get('page', 1, type=int)
@@ -17,16 +19,23 @@ def get_tasks():
     if request.args.get('tile_id'):
         filters['tile_id'] = request.args.get('tile_id')
 
-    tasks, total = CRUDService.get_all(Task, filters=filters, page=page, per_page=per_page)
+    cursor = request.args.get('cursor')
+    total_mode = request.args.get('total', 'exact')
+    try:
+        tasks, total, next_cursor = CRUDService.get_all(Task, filters=filters, page=page, per_page=per_page, cursor=cursor, total_mode=total_mode)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
     return jsonify({
         'data': [task.serialize() for task in tasks],
         'total': total,
         'page': page,
-        'per_page': per_page
+        'per_page': per_page,
+        'next_cursor': next_cursor
     }), 200
 
 @app.route("/v2/tasks/<id>", methods=['GET'])
+@cached_response(tags=["tasks"])
 def get_task(id):
     """Get a single task by ID"""
     task = CRUDService.get_by_id(Task, id)
@@ -20,13 +20,19 @@ def get_teams():
     if request.args.get('event_id'):
         filters['event_id'] = request.args.get('event_id')
 
-    teams, total = CRUDService.get_all(Team, filters=filters, page=page, per_page=per_page, order_by=order_by)
+    cursor = request.args.get('cursor')
+    total_mode = request.args.get('total', 'exact')
+    try:
+        teams, total, next_cursor = CRUDService.get_all(Team, filters=filters, page=page, per_page=per_page, order_by=order_by, cursor=cursor, total_mode=total_mode)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
     return jsonify({
         'data': [team.serialize() for team in teams],
         'total': total,
         'page': page,
-        'per_page': per_page
+        'per_page': per_page,
+        'next_cursor': next_cursor
     }), 200
 
 @app.route("/v2/teams/<id>", methods=['GET'])
@@ -4,10 +4,12 @@ from models.new_events import Tile, Task, Challenge, Trigger, Team, TileStatus,
 from models.models import Users
 from services.crud_service import CRUDService
 from helper.helpers import ModelEncoder
+from helper.response_cache import cached_response
 import json
 import logging
 
 @app.route("/v2/tiles", methods=['GET'])
+@cached_response(tags=["tiles"])
 def get_tiles():
     """Get all tiles with optional filtering by event"""
     page = request.args.get('page', 1, type=int)
@@ -19,16 +21,23 @@ def get_tiles():
     if request.args.get('event_id'):
         filters['event_id'] = request.args.get('event_id')
 
-    tiles, total = CRUDService.get_all(Tile, filters=filters, page=page, per_page=per_page, order_by=order_by)
+    cursor = request.args.get('cursor')
+    total_mode = request.args.get('total', 'exact')
+    try:
+        tiles, total, next_cursor = CRUDService.get_all(Tile, filters=filters, page=page, per_page=per_page, order_by=order_by, cursor=cursor, total_mode=total_mode)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
     return jsonify({
         'data': [tile.serialize() for tile in tiles],
         'total': total,
         'page': page,
-        'per_page': per_page
+        'per_page': per_page,
+        'next_cursor': next_cursor
     }), 200
 
 @app.route("/v2/tiles/<id>", methods=['GET'])
+@cached_response(tags=["tiles", "tasks", "challenges", "triggers"])
 def get_tile(id):
     """Get a single tile by ID with its tasks, challenges, and triggers"""
     tile = CRUDService.get_by_id(Tile, id)
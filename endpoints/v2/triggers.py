@@ -3,10 +3,12 @@ from flask import request, jsonify
 from models.new_events import Trigger
 from services.crud_service import CRUDService
 from helper.helpers import ModelEncoder
+from helper.response_cache import cached_response
 import json
 import logging
 
 @app.route("/v2/triggers", methods=['GET'])
+@cached_response(tags=["triggers"])
 def get_triggers():
     """Get all triggers with optional filtering"""
     page = request.args.get('page', 1, type=int)
@@ -20,16 +22,23 @@ def get_triggers():
     if request.args.get('source'):
         filters['source'] = request.args.get('source')
 
-    triggers, total = CRUDService.get_all(Trigger, filters=filters, page=page, per_page=per_page, order_by=order_by)
+    cursor = request.args.get('cursor')
+    total_mode = request.args.get('total', 'exact')
+    try:
+        triggers, total, next_cursor = CRUDService.get_all(Trigger, filters=filters, page=page, per_page=per_page, order_by=order_by, cursor=cursor, total_mode=total_mode)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
     return jsonify({
         'data': [trigger.serialize() for trigger in triggers],
         'total': total,
         'page': page,
-        'per_page': per_page
+        'per_page': per_page,
+        'next_cursor': next_cursor
     }), 200
 
 @app.route("/v2/triggers/<id>", methods=['GET'])
+@cached_response(tags=["triggers"])
 def get_trigger(id):
     """Get a single trigger by ID"""
     trigger = CRUDService.get_by_id(Trigger, id)
@@ -84,6 +93,7 @@ def delete_trigger(id):
     return jsonify({'message': 'Trigger deleted successfully'}), 200
 
 @app.route("/v2/triggers/search", methods=['GET'])
+@cached_response(tags=["triggers"])
 def search_triggers():
     """Search triggers by name (partial match)"""
     query = request.args.get('q', '').strip()
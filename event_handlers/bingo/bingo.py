@@ -1,6 +1,8 @@
 from datetime import datetime, timezone
 from app import db
-from app import firestore_db
+from app import firestore_writer
+from helper.metrics import mark_submission_matched, record_submission_outcome
+from helper.response_cache import invalidate_on_commit
 from event_handlers.event_handler import EventSubmission, NotificationField, NotificationResponse, NotificationAuthor
 from models.models import Users
 from models.new_events import (
@@ -9,13 +11,12 @@ from models.new_events import (
 )
 
 import logging
-import threading
 from sqlalchemy import func, text
 from sqlalchemy.orm import joinedload
 
 
 def write_to_firestore(submission: EventSubmission, event: Event, action: Action, user: Users, team: Team | None = None):
-    """Write submission to Firestore for backwards compatibility (fire-and-forget)"""
+    """Queue submission for Firestore for backwards compatibility (fire-and-forget)"""
     # Build the drop dict on the calling thread while SQLAlchemy objects are still valid
     drop = {
         "id": str(action.id),
@@ -36,17 +37,7 @@ def write_to_firestore(submission: EventSubmission, event: Event, action: Action
         drop["team_id"] = str(team.id)
         drop["team_name"] = team.name
 
-    collection_name = f"drops_{event.id}"
-
-    def _write():
-        try:
-            if firestore_db:
-                firestore_db.collection(collection_name).add(drop)
-                logging.info(f"Wrote drop to Firestore for action: {drop['id']}")
-        except Exception as e:
-            logging.exception(f"Failed to write drop to Firestore for action: {drop['id']} : {e}")
-
-    threading.Thread(target=_write, daemon=True).start()
+    firestore_writer.enqueue(f"drops_{event.id}", drop)
 
 
 def process_submission_for_team(event: Event, submission: EventSubmission, team: Team, action: Action) -> list[int]:
@@ -334,6 +325,7 @@ def update_tile_status(team: Team, tile_id: str):
 
     # Award 3 points using atomic SQL UPDATE to prevent race conditions
     db.session.flush()
+    invalidate_on_commit(db.session, f"event:{team.event_id}")
     db.session.execute(
         text("UPDATE new_stability.teams SET points = points + 3, updated_at = NOW() WHERE id = :team_id"),
         {"team_id": str(team.id)}
@@ -427,6 +419,7 @@ def bingo_handler(submission: EventSubmission) -> list[NotificationResponse]:
                 f"[BINGO] DUPLICATE DETECTED: request_id={submission.request_id!r} already processed "
                 f"(action_id={existing_action.id}). Skipping."
             )
+            record_submission_outcome("bingo_handler", "duplicate")
             return []
 
     # Check if user is a team member in this event
@@ -461,8 +454,11 @@ def bingo_handler(submission: EventSubmission) -> list[NotificationResponse]:
     # If user is not on a team, we've already logged to Firestore, just return
     if not team_member or not team:
         logging.info(f"User {submission.rsn} (ID: {submission.id}) is not a participant in the Bingo event.")
+        record_submission_outcome("bingo_handler", "no_team")
         return []
 
+    mark_submission_matched()
+
     # Process the submission for this team
     completed_task_tile_indices = process_submission_for_team(event, submission, team, action)
 
@@ -475,6 +471,7 @@ def bingo_handler(submission: EventSubmission) -> list[NotificationResponse]:
 
     # Award bonus points for bingos using atomic SQL UPDATE
     if bingo_count > 0:
+        invalidate_on_commit(db.session, f"event:{team.event_id}")
         db.session.execute(
             text("UPDATE new_stability.teams SET points = points + :pts, updated_at = NOW() WHERE id = :team_id"),
             {"pts": bingo_count * 15, "team_id": str(team.id)}
@@ -3,6 +3,7 @@ import logging
 from datetime import datetime, timezone
 
 from app import db
+from helper.metrics import mark_submission_matched, record_submission_outcome
 from event_handlers.event_handler import (
     EventSubmission, NotificationAuthor, NotificationField, NotificationResponse
 )
@@ -15,7 +16,9 @@ from models.new_events import (
 from services.conquest_service import (
     broadcast_delta,
     check_green_log,
+    maybe_write_conquest_checkpoint,
     recalculate_team_points,
+    record_player_action,
     update_region_control,
     update_territory_control,
 )
@@ -59,6 +62,7 @@ def conquest_handler(submission: EventSubmission) -> list[NotificationResponse]:
     if submission.request_id:
         if Action.query.filter_by(request_id=submission.request_id).first():
             logging.warning(f"[CONQUEST] duplicate request_id={submission.request_id!r}, skipping")
+            record_submission_outcome("conquest_handler", "duplicate")
             return []
 
     # Record action
@@ -83,9 +87,11 @@ def conquest_handler(submission: EventSubmission) -> list[NotificationResponse]:
 
     if not team_member:
         logging.info(f"[CONQUEST] {submission.rsn} has no team in event {event.id}")
+        record_submission_outcome("conquest_handler", "no_team")
         return []
 
     team = Team.query.get(team_member.team_id)
+    mark_submission_matched()
 
     # Batch-load all territories for this event, keyed by challenge_id
     regions = Region.query.filter_by(event_id=event.id).all()
@@ -186,6 +192,7 @@ def conquest_handler(submission: EventSubmission) -> list[NotificationResponse]:
             action_id=action.id,
             img_path=submission.img_path,
         ))
+        record_player_action(event.id, team.id, action.id, trigger.img_path, db.session)
 
         if new_completions <= old_completions:
             continue
@@ -267,6 +274,14 @@ def conquest_handler(submission: EventSubmission) -> list[NotificationResponse]:
     if new_log_entries:
         broadcast_delta(event.id, [entry.serialize() for entry in new_log_entries])
 
+        # Periodic state checkpoint for the timeline scrubber; never fail the submission over it
+        try:
+            if maybe_write_conquest_checkpoint(event.id, db.session):
+                db.session.commit()
+        except Exception as e:
+            logging.exception(f"[CONQUEST] checkpoint failed for event {event.id}: {e}")
+            db.session.rollback()
+
     return _build_notifications(event, team, submission, new_log_entries)
 
 
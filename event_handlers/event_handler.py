@@ -1,4 +1,7 @@
 import logging
+import time
+from helper.metrics import HANDLER_LATENCY, HANDLER_QUERIES, track_submission_outcome
+from helper.query_stats import track_queries
 
 class EventSubmission:
     def __init__(self, rsn: str, id: str | None, trigger: str, source: str | None, quantity: int | None, totalValue: int | None, img_path: str | None, type: str | None, request_id: str | None = None) -> None:
@@ -116,8 +119,13 @@ class EventHandler:
         )
         notifications: list[NotificationResponse] = []
         for handler in cls.handlers:
+            start = time.perf_counter()
+            stats = None
             try:
-                responses: list[NotificationResponse] = handler(data)
+                with track_queries(handler.__name__) as stats, track_submission_outcome(handler.__name__):
+                    responses: list[NotificationResponse] = handler(data)
+                if stats.count:
+                    logging.debug(f"[QUERY] handler={handler.__name__!r}, trigger={data.trigger!r}, {stats.log_line()}")
                 if not responses:
                     continue
 
@@ -127,4 +135,8 @@ class EventHandler:
                 logging.error(f"Error in handler {handler.__name__}: {e}", exc_info=True)
                 from app import db
                 db.session.rollback()
+            finally:
+                HANDLER_LATENCY.observe(time.perf_counter() - start, handler=handler.__name__)
+                if stats is not None:
+                    HANDLER_QUERIES.inc(stats.count, handler=handler.__name__)
         return {"notifications": notifications}
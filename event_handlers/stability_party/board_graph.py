@@ -0,0 +1,215 @@
+"""
+Compiled, in-memory view of a Stability Party board.
+
+Movement and the special-tile checks used to query SP3EventTiles (and Events, for
+star_tiles) several times per step of a roll. A BoardGraph holds everything they
+need for one event: tiles, adjacency, shop/dock/island-start flags, tile -> region
+and region -> tiles maps, the regions themselves and the star tiles. It is built
+with three queries on first use and kept until a commit touches the event's tiles, regions or Events row (which
+is how stars move), or until GRAPH_TTL_SECONDS pass, which bounds staleness for
+writes made outside this process.
+"""
+import logging
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from models.models import Events
+from models.stability_party_3 import SP3EventTiles, SP3Regions
+
+GRAPH_TTL_SECONDS = 600
+
+_TRUE_STRINGS = ("t", "true", "y", "yes", "on", "1")
+
+
+@dataclass(frozen=True)
+class BoardTile:
+    id: uuid.UUID
+    event_id: uuid.UUID
+    region_id: uuid.UUID | None
+    name: str
+    description: str | None
+    data: dict  # The tile's JSONB data; shared by every caller, do not mutate
+
+
+@dataclass(frozen=True)
+class BoardRegion:
+    id: uuid.UUID
+    name: str
+    description: str | None
+    challenges: tuple[str, ...]
+
+
+def _as_uuid(value) -> uuid.UUID | None:
+    try:
+        return value if isinstance(value, uuid.UUID) else uuid.UUID(str(value))
+    except ValueError:
+        return None
+
+
+def _is_true(value) -> bool:
+    # Matches the (data->>'isIslandStart')::boolean the start-tile queries used
+    return value is True or str(value).lower() in _TRUE_STRINGS
+
+
+class BoardGraph:
+    def __init__(self, event_id: uuid.UUID, tiles: list[BoardTile], star_tiles, regions: list[BoardRegion] = ()) -> None:
+        self.event_id = event_id
+        self.tiles: dict[uuid.UUID, BoardTile] = {t.id: t for t in tiles}
+        self.regions: dict[uuid.UUID, BoardRegion] = {r.id: r for r in regions}
+        self.adjacency: dict[uuid.UUID, tuple[uuid.UUID, ...]] = {}
+        self.region_tiles: dict[uuid.UUID, tuple[uuid.UUID, ...]] = {}
+        self.island_starts: dict[uuid.UUID, uuid.UUID] = {}
+        shops, docks, by_region = set(), set(), {}
+        for t in tiles:
+            self.adjacency[t.id] = tuple(
+                next_id for next_id in map(_as_uuid, t.data.get("nextTiles") or []) if next_id is not None)
+            if t.data.get("isShop", False):
+                shops.add(t.id)
+            if t.data.get("isDock", False):
+                docks.add(t.id)
+            if t.region_id is not None:
+                by_region.setdefault(t.region_id, []).append(t.id)
+                if _is_true(t.data.get("isIslandStart")) and t.region_id not in self.island_starts:
+                    self.island_starts[t.region_id] = t.id
+        self.shops = frozenset(shops)
+        self.docks = frozenset(docks)
+        self.region_tiles = {region_id: tuple(ids) for region_id, ids in by_region.items()}
+        self.star_tiles = frozenset(s for s in map(_as_uuid, star_tiles or []) if s is not None)
+        self.star_regions = frozenset(
+            self.tiles[s].region_id for s in self.star_tiles if s in self.tiles and self.tiles[s].region_id)
+
+    def tile(self, tile_id) -> BoardTile | None:
+        return self.tiles.get(_as_uuid(tile_id))
+
+    def region(self, region_id) -> BoardRegion | None:
+        return self.regions.get(_as_uuid(region_id))
+
+    def next_tiles(self, tile_id) -> tuple[uuid.UUID, ...]:
+        return self.adjacency.get(_as_uuid(tile_id), ())
+
+    def is_star(self, tile_id) -> bool:
+        return _as_uuid(tile_id) in self.star_tiles
+
+    def is_shop(self, tile_id) -> bool:
+        return _as_uuid(tile_id) in self.shops
+
+    def is_dock(self, tile_id) -> bool:
+        return _as_uuid(tile_id) in self.docks
+
+    def is_island_start(self, tile_id) -> bool:
+        tile = self.tile(tile_id)
+        return tile is not None and bool(tile.data.get("isIslandStart", False))
+
+    def island_start(self, region_id) -> BoardTile | None:
+        tile_id = self.island_starts.get(_as_uuid(region_id))
+        return self.tiles[tile_id] if tile_id else None
+
+    def region_has_star(self, tile_id) -> bool:
+        tile = self.tile(tile_id)
+        return tile is not None and tile.region_id in self.star_regions
+
+
+_lock = threading.Lock()
+_graphs: dict[uuid.UUID, tuple[BoardGraph, float]] = {}
+_tile_events: dict[uuid.UUID, uuid.UUID] = {}
+# Bumped on every invalidation so a graph built from data read before it is not stored
+_generations: dict[uuid.UUID, int] = {}
+
+
+def _build(event_id: uuid.UUID, session) -> BoardGraph:
+    rows = session.execute(text("""
+        SELECT id, event_id, region_id, name, description, data
+        FROM sp3_event_tiles
+        WHERE event_id = :event_id
+        ORDER BY id
+    """), {"event_id": str(event_id)}).fetchall()
+    star_tiles = session.execute(text("SELECT data->'star_tiles' FROM events WHERE id = :event_id"),
+                                 {"event_id": str(event_id)}).scalar()
+    region_rows = session.execute(text("""
+        SELECT id, name, description, challenges
+        FROM sp3_regions
+        WHERE event_id = :event_id
+        ORDER BY name, id
+    """), {"event_id": str(event_id)}).fetchall()
+    tiles = [BoardTile(r.id, r.event_id, r.region_id, r.name, r.description, r.data or {}) for r in rows]
+    regions = [BoardRegion(r.id, r.name, r.description, tuple(r.challenges or ())) for r in region_rows]
+    return BoardGraph(event_id, tiles, star_tiles, regions)
+
+
+def get_board_graph(event_id, session=None) -> BoardGraph:
+    """The cached graph for event_id, built on first use."""
+    from app import db
+
+    event_id = _as_uuid(event_id)
+    now = time.monotonic()
+    with _lock:
+        cached = _graphs.get(event_id)
+        if cached is not None and cached[1] > now:
+            return cached[0]
+        generation = _generations.get(event_id, 0)
+
+    graph = _build(event_id, session or db.session)
+    with _lock:
+        if _generations.get(event_id, 0) == generation:
+            _graphs[event_id] = (graph, now + GRAPH_TTL_SECONDS)
+            for tile_id in graph.tiles:
+                _tile_events[tile_id] = event_id
+    logging.debug(f"[SP3] built board graph for event {event_id}: {len(graph.tiles)} tiles, {len(graph.star_tiles)} stars")
+    return graph
+
+
+def board_graph_for_tile(tile_id, session=None) -> BoardGraph | None:
+    """The graph of the event tile_id belongs to, or None if there is no such tile."""
+    from app import db
+
+    tile_id = _as_uuid(tile_id)
+    if tile_id is None:
+        return None
+    event_id = _tile_events.get(tile_id)
+    if event_id is None:
+        event_id = (session or db.session).execute(
+            text("SELECT event_id FROM sp3_event_tiles WHERE id = :id"), {"id": str(tile_id)}).scalar()
+        if event_id is None:
+            return None
+    return get_board_graph(event_id, session)
+
+
+def invalidate_board_graph(*event_ids) -> None:
+    """Drop the cached graphs for event_ids (all of them if none are given)."""
+    with _lock:
+        for event_id in (event_ids or tuple(_graphs)):
+            event_id = _as_uuid(event_id)
+            _generations[event_id] = _generations.get(event_id, 0) + 1
+            graph, _ = _graphs.pop(event_id, (None, None))
+            if graph is not None:
+                for tile_id in graph.tiles:
+                    _tile_events.pop(tile_id, None)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_board_writes(session, flush_context):
+    event_ids = set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, (SP3EventTiles, SP3Regions)) and obj.event_id is not None:
+            event_ids.add(obj.event_id)
+        elif isinstance(obj, Events) and obj.type == "STABILITY_PARTY":
+            event_ids.add(obj.id)
+    if event_ids:
+        session.info.setdefault("sp3_board_events", set()).update(event_ids)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_boards(session):
+    event_ids = session.info.pop("sp3_board_events", None)
+    if event_ids:
+        invalidate_board_graph(*event_ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_boards(session):
+    session.info.pop("sp3_board_events", None)
@@ -0,0 +1,161 @@
+"""
+Per-trigger drop totals for Stability Party events.
+
+Every submission used to add its value and quantity to Events.data["log"] and
+commit the whole Events row, so all drops of an event serialized on that row.
+Totals now live in sp3_trigger_totals, one row per (event, trigger), and are
+added to with an upsert. By default the upsert runs in the submission's own
+transaction; with SP3_DROP_LOG_FLUSH_SECONDS set, drops are summed in memory and
+written as one batch at most that many seconds later (and at interpreter exit),
+trading a small window of loss on a crash for one write per trigger per flush.
+"""
+import atexit
+import logging
+import os
+import threading
+
+from sqlalchemy import text
+
+UPSERT_SQL = text("""
+    INSERT INTO sp3_trigger_totals (event_id, trigger, value, quantity)
+    VALUES (:event_id, :trigger, :value, :quantity)
+    ON CONFLICT (event_id, trigger) DO UPDATE
+    SET value = sp3_trigger_totals.value + EXCLUDED.value,
+        quantity = sp3_trigger_totals.quantity + EXCLUDED.quantity
+""")
+
+
+class DropLogCounters:
+    def __init__(self, engine, flush_interval: float = 0.0, max_pending: int = 500) -> None:
+        """
+        engine: used for buffered flushes; write-through drops go through the caller's session.
+        flush_interval: seconds drops may wait in memory; 0 writes each one immediately.
+        max_pending: flush early once this many (event, trigger) pairs are waiting.
+        """
+        self.engine = engine
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending: dict[tuple[str, str], list[int]] = {}
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+
+    @property
+    def buffered(self) -> bool:
+        return self.flush_interval > 0
+
+    def record(self, event_id, trigger: str, value: int | None, quantity: int | None, session) -> None:
+        """Add one submission to the event's totals for trigger."""
+        key, amounts = (str(event_id), trigger), [value or 0, quantity or 0]
+        if not self.buffered:
+            session.execute(UPSERT_SQL, _params(key, amounts))
+            return
+
+        with self._lock:
+            pending = self._pending.setdefault(key, [0, 0])
+            pending[0] += amounts[0]
+            pending[1] += amounts[1]
+            full = len(self._pending) >= self.max_pending
+        self._ensure_started()
+        if full:
+            self._wakeup.set()
+
+    def pending(self, event_id) -> dict[str, dict]:
+        """Amounts recorded for event_id that have not been flushed yet."""
+        event_id = str(event_id)
+        with self._lock:
+            return {trigger: {"value": value, "quantity": quantity}
+                    for (pending_event, trigger), (value, quantity) in self._pending.items() if pending_event == event_id}
+
+    def flush(self) -> int:
+        """Write everything buffered so far in one transaction. Returns the number of rows upserted."""
+        with self._lock:
+            batch, self._pending = self._pending, {}
+        if not batch:
+            return 0
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(UPSERT_SQL, [_params(key, amounts) for key, amounts in sorted(batch.items())])
+        except Exception as e:
+            logging.error(f"[SP3] drop log flush of {len(batch)} totals failed, keeping them for the next one: {e}", exc_info=True)
+            with self._lock:
+                for key, (value, quantity) in batch.items():
+                    pending = self._pending.setdefault(key, [0, 0])
+                    pending[0] += value
+                    pending[1] += quantity
+            return 0
+        return len(batch)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop the flush thread and write what is left."""
+        if self._thread is not None:
+            self._stopping.set()
+            self._wakeup.set()
+            self._thread.join(timeout=timeout)
+        self.flush()
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping.clear()
+                self._thread = threading.Thread(target=self._run, name="sp3-drop-log", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+
+def _params(key: tuple[str, str], amounts: list[int]) -> dict:
+    return {"event_id": key[0], "trigger": key[1], "value": amounts[0], "quantity": amounts[1]}
+
+
+_default_counters: DropLogCounters | None = None
+_default_lock = threading.Lock()
+
+
+def drop_log_counters() -> DropLogCounters:
+    """The process-wide counters, created on first use inside an app context."""
+    global _default_counters
+    if _default_counters is None:
+        from app import db
+        with _default_lock:
+            if _default_counters is None:
+                counters = DropLogCounters(db.engine, float(os.getenv("SP3_DROP_LOG_FLUSH_SECONDS", 0)))
+                atexit.register(counters.stop)
+                _default_counters = counters
+    return _default_counters
+
+
+def record_drop(event_id, trigger: str, value: int | None, quantity: int | None, session) -> None:
+    drop_log_counters().record(event_id, trigger, value, quantity, session)
+
+
+def event_drop_logs(event_ids: list, session) -> dict:
+    """{event_id: {trigger: {"value", "quantity"}}} for each of event_ids, including unflushed drops."""
+    if not event_ids:
+        return {}
+    rows = session.execute(text("""
+        SELECT event_id, trigger, value, quantity
+        FROM sp3_trigger_totals
+        WHERE event_id = ANY(CAST(:event_ids AS uuid[]))
+        ORDER BY trigger
+    """), {"event_ids": [str(event_id) for event_id in event_ids]}).fetchall()
+
+    logs = {event_id: {} for event_id in event_ids}
+    by_str = {str(event_id): event_id for event_id in event_ids}
+    for r in rows:
+        logs[by_str[str(r.event_id)]][r.trigger] = {"value": r.value, "quantity": r.quantity}
+    counters = drop_log_counters()
+    if counters.buffered:
+        for event_id in event_ids:
+            for trigger, amounts in counters.pending(event_id).items():
+                total = logs[event_id].setdefault(trigger, {"value": 0, "quantity": 0})
+                total["value"] += amounts["value"]
+                total["quantity"] += amounts["quantity"]
+    return logs
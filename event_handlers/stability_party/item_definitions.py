@@ -8,7 +8,8 @@ keeping the definition and functionality together for better maintenance.
 
 import uuid
 import logging
-from typing import Dict, List, Any, Optional, Callable, Tuple
+from types import MappingProxyType
+from typing import Dict, List, Any, Optional, Callable, Tuple, Mapping
 from event_handlers.stability_party.save_data import SaveData, save_team_data
 import random
 
@@ -19,6 +20,9 @@ ITEM_REGISTRY = {}
 # Each handler is a function that takes (event_id, team_id, save_data, item_data) and returns a result dict
 ITEM_HANDLERS = {}
 
+# Read-only indexes over ITEM_REGISTRY, built by freeze_item_registry once every item is registered
+_catalog: Optional["ItemCatalog"] = None
+
 class ItemDefinition:
     """Class representing an item definition"""
     
@@ -115,6 +119,9 @@ def register_item(
     Returns:
         The registered item definition
     """
+    if _catalog is not None:
+        raise RuntimeError(f"Cannot register item {id}: the item registry is frozen")
+
     # If a handler is provided, register it with the item's ID as the handler name
     activation_handler = None
     selection_handler = None
@@ -147,21 +154,47 @@ def register_item(
     logging.debug(f"Registered item: {name} (ID: {id})")
     return item
 
+class ItemCatalog:
+    """Frozen view of the item registry with the lookups shops and item effects need precomputed"""
+
+    def __init__(self, items: List[ItemDefinition]):
+        self.items: Tuple[ItemDefinition, ...] = tuple(items)
+        self.by_id: Mapping[str, ItemDefinition] = MappingProxyType({item.id: item for item in self.items})
+        by_rarity: Dict[str, List[ItemDefinition]] = {}
+        by_type: Dict[str, List[ItemDefinition]] = {}
+        for item in self.items:
+            by_rarity.setdefault(item.rarity, []).append(item)
+            by_type.setdefault(item.item_type, []).append(item)
+        self.by_rarity: Mapping[str, Tuple[ItemDefinition, ...]] = MappingProxyType({k: tuple(v) for k, v in by_rarity.items()})
+        self.by_type: Mapping[str, Tuple[ItemDefinition, ...]] = MappingProxyType({k: tuple(v) for k, v in by_type.items()})
+
+def freeze_item_registry() -> ItemCatalog:
+    """Build the catalog; registering items afterwards is an error"""
+    global _catalog
+    if _catalog is None:
+        _catalog = ItemCatalog(list(ITEM_REGISTRY.values()))
+        logging.debug(f"Froze item registry with {len(_catalog.items)} items")
+    return _catalog
+
+def item_catalog() -> ItemCatalog:
+    """The frozen catalog, freezing the registry on first use"""
+    return _catalog or freeze_item_registry()
+
 def get_item(item_id: str) -> Optional[ItemDefinition]:
     """Get an item from the registry by ID"""
-    return ITEM_REGISTRY.get(item_id)
+    return item_catalog().by_id.get(item_id)
 
-def get_all_items() -> List[ItemDefinition]:
+def get_all_items() -> Tuple[ItemDefinition, ...]:
     """Get all registered items"""
-    return list(ITEM_REGISTRY.values())
+    return item_catalog().items
 
-def get_items_by_type(item_type: str) -> List[ItemDefinition]:
+def get_items_by_type(item_type: str) -> Tuple[ItemDefinition, ...]:
     """Get all items of a specific type"""
-    return [item for item in ITEM_REGISTRY.values() if item.item_type == item_type]
+    return item_catalog().by_type.get(item_type, ())
 
-def get_items_by_rarity(rarity: str) -> List[ItemDefinition]:
+def get_items_by_rarity(rarity: str) -> Tuple[ItemDefinition, ...]:
     """Get all items of a specific rarity"""
-    return [item for item in ITEM_REGISTRY.values() if item.rarity == rarity]
+    return item_catalog().by_rarity.get(rarity, ())
 
 def get_handler(handler_name: str) -> Optional[Callable]:
     """Get a handler function by name"""
@@ -459,24 +492,24 @@ register_item(
 )
 
 def bounty_target_teleport(event_id: uuid.UUID, team_id: uuid.UUID, save_data: SaveData, item_data: Dict[str, Any]) -> Dict[str, Any]:
-    from models.models import EventTeams
-    from models.stability_party_3 import SP3EventTiles, SP3Regions
+    from models.stability_party_3 import SP3Regions
+    from event_handlers.stability_party.board_graph import get_board_graph
+    from event_handlers.stability_party.team_positions import team_positions
     team_id = uuid.UUID(team_id) # WHY DO I NEED THIS????
-    teams = EventTeams.query.filter_by(event_id=event_id).all()
-    available_teams = [team for team in teams if team.id != team_id]
+    available_teams = [team for team in team_positions(event_id) if team.team_id != team_id]
     if not available_teams:
         return { "error": "No other teams available to teleport to." }
     
+    board = get_board_graph(event_id)
+    region_ids = {team.island_id for team in available_teams if team.island_id}
+    region_names = {region.id: region.name for region in SP3Regions.query.filter(SP3Regions.id.in_(region_ids))} if region_ids else {}
     options = []
     for team in available_teams:
-        print(f"{team.id}{type(team.id)} VS {team_id}{type(team_id)}")
         available_team_name = team.name
-        available_team_id = str(team.id)
-        available_team_tile_id = uuid.UUID(team.data.get("currentTile"))
-        tile = SP3EventTiles.query.filter_by(id=available_team_tile_id).first()
+        available_team_id = str(team.team_id)
+        tile = board.tile(team.tile_id) if team.tile_id else None
         tile_name = tile.name if tile else "Unknown Tile"
-        region = SP3Regions.query.filter_by(id=tile.region_id).first()
-        region_name = region.name if region else "Unknown Region"
+        region_name = region_names.get(tile.region_id if tile else team.island_id, "Unknown Region")
 
         options.append({
             "name": available_team_name,
@@ -583,40 +616,23 @@ def genie_lamp_selection_handler(event_id: uuid.UUID, team_id: uuid.UUID, save_d
         if save_data.coins < 100:
             return { "message": "Not enough coins to buy the star." }
 
-        save_data.coins -= 100
-        save_data.stars += 1
-
-        # Move the star to another tile
-        # Move the star to a new tile
-        new_star_tile_id = None
-        all_regions = SP3Regions.query.all()
-        applicable_regions = []
-
         from event_handlers.stability_party.send_event_notification import send_event_notification
-        from event_handlers.stability_party.stability_party_handler import is_region_populated, is_shop_tile, is_dock_tile, is_star_tile
+        from event_handlers.stability_party.stability_party_handler import pick_star_destination
+        from event_handlers.stability_party.board_graph import get_board_graph
         from sqlalchemy.orm.attributes import flag_modified
         from app import db
 
-        for region in all_regions:
-            if not is_region_populated(region.id):
-                applicable_regions.append(region.id)
-                
-        applicable_region_tiles = SP3EventTiles.query.filter(
-            SP3EventTiles.event_id == event_id,
-            SP3EventTiles.region_id.in_(applicable_regions),
-        ).all()
-
-        # Filter out tiles that are shops, docks, or already have stars
-        applicable_region_tiles = [tile for tile in applicable_region_tiles if not is_shop_tile(tile.id) and not is_dock_tile(tile.id) and not is_star_tile(tile.id)]
-        logging.info(f"Applicable region tiles for star placement: {[tile.name for tile in applicable_region_tiles]}")
-        if applicable_region_tiles:
-            new_star_tile = random.choice(applicable_region_tiles)
-            new_star_tile_id = new_star_tile.id
-            logging.info(f"Star moved to tile {new_star_tile.name} (ID: {new_star_tile_id})")
-        else:
+        # Move the star to a new tile
+        new_star_tile = pick_star_destination(event_id, get_board_graph(event_id))
+        if new_star_tile is None:
             logging.error("No valid tiles available for star placement.")
-            return {"error": "No valid tiles available for star placement"}, 400
-        
+            return {"error": "No valid tiles available for star placement"}
+        new_star_tile_id = new_star_tile.id
+        logging.info(f"Star moved to tile {new_star_tile.name} (ID: {new_star_tile_id})")
+
+        save_data.coins -= 100
+        save_data.stars += 1
+
         old_star_tile_id = save_data.currentTile
         event = Events.query.filter_by(id=event_id).first()
         star_tiles = event.data.get("star_tiles")
@@ -698,21 +714,18 @@ register_item(
 )
 
 def moonlight_moth_mix_handler(event_id: uuid.UUID, team_id: uuid.UUID, save_data: SaveData, item_data: Dict[str, Any]) -> Dict[str, Any]:
-    from models.models import EventTeams
-    from models.stability_party_3 import SP3EventTiles, SP3Regions
+    from event_handlers.stability_party.team_positions import team_positions
     team_id = uuid.UUID(team_id) # WHY DO I NEED THIS????
-    teams = EventTeams.query.filter_by(event_id=event_id).all()
-    available_teams = [team for team in teams if team.id != team_id]
+    available_teams = [team for team in team_positions(event_id) if team.team_id != team_id]
     if not available_teams:
         return { "error": "No other teams available to select." }
     
     options = []
     for team in available_teams:
-        print(f"{team.id}{type(team.id)} VS {team_id}{type(team_id)}")
         available_team_name = team.name
-        available_team_id = str(team.id)
-        available_team_coins = team.data.get("coins", 0)
-        available_team_stars = team.data.get("stars", 0)
+        available_team_id = str(team.team_id)
+        available_team_coins = team.coins
+        available_team_stars = team.stars
 
         options.append({
             "name": available_team_name,
@@ -759,3 +772,5 @@ register_item(
     requires_selection=True,
     data={}
 )
+
+freeze_item_registry()
@@ -11,12 +11,13 @@ This module handles all item-related functionality including:
 import random
 import logging
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, Sequence, Tuple
 
 from models.models import EventTeams
 from event_handlers.stability_party.save_data import SaveData, save_team_data
 from event_handlers.stability_party.item_definitions import (
-    ITEM_HANDLERS, get_item, get_all_items
+    ITEM_HANDLERS, get_item, item_catalog
 )
 from event_handlers.stability_party.send_event_notification import send_event_notification
 
@@ -85,6 +86,56 @@ def get_team_items(team_id: str, event_id: str) -> List[Dict[str, Any]]:
         logging.error(f"Error getting team items: {str(e)}")
         return []
 
+def shop_rarity_weights(shop_tier: int = 1) -> Dict[str, int]:
+    """Rarity weights a shop of the given tier draws its items with"""
+    tier_weights = RARITY_WEIGHTS.copy()
+    if shop_tier > 1:
+        # Decrease common chance, increase rare+ chances for higher tier shops
+        tier_weights["common"] = max(10, 50 - (shop_tier * 10))
+        tier_weights["uncommon"] = 30 + (shop_tier * 2)
+        tier_weights["rare"] = 15 + (shop_tier * 5)
+        tier_weights["epic"] = 4 + (shop_tier * 2)
+        tier_weights["legendary"] = 1 + shop_tier
+    return tier_weights
+
+class AliasTable:
+    """Walker's alias method: after O(n) setup, each draw from the weights costs one random index and one coin flip"""
+
+    def __init__(self, weights: Sequence[float]):
+        self.weights = tuple(weights)
+        n = len(self.weights)
+        total = sum(self.weights)
+        scaled = [w * n / total for w in self.weights]
+        self.prob = [1.0] * n
+        self.alias = list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            under, over = small.pop(), large.pop()
+            self.prob[under], self.alias[under] = scaled[under], over
+            scaled[over] -= 1.0 - scaled[under]
+            (small if scaled[over] < 1.0 else large).append(over)
+
+    def draw(self, rng=random) -> int:
+        i = int(rng.random() * len(self.prob))
+        return i if rng.random() < self.prob[i] else self.alias[i]
+
+@lru_cache(maxsize=None)
+def shop_rarity_table(shop_tier: int = 1) -> Tuple[Tuple[str, ...], AliasTable]:
+    """
+    Rarities a shop of the given tier can stock and an alias table over their weights.
+    A rarity with no items gives its weight to the highest rarity that has some, which
+    is where a draw of it used to fall back to.
+    Cached per tier: call shop_rarity_table.cache_clear() after changing RARITY_WEIGHTS.
+    """
+    stocked = [rarity for rarity in RARITY_WEIGHTS if item_catalog().by_rarity.get(rarity)]
+    if not stocked:
+        return (), None
+    weights = dict.fromkeys(stocked, 0)
+    for rarity, weight in shop_rarity_weights(shop_tier).items():
+        weights[rarity if rarity in weights else stocked[-1]] += weight
+    return tuple(weights), AliasTable(list(weights.values()))
+
 def generate_shop_inventory(event_id: str, shop_tier: int = 1, item_count: int = 3) -> List[Dict[str, Any]]:
     """
     Generate a random selection of items for a shop based on shop tier.
@@ -98,102 +149,68 @@ def generate_shop_inventory(event_id: str, shop_tier: int = 1, item_count: int =
     - List of item dictionaries for the shop
     """
     try:
-        # Get all available items from registry
-        all_items = [item.to_dict() for item in get_all_items()]
-        
-        if not all_items:
+        catalog = item_catalog()
+        rarities, rarity_table = shop_rarity_table(shop_tier)
+        if not rarities:
             logging.warning(f"No items found for shop generation")
             return []
-        
+
+        logging.debug(f"Shop tier {shop_tier} rarity weights: {dict(zip(rarities, rarity_table.weights))}")
+
         # Prepare empty result list
         shop_items = []
-        
-        # Keep track of selected items to avoid duplicates
+
+        # Keep track of selected items to avoid duplicates, and how many of each rarity are taken
         selected_item_ids = set()
-        
-        # Adjust weights based on shop tier
-        tier_weights = RARITY_WEIGHTS.copy()
-        if shop_tier > 1:
-            # Decrease common chance, increase rare+ chances for higher tier shops
-            tier_weights["common"] = max(10, 50 - (shop_tier * 10))
-            tier_weights["uncommon"] = 30 + (shop_tier * 2)
-            tier_weights["rare"] = 15 + (shop_tier * 5)
-            tier_weights["epic"] = 4 + (shop_tier * 2)
-            tier_weights["legendary"] = 1 + shop_tier
-            
-        logging.debug(f"Shop tier {shop_tier} rarity weights: {tier_weights}")
-        
-        # Group items by rarity
-        items_by_rarity = {}
-        for item in all_items:
-            rarity = item["rarity"].lower()
-            if rarity not in items_by_rarity:
-                items_by_rarity[rarity] = []
-            items_by_rarity[rarity].append(item)
-        
+        taken_by_rarity = dict.fromkeys(rarities, 0)
+
         # Count attempt to avoid infinite loops if there aren't enough unique items
         attempt_count = 0
         max_attempts = item_count * 10  # Increased to ensure we can find items even with bad RNG
-        
+
         # Select random items based on rarity weights
         while len(shop_items) < item_count and attempt_count < max_attempts:
             attempt_count += 1
-            
-            # Determine rarity based on weights
-            rarities = list(tier_weights.keys())
-            weights = list(tier_weights.values())
-            selected_rarity = random.choices(rarities, weights=weights, k=1)[0]
-            
-            # If no items of this rarity, try another
-            if selected_rarity not in items_by_rarity or not items_by_rarity[selected_rarity]:
-                # Try all rarities from highest to lowest
-                for rarity in sorted(items_by_rarity.keys(), 
-                                     key=lambda r: ["common", "uncommon", "rare", "epic", "legendary"].index(r), 
-                                     reverse=True):
-                    if items_by_rarity[rarity]:
-                        selected_rarity = rarity
-                        break
-                else:
-                    # Skip if still no items found
-                    continue
-            
-            # Get available items of this rarity (items not already selected)
-            available_items = [item for item in items_by_rarity[selected_rarity] 
-                               if str(item["id"]) not in selected_item_ids]
-            
-            # If no available items of this rarity, try another rarity
-            if not available_items:
+
+            selected_rarity = rarities[rarity_table.draw()]
+            candidates = catalog.by_rarity[selected_rarity]
+
+            # If every item of this rarity is already on offer, try another
+            if taken_by_rarity[selected_rarity] >= len(candidates):
                 continue
-                
-            # Select random item of chosen rarity
-            item = random.choice(available_items)
-            
+
+            # Select a random item of the chosen rarity that is not on offer yet
+            item = random.choice(candidates)
+            while item.id in selected_item_ids:
+                item = random.choice(candidates)
+
             # Mark as selected to avoid duplicates
-            selected_item_ids.add(str(item["id"]))
-            
+            selected_item_ids.add(item.id)
+            taken_by_rarity[selected_rarity] += 1
+
             # Calculate price with some randomness
-            base_price = item["base_price"]
+            base_price = item.base_price
             if base_price >= 10: # Only apply variance if base price is above a threshold
                 price_variance = random.uniform(0.8, 1.2)  # 20% variance
                 final_price = int(base_price * price_variance)
             else:
                 final_price = base_price
-            
+
             # Add item to shop inventory
             shop_items.append({
-                "id": str(item["id"]),
-                "name": item["name"],
-                "description": item["description"],
-                "image": item["image"],
-                "item_type": item["item_type"],
-                "rarity": item["rarity"],
+                "id": str(item.id),
+                "name": item.name,
+                "description": item.description,
+                "image": item.image,
+                "item_type": item.item_type,
+                "rarity": item.rarity,
                 "price": final_price
             })
-        
+
         # If we couldn't find enough unique items, log a warning
         if len(shop_items) < item_count:
             logging.warning(f"Could only generate {len(shop_items)} unique items for shop (requested {item_count})")
-            
+
         return shop_items
     except Exception as e:
         logging.error(f"Error generating shop inventory: {str(e)}")
@@ -242,7 +259,7 @@ def add_item_to_inventory(event_id: str, team_id: str, item_id: str) -> bool:
         logging.info(f"Added item {item['name']} (ID: {item_id}) to team {team_id} inventory")
         
         # Save changes
-        save_team_data(team, save)
+        save_team_data(team, save, reason="add_item")
         return True
     
     except Exception as e:
@@ -319,7 +336,7 @@ def use_item(event_id: str, team_id: str, item_index: int) -> Dict[str, Any]:
                 "effect": result.get("effect", {}),
             }
 
-            save_team_data(team, save)
+            save_team_data(team, save, reason="use_item")
 
             return {
                 "success": True,
@@ -341,7 +358,7 @@ def use_item(event_id: str, team_id: str, item_index: int) -> Dict[str, Any]:
                 save.itemList.pop(item_index)
             
         # Save changes
-        save_team_data(team, save)
+        save_team_data(team, save, reason="use_item")
         
         # Return result
         return {
@@ -389,14 +406,14 @@ def complete_item_activation(event_id: str, team_id: str, selection_data: Dict[s
         if item_index >= len(save.itemList) or save.itemList[item_index]["id"] != pending["item_id"]:
             logging.error(f"Pending item no longer exists in inventory: {pending['item_id']}")
             save.pendingItemActivation = {}
-            save_team_data(team, save)
+            save_team_data(team, save, reason="item_activation")
             return {"success": False, "message": "The item you were using is no longer in your inventory"}
         
         # Get the selection handler
         if not selection_handler or selection_handler not in ITEM_HANDLERS:
             logging.error(f"No selection handler found: {selection_handler}")
             save.pendingItemActivation = {}
-            save_team_data(team, save)
+            save_team_data(team, save, reason="item_activation")
             return {"success": False, "message": "Unable to process your selection"}
         
         # Call the selection handler with the selected option
@@ -408,13 +425,18 @@ def complete_item_activation(event_id: str, team_id: str, selection_data: Dict[s
             save.itemList[item_index],
             selected_value=selection_data.get("selection")
         )
+
+        if "error" in result:
+            # Nothing was applied; the activation stays pending so another option can be picked
+            logging.error(f"Error in {pending['item_id']} selection: {result['error']}")
+            return {"success": False, "message": result["error"]}
         
         # Get full item details
         item = get_item_by_id(pending["item_id"])
         if not item:
             logging.error(f"Item not found in registry: {pending['item_id']}")
             save.pendingItemActivation = {}
-            save_team_data(team, save)
+            save_team_data(team, save, reason="item_activation")
             return {"success": False, "message": "Item definition no longer exists"}
         
         # Update uses remaining
@@ -431,7 +453,7 @@ def complete_item_activation(event_id: str, team_id: str, selection_data: Dict[s
         save.pendingItemActivation = {}
         
         # Save changes
-        save_team_data(team, save)
+        save_team_data(team, save, reason="item_activation")
         
         send_event_notification(event_id, team_id, f"{item['name']} used by {team.name}!", result.get("message", ""))
         
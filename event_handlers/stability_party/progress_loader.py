@@ -0,0 +1,150 @@
+"""
+Batch loader for the Stability Party progress endpoints.
+
+The tile-progress view used to look up every challenge, then every task of it,
+then every trigger of those, one query each, and the event progress view looked
+up each team's tile and region on its own. load_progress reads everything the
+given teams' challenges reference with one query per table (tile -> challenge
+mappings, challenges, tasks, triggers) and takes tiles and regions from the
+cached board graph; progress is then rendered from memory.
+
+event_standings ranks every team of an event from the team positions index and
+the board graph, both kept up to date in memory on committed writes, so the
+standings take no queries once those are loaded.
+"""
+import uuid
+
+from sqlalchemy import text
+
+from event_handlers.stability_party.board_graph import BoardGraph, get_board_graph
+from event_handlers.stability_party.team_positions import team_positions
+
+
+def _as_uuid(value) -> uuid.UUID | None:
+    try:
+        return value if isinstance(value, uuid.UUID) else uuid.UUID(str(value))
+    except ValueError:
+        return None
+
+
+def _by_ids(session, sql: str, ids) -> list:
+    ids = sorted({str(i) for i in map(_as_uuid, ids) if i is not None})
+    if not ids:
+        return []
+    return session.execute(text(sql), {"ids": ids}).fetchall()
+
+
+class ProgressData:
+    def __init__(self, graph: BoardGraph, tile_challenges: dict, challenges: dict, tasks: dict, triggers: dict) -> None:
+        self.graph = graph
+        self.tile_challenges: dict[uuid.UUID, list[uuid.UUID]] = tile_challenges
+        self.challenges: dict[uuid.UUID, list[str]] = challenges  # challenge -> task ids
+        self.tasks: dict[uuid.UUID, tuple[int, list[str]]] = tasks  # task -> (quantity, trigger ids)
+        self.triggers: dict[uuid.UUID, str] = triggers  # trigger -> how it reads in a progress line
+
+    def tile_challenge_ids(self, save) -> list:
+        if save.currentChallenges:
+            return save.currentChallenges
+        if save.currentTile:
+            return self.tile_challenges.get(_as_uuid(save.currentTile), [])
+        return []
+
+    def region_challenge_ids(self, save) -> list:
+        region = self.graph.region(save.islandId)
+        return list(region.challenges) if region else []
+
+    def challenge_progress(self, challenge_id, tile_progress: dict) -> list[str]:
+        """One "progress/quantity triggers" line per task of the challenge."""
+        task_ids = self.challenges.get(_as_uuid(challenge_id))
+        if task_ids is None:
+            return ["Unknown challenge"]
+
+        progress = tile_progress.get(str(challenge_id), {})
+        lines = []
+        for task_id in task_ids:
+            task = self.tasks.get(_as_uuid(task_id))
+            if task is None:
+                continue
+            quantity, trigger_ids = task
+            triggers = [self.triggers[t] for t in map(_as_uuid, trigger_ids) if t in self.triggers]
+            lines.append(f"{progress.get(task_id, 0)}/{quantity} {' OR '.join(triggers)}")
+        return lines
+
+    def team_progress(self, save) -> tuple[list[str], list[str]]:
+        """(tile progress lines, region progress lines) for a team's save."""
+        tile_progress = [line for challenge_id in self.tile_challenge_ids(save)
+                         for line in self.challenge_progress(challenge_id, save.tileProgress)]
+        region_progress = [line for challenge_id in self.region_challenge_ids(save)
+                           for line in self.challenge_progress(challenge_id, save.tileProgress)]
+        return tile_progress, region_progress
+
+
+def _trigger_label(trigger: str, source: str | None, trigger_type: str) -> str | None:
+    if trigger_type == "DROP":
+        return f"{trigger}{' from ' + source if source else ''}"
+    if trigger_type == "KC":
+        return f"{trigger} KC"
+    return None
+
+
+def load_progress(event_id, saves: list, session=None) -> ProgressData:
+    """Everything needed to render the progress of saves, in at most four queries past the board graph."""
+    from app import db
+
+    session = session or db.session
+    graph = get_board_graph(event_id, session)
+
+    mapped_tiles = [save.currentTile for save in saves if not save.currentChallenges and save.currentTile]
+    tile_challenges = {}
+    for r in _by_ids(session, """
+        SELECT tile_id, challenge_id
+        FROM sp3_event_tile_challenge_mapping
+        WHERE type = 'TILE' AND tile_id = ANY(CAST(:ids AS uuid[]))
+        ORDER BY id
+    """, mapped_tiles):
+        tile_challenges.setdefault(r.tile_id, []).append(r.challenge_id)
+
+    challenge_ids = set()
+    for save in saves:
+        challenge_ids.update(save.currentChallenges or ())
+        region = graph.region(save.islandId)
+        if region:
+            challenge_ids.update(region.challenges)
+    for mapped in tile_challenges.values():
+        challenge_ids.update(mapped)
+    challenges = {r.id: list(r.tasks or ()) for r in _by_ids(
+        session, "SELECT id, tasks FROM event_challenges WHERE id = ANY(CAST(:ids AS uuid[]))", challenge_ids)}
+
+    tasks = {r.id: (r.quantity, list(r.triggers or ())) for r in _by_ids(
+        session, "SELECT id, quantity, triggers FROM event_tasks WHERE id = ANY(CAST(:ids AS uuid[]))",
+        [task_id for task_ids in challenges.values() for task_id in task_ids])}
+
+    triggers = {}
+    for r in _by_ids(session, "SELECT id, trigger, source, type FROM event_triggers WHERE id = ANY(CAST(:ids AS uuid[]))",
+                     [trigger_id for _, trigger_ids in tasks.values() for trigger_id in trigger_ids]):
+        label = _trigger_label(r.trigger, r.source, r.type)
+        if label is not None:
+            triggers[r.id] = label
+
+    return ProgressData(graph, tile_challenges, challenges, tasks, triggers)
+
+
+def event_standings(event_id, session=None) -> list[dict]:
+    """Every team of the event ranked by stars, then coins."""
+    graph = get_board_graph(event_id, session)
+    standings = []
+    for position in team_positions(event_id, session):
+        region = graph.region(position.island_id)
+        standings.append({
+            "team_id": str(position.team_id),
+            "team_name": position.name,
+            "stars": position.stars,
+            "coins": position.coins,
+            "current_tile": str(position.tile_id) if position.tile_id else None,
+            "current_region": region.name if region else "Unknown",
+            "tile_completed": position.tile_completed,
+        })
+    standings.sort(key=lambda x: (x["stars"], x["coins"]), reverse=True)
+    for i, team in enumerate(standings):
+        team["rank"] = i + 1
+    return standings
@@ -1,9 +1,18 @@
 from app import db
 from models.models import EventTeams
+from event_handlers.stability_party.team_positions import note_team_write
+from event_handlers.stability_party.team_history import record_team_version, team_state_at
+from helper.helpers import dumps_json
+import json
+from sqlalchemy import inspect, text
 from sqlalchemy.orm.attributes import flag_modified  # Add this import
+import functools
 import uuid
 import logging
 
+# Written as increments of the stored value so concurrent saves (a roll and a drop) both count
+COUNTER_FIELDS = ("coins", "stars")
+
 # Roll Progression System
 class RollState:
     ACTION_TYPES = {
@@ -17,6 +26,9 @@ class RollState:
         "ISLAND_SELECTION": "island_selection" # Player has chosen starting island
     }
     
+    __slots__ = ("event_id", "team_id", "starting_tile_id", "current_tile_id", "roll_total_for_turn", "roll_remaining",
+                 "dice_results_for_roll", "modifier_for_roll", "path_taken_this_turn", "action_required", "action_data")
+
     def __init__(self, event_id, team_id, roll_total_for_turn, current_tile_id=None):
         self.event_id = event_id
         self.team_id = team_id
@@ -48,15 +60,15 @@ class RollState:
     @staticmethod
     def from_dict(data: dict) -> "RollState":
         roll_state = RollState(
-            event_id=uuid.UUID(data["event_id"]),
-            team_id=uuid.UUID(data["team_id"]),
+            event_id=_parse_uuid(data["event_id"]),
+            team_id=_parse_uuid(data["team_id"]),
             roll_total_for_turn=data.get("roll_total_for_turn", 0),
-            current_tile_id=uuid.UUID(data["current_tile_id"]) if data.get("current_tile_id") else None
+            current_tile_id=_uuid_or_none(data.get("current_tile_id"))
         )
         roll_state.roll_remaining = data.get("roll_remaining", 0)
         roll_state.dice_results_for_roll = data.get("dice_results_for_roll", [])
         roll_state.modifier_for_roll = data.get("modifier_for_roll", 0)
-        roll_state.path_taken_this_turn = [uuid.UUID(tile) for tile in data.get("path_taken_this_turn", [])]
+        roll_state.path_taken_this_turn = [_parse_uuid(tile) for tile in data.get("path_taken_this_turn", [])]
         roll_state.action_required = data.get("action_required", None)
         roll_state.action_data = data.get("action_data", {})
         
@@ -78,6 +90,8 @@ class RollState:
         })
 
 class Equipment:
+    __slots__ = ("helmet", "armor", "weapon", "jewelry", "cape")
+
     helmet: str
     armor: str
     weapon: str
@@ -111,109 +125,220 @@ class Equipment:
         equipment.cape = data.get("cape", "")
         return equipment
 
+@functools.lru_cache(maxsize=8192)
+def _parse_uuid(value: str) -> uuid.UUID:
+    # The same few tile, region and challenge ids are parsed over and over; UUIDs are immutable
+    return uuid.UUID(value)
+
+def _uuid_or_none(value) -> uuid.UUID | None:
+    return _parse_uuid(value) if value else None
+
+def _str_or_none(value) -> str | None:
+    return str(value) if value else None
+
+def _copy_json(value):
+    """Copy of a decoded JSON value, so changes made through SaveData never reach the loaded blob"""
+    if isinstance(value, dict):
+        return {k: _copy_json(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_copy_json(v) for v in value]
+    return value
+
+def _same(value):
+    return value
+
+class _Field:
+    """A SaveData key, decoded from the loaded blob on first access and encoded back by to_dict()."""
+    __slots__ = ("key", "default", "decode", "encode")
+
+    def __init__(self, default, decode=_same, encode=_same):
+        self.default = default  # Called for a missing or null key
+        self.decode = decode
+        self.encode = encode
+
+    def __set_name__(self, owner, name):
+        self.key = name
+
+    def load(self, save: "SaveData", raw):
+        return self.decode(raw) if raw is not None else self.default()
+
+    def __get__(self, save, owner=None):
+        if save is None:
+            return self
+        try:
+            return save._values[self.key]
+        except KeyError:
+            value = save._values[self.key] = self.load(save, save._data.get(self.key))
+            return value
+
+    def __set__(self, save, value):
+        save._values[self.key] = value
+
+class _RollStateField(_Field):
+    def load(self, save: "SaveData", raw):
+        if not raw:
+            return None
+        return RollState.from_save_data(save._data.get("event_id"), save._data.get("team_id"), _copy_json(raw))
+
 class SaveData:
-    team: EventTeams
+    """
+    A team's Stability Party state. from_dict keeps the stored blob and each field is
+    decoded the first time it is read, so a request that only looks at coins and the
+    current tile never builds the rest; to_dict passes untouched keys through as stored.
+    """
+    __slots__ = ("_data", "_values", "_loaded")
 
-    previousTile: uuid.UUID
-    currentTile: uuid.UUID
-    currentChallenges: list[uuid.UUID]
-    stars: int
-    coins: int
-    islandId: uuid.UUID
-    islandLaps: int
-    itemList: list[dict]
-    pendingItemActivation: dict
-    equipment: Equipment
+    previousTile = _Field(lambda: None, _uuid_or_none, _str_or_none)
+    currentTile = _Field(lambda: None, _uuid_or_none, _str_or_none)
+    currentChallenges = _Field(list, lambda ids: [_uuid_or_none(i) for i in ids], lambda ids: [str(i) for i in ids])
+    stars = _Field(int)
+    coins = _Field(int)
+    islandId = _Field(lambda: None, _uuid_or_none, _str_or_none)
+    islandLaps = _Field(int)
+    itemList = _Field(list, _copy_json)
+    pendingItemActivation = _Field(dict, _copy_json)
+    equipment = _Field(lambda: Equipment.from_dict({}), Equipment.from_dict, lambda e: e.to_dict() if e else None)
 
-    dice: list[int]
-    modifier: int
+    dice = _Field(list, list)
+    modifier = _Field(int)
 
-    isTileCompleted: bool
-    isRolling: bool
+    isTileCompleted = _Field(bool)
+    isRolling = _Field(bool)
 
-    buffs: list[dict]
-    debuffs: list[dict]
+    buffs = _Field(list, _copy_json)
+    debuffs = _Field(list, _copy_json)
 
-    textChannelId: str
-    voiceChannelId: str
+    textChannelId = _Field(str)
+    voiceChannelId = _Field(str)
 
     # This is called tileProgress but it is essentially a challenge progress tracker
     # Maps challenge IDs to task progress
     # e.g., {challenge_id: {task_id: progress}}
-    tileProgress: dict[str, dict[str, int]]
+    tileProgress = _Field(dict, lambda progress: {challenge_id: dict(tasks) for challenge_id, tasks in progress.items()})
+
+    roll_state = _RollStateField(lambda: None, encode=lambda r: r.to_dict() if r else None)  # Optional roll state for tracking current roll
 
-    roll_state: RollState | None = None  # Optional roll state for tracking current roll
+    _FIELDS = (previousTile, currentTile, currentChallenges, stars, coins, islandId, islandLaps, itemList,
+               pendingItemActivation, equipment, dice, modifier, isTileCompleted, isRolling, buffs, debuffs,
+               textChannelId, voiceChannelId, tileProgress, roll_state)
+
+    def __init__(self):
+        self._data = {}     # The blob this was loaded from, never modified in place
+        self._values = {}   # Decoded (or assigned) fields
+        self._loaded = False
+
+    def changed_fields(self) -> dict | None:
+        """Keys of to_dict() that differ from what was loaded, or None if this was not loaded from a dict."""
+        if not self._loaded:
+            return None
+        changes = {}
+        for field in self._FIELDS:
+            if field.key in self._values:
+                value = field.encode(self._values[field.key])
+                if field.key not in self._data or self._data[field.key] != value:
+                    changes[field.key] = value
+            elif field.key not in self._data:
+                changes[field.key] = field.encode(field.default())
+        return changes
+
+    def mark_saved(self, stored: dict) -> None:
+        """Record that stored is now what the row holds for those keys."""
+        self._data = {**self._data, **_copy_json(stored)}
+        for key in stored:
+            self._values.pop(key, None)
 
     def to_dict(self) -> dict:
-        path_taken = []
-        if hasattr(self, 'path_taken_this_turn') and self.path_taken_this_turn:
-            path_taken = [str(tile_id) for tile_id in self.path_taken_this_turn]
-            
-        return {
-            "previousTile": str(self.previousTile) if self.previousTile else None,
-            "currentTile": str(self.currentTile) if self.currentTile else None,
-            "currentChallenges": [str(challenge_id) for challenge_id in self.currentChallenges],
-            "stars": self.stars,
-            "coins": self.coins,
-            "islandId": str(self.islandId) if self.islandId else None,
-            "islandLaps": self.islandLaps,
-            "itemList": self.itemList,
-            "pendingItemActivation": self.pendingItemActivation,
-            "equipment": self.equipment.to_dict() if self.equipment else None,
-            "dice": self.dice,
-            "modifier": self.modifier,
-            "isTileCompleted": self.isTileCompleted,
-            "isRolling": self.isRolling,
-            "buffs": self.buffs,
-            "debuffs": self.debuffs,
-            "textChannelId": self.textChannelId,
-            "voiceChannelId": self.voiceChannelId,
-            "tileProgress": {
-                challenge_id: {task_id: progress for task_id, progress in tasks.items()}
-                for challenge_id, tasks in self.tileProgress.items()
-            },
-            "roll_state": self.roll_state.to_dict() if self.roll_state else None,
-        }
+        data = {}
+        for field in self._FIELDS:
+            if field.key in self._values:
+                data[field.key] = field.encode(self._values[field.key])
+            elif field.key in self._data:
+                data[field.key] = self._data[field.key]
+            else:
+                data[field.key] = field.encode(field.default())
+        return data
     
     @staticmethod
     def from_dict(data: dict) -> "SaveData":
         save_data = SaveData()
-        save_data.previousTile = uuid.UUID(data["previousTile"]) if data.get("previousTile") else None
-        save_data.currentTile = uuid.UUID(data["currentTile"]) if data.get("currentTile") else None
-        save_data.currentChallenges = [uuid.UUID(challenge_id) if challenge_id else None for challenge_id in data.get("currentChallenges", [])]
-        save_data.stars = data.get("stars", 0)
-        save_data.coins = data.get("coins", 0)
-        save_data.islandId = uuid.UUID(data["islandId"]) if data.get("islandId") else None
-        save_data.islandLaps = data.get("islandLaps", 0)
-        save_data.itemList = data.get("itemList", [])
-        save_data.pendingItemActivation = data.get("pendingItemActivation", {})
-        save_data.equipment = Equipment.from_dict(data.get("equipment", {}) if "equipment" in data else {})
-        save_data.dice = data.get("dice", [])
-        save_data.modifier = data.get("modifier", 0)
-        save_data.isTileCompleted = data.get("isTileCompleted", False)
-        save_data.isRolling = data.get("isRolling", False)
-        save_data.buffs = data.get("buffs", [])
-        save_data.debuffs = data.get("debuffs", [])
-        save_data.textChannelId = data.get("textChannelId", "")
-        save_data.voiceChannelId = data.get("voiceChannelId", "")
-        save_data.tileProgress = {
-            challenge_id: {task_id: progress for task_id, progress in tasks.items()}
-            for challenge_id, tasks in data.get("tileProgress", {}).items()
-        }
-        
-        save_data.roll_state = RollState.from_save_data(
-            event_id=data.get("event_id"),
-            team_id=data.get("team_id"),
-            save_data=data.get("roll_state", {})
-        ) if "roll_state" in data else None
-        
+        save_data._data = dict(data)
+        save_data._loaded = True
         return save_data
 
-# Ensure save_team_data is correctly flagging modifications and committing
-def save_team_data(team: EventTeams, save: SaveData):
-    team.data = save.to_dict()
-    logging.debug(f"Preparing to save team data for team {team.id}: {team.data}")
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+def _patch_team_data(team: EventTeams, save: SaveData, changes: dict, reason: str | None = None, absolute: tuple[str, ...] = ()):
+    """
+    Apply changes to the stored blob with one UPDATE, leaving keys nobody touched as they are in the row.
+    Counter fields are written as increments unless named in absolute.
+    """
+    params = {"id": str(team.id)}
+    expression = "COALESCE(t.data, '{}'::jsonb) || CAST(:patch AS jsonb)"
+    for field in COUNTER_FIELDS:
+        before = save._data.get(field, 0)
+        if field in changes and field not in absolute and _is_number(before) and _is_number(changes[field]):
+            params[f"{field}_delta"] = changes.pop(field) - before
+            expression = f"jsonb_set({expression}, '{{{field}}}', to_jsonb(COALESCE((t.data->>'{field}')::numeric, 0) + :{field}_delta))"
+    params["patch"] = dumps_json(changes)
+
+    # Joining the row to itself, locked, returns what it held before the update for the history
+    row = db.session.execute(text(f"""
+        UPDATE event_teams AS t SET data = {expression}
+        FROM (SELECT id, data FROM event_teams WHERE id = :id FOR UPDATE) AS old
+        WHERE t.id = old.id
+        RETURNING old.data AS before, t.data AS after
+    """), params).one()
+    db.session.expire(team, ["data"])
+    record_team_version(db.session, team, row.before, row.after, reason)
+
+    # The row may have been incremented by someone else too; carry on from what was stored
+    save.mark_saved({**changes, **{field: row.after.get(field) for field in COUNTER_FIELDS}})
+    note_team_write(db.session, team, save.to_dict())
+
+def _write_team_data(team: EventTeams, data: dict, reason: str | None = None):
+    """Replace the whole stored blob with data"""
+    before = None
+    if inspect(team).persistent:
+        with db.session.no_autoflush:
+            before = db.session.execute(text("SELECT data FROM event_teams WHERE id = :id FOR UPDATE"), {"id": str(team.id)}).scalar()
+    team.data = data
     flag_modified(team, "data")
+    db.session.flush()
+    return record_team_version(db.session, team, before, json.loads(dumps_json(data)), reason)
+
+def restore_team_data(team: EventTeams, version: int, reason: str | None = None) -> int | None:
+    """
+    Put the team back to its save data as of version, recorded as a new version. Returns
+    that version (None if restoring changed nothing), or raises LookupError if version
+    does not exist.
+    """
+    data = team_state_at(db.session, team.id, version)
+    if data is None:
+        raise LookupError(f"Team {team.id} has no version {version}")
+    try:
+        restored = _write_team_data(team, data, reason or f"restore:{version}")
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logging.error(f"Error restoring team {team.id} to version {version}: {e}", exc_info=True)
+        raise
+    return restored
+
+def save_team_data(team: EventTeams, save: SaveData, reason: str | None = None, absolute: tuple[str, ...] = ()):
+    """
+    Write save to the team's row and append it to the team's history; reason is recorded with the version.
+    Coins and stars are saved as increments so concurrent saves both count; name them in absolute
+    to store the value as set instead (a moderator correcting a count).
+    """
+    changes = save.changed_fields()
+    state = inspect(team)
+    if changes is None or not state.persistent or state.attrs.data.history.has_changes():
+        # Not loaded from the stored blob (or the blob was reassigned this session): write it whole
+        _write_team_data(team, save.to_dict(), reason)
+    elif changes:
+        _patch_team_data(team, save, changes, reason, absolute)
+    logging.debug(f"Preparing to save team data for team {team.id}: {changes if changes is not None else team.data}")
     try:
         db.session.commit()
         logging.debug(f"Team data saved successfully for team {team.id}")
@@ -1,6 +1,6 @@
 import uuid
 import logging
-import requests
+from helper.discord_outbox import enqueue_webhook
 from models.models import Events, EventTeams
 
 def send_event_notification(event_id: uuid, team_id: uuid, title: str, message: str) -> None:
@@ -25,7 +25,8 @@ def send_event_notification(event_id: uuid, team_id: uuid, title: str, message:
             ]
         }
 
-        requests.post(webhook, json=data)
+        # Delivered by the discord outbox once the caller's transaction commits
+        enqueue_webhook(webhook, data)
     else:
         logging.warning(f"No webhook URL found for event {event.id}. Cannot send notification.")
         return
\ No newline at end of file
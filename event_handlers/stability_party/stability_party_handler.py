@@ -5,11 +5,14 @@ from models.stability_party_3 import SP3Regions, SP3EventTiles, SP3EventTileChal
 from event_handlers.stability_party.item_system import generate_shop_inventory, get_item_by_id, add_item_to_inventory
 from event_handlers.stability_party.item_definitions import get_items_by_rarity
 from event_handlers.stability_party.save_data import RollState, SaveData, save_team_data
+from event_handlers.stability_party.board_graph import BoardTile, get_board_graph, board_graph_for_tile
+from event_handlers.stability_party.team_positions import teams_in_region
+from event_handlers.stability_party.drop_log import record_drop
 from event_handlers.stability_party.send_event_notification import send_event_notification
+from helper.metrics import mark_submission_matched, record_submission_outcome
 import uuid
 import logging
 import random
-import requests
 from datetime import datetime, timezone
 from sqlalchemy.orm.attributes import flag_modified  # Add this import
 
@@ -119,7 +122,7 @@ def create_region_challenge_notification(challenge: EventChallenges, event: Even
     )
 
 def create_tile_challenge_notification(challenge_mapping: SP3EventTileChallengeMapping, event: Events, team: EventTeams, save: SaveData, submission: EventSubmission) -> NotificationResponse:
-    tile = SP3EventTiles.query.filter(SP3EventTiles.id == save.currentTile).first()
+    tile = get_board_graph(event.id).tile(save.currentTile)
     if not tile:
         logging.error(f"Tile not found for currentTile ID {save.currentTile} during notification creation.")
         return None
@@ -168,7 +171,7 @@ def create_tile_challenge_notification(challenge_mapping: SP3EventTileChallengeM
 
 def create_coin_challenge_notification(challenge_mapping: SP3EventTileChallengeMapping, event: Events, team: EventTeams, save: SaveData, submission: EventSubmission) -> NotificationResponse:
     # Placeholder - similar to tile challenge but might have different rewards or logic
-    tile = SP3EventTiles.query.filter(SP3EventTiles.id == save.currentTile).first()
+    tile = get_board_graph(event.id).tile(save.currentTile)
     if not tile: return None
     region = SP3Regions.query.filter(SP3Regions.id == tile.region_id).first()
     if not region: return None
@@ -415,24 +418,12 @@ def stability_party_handler(submission: EventSubmission) -> list[NotificationRes
     
     if team is None:
         logging.info(f"Team not found for RSN '{submission.rsn}' or ID '{submission.id}' in event '{event.name}' (ID: {event.id}).")
+        record_submission_outcome("stability_party_handler", "no_team")
         return None
+    mark_submission_matched()
     
-    if event.data.get("log") is None:
-        event.data["log"] = {} # Ensure log is initialized
-
-    if event.data["log"].get(submission.trigger) is None:
-        event.data["log"][submission.trigger] = {
-            "value": submission.totalValue,
-            "quantity": submission.quantity
-        }
-    else:
-        event.data["log"][submission.trigger] = {
-            "value": event.data["log"][submission.trigger]["value"] + submission.totalValue,
-            "quantity": event.data["log"][submission.trigger]["quantity"] + submission.quantity
-        }
-
-    flag_modified(event, "data") # Flag the event data as modified
-    db.session.commit() # Commit the event data changes
+    record_drop(event.id, submission.trigger, submission.totalValue, submission.quantity, db.session)
+    db.session.commit() # Commit the drop log totals
 
     # Ensure team.data is not None before passing to SaveData.from_dict
     team_data_dict = team.data if team.data is not None else {}
@@ -457,7 +448,7 @@ def stability_party_handler(submission: EventSubmission) -> list[NotificationRes
     # progress_event might be for global, non-team specific objectives
     # progress_event(event, submission) 
     
-    save_team_data(team, save) # Save any changes to save.data (like tileProgress, coins, isTileCompleted)
+    save_team_data(team, save, reason="submission") # Save any changes to save.data (like tileProgress, coins, isTileCompleted)
 
     return notifications
 
@@ -499,7 +490,7 @@ def roll_dice_progression(event_id_str: str, team_id_str: str, data: dict = None
                 logging.info(f"Team {team_id} has no currentTile. Initiating FIRST_ROLL sequence.")
                 roll_state_obj = _handle_first_roll_initiation(event_id, team_id, save, data if data else {})
                 response_payload = roll_state_obj.to_dict()
-                save_team_data(team, save) 
+                save_team_data(team, save, reason=RollState.ACTION_TYPES["FIRST_ROLL"])
                 return response_payload, 200
             else: 
                 logging.info(f"Initiating new standard roll for team {team_id}")
@@ -512,7 +503,7 @@ def roll_dice_progression(event_id_str: str, team_id_str: str, data: dict = None
                 
                 _initiate_new_roll(event_id, team_id, save, data if data else {})
                 response_payload = _process_next_move(event_id, team_id, save)
-                save_team_data(team, save)
+                save_team_data(team, save, reason="roll")
                 return response_payload, 200
 
         elif action_type == RollState.ACTION_TYPES["ISLAND_SELECTION"]:
@@ -527,7 +518,7 @@ def roll_dice_progression(event_id_str: str, team_id_str: str, data: dict = None
             response_payload = _handle_island_selection(event_id, team_id, save, data if data else {})
             if "error" in response_payload: 
                 return response_payload, response_payload.get("status_code", 400) 
-            save_team_data(team, save)
+            save_team_data(team, save, reason=action_type)
             return response_payload, 200
             
         # --- Existing Action Handlers ---
@@ -572,7 +563,7 @@ def roll_dice_progression(event_id_str: str, team_id_str: str, data: dict = None
         # Save data after any action that modified 'save' object and did not error
         if "error" not in response_payload:
             logging.info(f"Action '{action_type}' processed successfully for team {team_id}. Saving state.")
-            save_team_data(team, save)
+            save_team_data(team, save, reason=action_type)
         else:
             logging.error(f"Error processing action '{action_type}' for team {team_id}: {response_payload['error']}")
         
@@ -633,7 +624,8 @@ def _process_next_move(event_id, team_id, save: SaveData) -> dict:
         logging.debug(f"No moves remaining for team {team_id}. Completing roll.")
         return _complete_roll(event_id, team_id, save)
 
-    current_tile_obj = SP3EventTiles.query.filter_by(id=save.currentTile).first()
+    board = get_board_graph(event_id)
+    current_tile_obj = board.tile(save.currentTile)
     if not current_tile_obj:
         logging.error(f"Current tile {save.currentTile} not found for team {team_id}.")
         save.isRolling = False 
@@ -642,16 +634,16 @@ def _process_next_move(event_id, team_id, save: SaveData) -> dict:
     if not save.roll_state.path_taken_this_turn or save.roll_state.path_taken_this_turn[-1] != save.currentTile:
         save.roll_state.path_taken_this_turn.append(save.currentTile)
 
-    next_tile_ids_str = current_tile_obj.data.get("nextTiles", []) if current_tile_obj.data else []
+    next_tile_ids = board.next_tiles(current_tile_obj.id)
 
-    if len(next_tile_ids_str) > 1:
+    if len(next_tile_ids) > 1:
         logging.info(f"Crossroad detected at tile {current_tile_obj.id} for team {team_id}.")
-        return _handle_crossroad(event_id, team_id, save, next_tile_ids_str)
-    elif len(next_tile_ids_str) == 1:
-        next_tile_id_str = next_tile_ids_str[0]
-        logging.info(f"Team {team_id} moving from {current_tile_obj.id} to single next tile {next_tile_id_str}.")
+        return _handle_crossroad(event_id, team_id, save, next_tile_ids)
+    elif len(next_tile_ids) == 1:
+        next_tile_id = next_tile_ids[0]
+        logging.info(f"Team {team_id} moving from {current_tile_obj.id} to single next tile {next_tile_id}.")
         
-        save.currentTile = uuid.UUID(next_tile_id_str)
+        save.currentTile = next_tile_id
         save.roll_state.current_tile_id = save.currentTile
         save.roll_state.roll_remaining -= 1
         
@@ -663,100 +655,68 @@ def _process_next_move(event_id, team_id, save: SaveData) -> dict:
 
 def is_star_tile(tile_id):
     """Check if the tile is a star tile"""
-    tile = SP3EventTiles.query.filter_by(id=tile_id).first()
-    if tile:
-        event = Events.query.filter_by(id=tile.event_id).first()
-        if event:
-            star_list = event.data.get("star_tiles", [])
-            if str(tile_id) in star_list:
-                logging.debug(f"Tile {tile_id} is a star tile")
-                return True
-            else:
-                logging.debug(f"Tile {tile_id} is not a star tile")
-                return False
-            
+    board = board_graph_for_tile(tile_id)
+    if board and board.is_star(tile_id):
+        logging.debug(f"Tile {tile_id} is a star tile")
+        return True
+    logging.debug(f"Tile {tile_id} is not a star tile")
     return False
 
 def is_dock_tile(tile_id):
     """Check if the tile is a dock tile"""
-    tile = SP3EventTiles.query.filter_by(id=tile_id).first()
-    if tile:
-        isDock = tile.data.get("isDock", False)
-        if isDock:
-            logging.debug(f"Tile {tile_id} is a dock tile")
-            return True
-        else:
-            logging.debug(f"Tile {tile_id} is not a dock tile")
-            return False
-            
+    board = board_graph_for_tile(tile_id)
+    if board and board.is_dock(tile_id):
+        logging.debug(f"Tile {tile_id} is a dock tile")
+        return True
+    logging.debug(f"Tile {tile_id} is not a dock tile")
     return False
 
 def is_shop_tile(tile_id):
     """Check if the tile is a shop tile"""
-    tile = SP3EventTiles.query.filter_by(id=tile_id).first()
-    if tile:
-        isShop = tile.data.get("isShop", False)
-        if isShop:
-            logging.debug(f"Tile {tile_id} is a shop tile")
-            return True
-        else:
-            logging.debug(f"Tile {tile_id} is not a shop tile")
-            return False
-            
+    board = board_graph_for_tile(tile_id)
+    if board and board.is_shop(tile_id):
+        logging.debug(f"Tile {tile_id} is a shop tile")
+        return True
+    logging.debug(f"Tile {tile_id} is not a shop tile")
     return False
 
 def is_island_start_tile(tile_id):
     """Check if the tile is the first tile of an island"""
-    tile = SP3EventTiles.query.filter_by(id=tile_id).first()
-    if tile:
-        isIslandStart = tile.data.get("isIslandStart", False)
-        if isIslandStart:
-            logging.debug(f"Tile {tile_id} is the start tile of an island")
-            return True
-        else:
-            logging.debug(f"Tile {tile_id} is not the start tile of an island")
-            return False
-            
+    board = board_graph_for_tile(tile_id)
+    if board and board.is_island_start(tile_id):
+        logging.debug(f"Tile {tile_id} is the start tile of an island")
+        return True
+    logging.debug(f"Tile {tile_id} is not the start tile of an island")
     return False
 
 def is_region_populated(tile_id):
     """Check if the tile is a populated region"""
-    all_teams: list[EventTeams] = EventTeams.query.all()
-    tile = SP3EventTiles.query.filter_by(id=tile_id).first()
+    board = board_graph_for_tile(tile_id)
+    tile = board.tile(tile_id) if board else None
     if not tile:
         logging.error(f"Tile not found for ID {tile_id}")
         return False
     
-    tile_region_id = tile.region_id
-    for team in all_teams:
-        if team.data.get("islandId") == str(tile_region_id):
-            logging.debug(f"Tile {tile_id} is a populated region")
-            return True
+    if tile.region_id and teams_in_region(tile.event_id, tile.region_id):
+        logging.debug(f"Tile {tile_id} is a populated region")
+        return True
             
     return False
 
 def does_region_have_star(tile_id):
     """Check if the tile is a region with a star"""
-    tile = SP3EventTiles.query.filter_by(id=tile_id).first()
-    tile_region = tile.region_id if tile else None
-    if tile and tile_region:
-        event = Events.query.filter_by(id=tile.event_id).first()
-        if event:
-            star_list = event.data.get("star_tiles", [])
-            for star_tile_id in star_list:
-                star_tile = SP3EventTiles.query.filter_by(id=star_tile_id).first()
-                star_tile_region = star_tile.region_id if star_tile else None
-                if str(tile_region) == str(star_tile_region):
-                    logging.debug(f"Tile {tile_id} is a region with a star")
-                    return True
-            
+    board = board_graph_for_tile(tile_id)
+    if board and board.region_has_star(tile_id):
+        logging.debug(f"Tile {tile_id} is a region with a star")
+        return True
     return False
 
 def _check_for_special_tile(event_id, team_id, save):
     """Check if the current tile is a special tile that needs interaction"""
     logging.info(f"Checking for special tile interaction for team {team_id} at tile {save.currentTile}")
     
-    current_tile = SP3EventTiles.query.filter_by(id=save.currentTile).first()
+    board = get_board_graph(event_id)
+    current_tile = board.tile(save.currentTile)
     if not current_tile:
         logging.error(f"Current tile not found: {save.currentTile}")
         return {"error": "Current tile not found"}
@@ -776,13 +736,13 @@ def _check_for_special_tile(event_id, team_id, save):
         save.islandId = current_tile.region_id
     
     # Check if this is a special tile that requires an action
-    if is_shop_tile(current_tile.id):
+    if board.is_shop(current_tile.id):
         logging.info(f"Special tile detected: SHOP - Preparing shop interaction")
         return _prepare_shop_interaction(event_id, team_id, save, current_tile)
-    elif is_star_tile(current_tile.id):
+    elif board.is_star(current_tile.id):
         logging.info(f"Special tile detected: STAR_SPOT - Preparing star interaction")
         return _prepare_star_interaction(event_id, team_id, save, current_tile)
-    elif is_dock_tile(current_tile.id):
+    elif board.is_dock(current_tile.id):
         logging.info(f"Special tile detected: DOCK - Preparing dock interaction")
         return _prepare_dock_interaction(event_id, team_id, save, current_tile)
     else:
@@ -809,12 +769,13 @@ def _check_for_special_tile(event_id, team_id, save):
     
     return save.roll_state.to_dict()
 
-def _handle_crossroad(event_id, team_id, save: SaveData, next_tile_ids_str: list) -> dict:
-    logging.info(f"Handling crossroad for team {team_id} with {len(next_tile_ids_str)} options")
-    current_tile_obj = SP3EventTiles.query.filter_by(id=save.currentTile).first()
+def _handle_crossroad(event_id, team_id, save: SaveData, next_tile_ids: tuple) -> dict:
+    logging.info(f"Handling crossroad for team {team_id} with {len(next_tile_ids)} options")
+    board = get_board_graph(event_id)
+    current_tile_obj = board.tile(save.currentTile)
     path_options = []
-    for tile_id_str in next_tile_ids_str:
-        next_tile = SP3EventTiles.query.filter_by(id=uuid.UUID(tile_id_str)).first()
+    for tile_id in next_tile_ids:
+        next_tile = board.tile(tile_id)
         if next_tile:
             path_options.append({"id": str(next_tile.id), "name": next_tile.name, "description": next_tile.description or ""})
     
@@ -945,47 +906,23 @@ def _handle_star_action(event_id, team_id, save, data):
                 return _process_next_move(event_id, team_id, save)
             return _complete_roll(event_id, team_id, save)
         
-        if not is_star_tile(save.currentTile):
+        board = get_board_graph(event_id)
+        if not board.is_star(save.currentTile):
             logging.error(f"Current tile {save.currentTile} is not a star tile.")
-            return {"error": "Current tile is not a star tile"}, 400
-        
+            return {"error": "Current tile is not a star tile"}
+
+        # Move the star to a new tile
+        new_star_tile = pick_star_destination(event_id, board)
+        if new_star_tile is None:
+            logging.error("No valid tiles available for star placement.")
+            return {"error": "No valid tiles available for star placement"}
+        new_star_tile_id = new_star_tile.id
+        logging.info(f"Star moved to tile {new_star_tile.name} (ID: {new_star_tile_id})")
+
         # Deduct coins for the star purchase
         save.coins -= 100
         save.stars += 1
 
-        # Move the star to a new tile
-        new_star_tile_id = None
-        all_regions = SP3Regions.query.all()
-        applicable_regions = []
-
-        for region in all_regions:
-            if not is_region_populated(region.id):
-                applicable_regions.append(region.id)
-                
-        applicable_region_tiles = SP3EventTiles.query.filter(
-            SP3EventTiles.event_id == event_id,
-            SP3EventTiles.region_id.in_(applicable_regions),
-        ).all()
-        for region in all_regions:
-            if not is_region_populated(region.id):
-                applicable_regions.append(region.id)
-                
-        applicable_region_tiles = SP3EventTiles.query.filter(
-            SP3EventTiles.event_id == event_id,
-            SP3EventTiles.region_id.in_(applicable_regions),
-        ).all()
-
-        # Filter out tiles that are shops, docks, or already have stars
-        applicable_region_tiles = [tile for tile in applicable_region_tiles if not is_shop_tile(tile.id) and not is_dock_tile(tile.id) and not is_star_tile(tile.id)]
-        logging.info(f"Applicable region tiles for star placement: {[tile.name for tile in applicable_region_tiles]}")
-        if applicable_region_tiles:
-            new_star_tile = random.choice(applicable_region_tiles)
-            new_star_tile_id = new_star_tile.id
-            logging.info(f"Star moved to tile {new_star_tile.name} (ID: {new_star_tile_id})")
-        else:
-            logging.error("No valid tiles available for star placement.")
-            return {"error": "No valid tiles available for star placement"}, 400
-        
         old_star_tile_id = save.currentTile
         event = Events.query.filter_by(id=event_id).first()
         star_tiles = event.data.get("star_tiles")
@@ -996,10 +933,9 @@ def _handle_star_action(event_id, team_id, save, data):
         db.session.commit()
 
         team_name = EventTeams.query.filter_by(id=team_id).first().name
-        old_star_tile = SP3EventTiles.query.filter_by(id=old_star_tile_id).first()
+        old_star_tile = board.tile(old_star_tile_id)
         old_star_tile_name = old_star_tile.name
         old_star_tile_region = SP3Regions.query.filter_by(id=old_star_tile.region_id).first().name
-        new_star_tile = SP3EventTiles.query.filter_by(id=new_star_tile_id).first()
         new_star_tile_name = new_star_tile.name
         new_star_tile_region = SP3Regions.query.filter_by(id=new_star_tile.region_id).first().name
         send_event_notification(event_id, team_id, f"{team_name} has purchased a star!", f"purchased the star on {old_star_tile_name} on {old_star_tile_region}!\n\nThe star has been moved to {new_star_tile_name} on {new_star_tile_region}!")
@@ -1016,6 +952,23 @@ def _handle_star_action(event_id, team_id, save, data):
         return _process_next_move(event_id, team_id, save)
     return _complete_roll(event_id, team_id, save)
 
+def pick_star_destination(event_id, board) -> BoardTile | None:
+    """
+    Pick the tile a bought star moves to: any tile that is not a shop, dock or star,
+    on an island no team is on if there is one. None when the board has no such tile.
+    """
+    candidates = [
+        board.tiles[tile_id]
+        for tile_ids in board.region_tiles.values()
+        for tile_id in tile_ids
+        if not board.is_shop(tile_id) and not board.is_dock(tile_id) and not board.is_star(tile_id)
+    ]
+    empty_regions = {region_id for region_id in board.region_tiles if not teams_in_region(event_id, region_id)}
+    # With more teams than islands every island is occupied; the star still has to go somewhere
+    applicable = [tile for tile in candidates if tile.region_id in empty_regions] or candidates
+    logging.info(f"Applicable region tiles for star placement: {[tile.name for tile in applicable]}")
+    return random.choice(applicable) if applicable else None
+
 def _island_lap_completed(event_id, team_id, save: SaveData):
     """Check if the team has completed a lap around the island"""
     logging.info(f"Checking if team {team_id} has completed an island lap.")
@@ -1067,7 +1020,7 @@ def _island_lap_completed(event_id, team_id, save: SaveData):
                 send_event_notification(event_id, team_id, "Raid-ical Island Challenge Completed", f"completed the Raid-ical Challenge and received 50 coins!\n\nTotal coins: {save.coins}")
 
 
-def _prepare_dock_interaction(event_id, team_id, save, current_tile: SP3EventTiles):
+def _prepare_dock_interaction(event_id, team_id, save, current_tile: BoardTile):
     logging.info(f"Preparing DOCK for team {team_id} at {current_tile.name}")
     save.roll_state.action_required = RollState.ACTION_TYPES["DOCK"]
 
@@ -1134,12 +1087,7 @@ def _handle_dock_action(event_id, team_id, save, data):
 
         # Get the region's start tile
         if destination_region:
-            start_tile = db.session.query(SP3EventTiles).filter(
-                SP3EventTiles.event_id == event_id,
-                SP3EventTiles.region_id == destination_region.id,
-                SP3EventTiles.data.has_key('isIslandStart'), 
-                SP3EventTiles.data['isIslandStart'].astext.cast(db.Boolean) == True 
-            ).first()
+            start_tile = get_board_graph(event_id).island_start(destination_region.id)
             
             if start_tile:
                 save.coins -= cost
@@ -1214,13 +1162,9 @@ def _handle_first_roll_initiation(event_id: uuid.UUID, team_id: uuid.UUID, save:
     available_islands = []
     regions = SP3Regions.query.filter_by(event_id=event_id).order_by(SP3Regions.name).all()
     
+    board = get_board_graph(event_id)
     for region in regions:
-        start_tile_exists = db.session.query(SP3EventTiles).filter(
-            SP3EventTiles.event_id == event_id,
-            SP3EventTiles.region_id == region.id,
-            SP3EventTiles.data.has_key('isIslandStart'), 
-            SP3EventTiles.data['isIslandStart'].astext.cast(db.Boolean) == True 
-        ).first()
+        start_tile_exists = board.island_start(region.id)
         
         if start_tile_exists:
             available_islands.append({
@@ -1283,12 +1227,7 @@ def _handle_island_selection(event_id: uuid.UUID, team_id: uuid.UUID, save: Save
         logging.error(f"Chosen island ID {chosen_island_id} not found or not part of event {event_id}.")
         return {"error": "Invalid island choice."}
 
-    starting_tile = db.session.query(SP3EventTiles).filter(
-        SP3EventTiles.event_id == event_id,
-        SP3EventTiles.region_id == chosen_island_id,
-        SP3EventTiles.data.has_key('isIslandStart'),
-        SP3EventTiles.data['isIslandStart'].astext.cast(db.Boolean) == True
-    ).first()
+    starting_tile = get_board_graph(event_id).island_start(chosen_island_id)
 
     if not starting_tile:
         logging.error(f"No starting tile found for chosen island {chosen_island_id} (Region: {chosen_region.name}).")
@@ -1339,7 +1278,8 @@ def _handle_island_selection(event_id: uuid.UUID, team_id: uuid.UUID, save: Save
 def _complete_roll(event_id, team_id, save: SaveData) -> dict:
     logging.info(f"Completing roll for team {team_id} on tile {save.currentTile}")
     
-    current_tile_obj = SP3EventTiles.query.filter_by(id=save.currentTile).first()
+    board = get_board_graph(event_id)
+    current_tile_obj = board.tile(save.currentTile)
     tile_info = {}
 
     if current_tile_obj:
@@ -1420,7 +1360,7 @@ def _complete_roll(event_id, team_id, save: SaveData) -> dict:
             "dice_results_for_roll": save.roll_state.dice_results_for_roll,
             "modifier_for_roll": save.roll_state.modifier_for_roll,
             "roll_total_for_turn": save.roll_state.roll_total_for_turn,
-            "path_taken_this_turn": [SP3EventTiles.query.filter(SP3EventTiles.id == tid).first().name for tid in save.roll_state.path_taken_this_turn],
+            "path_taken_this_turn": [board.tile(tid).name for tid in save.roll_state.path_taken_this_turn],
             "is_tile_completed_on_land": save.isTileCompleted
         }
         return save.roll_state.to_dict()
@@ -0,0 +1,142 @@
+"""
+Version history of Stability Party team save data.
+
+Each save_team_data write appends a row to sp3_team_history holding an RFC 6902
+patch (top-level add/replace/remove operations) that turns the previous version
+into the new one. Every SP3_HISTORY_SNAPSHOT_EVERY-th version also stores the
+whole state, so any version is rebuilt from the nearest snapshot at or below it
+plus fewer than that many patches, read in one query however long the history
+is. The row is written in the same transaction as the save and after the team's
+row is locked, so versions of a team never interleave.
+
+Each version records a digest of its state. When the state found in the row
+does not match the latest version's digest, something wrote the row without
+going through save_team_data; that state is stored as an "untracked" snapshot
+first so the versions after it still rebuild exactly.
+"""
+import hashlib
+import json
+import os
+
+from sqlalchemy import text
+
+SNAPSHOT_EVERY = max(1, int(os.getenv("SP3_HISTORY_SNAPSHOT_EVERY", 20)))
+
+INSERT_SQL = text("""
+    INSERT INTO sp3_team_history (team_id, version, event_id, patch, snapshot, digest, reason)
+    VALUES (:team_id, :version, :event_id, CAST(:patch AS jsonb), CAST(:snapshot AS jsonb), :digest, :reason)
+""")
+
+
+def _pointer(key: str) -> str:
+    return "/" + key.replace("~", "~0").replace("/", "~1")
+
+
+def _key(path: str) -> str:
+    return path[1:].replace("~1", "/").replace("~0", "~")
+
+
+def diff_state(before: dict, after: dict) -> list[dict]:
+    """Top-level JSON patch operations turning before into after."""
+    ops = []
+    for key, value in after.items():
+        if key not in before:
+            ops.append({"op": "add", "path": _pointer(key), "value": value})
+        elif before[key] != value:
+            ops.append({"op": "replace", "path": _pointer(key), "value": value})
+    for key in before:
+        if key not in after:
+            ops.append({"op": "remove", "path": _pointer(key)})
+    return ops
+
+
+def apply_patch(state: dict, ops: list[dict]) -> dict:
+    """A copy of state with the operations of diff_state applied."""
+    state = dict(state)
+    for op in ops:
+        if op["op"] == "remove":
+            state.pop(_key(op["path"]), None)
+        else:
+            state[_key(op["path"])] = op["value"]
+    return state
+
+
+def state_digest(state: dict) -> str:
+    return hashlib.sha1(json.dumps(state, sort_keys=True, separators=(",", ":"), default=str).encode()).hexdigest()
+
+
+def record_team_version(session, team, before: dict | None, after: dict, reason: str | None = None) -> int | None:
+    """
+    Append after as the team's next version. before is the state the write replaced, read
+    with the row locked (None for a new team). Returns the new version, or None if nothing changed.
+    """
+    if before == after:
+        return None
+    last = session.execute(text("""
+        SELECT version, digest FROM sp3_team_history
+        WHERE team_id = :team_id
+        ORDER BY version DESC
+        LIMIT 1
+    """), {"team_id": str(team.id)}).first()
+
+    version = last.version if last else 0
+    rows = []
+    if before is not None and (last is None or last.digest != state_digest(before)):
+        version += 1
+        rows.append(_row(team, version, [], before, True, "untracked"))
+    version += 1
+    snapshot = (version - 1) % SNAPSHOT_EVERY == 0
+    rows.append(_row(team, version, diff_state(before or {}, after), after, snapshot, reason))
+    session.execute(INSERT_SQL, rows)
+    return version
+
+
+def _row(team, version: int, patch: list, state: dict, snapshot: bool, reason: str | None) -> dict:
+    return {
+        "team_id": str(team.id),
+        "version": version,
+        "event_id": str(team.event_id),
+        "patch": json.dumps(patch),
+        "snapshot": json.dumps(state) if snapshot else None,
+        "digest": state_digest(state),
+        "reason": reason,
+    }
+
+
+def team_state_at(session, team_id, version: int) -> dict | None:
+    """The team's save data as of version, or None if there is no such version."""
+    rows = session.execute(text("""
+        SELECT version, patch, snapshot FROM sp3_team_history
+        WHERE team_id = :team_id AND version <= :version AND version >= (
+            SELECT MAX(version) FROM sp3_team_history
+            WHERE team_id = :team_id AND version <= :version AND snapshot IS NOT NULL
+        )
+        ORDER BY version
+    """), {"team_id": str(team_id), "version": version}).fetchall()
+    if not rows or rows[-1].version != version:
+        return None
+    state = rows[0].snapshot
+    for row in rows[1:]:
+        state = apply_patch(state, row.patch)
+    return state
+
+
+def team_versions(session, team_id, limit: int = 50, before_version: int | None = None) -> list[dict]:
+    """The team's most recent versions, newest first, without their snapshots."""
+    rows = session.execute(text("""
+        SELECT version, patch, snapshot IS NOT NULL AS is_snapshot, reason, created_at
+        FROM sp3_team_history
+        WHERE team_id = :team_id AND (CAST(:before_version AS integer) IS NULL OR version < :before_version)
+        ORDER BY version DESC
+        LIMIT :limit
+    """), {"team_id": str(team_id), "before_version": before_version, "limit": limit}).fetchall()
+    return [{"version": r.version, "reason": r.reason, "created_at": r.created_at, "snapshot": r.is_snapshot, "patch": r.patch}
+            for r in rows]
+
+
+def latest_version(session, team_id, reason: str | None = None) -> int | None:
+    """The team's newest version, or the newest one written for reason."""
+    return session.execute(text("""
+        SELECT MAX(version) FROM sp3_team_history
+        WHERE team_id = :team_id AND (CAST(:reason AS varchar) IS NULL OR reason = :reason)
+    """), {"team_id": str(team_id), "reason": reason}).scalar()
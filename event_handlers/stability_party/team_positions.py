@@ -0,0 +1,160 @@
+"""
+Per-event index of where Stability Party teams are.
+
+is_region_populated and the team-picking items (Bounty Target Teleport, Moonlight
+Moth Mix) used to load every EventTeams row and read positions out of the JSONB
+save data. The index keeps, per event, each team's tile, island, coins, stars and
+whether its tile is completed, and region -> teams, loaded with one query on first use. Committed EventTeams
+writes (save_team_data and the moderation endpoints alike) are applied to it in
+place, so it does not need rebuilding after every move; POSITIONS_TTL_SECONDS
+bounds staleness for writes made outside this process.
+"""
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from models.models import EventTeams
+
+POSITIONS_TTL_SECONDS = 600
+
+
+@dataclass(frozen=True)
+class TeamPosition:
+    team_id: uuid.UUID
+    name: str
+    tile_id: uuid.UUID | None
+    island_id: uuid.UUID | None
+    coins: int
+    stars: int
+    tile_completed: bool = False
+
+
+def _as_uuid(value) -> uuid.UUID | None:
+    try:
+        return value if isinstance(value, uuid.UUID) or value is None else uuid.UUID(str(value))
+    except ValueError:
+        return None
+
+
+def _position(team_id, name, data) -> TeamPosition:
+    data = data or {}
+    return TeamPosition(_as_uuid(team_id), name, _as_uuid(data.get("currentTile")), _as_uuid(data.get("islandId")),
+                        data.get("coins", 0), data.get("stars", 0), bool(data.get("isTileCompleted", False)))
+
+
+class TeamPositions:
+    def __init__(self, positions: list[TeamPosition]) -> None:
+        self.teams: dict[uuid.UUID, TeamPosition] = {}
+        self.by_region: dict[uuid.UUID, set[uuid.UUID]] = {}
+        for position in positions:
+            self.set(position)
+
+    def set(self, position: TeamPosition) -> None:
+        self.remove(position.team_id)
+        self.teams[position.team_id] = position
+        if position.island_id is not None:
+            self.by_region.setdefault(position.island_id, set()).add(position.team_id)
+
+    def remove(self, team_id: uuid.UUID) -> None:
+        old = self.teams.pop(team_id, None)
+        if old is not None and old.island_id is not None:
+            members = self.by_region.get(old.island_id)
+            members.discard(team_id)
+            if not members:
+                del self.by_region[old.island_id]
+
+
+_lock = threading.Lock()
+_indexes: dict[uuid.UUID, tuple[TeamPositions, float]] = {}
+# Bumped by every committed team write so an index loaded before it is not stored
+_generations: dict[uuid.UUID, int] = {}
+
+
+def _index(event_id, session=None) -> TeamPositions:
+    """The event's index; callers must hold _lock while reading it."""
+    from app import db
+
+    now = time.monotonic()
+    with _lock:
+        cached = _indexes.get(event_id)
+        if cached is not None and cached[1] > now:
+            return cached[0]
+        generation = _generations.get(event_id, 0)
+
+    rows = (session or db.session).execute(text("SELECT id, name, data FROM event_teams WHERE event_id = :event_id"),
+                                           {"event_id": str(event_id)}).fetchall()
+    index = TeamPositions([_position(r.id, r.name, r.data) for r in rows])
+    with _lock:
+        if _generations.get(event_id, 0) == generation:
+            _indexes[event_id] = (index, now + POSITIONS_TTL_SECONDS)
+    return index
+
+
+def teams_in_region(event_id, region_id, session=None) -> frozenset[uuid.UUID]:
+    """Ids of the event's teams whose island is region_id."""
+    index = _index(_as_uuid(event_id), session)
+    with _lock:
+        return frozenset(index.by_region.get(_as_uuid(region_id), ()))
+
+
+def team_positions(event_id, session=None) -> list[TeamPosition]:
+    """Every team of the event, ordered by name."""
+    index = _index(_as_uuid(event_id), session)
+    with _lock:
+        return sorted(index.teams.values(), key=lambda p: (p.name or "", str(p.team_id)))
+
+
+def invalidate_team_positions(*event_ids) -> None:
+    """Drop the indexes for event_ids (all of them if none are given)."""
+    with _lock:
+        for event_id in (event_ids or tuple(_indexes)):
+            event_id = _as_uuid(event_id)
+            _generations[event_id] = _generations.get(event_id, 0) + 1
+            _indexes.pop(event_id, None)
+
+
+def _apply(updates: dict) -> None:
+    with _lock:
+        for (event_id, team_id), position in updates.items():
+            _generations[event_id] = _generations.get(event_id, 0) + 1
+            cached = _indexes.get(event_id)
+            if cached is None:
+                continue
+            if position is None:
+                cached[0].remove(team_id)
+            else:
+                cached[0].set(position)
+
+
+def note_team_write(session, team: EventTeams, data: dict) -> None:
+    """Queue a team's new save data for the index, for writes that bypass the ORM flush."""
+    session.info.setdefault("sp3_team_positions", {})[(_as_uuid(team.event_id), team.id)] = _position(team.id, team.name, data)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_team_writes(session, flush_context):
+    updates = {}
+    for obj in (*session.new, *session.dirty):
+        if isinstance(obj, EventTeams) and obj.event_id is not None:
+            updates[(_as_uuid(obj.event_id), obj.id)] = _position(obj.id, obj.name, obj.data)
+    for obj in session.deleted:
+        if isinstance(obj, EventTeams) and obj.event_id is not None:
+            updates[(_as_uuid(obj.event_id), obj.id)] = None
+    if updates:
+        session.info.setdefault("sp3_team_positions", {}).update(updates)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_committed_team_writes(session):
+    updates = session.info.pop("sp3_team_positions", None)
+    if updates:
+        _apply(updates)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_team_writes(session):
+    session.info.pop("sp3_team_positions", None)
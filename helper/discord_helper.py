@@ -3,23 +3,18 @@ import os
 from dotenv import load_dotenv
 import logging
 from typing import Optional, List, Dict, Any
+from helper.discord_outbox import enqueue_bot_call, outbox_enabled
+from helper.http_client import http_client
 
 load_dotenv()
 
 def send_discord_dm(user_id: str, message: str) -> bool:
-    if os.getenv("RAILWAY_ENVIRONMENT_NAME", "local") != "production":
+    """Queues a DM to the user; it is sent once the caller's transaction commits."""
+    if not outbox_enabled():
         return False
 
-    token = os.getenv("DISCORD_BOT_API_TOKEN")
-    url = os.getenv("DISCORD_BOT_API") + f"/dm"
-
-    try:
-        response = requests.post(url, json={"user_id": user_id, "message": message, "token": token})
-        response.raise_for_status()
-        return True
-    except requests.exceptions.RequestException as e:
-        logging.error(f"Failed to send Discord DM: {str(e)}")
-        return False
+    enqueue_bot_call("/dm", {"user_id": user_id, "message": message})
+    return True
 
 
 def set_discord_nickname(user_id: str, nickname: str) -> bool:
@@ -31,27 +26,13 @@ def set_discord_nickname(user_id: str, nickname: str) -> bool:
         nickname: The new nickname to set for the user
         
     Returns:
-        True if the nickname was set successfully, False otherwise
+        True if the change was queued in the discord outbox, False otherwise
     """
-    if os.getenv("RAILWAY_ENVIRONMENT_NAME", "local") != "production":
+    if not outbox_enabled():
         return False
 
-    token = os.getenv("DISCORD_BOT_API_TOKEN")
-    url = os.getenv("DISCORD_BOT_API") + f"/{user_id}/set-nickname"
-    
-    json_data = {
-        "user_id": user_id,
-        "nickname": nickname,
-        "token": token
-    }
-    
-    try:
-        response = requests.post(url, json=json_data)
-        response.raise_for_status()  # Raise an exception for non-2xx status codes
-        return True
-    except requests.exceptions.RequestException as e:
-        logging.error(f"Failed to set Discord nickname: {str(e)}")
-        return False
+    enqueue_bot_call(f"/{user_id}/set-nickname", {"user_id": user_id, "nickname": nickname})
+    return True
 
 def create_discord_role(role_name: str, color: str = None) -> Optional[str]:
     """
@@ -79,7 +60,7 @@ def create_discord_role(role_name: str, color: str = None) -> Optional[str]:
         json_data["color"] = color
     
     try:
-        response = requests.post(url, json=json_data)
+        response = http_client().post(url, json=json_data)
         response.raise_for_status()  # Raise an exception for non-2xx status codes
         role_data = response.json()
         return role_data.get("role_id")  # Return the role ID
@@ -111,18 +92,11 @@ def create_discord_text_channel(
     token = os.getenv("DISCORD_BOT_API_TOKEN")
     url = os.getenv("DISCORD_BOT_API") + "/channels/create-text"
     
-    json_data = {
-        "category_name": category,
-        "channel_name": channel_name,
-        "view_roles": role_name_list,  # Only team role can view
-        "access_roles": role_name_list,  # Only team role can access
-        "view_users": user_id_list if user_id_list else [],  # Optional: users who can view
-        "access_users": user_id_list if user_id_list else [],  # Optional: users who can access
-        "token": token
-    }
+    json_data = _text_channel_payload(channel_name, category, role_name_list, user_id_list)
+    json_data["token"] = token
     
     try:
-        response = requests.post(url, json=json_data)
+        response = http_client().post(url, json=json_data)
         response.raise_for_status()
         channel_data = response.json()
         return channel_data.get("channel_id")
@@ -130,6 +104,32 @@ def create_discord_text_channel(
         logging.error(f"Failed to create Discord text channel: {str(e)}")
         return None
 
+def queue_discord_text_channel(
+    channel_name: str,
+    category: str = "Events",
+    role_name_list: List[str] = None,
+    user_id_list: List[int] = None
+) -> bool:
+    """
+    Queues creation of a text channel in the discord outbox, for callers that
+    do not need the new channel's ID. Takes the same arguments as create_discord_text_channel.
+    """
+    if not outbox_enabled():
+        return False
+
+    enqueue_bot_call("/channels/create-text", _text_channel_payload(channel_name, category, role_name_list, user_id_list))
+    return True
+
+def _text_channel_payload(channel_name, category, role_name_list, user_id_list) -> Dict[str, Any]:
+    return {
+        "category_name": category,
+        "channel_name": channel_name,
+        "view_roles": role_name_list,  # Only team role can view
+        "access_roles": role_name_list,  # Only team role can access
+        "view_users": user_id_list if user_id_list else [],  # Optional: users who can view
+        "access_users": user_id_list if user_id_list else [],  # Optional: users who can access
+    }
+
 def create_discord_voice_channel(
     channel_name: str, 
     team_role_id: str
@@ -163,7 +163,7 @@ def create_discord_voice_channel(
     }
     
     try:
-        response = requests.post(url, json=json_data)
+        response = http_client().post(url, json=json_data)
         response.raise_for_status()
         channel_data = response.json()
         return channel_data.get("channel_id")
@@ -185,7 +185,7 @@ def get_event_category_id() -> Optional[str]:
     url = os.getenv("DISCORD_BOT_API") + "/channels/list"
     
     try:
-        response = requests.get(url, params={"token": token})
+        response = http_client().get(url, params={"token": token})
         response.raise_for_status()
         channels = response.json()
         
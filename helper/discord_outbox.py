@@ -0,0 +1,313 @@
+"""
+Transactional outbox for Discord bot API calls and webhooks.
+
+Request handlers call enqueue_bot_call / enqueue_webhook, which add a DiscordOutbox
+row to db.session: the call is committed (or rolled back) together with the
+handler's own changes and the response never waits on Discord. One worker thread
+per process claims due rows with FOR UPDATE SKIP LOCKED, sends them through a
+pooled HttpClient with timeouts, rate-limits per endpoint, retries failures
+with exponential backoff and marks a row dead once it runs out of attempts or
+Discord rejects it outright. Dead rows stay in the table for inspection and can be
+re-queued with requeue_outbox_rows.
+"""
+import hashlib
+import logging
+import os
+import random
+import threading
+import time
+
+import requests
+from flask import request
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from helper.http_client import DEFAULT_TIMEOUT, HttpClient
+from helper.metrics import DISCORD_OUTBOX_DELIVERIES
+
+PENDING, SENT, DEAD = "pending", "sent", "dead"
+
+# (requests, per seconds) by rate_key prefix. Discord allows 5 requests / 2s per
+# webhook; the bot API is our own service and only needs protecting from bursts.
+RATE_LIMITS = {"webhook": (5, 2.0), "bot": (10, 1.0)}
+
+_default_worker = None
+
+CLAIM_SQL = text("""
+    UPDATE new_stability.discord_outbox o
+    SET attempts = o.attempts + 1,
+        next_attempt_at = NOW() + make_interval(secs => :lease)
+    WHERE o.id IN (
+        SELECT id FROM new_stability.discord_outbox
+        WHERE status = 'pending' AND next_attempt_at <= NOW()
+        ORDER BY next_attempt_at, id
+        LIMIT :limit
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING o.id, o.target, o.method, o.url, o.payload, o.rate_key, o.attempts
+""")
+MARK_SENT_SQL = text("""
+    UPDATE new_stability.discord_outbox
+    SET status = 'sent', sent_at = NOW(), last_error = NULL
+    WHERE id = :id
+""")
+MARK_DEAD_SQL = text("""
+    UPDATE new_stability.discord_outbox
+    SET status = 'dead', last_error = :error
+    WHERE id = :id
+""")
+RESCHEDULE_SQL = text("""
+    UPDATE new_stability.discord_outbox
+    SET next_attempt_at = NOW() + make_interval(secs => :delay),
+        attempts = attempts - :refund,
+        last_error = COALESCE(:error, last_error)
+    WHERE id = :id
+""")
+
+
+def outbox_enabled() -> bool:
+    """Discord calls are only made from production, as with the synchronous helpers before."""
+    return os.getenv("RAILWAY_ENVIRONMENT_NAME", "local") == "production"
+
+
+def _endpoint_key(path: str) -> str:
+    # "/1234/roles/add" -> "roles/add" so every user shares the endpoint's bucket
+    return "/".join(part for part in path.strip("/").split("/") if not part.isdigit())
+
+
+def enqueue_bot_call(path: str, payload: dict, method: str = "POST", session=None):
+    """
+    Queue a call to DISCORD_BOT_API + path in the caller's transaction.
+    The bot token is added when the call is sent and is never stored.
+    """
+    return _enqueue("bot", method, path, payload, f"bot:{_endpoint_key(path)}", session)
+
+
+def enqueue_webhook(url: str, payload: dict, session=None):
+    """Queue a POST to a Discord webhook in the caller's transaction."""
+    # Hash rather than embed the url: it contains the webhook's secret token
+    rate_key = "webhook:" + hashlib.sha1(url.encode()).hexdigest()[:16]
+    return _enqueue("webhook", "POST", url, payload, rate_key, session)
+
+
+def _enqueue(target: str, method: str, url: str, payload: dict, rate_key: str, session=None):
+    from app import db
+    from models.new_events import DiscordOutbox
+
+    session = session or db.session
+    row = DiscordOutbox(target=target, method=method, url=url, payload=payload, rate_key=rate_key)
+    session.add(row)
+    session.info["discord_outbox_pending"] = True
+    # Kept until the transaction ends, flushed or not, for _persist_orphaned_outbox_rows
+    session.info.setdefault("discord_outbox_uncommitted", []).append(row)
+    return row
+
+
+def requeue_outbox_rows(ids: list[int], session) -> int:
+    """Move dead (or stuck) rows back to pending with a fresh attempt budget. Does not commit."""
+    result = session.execute(text("""
+        UPDATE new_stability.discord_outbox
+        SET status = 'pending', attempts = 0, next_attempt_at = NOW()
+        WHERE id = ANY(:ids) AND status != 'sent'
+    """), {"ids": list(ids)})
+    session.info["discord_outbox_pending"] = True
+    return result.rowcount
+
+
+class RateLimiter:
+    """Token bucket per rate_key; limits are looked up by the key's prefix."""
+
+    def __init__(self, limits: dict[str, tuple[int, float]] | None = None) -> None:
+        self.limits = limits or RATE_LIMITS
+        self._buckets: dict[str, tuple[float, float]] = {}
+
+    def acquire(self, key: str) -> float:
+        """Take a token for key. Returns 0 on success, otherwise seconds until one is available."""
+        capacity, per = self.limits.get(key.split(":", 1)[0], (10, 1.0))
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated) * capacity / per)
+        if tokens >= 1:
+            self._buckets[key] = (tokens - 1, now)
+            return 0.0
+        self._buckets[key] = (tokens, now)
+        return (1 - tokens) * per / capacity
+
+
+def _retry_after(response) -> float:
+    try:
+        return float(response.headers.get("Retry-After") or response.json().get("retry_after"))
+    except (TypeError, ValueError, AttributeError):
+        return 5.0
+
+
+class OutboxWorker:
+    def __init__(self, engine, http: HttpClient | None = None, batch_size: int = 20, max_attempts: int = 8,
+                 backoff_base: float = 5.0, backoff_max: float = 900.0, lease_seconds: float = 120.0,
+                 poll_interval: float = 5.0, timeout=DEFAULT_TIMEOUT, limiter: RateLimiter | None = None) -> None:
+        """
+        engine: SQLAlchemy engine for the outbox table; the worker never touches db.session.
+        lease_seconds: how long a claimed row stays invisible to other workers before it is retried.
+        """
+        self.engine = engine
+        # Retries are rescheduled rows here, so the client makes one attempt per delivery
+        self.http = http or HttpClient(retries=0, pool_connections=4, pool_maxsize=8)
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.limiter = limiter or RateLimiter()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+
+    def wake(self) -> None:
+        """Start the worker if needed and have it look for due rows now."""
+        self._ensure_started()
+        self._wakeup.set()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._wakeup.set()
+        self._thread.join(timeout=timeout)
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping.clear()
+                self._thread = threading.Thread(target=self._run, name="discord-outbox", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                claimed = self.drain_once()
+            except Exception as e:
+                logging.error(f"[OUTBOX] drain failed: {e}", exc_info=True)
+                claimed = 0
+            if claimed < self.batch_size:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+
+    def drain_once(self) -> int:
+        """Claim one batch of due rows and attempt each once. Returns the number claimed."""
+        with self.engine.begin() as conn:
+            rows = conn.execute(CLAIM_SQL, {"lease": self.lease_seconds, "limit": self.batch_size}).mappings().all()
+        for row in sorted(rows, key=lambda r: r["id"]):
+            self._deliver(row)
+        return len(rows)
+
+    def _deliver(self, row) -> None:
+        wait = self.limiter.acquire(row["rate_key"])
+        if wait > 0:
+            # Not an attempt: push it back until the bucket refills
+            self._execute(RESCHEDULE_SQL, id=row["id"], delay=wait, refund=1, error=None)
+            return
+
+        if row["target"] == "bot":
+            url = os.getenv("DISCORD_BOT_API", "") + row["url"]
+            body = dict(row["payload"] or {}, token=os.getenv("DISCORD_BOT_API_TOKEN"))
+        else:
+            url, body = row["url"], row["payload"]
+
+        try:
+            response = self.http.request(row["method"], url, json=body, timeout=self.timeout)
+        except requests.exceptions.RequestException as e:
+            self._retry_or_kill(row, f"{type(e).__name__}: {e}")
+            return
+
+        if response.status_code == 429:
+            DISCORD_OUTBOX_DELIVERIES.inc(target=row["target"], outcome="rate_limited")
+            self._execute(RESCHEDULE_SQL, id=row["id"], delay=_retry_after(response), refund=1, error="429 Too Many Requests")
+        elif response.ok:
+            DISCORD_OUTBOX_DELIVERIES.inc(target=row["target"], outcome="sent")
+            self._execute(MARK_SENT_SQL, id=row["id"])
+        elif response.status_code < 500 and response.status_code != 408:
+            # Discord (or the bot API) rejected the request itself; retrying will not help
+            self._kill(row, f"{response.status_code}: {response.text[:500]}")
+        else:
+            self._retry_or_kill(row, f"{response.status_code}: {response.text[:500]}")
+
+    def _retry_or_kill(self, row, error: str) -> None:
+        if row["attempts"] >= self.max_attempts:
+            self._kill(row, error)
+            return
+        delay = min(self.backoff_max, self.backoff_base * 2 ** (row["attempts"] - 1)) * random.uniform(0.5, 1.0)
+        logging.warning(f"[OUTBOX] {row['target']} call {row['id']} failed (attempt {row['attempts']}), retrying in {delay:.0f}s: {error}")
+        DISCORD_OUTBOX_DELIVERIES.inc(target=row["target"], outcome="retry")
+        self._execute(RESCHEDULE_SQL, id=row["id"], delay=delay, refund=0, error=error)
+
+    def _kill(self, row, error: str) -> None:
+        logging.error(f"[OUTBOX] {row['target']} call {row['id']} to {row['rate_key']} dead after {row['attempts']} attempts: {error}")
+        DISCORD_OUTBOX_DELIVERIES.inc(target=row["target"], outcome="dead")
+        self._execute(MARK_DEAD_SQL, id=row["id"], error=error)
+
+    def _execute(self, statement, **params) -> None:
+        with self.engine.begin() as conn:
+            conn.execute(statement, params)
+
+
+def _persist_orphaned_outbox_rows(db, response):
+    """
+    Rows enqueued after the handler's last commit would be discarded with the request's
+    session. A successful response means the handler meant to make the call, so write
+    copies of them on their own; otherwise they go with its uncommitted work.
+    """
+    from models.new_events import DiscordOutbox
+    orphans = db.session.info.pop("discord_outbox_uncommitted", None)
+    if not orphans:
+        return response
+    for obj in orphans:
+        # Autoflushed rows are no longer in session.new but are still only in this transaction
+        if obj in db.session:
+            db.session.expunge(obj)
+    if not 200 <= response.status_code < 300:
+        logging.warning(f"[OUTBOX] dropped {len(orphans)} uncommitted call(s) from {request.path} ({response.status_code})")
+        return response
+    logging.warning(f"[OUTBOX] committing {len(orphans)} call(s) {request.path} enqueued after its last commit")
+    with Session(db.engine) as session:
+        session.add_all([
+            DiscordOutbox(target=o.target, method=o.method, url=o.url, payload=o.payload, rate_key=o.rate_key)
+            for o in orphans
+        ])
+        session.info["discord_outbox_pending"] = True
+        session.commit()
+    return response
+
+
+def init_discord_outbox(app, db) -> OutboxWorker:
+    """
+    Create the process-wide worker. It is started on the first commit that carries
+    outbox rows, and at startup in production so rows left by a previous process drain.
+    """
+    global _default_worker
+    with app.app_context():
+        worker = OutboxWorker(db.engine)
+    _default_worker = worker
+
+    @event.listens_for(Session, "after_commit")
+    def _wake_after_commit(session):
+        session.info.pop("discord_outbox_uncommitted", None)
+        if session.info.pop("discord_outbox_pending", False):
+            worker.wake()
+
+    @event.listens_for(Session, "after_rollback")
+    def _forget_after_rollback(session):
+        session.info.pop("discord_outbox_uncommitted", None)
+        session.info.pop("discord_outbox_pending", None)
+
+    @app.after_request
+    def _persist_after_request(response):
+        return _persist_orphaned_outbox_rows(db, response)
+
+    if outbox_enabled():
+        worker.wake()
+    return worker
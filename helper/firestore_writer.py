@@ -0,0 +1,142 @@
+"""
+Single background writer for the legacy Firestore drop feeds.
+
+Handlers enqueue documents and return immediately; one daemon thread drains the
+bounded queue, groups pending documents into Firestore batched writes (at most
+BATCH_LIMIT per commit) and retries failed commits with exponential backoff.
+The number of accepted-but-unwritten documents is exported as the
+firestore_write_backlog gauge. Pending documents are flushed at interpreter exit.
+"""
+import atexit
+import logging
+import queue
+import random
+import threading
+import time
+
+from helper.metrics import FIRESTORE_BACKLOG
+
+# Firestore rejects batched writes with more than 500 operations
+BATCH_LIMIT = 500
+
+
+class FirestoreWriter:
+    def __init__(self, client, max_queue: int = 10000, batch_size: int = BATCH_LIMIT, max_retries: int = 5,
+                 backoff_base: float = 0.5, backoff_max: float = 30.0, linger: float = 0.05) -> None:
+        """
+        client: a firestore.Client (or anything with .batch() and .collection()); None disables writes.
+        linger: how long to wait for more documents before committing a partial batch.
+        """
+        self.client = client
+        self.batch_size = min(batch_size, BATCH_LIMIT)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.linger = linger
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._stopping = threading.Event()
+        self.written = 0
+        self.dropped = 0
+
+    @property
+    def backlog(self) -> int:
+        # Queued plus taken-but-not-yet-committed documents
+        return self._queue.unfinished_tasks
+
+    def enqueue(self, collection: str, document: dict) -> bool:
+        """Queue document for collection. Returns False if writes are disabled or the queue is full."""
+        if self.client is None or self._stopping.is_set():
+            return False
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((collection, document))
+        except queue.Full:
+            self.dropped += 1
+            logging.error(f"[FIRESTORE] write queue full, dropping document for {collection}: {document.get('id')}")
+            return False
+        FIRESTORE_BACKLOG.set(self.backlog)
+        return True
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Block until everything queued so far is written (or given up on). Returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.backlog:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def shutdown(self, timeout: float = 10.0) -> None:
+        """Stop accepting documents and flush the queue."""
+        if self._thread is None:
+            return
+        self._stopping.set()
+        if not self.flush(timeout):
+            logging.error(f"[FIRESTORE] shutdown timed out with {self.backlog} documents unwritten")
+        self._thread.join(timeout=1.0)
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="firestore-writer", daemon=True)
+                self._thread.start()
+
+    def _next_batch(self) -> list[tuple[str, dict]]:
+        try:
+            first = self._queue.get(timeout=0.5)
+        except queue.Empty:
+            return []
+        pending = [first]
+        deadline = time.monotonic() + self.linger
+        while len(pending) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                pending.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return pending
+
+    def _run(self) -> None:
+        while not (self._stopping.is_set() and self._queue.empty()):
+            pending = self._next_batch()
+            if not pending:
+                continue
+            try:
+                self._commit_with_retry(pending)
+            finally:
+                for _ in pending:
+                    self._queue.task_done()
+                FIRESTORE_BACKLOG.set(self.backlog)
+
+    def _commit_with_retry(self, pending: list[tuple[str, dict]]) -> None:
+        for attempt in range(self.max_retries + 1):
+            try:
+                batch = self.client.batch()
+                for collection, document in pending:
+                    batch.set(self.client.collection(collection).document(), document)
+                batch.commit()
+                self.written += len(pending)
+                logging.info(f"[FIRESTORE] committed batch of {len(pending)} documents")
+                return
+            except Exception as e:
+                if attempt == self.max_retries:
+                    self.dropped += len(pending)
+                    logging.exception(
+                        f"[FIRESTORE] giving up on batch of {len(pending)} documents after {attempt + 1} attempts: "
+                        f"{[d.get('id') for _, d in pending]}: {e}"
+                    )
+                    return
+                delay = min(self.backoff_max, self.backoff_base * 2 ** attempt) * random.uniform(0.5, 1.0)
+                logging.warning(f"[FIRESTORE] batch commit failed (attempt {attempt + 1}), retrying in {delay:.2f}s: {e}")
+                time.sleep(delay)
+
+
+def create_firestore_writer(client) -> FirestoreWriter:
+    """Create the process-wide writer and flush it at interpreter exit."""
+    writer = FirestoreWriter(client)
+    atexit.register(writer.shutdown)
+    return writer
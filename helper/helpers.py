@@ -1,24 +1,68 @@
 from sqlalchemy.inspection import inspect
+from flask.json.provider import DefaultJSONProvider
+import base64
+import binascii
 import json
 import decimal
 from datetime import date, datetime
 from uuid import UUID
 
-class Serializer:
-    def serialize(self):
-        data = {}
+try:
+    import orjson
+except ImportError:  # Fall back to the stdlib encoder
+    orjson = None
+
+def _convert_uuid(value):
+    return str(value)
+
+
+def _convert_datetime(value):
+    return value.isoformat()
+
+
+def _convert_any(value):
+    # Column types without a known python_type get the same checks serialize always made
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
 
-        mapper = inspect(self).mapper
-        for column in mapper.columns:
-            value = getattr(self, column.key)
 
-            if isinstance(value, UUID):
-                value = str(value)
-            elif isinstance(value, (datetime, date)):
-                value = value.isoformat()
+def _column_converter(column):
+    """Pick the converter for a column once, from its type, instead of isinstance-checking every value."""
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return _convert_any
+    if issubclass(python_type, UUID):
+        return _convert_uuid
+    if issubclass(python_type, (datetime, date)):
+        return _convert_datetime
+    if python_type in (str, int, float, bool, dict, list, decimal.Decimal, bytes):
+        return None
+    return _convert_any
 
-            data[column.key] = value
 
+class Serializer:
+    # model class -> (column keys, converter per key or None), built on first use
+    _compiled: dict = {}
+
+    @staticmethod
+    def _compile(model):
+        columns = list(inspect(model).columns)
+        plan = (tuple(column.key for column in columns), tuple(_column_converter(column) for column in columns))
+        Serializer._compiled[model] = plan
+        return plan
+
+    def serialize(self):
+        keys, converters = Serializer._compiled.get(type(self)) or Serializer._compile(type(self))
+        loaded = self.__dict__
+        data = {}
+        for key, convert in zip(keys, converters):
+            # Loaded values live in the instance dict; expired or deferred ones load through getattr
+            value = loaded[key] if key in loaded else getattr(self, key)
+            data[key] = convert(value) if convert is not None and value is not None else value
         return data
 
     @staticmethod
@@ -37,3 +81,82 @@ class ModelEncoder(json.JSONEncoder):
         if isinstance(obj, (datetime, date)):
             return obj.isoformat()
         return json.JSONEncoder.default(self, obj)
+
+
+def _orjson_model_default(obj):
+    if isinstance(obj, decimal.Decimal):
+        return str(obj)
+    raise TypeError
+
+
+def dumps_json(obj) -> str:
+    """
+    json.dumps(obj, cls=ModelEncoder) through orjson when it is installed. orjson writes
+    datetimes as isoformat itself but UUIDs in dashed form (as serialize() does) rather than
+    ModelEncoder's bare hex, so use it on serialized rows rather than raw UUID values.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=_orjson_model_default, option=orjson.OPT_NON_STR_KEYS).decode()
+        except TypeError:  # orjson.JSONEncodeError, e.g. an int wider than 64 bits
+            pass
+    return json.dumps(obj, cls=ModelEncoder)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider that encodes compact responses with orjson, keeping the default
+    provider's output: sorted keys, HTTP dates for datetimes, str() for UUID and Decimal.
+    Anything orjson cannot encode, and pretty-printed debug output, goes through the stdlib.
+    """
+
+    def _fast_dumps(self, obj) -> str | None:
+        if orjson is None:
+            return None
+        try:
+            return orjson.dumps(obj, default=self.default, option=_ORJSON_FLASK_OPTIONS).decode()
+        except TypeError:
+            return None
+
+    def dumps(self, obj, **kwargs) -> str:
+        if not kwargs:
+            encoded = self._fast_dumps(obj)
+            if encoded is not None:
+                return encoded
+        return super().dumps(obj, **kwargs)
+
+    def response(self, *args, **kwargs):
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        encoded = self._fast_dumps(obj)
+        if encoded is None:
+            encoded = super().dumps(obj, separators=(",", ":"))
+        return self._app.response_class(f"{encoded}\n", mimetype=self.mimetype)
+
+
+if orjson is not None:
+    # Datetimes are handed back to DefaultJSONProvider.default so they keep the HTTP date format
+    _ORJSON_FLASK_OPTIONS = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+
+def encode_cursor(*values) -> str:
+    """Opaque keyset pagination cursor built from the sort key of the last row returned."""
+    payload = [
+        value.isoformat() if isinstance(value, (datetime, date))
+        else str(value) if isinstance(value, UUID)
+        else value
+        for value in values
+    ]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> list:
+    """Inverse of encode_cursor. Raises ValueError if the cursor is malformed."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {e}")
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return values
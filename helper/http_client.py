@@ -0,0 +1,136 @@
+"""
+Shared client for every outbound HTTP call (the Discord bot API, webhooks, the OSRS wiki).
+
+Calls made with the bare requests.get/post opened a new connection each time and,
+without a timeout, could hold a worker thread for as long as the remote host kept
+the socket open. HttpClient sends through one requests.Session whose adapter keeps
+a pool of keep-alive connections per host, always applies a (connect, read)
+timeout, retries connection failures and 429/502/503/504 responses with jittered
+exponential backoff, and records the latency of every call by host.
+
+Only requests that cannot have been processed are retried for POST and PATCH:
+connect timeouts and 429s. Everything else that failed is returned (or raised)
+to the caller as before.
+"""
+import logging
+import os
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from helper.metrics import OUTBOUND_LATENCY, OUTBOUND_RETRIES
+
+# (connect, read) seconds
+DEFAULT_TIMEOUT = (3.05, 10)
+RETRY_STATUSES = frozenset((429, 502, 503, 504))
+IDEMPOTENT_METHODS = frozenset(("GET", "HEAD", "OPTIONS", "PUT", "DELETE"))
+
+
+def _outcome(response) -> str:
+    return f"{response.status_code // 100}xx" if response is not None else "error"
+
+
+def _retry_after(response) -> float | None:
+    try:
+        return max(0.0, float(response.headers.get("Retry-After")))
+    except (TypeError, ValueError):
+        return None
+
+
+class HttpClient:
+    def __init__(self, timeout=DEFAULT_TIMEOUT, retries: int = 2, backoff_base: float = 0.25, backoff_max: float = 4.0,
+                 pool_connections: int = 10, pool_maxsize: int = 16, headers: dict | None = None) -> None:
+        """
+        timeout: default (connect, read) seconds; a call may pass its own but never None.
+        retries: extra attempts after the first; backoff_base * 2^attempt seconds, jittered, capped at backoff_max.
+        pool_connections: hosts to keep a pool for; pool_maxsize: connections kept per host.
+        """
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        if headers:
+            self.session.headers.update(headers)
+
+    def request(self, method: str, url: str, timeout=None, retries: int | None = None, **kwargs) -> requests.Response:
+        """requests.Session.request with the client's timeout, retries and metrics."""
+        method = method.upper()
+        host = urlsplit(url).netloc
+        retries = self.retries if retries is None else retries
+        idempotent = method in IDEMPOTENT_METHODS
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            response, error = None, None
+            try:
+                response = self.session.request(method, url, timeout=timeout or self.timeout, **kwargs)
+            except requests.exceptions.RequestException as e:
+                error = e
+            OUTBOUND_LATENCY.observe(time.perf_counter() - started, host=host, method=method, outcome=_outcome(response))
+
+            if error is not None:
+                retryable = isinstance(error, requests.exceptions.ConnectTimeout) or (
+                    idempotent and isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)))
+                reason = type(error).__name__
+            else:
+                retryable = response.status_code in RETRY_STATUSES and (idempotent or response.status_code == 429)
+                reason = str(response.status_code)
+
+            delay = self._backoff(attempt, response) if retryable and attempt < retries else None
+            if delay is None:
+                if error is not None:
+                    raise error
+                return response
+
+            logging.warning(f"[HTTP] {method} {host} failed ({reason}, attempt {attempt + 1}), retrying in {delay:.2f}s")
+            OUTBOUND_RETRIES.inc(host=host, reason=reason)
+            if response is not None:
+                response.close()
+            time.sleep(delay)
+            attempt += 1
+
+    def _backoff(self, attempt: int, response) -> float | None:
+        """Seconds to wait before the next attempt, or None when the server asked for longer than backoff_max."""
+        retry_after = _retry_after(response) if response is not None else None
+        if retry_after is not None:
+            return retry_after if retry_after <= self.backoff_max else None
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def delete(self, url: str, **kwargs) -> requests.Response:
+        return self.request("DELETE", url, **kwargs)
+
+    def close(self) -> None:
+        self.session.close()
+
+
+_default_client: HttpClient | None = None
+_default_lock = threading.Lock()
+
+
+def http_client() -> HttpClient:
+    """The process-wide client, configured from the environment on first use."""
+    global _default_client
+    if _default_client is None:
+        with _default_lock:
+            if _default_client is None:
+                _default_client = HttpClient(
+                    timeout=(float(os.getenv("HTTP_CONNECT_TIMEOUT", DEFAULT_TIMEOUT[0])),
+                             float(os.getenv("HTTP_READ_TIMEOUT", DEFAULT_TIMEOUT[1]))),
+                    retries=int(os.getenv("HTTP_RETRIES", 2)),
+                    headers={"User-Agent": "Stabilisite Backend"},
+                )
+    return _default_client
@@ -0,0 +1,284 @@
+"""
+In-process metrics registry rendered in the Prometheus text exposition format.
+
+Metrics are module-level singletons updated from request hooks, the event handler
+dispatcher and the handlers themselves; GET /metrics renders the current values.
+Gauges that describe live state (pool usage, SSE subscribers) are computed at
+scrape time from a callback instead of being updated on every change.
+"""
+import contextvars
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import request
+from sqlalchemy.pool import QueuePool
+
+# Seconds. Covers fast lookups through slow multi-statement handlers.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape_label(v)}"' for k, v in labels.items()) + "}"
+
+
+class _Metric:
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> list[tuple[str, dict, float]]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        for name, labels, value in self.samples():
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        return [(self.name, dict(zip(self.labelnames, key)), value) for key, value in items]
+
+
+class Gauge(_Metric):
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), callback=None) -> None:
+        """callback, if given, returns {label_values_tuple: value} and is evaluated at scrape time."""
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple, float] = {}
+        self._callback = callback
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def value(self, **labels) -> float:
+        if self._callback:
+            return self._callback().get(self._key(labels), 0)
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        if self._callback:
+            items = list(self._callback().items())
+        else:
+            with self._lock:
+                items = list(self._values.items())
+        return [(self.name, dict(zip(self.labelnames, key)), value) for key, value in items]
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # key -> [bucket counts..., sum, count]
+        self._values: dict[tuple, list[float]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def count(self, **labels) -> int:
+        state = self._values.get(self._key(labels))
+        return state[-1] if state else 0
+
+    def sum(self, **labels) -> float:
+        state = self._values.get(self._key(labels))
+        return state[-2] if state else 0.0
+
+    def samples(self):
+        with self._lock:
+            items = [(key, list(state)) for key, state in self._values.items()]
+        out = []
+        for key, state in items:
+            labels = dict(zip(self.labelnames, key))
+            for bound, bucket_count in zip(self.buckets, state):
+                out.append((f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, bucket_count))
+            out.append((f"{self.name}_sum", labels, state[-2]))
+            out.append((f"{self.name}_count", labels, state[-1]))
+        return out
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def get(self, name: str) -> _Metric | None:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+REGISTRY = Registry()
+
+HANDLER_LATENCY = REGISTRY.register(Histogram(
+    "event_handler_duration_seconds", "Time spent in each event handler per submission.", ("handler",)))
+HANDLER_QUERIES = REGISTRY.register(Counter(
+    "event_handler_queries_total", "SQL statements executed by each event handler.", ("handler",)))
+ROUTE_LATENCY = REGISTRY.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template.", ("method", "route", "status")))
+SUBMISSION_OUTCOMES = REGISTRY.register(Counter(
+    "event_submissions_total", "Event submissions by handler and outcome (matched, no_team, duplicate, error).",
+    ("handler", "outcome")))
+POOL_CHECKOUT_WAIT = REGISTRY.register(Histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a connection from the SQLAlchemy pool.",
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)))
+FIRESTORE_BACKLOG = REGISTRY.register(Gauge(
+    "firestore_write_backlog", "Firestore writes accepted but not yet completed."))
+FIRESTORE_BACKLOG.set(0)
+DISCORD_OUTBOX_DELIVERIES = REGISTRY.register(Counter(
+    "discord_outbox_deliveries_total", "Discord outbox delivery attempts by target and outcome (sent, retry, rate_limited, dead).",
+    ("target", "outcome")))
+OUTBOUND_LATENCY = REGISTRY.register(Histogram(
+    "http_client_request_duration_seconds", "Outbound HTTP call latency by host, method and outcome (2xx..5xx, error).",
+    ("host", "method", "outcome"), buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)))
+OUTBOUND_RETRIES = REGISTRY.register(Counter(
+    "http_client_retries_total", "Outbound HTTP calls retried by host and reason.", ("host", "reason")))
+
+
+def record_submission_outcome(handler: str, outcome: str) -> None:
+    SUBMISSION_OUTCOMES.inc(handler=handler, outcome=outcome)
+
+
+# Set by a handler once the submission matched a team; counted only if the handler then returns
+_submission_matched: contextvars.ContextVar[bool] = contextvars.ContextVar("submission_matched", default=False)
+
+
+def mark_submission_matched() -> None:
+    """Called by a handler that found the submitter's team; see track_submission_outcome."""
+    _submission_matched.set(True)
+
+
+@contextmanager
+def track_submission_outcome(handler: str):
+    """
+    Count one outcome for a handler invocation: "error" if it raises, otherwise
+    "matched" if it called mark_submission_matched. Handlers record no_team and
+    duplicate themselves.
+    """
+    token = _submission_matched.set(False)
+    try:
+        yield
+    except Exception:
+        record_submission_outcome(handler, "error")
+        raise
+    else:
+        if _submission_matched.get():
+            record_submission_outcome(handler, "matched")
+    finally:
+        _submission_matched.reset(token)
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a free connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            POOL_CHECKOUT_WAIT.observe(time.perf_counter() - start)
+
+
+def init_metrics(app, db) -> None:
+    """Register request-latency hooks and the scrape-time pool and SSE gauges."""
+
+    def _pool_stats():
+        pool = db.engine.pool
+        if not hasattr(pool, "checkedout"):
+            return {}
+        return {
+            ("size",): pool.size(),
+            ("checked_out",): pool.checkedout(),
+            ("checked_in",): pool.checkedin(),
+            ("overflow",): max(pool.overflow(), 0),
+        }
+
+    def _sse_subscribers():
+        from services.conquest_service import sse_clients
+        return {(event_id,): len(clients) for event_id, clients in list(sse_clients.items())}
+
+    if REGISTRY.get("db_pool_connections") is None:
+        REGISTRY.register(Gauge("db_pool_connections", "SQLAlchemy pool connections by state.", ("state",), callback=_pool_stats))
+        REGISTRY.register(Gauge("sse_subscribers", "Open scoreboard SSE streams per event.", ("event_id",), callback=_sse_subscribers))
+
+    @app.before_request
+    def _start_request_timer():
+        request.environ["metrics.start_time"] = time.perf_counter()
+
+    @app.after_request
+    def _observe_request_latency(response):
+        start = request.environ.get("metrics.start_time")
+        if start is not None:
+            route = request.url_rule.rule if request.url_rule else "unmatched"
+            ROUTE_LATENCY.observe(time.perf_counter() - start,
+                                  method=request.method, route=route, status=response.status_code)
+        return response
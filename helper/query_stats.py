@@ -0,0 +1,168 @@
+"""
+Per-request and per-handler SQL instrumentation.
+
+Every statement executed through SQLAlchemy is attributed to all currently open
+scopes: the Flask request it ran under and, nested inside that, the event handler
+invocation (see EventHandler.handle_event). Each scope records the query count,
+commit count, total DB time and the slowest statement.
+
+Totals are logged once per request as a single [QUERY] line, returned as
+X-Query-* response headers when the app runs in debug mode (or QUERY_STATS_HEADERS
+is set), and checked against an optional per-route budget declared with
+@query_budget. Handler scopes run on every submission, so their [QUERY] lines
+are logged at DEBUG.
+"""
+import contextvars
+import logging
+import os
+import time
+from contextlib import contextmanager
+
+from flask import g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Statements longer than this are truncated in logs and headers
+MAX_STATEMENT_LENGTH = 300
+
+# Open scopes for the current thread/context, innermost last
+_active_scopes: contextvars.ContextVar[tuple] = contextvars.ContextVar("query_stats_scopes", default=())
+
+
+class QueryStats:
+    def __init__(self, name: str, request_scope: bool = False) -> None:
+        self.name = name
+        self.request_scope = request_scope
+        self.count = 0
+        self.commits = 0
+        self.total_ms = 0.0
+        self.slowest_ms = 0.0
+        self.slowest_statement: str | None = None
+
+    def record(self, statement: str, elapsed_ms: float) -> None:
+        self.count += 1
+        self.total_ms += elapsed_ms
+        if elapsed_ms > self.slowest_ms:
+            self.slowest_ms = elapsed_ms
+            self.slowest_statement = statement
+
+    def log_line(self) -> str:
+        return (
+            f"name={self.name!r}, queries={self.count}, commits={self.commits}, db_ms={self.total_ms:.1f}, "
+            f"slowest_ms={self.slowest_ms:.1f}, slowest={_shorten(self.slowest_statement)!r}"
+        )
+
+
+def _shorten(statement: str | None) -> str | None:
+    if statement is None:
+        return None
+    statement = " ".join(statement.split())
+    if len(statement) > MAX_STATEMENT_LENGTH:
+        return statement[:MAX_STATEMENT_LENGTH] + "..."
+    return statement
+
+
+@contextmanager
+def track_queries(name: str):
+    """Open a stats scope; statements executed inside it are counted on the yielded QueryStats."""
+    stats = QueryStats(name)
+    token = _active_scopes.set(_active_scopes.get() + (stats,))
+    try:
+        yield stats
+    finally:
+        _active_scopes.reset(token)
+
+
+def query_budget(max_queries: int | None = None, max_ms: float | None = None):
+    """
+    Declare a per-route query budget. Apply below @app.route:
+
+        @app.route("/events/<event_id>/progress")
+        @query_budget(max_queries=20, max_ms=250)
+        def get_event_progress(event_id): ...
+
+    Exceeding the budget logs a warning; the response is unaffected.
+    """
+    def decorator(func):
+        func.query_budget = {"max_queries": max_queries, "max_ms": max_ms}
+        return func
+    return decorator
+
+
+def check_budget(stats: QueryStats, budget: dict | None) -> list[str]:
+    """Return a description of every limit in budget that stats exceeded."""
+    if not budget:
+        return []
+    exceeded = []
+    if budget.get("max_queries") is not None and stats.count > budget["max_queries"]:
+        exceeded.append(f"queries {stats.count} > {budget['max_queries']}")
+    if budget.get("max_ms") is not None and stats.total_ms > budget["max_ms"]:
+        exceeded.append(f"db_ms {stats.total_ms:.1f} > {budget['max_ms']}")
+    return exceeded
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start_times = conn.info.get("query_start_time")
+    if not start_times:
+        return
+    elapsed_ms = (time.perf_counter() - start_times.pop()) * 1000
+    for stats in _active_scopes.get():
+        stats.record(statement, elapsed_ms)
+
+
+def _commit(conn):
+    for stats in _active_scopes.get():
+        stats.commits += 1
+
+
+def _handle_error(exception_context):
+    # after_cursor_execute does not fire for failed statements; drop their start time
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_start_time"):
+        conn.info["query_start_time"].pop()
+
+
+def init_query_stats(app) -> None:
+    """Install the SQLAlchemy cursor hooks and the Flask request hooks."""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(Engine, "commit", _commit)
+        event.listen(Engine, "handle_error", _handle_error)
+
+    app.config.setdefault("QUERY_STATS_HEADERS", os.getenv("QUERY_STATS_HEADERS", "").lower() in ("1", "true", "yes"))
+
+    @app.before_request
+    def _start_request_query_stats():
+        # Outermost for a worker thread; nested inside any scope the caller opened (a test client call)
+        g.query_stats = QueryStats(f"{request.method} {request.path}", request_scope=True)
+        _active_scopes.set(_active_scopes.get() + (g.query_stats,))
+
+    @app.after_request
+    def _report_request_query_stats(response):
+        stats = g.get("query_stats")
+        if stats is None:
+            return response
+
+        logging.info(f"[QUERY] route={request.endpoint!r}, status={response.status_code}, {stats.log_line()}")
+
+        view = app.view_functions.get(request.endpoint)
+        exceeded = check_budget(stats, getattr(view, "query_budget", None))
+        if exceeded:
+            logging.warning(f"[QUERY] budget exceeded on route={request.endpoint!r}: {', '.join(exceeded)}; {stats.log_line()}")
+
+        if app.debug or app.config.get("QUERY_STATS_HEADERS"):
+            response.headers["X-Query-Count"] = str(stats.count)
+            response.headers["X-Commit-Count"] = str(stats.commits)
+            response.headers["X-Query-Time-Ms"] = f"{stats.total_ms:.2f}"
+            response.headers["X-Query-Slowest-Ms"] = f"{stats.slowest_ms:.2f}"
+        return response
+
+    @app.teardown_request
+    def _end_request_query_stats(exc):
+        # Runs after the app context may be gone, so drop request scopes without reading g
+        _active_scopes.set(tuple(stats for stats in _active_scopes.get() if not stats.request_scope))
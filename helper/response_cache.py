@@ -0,0 +1,226 @@
+"""
+Read-through cache for GET endpoints whose data only changes when it is edited.
+
+Decorated routes store their serialized response in an in-memory LRU (bounded by
+entry count and total bytes) under a set of tags:
+
+    @app.route("/v2/events/<id>", methods=['GET'])
+    @cached_response(tags=["event:{id}"])
+    def get_event(id): ...
+
+Tags are invalidated when a transaction that wrote to a tagged model commits.
+Models opt in with a __cache_tag__ class attribute. A flushed instance invalidates
+that tag, plus event:<event_id> when it belongs to an event (event:<id> for an
+Event itself). Writes that bypass the ORM call invalidate_on_commit() with the tags
+they affect. Entries also expire after a TTL, which bounds staleness for writers
+that do neither and across processes, since every process keeps its own cache.
+"""
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import current_app, g, make_response, request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from helper.metrics import REGISTRY, Counter, Gauge
+
+DEFAULT_TTL_SECONDS = 300
+CACHE_LOOKUPS = REGISTRY.register(Counter(
+    "response_cache_lookups_total", "Response cache lookups by route and result (hit, miss).", ("route", "result")))
+
+
+class LRUResponseCache:
+    def __init__(self, max_entries: int = 2048, max_bytes: int = 64 * 1024 * 1024) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, tuple] = OrderedDict()  # key -> (body, status, headers, tags, expires_at)
+        self._tag_keys: dict[str, set[str]] = {}
+        # Sequence number of the latest invalidation of each tag, so a response computed
+        # while one of its tags was invalidated is not stored
+        self._sequence = 0
+        self._tag_invalidated_at: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[4] <= time.monotonic():
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def sequence(self) -> int:
+        """Current invalidation sequence; pass it to set() as since."""
+        return self._sequence
+
+    def set(self, key: str, body: bytes, status: int, headers: list, tags, ttl: float, since: int | None = None) -> bool:
+        """Store an entry unless one of its tags was invalidated after sequence since."""
+        if len(body) > self.max_bytes:
+            return False
+        with self._lock:
+            if since is not None and any(self._tag_invalidated_at.get(tag, 0) > since for tag in tags):
+                return False
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (body, status, headers, tuple(tags), time.monotonic() + ttl)
+            self.bytes += len(body)
+            for tag in tags:
+                self._tag_keys.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+            return True
+
+    def invalidate(self, *tags: str) -> int:
+        """Drop every entry carrying any of tags. Returns the number of entries removed."""
+        removed = 0
+        with self._lock:
+            self._sequence += 1
+            for tag in tags:
+                self._tag_invalidated_at[tag] = self._sequence
+                for key in self._tag_keys.pop(tag, ()):
+                    if key in self._entries:
+                        self._remove(key)
+                        removed += 1
+            self.invalidations += removed
+        return removed
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tag_keys.clear()
+            self.bytes = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+    def _remove(self, key: str) -> None:
+        body, _, _, tags, _ = self._entries.pop(key)
+        self.bytes -= len(body)
+        for tag in tags:
+            keys = self._tag_keys.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tag_keys[tag]
+
+
+response_cache = LRUResponseCache(
+    max_entries=int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", 2048)),
+    max_bytes=int(os.getenv("RESPONSE_CACHE_MAX_BYTES", 64 * 1024 * 1024)),
+)
+
+if REGISTRY.get("response_cache") is None:
+    REGISTRY.register(Gauge(
+        "response_cache", "Response cache size and totals (entries, bytes, hits, misses, evictions, invalidations).",
+        ("stat",), callback=lambda: {(k,): v for k, v in response_cache.stats().items() if k != "hit_rate"}))
+
+
+def cache_enabled() -> bool:
+    return os.getenv("RESPONSE_CACHE_ENABLED", "1").lower() not in ("0", "false", "no")
+
+
+def add_cache_tags(*tags: str) -> None:
+    """Tag the response being built by the current cached route with tags only known at runtime."""
+    g.setdefault("cache_tags", []).extend(tags)
+
+
+def cached_response(tags: list[str], ttl: float = DEFAULT_TTL_SECONDS):
+    """
+    Serve a GET route from the response cache. Apply below @app.route. Tags may use the
+    route's arguments, e.g. "event:{id}". Only 200 responses are stored; the cache key is
+    the path plus the sorted query string.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not cache_enabled():
+                return func(*args, **kwargs)
+
+            key = request.path + "?" + "&".join(f"{k}={v}" for k, v in sorted(request.args.items(multi=True)))
+            route = request.url_rule.rule if request.url_rule else request.path
+            entry = response_cache.get(key)
+            if entry is not None:
+                CACHE_LOOKUPS.inc(route=route, result="hit")
+                response = current_app.response_class(entry[0], status=entry[1], headers=entry[2])
+                response.headers["X-Cache"] = "HIT"
+                return response
+
+            CACHE_LOOKUPS.inc(route=route, result="miss")
+            since = response_cache.sequence()
+            g.cache_tags = [tag.format(**kwargs) for tag in tags]
+            response = make_response(func(*args, **kwargs))
+            entry_tags = g.pop("cache_tags", [])
+            if response.status_code == 200 and not response.is_streamed:
+                response_cache.set(key, response.get_data(), response.status_code,
+                                   list(response.headers.items()), entry_tags, ttl, since)
+            response.headers["X-Cache"] = "MISS"
+            return response
+        return wrapper
+    return decorator
+
+
+def invalidate_tags(*tags: str) -> int:
+    """Invalidate immediately, e.g. after a raw-SQL write has already been committed."""
+    removed = response_cache.invalidate(*tags)
+    if removed:
+        logging.debug(f"[CACHE] invalidated {removed} entries for {tags}")
+    return removed
+
+
+def invalidate_on_commit(session, *tags: str) -> None:
+    """Invalidate tags once session's transaction commits (dropped on rollback)."""
+    session.info.setdefault("cache_tags", set()).update(tags)
+
+
+def _instance_tags(obj) -> tuple:
+    tag = getattr(type(obj), "__cache_tag__", None)
+    if tag is None:
+        return ()
+    loaded = obj.__dict__
+    event_id = loaded.get("id") if tag == "events" else loaded.get("event_id")
+    return (tag, f"event:{event_id}") if event_id is not None else (tag,)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_flushed_tags(session, flush_context):
+    tags = set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        tags.update(_instance_tags(obj))
+    if tags:
+        invalidate_on_commit(session, *tags)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_tags(session):
+    tags = session.info.pop("cache_tags", None)
+    if tags:
+        invalidate_tags(*tags)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_tags(session):
+    session.info.pop("cache_tags", None)
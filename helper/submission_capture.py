@@ -0,0 +1,56 @@
+"""
+Optional capture of raw /events/submit payloads for the replay benchmarks.
+
+Set SUBMISSION_CAPTURE_FILE to append every submission to an NDJSON file. With
+SUBMISSION_CAPTURE_ANONYMIZE set, player names, Discord IDs, screenshot paths and
+request IDs are replaced by stable pseudonyms before they reach disk, keyed by
+SUBMISSION_CAPTURE_SALT so the same player maps to the same pseudonym across a
+capture (which keeps per-player and per-team cardinality intact for replays).
+"""
+import hashlib
+import hmac
+import json
+import logging
+import os
+import threading
+import time
+
+CAPTURE_FILE = os.getenv("SUBMISSION_CAPTURE_FILE")
+CAPTURE_ANONYMIZE = os.getenv("SUBMISSION_CAPTURE_ANONYMIZE", "").lower() in ("1", "true", "yes")
+CAPTURE_SALT = os.getenv("SUBMISSION_CAPTURE_SALT", "stability")
+
+_write_lock = threading.Lock()
+
+
+def _pseudonym(value: str, salt: str, length: int = 10) -> str:
+    return hmac.new(salt.encode(), value.lower().encode(), hashlib.sha256).hexdigest()[:length]
+
+
+def anonymize_submission(payload: dict, salt: str = CAPTURE_SALT) -> dict:
+    """Return a copy of payload with identifying fields replaced by stable pseudonyms."""
+    anonymized = dict(payload)
+    if anonymized.get("rsn"):
+        anonymized["rsn"] = f"player_{_pseudonym(anonymized['rsn'], salt)}"
+    if anonymized.get("id"):
+        # Keep Discord IDs numeric so they look like the real thing to the handlers
+        anonymized["id"] = str(int(_pseudonym(str(anonymized["id"]), salt, 15), 16))
+    if anonymized.get("request_id"):
+        anonymized["request_id"] = _pseudonym(str(anonymized["request_id"]), salt, 32)
+    if anonymized.get("img_path"):
+        anonymized["img_path"] = None
+    return anonymized
+
+
+def capture_submission(payload: dict, path: str | None = CAPTURE_FILE, anonymize: bool = CAPTURE_ANONYMIZE) -> None:
+    """Append payload to the capture file as one NDJSON line. No-op unless capture is enabled."""
+    if not path:
+        return
+    record = {
+        "captured_at": time.time(),
+        "payload": anonymize_submission(payload) if anonymize else payload,
+    }
+    try:
+        with _write_lock, open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+    except OSError as e:
+        logging.error(f"Failed to capture submission to {path}: {e}")
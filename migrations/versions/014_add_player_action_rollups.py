@@ -0,0 +1,51 @@
+"""Add player_action_rollups table
+
+Revision ID: b1c2d3e4f5a6
+Revises: a9b0c1d2e3f4
+Create Date: 2026-10-19
+
+Per-player action totals for conquest events, maintained by conquest_handler.
+Existing events can be backfilled with scripts/rebuild_player_action_rollups.py.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'b1c2d3e4f5a6'
+down_revision = 'a9b0c1d2e3f4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'player_action_rollups',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True, server_default=sa.text('gen_random_uuid()')),
+        sa.Column('event_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('team_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('player_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('action_name', sa.String(255), nullable=False),
+        sa.Column('action_source', sa.String(255), nullable=True),
+        sa.Column('img_path', sa.String(512), nullable=True),
+        sa.Column('quantity', sa.Integer, nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('NOW()')),
+        sa.ForeignKeyConstraint(['event_id'], ['new_stability.events.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['team_id'], ['new_stability.teams.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['player_id'], ['users.id'], ondelete='CASCADE'),
+        schema='new_stability'
+    )
+    # Upsert target for conquest_handler; also serves the per-event read
+    op.create_index(
+        'player_action_rollups_unique_key',
+        'player_action_rollups',
+        ['event_id', 'team_id', 'player_id', 'action_name', sa.text("COALESCE(action_source, '')")],
+        unique=True,
+        schema='new_stability'
+    )
+
+
+def downgrade():
+    op.drop_index('player_action_rollups_unique_key', table_name='player_action_rollups', schema='new_stability')
+    op.drop_table('player_action_rollups', schema='new_stability')
@@ -0,0 +1,40 @@
+"""Add conquest_checkpoints table
+
+Revision ID: c2d3e4f5a6b7
+Revises: b1c2d3e4f5a6
+Create Date: 2026-10-19
+
+Compact snapshots of conquest control state so point-in-time reconstruction
+only replays the event logs written after the nearest checkpoint.
+Existing events can be backfilled with scripts/rebuild_conquest_checkpoints.py.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'c2d3e4f5a6b7'
+down_revision = 'b1c2d3e4f5a6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'conquest_checkpoints',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True, server_default=sa.text('gen_random_uuid()')),
+        sa.Column('event_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('as_of', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('log_count', sa.Integer, nullable=False, server_default='0'),
+        sa.Column('state', postgresql.JSONB, nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('NOW()')),
+        sa.ForeignKeyConstraint(['event_id'], ['new_stability.events.id'], ondelete='CASCADE'),
+        schema='new_stability'
+    )
+    op.create_index('idx_conquest_checkpoints_event_as_of', 'conquest_checkpoints', ['event_id', 'as_of'], schema='new_stability')
+
+
+def downgrade():
+    op.drop_index('idx_conquest_checkpoints_event_as_of', table_name='conquest_checkpoints', schema='new_stability')
+    op.drop_table('conquest_checkpoints', schema='new_stability')
@@ -0,0 +1,29 @@
+"""Add challenge_proofs (challenge_status_id, created_at, id) index
+
+Revision ID: d3e4f5a6b7c8
+Revises: c2d3e4f5a6b7
+Create Date: 2026-10-19
+
+Supports the newest-first keyset pagination of /v2/territories/<id>/proofs.
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'd3e4f5a6b7c8'
+down_revision = 'c2d3e4f5a6b7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        'idx_challenge_proofs_status_created',
+        'challenge_proofs',
+        ['challenge_status_id', 'created_at', 'id'],
+        schema='new_stability'
+    )
+
+
+def downgrade():
+    op.drop_index('idx_challenge_proofs_status_created', table_name='challenge_proofs', schema='new_stability')
@@ -0,0 +1,51 @@
+"""Add discord_outbox table
+
+Revision ID: e4f5a6b7c8d9
+Revises: d3e4f5a6b7c8
+Create Date: 2026-10-19
+
+Discord bot API calls and webhooks are written here in the caller's transaction
+and delivered by the outbox worker in helper/discord_outbox.py.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'e4f5a6b7c8d9'
+down_revision = 'd3e4f5a6b7c8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'discord_outbox',
+        sa.Column('id', sa.BigInteger, primary_key=True, autoincrement=True),
+        sa.Column('target', sa.String(16), nullable=False),
+        sa.Column('method', sa.String(8), nullable=False, server_default='POST'),
+        sa.Column('url', sa.Text, nullable=False),
+        sa.Column('payload', postgresql.JSONB, nullable=True),
+        sa.Column('rate_key', sa.String(255), nullable=False),
+        sa.Column('status', sa.String(16), nullable=False, server_default='pending'),
+        sa.Column('attempts', sa.Integer, nullable=False, server_default='0'),
+        sa.Column('next_attempt_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('NOW()')),
+        sa.Column('last_error', sa.Text, nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('NOW()')),
+        sa.Column('sent_at', sa.DateTime(timezone=True), nullable=True),
+        schema='new_stability'
+    )
+    # The worker's claim query: due pending rows in delivery order
+    op.create_index(
+        'idx_discord_outbox_due',
+        'discord_outbox',
+        ['next_attempt_at', 'id'],
+        postgresql_where=sa.text("status = 'pending'"),
+        schema='new_stability'
+    )
+
+
+def downgrade():
+    op.drop_index('idx_discord_outbox_due', table_name='discord_outbox', schema='new_stability')
+    op.drop_table('discord_outbox', schema='new_stability')
@@ -0,0 +1,29 @@
+"""Add actions (date, id) index
+
+Revision ID: f5a6b7c8d9e0
+Revises: e4f5a6b7c8d9
+Create Date: 2026-10-19
+
+Supports keyset pagination of /v2/actions in its default newest-first order.
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'f5a6b7c8d9e0'
+down_revision = 'e4f5a6b7c8d9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        'idx_actions_date_id',
+        'actions',
+        ['date', 'id'],
+        schema='new_stability'
+    )
+
+
+def downgrade():
+    op.drop_index('idx_actions_date_id', table_name='actions', schema='new_stability')
@@ -0,0 +1,50 @@
+"""Add sp3_trigger_totals table
+
+Revision ID: a6b7c8d9e0f1
+Revises: f5a6b7c8d9e0
+Create Date: 2026-10-19
+
+Stability Party drop totals move out of Events.data["log"], which every
+submission rewrote, into one row per (event, trigger) updated with an upsert.
+Existing logs are copied over and removed from the events' data.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'a6b7c8d9e0f1'
+down_revision = 'f5a6b7c8d9e0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'sp3_trigger_totals',
+        sa.Column('event_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('events.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('trigger', sa.String, primary_key=True),
+        sa.Column('value', sa.BigInteger, nullable=False, server_default='0'),
+        sa.Column('quantity', sa.BigInteger, nullable=False, server_default='0'),
+    )
+    op.execute("""
+        INSERT INTO sp3_trigger_totals (event_id, trigger, value, quantity)
+        SELECT e.id, log.key, COALESCE((log.value->>'value')::numeric, 0), COALESCE((log.value->>'quantity')::numeric, 0)
+        FROM events e, jsonb_each(e.data->'log') AS log
+        WHERE jsonb_typeof(e.data->'log') = 'object'
+    """)
+    op.execute("UPDATE events SET data = data - 'log' WHERE data ? 'log'")
+
+
+def downgrade():
+    op.execute("""
+        UPDATE events e SET data = COALESCE(e.data, '{}'::jsonb) || jsonb_build_object('log', totals.log)
+        FROM (
+            SELECT event_id, jsonb_object_agg(trigger, jsonb_build_object('value', value, 'quantity', quantity)) AS log
+            FROM sp3_trigger_totals
+            GROUP BY event_id
+        ) totals
+        WHERE totals.event_id = e.id
+    """)
+    op.drop_table('sp3_trigger_totals')
@@ -0,0 +1,38 @@
+"""Add sp3_team_history table
+
+Revision ID: b7c8d9e0f1a2
+Revises: a6b7c8d9e0f1
+Create Date: 2026-10-19
+
+Every save_team_data write appends a version of the team's save data, stored as
+a JSON patch against the previous version with a full snapshot every few
+versions, so moderators can audit a team and restore any earlier state.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'b7c8d9e0f1a2'
+down_revision = 'a6b7c8d9e0f1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'sp3_team_history',
+        sa.Column('team_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('event_teams.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('version', sa.Integer, primary_key=True),
+        sa.Column('event_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('events.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('patch', postgresql.JSONB, nullable=False),
+        sa.Column('snapshot', postgresql.JSONB),
+        sa.Column('digest', sa.String, nullable=False),
+        sa.Column('reason', sa.String),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    )
+
+
+def downgrade():
+    op.drop_table('sp3_team_history')
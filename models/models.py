@@ -76,6 +76,7 @@ class ClanApplications(db.Model, Serializer):
 
 class ClanRanks(db.Model, Serializer):
     __tablename__ = 'clan_ranks'
+    __cache_tag__ = 'ranks'
     id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     rank_name = db.Column(db.String, nullable=False)
     rank_minimum_points = db.Column(db.Integer, nullable=False)
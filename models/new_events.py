@@ -11,6 +11,7 @@ import datetime
 
 class Event(db.Model, Serializer):
     __tablename__ = 'events'
+    __cache_tag__ = 'events'  # Response cache tag invalidated on writes, see helper/response_cache.py
     __table_args__ = {'schema': 'new_stability'}
 
     id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -39,6 +40,7 @@ class Event(db.Model, Serializer):
 
 class Team(db.Model, Serializer):
     __tablename__ = 'teams'
+    __cache_tag__ = 'teams'
     __table_args__ = (
         db.UniqueConstraint('event_id', 'name', name='teams_unique_name_per_event'),
         {'schema': 'new_stability'}
@@ -66,6 +68,7 @@ class Team(db.Model, Serializer):
 
 class TeamMember(db.Model, Serializer):
     __tablename__ = 'team_members'
+    __cache_tag__ = 'team_members'
     __table_args__ = (
         db.UniqueConstraint('team_id', 'user_id', name='team_members_unique_user_per_team'),
         {'schema': 'new_stability'}
@@ -89,6 +92,7 @@ class Action(db.Model, Serializer):
     __tablename__ = 'actions'
     __table_args__ = (
         db.UniqueConstraint('request_id', name='actions_unique_request_id'),
+        db.Index('idx_actions_date_id', 'date', 'id'),
         {'schema': 'new_stability'}
     )
 
@@ -112,6 +116,7 @@ class Action(db.Model, Serializer):
 
 class Trigger(db.Model, Serializer):
     __tablename__ = 'triggers'
+    __cache_tag__ = 'triggers'
     __table_args__ = (
         db.UniqueConstraint('name', 'source', name='triggers_unique_name_source'),
         {'schema': 'new_stability'}
@@ -135,6 +140,7 @@ class Trigger(db.Model, Serializer):
 
 class Tile(db.Model, Serializer):
     __tablename__ = 'tiles'
+    __cache_tag__ = 'tiles'
     __table_args__ = (
         db.UniqueConstraint('event_id', 'index', name='tiles_unique_index_per_event'),
         {'schema': 'new_stability'}
@@ -159,6 +165,7 @@ class Tile(db.Model, Serializer):
 
 class Task(db.Model, Serializer):
     __tablename__ = 'tasks'
+    __cache_tag__ = 'tasks'
     __table_args__ = {'schema': 'new_stability'}
 
     id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -179,6 +186,7 @@ class Task(db.Model, Serializer):
 
 class Challenge(db.Model, Serializer):
     __tablename__ = 'challenges'
+    __cache_tag__ = 'challenges'
     __table_args__ = {'schema': 'new_stability'}
 
     id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -279,6 +287,7 @@ class ChallengeProof(db.Model, Serializer):
     __tablename__ = 'challenge_proofs'
     __table_args__ = (
         db.UniqueConstraint('challenge_status_id', 'action_id', name='challenge_proofs_unique_status_action'),
+        db.Index('idx_challenge_proofs_status_created', 'challenge_status_id', 'created_at', 'id'),
         {'schema': 'new_stability'}
     )
 
@@ -404,3 +413,74 @@ class EventLog(db.Model, Serializer):
 
     def serialize(self):
         return Serializer.serialize(self)
+
+
+class ConquestCheckpoint(db.Model, Serializer):
+    __tablename__ = 'conquest_checkpoints'
+    __table_args__ = (
+        db.Index('idx_conquest_checkpoints_event_as_of', 'event_id', 'as_of'),
+        {'schema': 'new_stability'}
+    )
+
+    id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    event_id = db.Column(UUID(as_uuid=True), db.ForeignKey('new_stability.events.id', ondelete='CASCADE'), nullable=False)
+    as_of = db.Column(db.DateTime(timezone=True), nullable=False)  # Every event log created at or before this is folded in
+    log_count = db.Column(db.Integer, nullable=False, default=0)  # Total event logs folded in since the start of the event
+    state = db.Column(JSONB, nullable=False)  # {territories, regions, green_logs, points}, keyed by id strings
+    created_at = db.Column(db.DateTime(timezone=True), nullable=False, default=lambda: datetime.datetime.now(datetime.timezone.utc))
+
+    def serialize(self):
+        return Serializer.serialize(self)
+
+
+class PlayerActionRollup(db.Model, Serializer):
+    __tablename__ = 'player_action_rollups'
+    __table_args__ = (
+        db.Index(
+            'player_action_rollups_unique_key',
+            'event_id', 'team_id', 'player_id', 'action_name', db.text("COALESCE(action_source, '')"),
+            unique=True,
+        ),
+        {'schema': 'new_stability'}
+    )
+
+    id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    event_id = db.Column(UUID(as_uuid=True), db.ForeignKey('new_stability.events.id', ondelete='CASCADE'), nullable=False)
+    team_id = db.Column(UUID(as_uuid=True), db.ForeignKey('new_stability.teams.id', ondelete='CASCADE'), nullable=False)
+    player_id = db.Column(UUID(as_uuid=True), db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    action_name = db.Column(db.String(255), nullable=False)
+    action_source = db.Column(db.String(255), nullable=True)
+    img_path = db.Column(db.String(512), nullable=True)  # Trigger image for the matched challenge
+    quantity = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime(timezone=True), nullable=False, default=lambda: datetime.datetime.now(datetime.timezone.utc))
+
+    def serialize(self):
+        return Serializer.serialize(self)
+
+
+# =========================================
+# OUTBOX MODELS
+# =========================================
+
+class DiscordOutbox(db.Model, Serializer):
+    __tablename__ = 'discord_outbox'
+    __table_args__ = (
+        db.Index('idx_discord_outbox_due', 'next_attempt_at', 'id', postgresql_where=db.text("status = 'pending'")),
+        {'schema': 'new_stability'}
+    )
+
+    id = db.Column(db.BigInteger, primary_key=True, autoincrement=True)  # Delivery order
+    target = db.Column(db.String(16), nullable=False)  # 'bot' (url is a DISCORD_BOT_API path) or 'webhook' (absolute url)
+    method = db.Column(db.String(8), nullable=False, default='POST')
+    url = db.Column(db.Text, nullable=False)
+    payload = db.Column(JSONB)  # Never holds the bot token; it is added at send time
+    rate_key = db.Column(db.String(255), nullable=False)
+    status = db.Column(db.String(16), nullable=False, default='pending')  # pending, sent, dead
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime(timezone=True), nullable=False, default=lambda: datetime.datetime.now(datetime.timezone.utc))
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime(timezone=True), nullable=False, default=lambda: datetime.datetime.now(datetime.timezone.utc))
+    sent_at = db.Column(db.DateTime(timezone=True))
+
+    def serialize(self):
+        return Serializer.serialize(self)
@@ -41,3 +41,29 @@ class SP3EventTileChallengeMapping(db.Model, Serializer):
 
     def serialize(self):
         return Serializer.serialize(self)
+
+class SP3TriggerTotals(db.Model, Serializer):
+    """Per-trigger drop totals for an event, the log that used to live in Events.data["log"]"""
+    __tablename__ = 'sp3_trigger_totals'
+    event_id = db.Column(UUID(as_uuid=True), db.ForeignKey('events.id', ondelete="CASCADE"), primary_key=True)  # Cascade delete
+    trigger = db.Column(db.String, primary_key=True)
+    value = db.Column(db.BigInteger, nullable=False, default=0)
+    quantity = db.Column(db.BigInteger, nullable=False, default=0)
+
+    def serialize(self):
+        return Serializer.serialize(self)
+
+class SP3TeamHistory(db.Model, Serializer):
+    """One version of a team's save data: a JSON patch against the previous version, and every so often the whole state"""
+    __tablename__ = 'sp3_team_history'
+    team_id = db.Column(UUID(as_uuid=True), db.ForeignKey('event_teams.id', ondelete="CASCADE"), primary_key=True)  # Cascade delete
+    version = db.Column(db.Integer, primary_key=True)
+    event_id = db.Column(UUID(as_uuid=True), db.ForeignKey('events.id', ondelete="CASCADE"), nullable=False)  # Cascade delete
+    patch = db.Column(JSONB, nullable=False)  # RFC 6902 operations turning the previous version into this one
+    snapshot = db.Column(JSONB)  # The whole state, on every SP3_HISTORY_SNAPSHOT_EVERY-th version
+    digest = db.Column(db.String, nullable=False)  # Hash of the state, to spot writes that bypassed save_team_data
+    reason = db.Column(db.String)
+    created_at = db.Column(db.DateTime(timezone=True), nullable=False, server_default=db.func.now())
+
+    def serialize(self):
+        return Serializer.serialize(self)
@@ -15,6 +15,7 @@ if [ -z "$1" ]; then
     echo "  simple       - Run simplified bingo test (OR, AND, multi-task)"
     echo "  parent       - Run parent challenge test"
     echo "  all          - Run all event system tests"
+    echo "  bench        - Seed a synthetic workload and replay it (benchmarks/)"
     echo ""
     echo "Example: ./run_tests.sh parent"
     exit 1
@@ -40,6 +41,12 @@ case "$1" in
         echo "------------------------"
         .venv/bin/python tests/test_parent_challenges.py
         ;;
+    bench)
+        echo "Running submission replay benchmark..."
+        .venv/bin/python benchmarks/workload.py synthesize --output bench_workload.ndjson
+        .venv/bin/python benchmarks/seed.py bench_workload.ndjson
+        .venv/bin/python benchmarks/replay.py bench_workload.ndjson --output bench_result.json ${BENCH_BASELINE:+--baseline "$BENCH_BASELINE"}
+        ;;
     *)
         echo "Unknown test: $1"
         echo "Run './run_tests.sh' for usage"
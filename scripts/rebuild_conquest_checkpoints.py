@@ -0,0 +1,46 @@
+"""
+Rebuild conquest state checkpoints from each event's full event log.
+
+Usage:
+    python scripts/rebuild_conquest_checkpoints.py [--event-id <uuid>]
+
+Without --event-id every conquest event is rebuilt. Each event is rebuilt in its
+own transaction, so a failure leaves the other events untouched.
+"""
+
+import argparse
+import logging
+import os
+import sys
+
+# Add the project root directory to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(project_root)
+
+from app import app, db
+from models.new_events import Event
+from services.conquest_service import rebuild_conquest_checkpoints
+
+
+def run(event_id: str | None):
+    with app.app_context():
+        if event_id:
+            event_ids = [event_id]
+        else:
+            event_ids = [e.id for e in Event.query.filter_by(type='conquest').all()]
+
+        for eid in event_ids:
+            try:
+                count = rebuild_conquest_checkpoints(eid, db.session)
+                db.session.commit()
+                print(f"Wrote {count} checkpoints for event {eid}")
+            except Exception as e:
+                db.session.rollback()
+                logging.exception(f"Failed to rebuild checkpoints for event {eid}: {e}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild conquest state checkpoints")
+    parser.add_argument("--event-id", default=None, help="Only rebuild this event")
+    args = parser.parse_args()
+    run(args.event_id)
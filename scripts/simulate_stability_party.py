@@ -0,0 +1,646 @@
+"""
+Monte Carlo simulator for Stability Party board and economy balance.
+
+Plays many games of an SP3 board at once: every team's tile, dice, coins, stars,
+laps and inventory live in NumPy arrays, so each turn's rolls, moves, shop visits
+and charters are a handful of array operations over all games, and the games are
+split across a process pool. Reports, per team at the end of a game, the spread
+of laps, stars and coins, plus how often each item is offered, bought and used
+and what shops asked for it.
+
+Boards:
+  - built in (default): four looping islands with a shortcut, a shop and a dock
+    each, three of them the hotspots the handler has special rules for
+  - --board board.json: {"regions": [{"id", "name", "data"}], "tiles": [{"id",
+    "region_id", "name", "data"}], "star_tiles": [...]}, the sp3_regions and
+    sp3_event_tiles rows and events.data["star_tiles"] of an event
+  - --event-id <uuid>: the same, read from DATABASE_URL
+
+Rules follow stability_party_handler and item_definitions. Each turn every team
+uses (maybe) its oldest item, rolls, moves (stopping at shops, stars and docks on
+the way, as the handler does), then clears the challenge where it lands for the
+tile or region reward. Choices players make are set by Policy. Items whose effect
+is on challenges (Turael Skip) are counted as used but change nothing.
+
+Usage (needs requirements-scripts.txt):
+    python scripts/simulate_stability_party.py [--games 10000] [--teams 8] [--turns 30] [--workers 4]
+        [--seed 0] [--board board.json | --event-id <uuid>] [--output report.json]
+
+Results are reproducible for the same --seed and --workers. Nothing is written to the database.
+"""
+
+import argparse
+import json
+import os
+import sys
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+
+# Add the project root directory to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(project_root)
+
+import app  # noqa: F401 - imports the endpoints (and through them the SP3 modules) in the usual order
+from event_handlers.stability_party.board_graph import BoardGraph, BoardTile
+from event_handlers.stability_party.item_definitions import get_all_items
+from event_handlers.stability_party.item_system import RARITY_WEIGHTS, shop_rarity_table
+
+STAR_PRICE = 100
+INVENTORY_LIMIT = 3
+# NPC Contact and Mystery Box hand out items without checking the limit
+ITEM_SLOTS = INVENTORY_LIMIT + 2
+SHOP_ITEM_COUNT = 3
+RARITIES = list(RARITY_WEIGHTS)
+
+# Hotspot islands with lap rules in _island_lap_completed / _initiate_new_roll
+MOONWAKE_COVE = "Moonwake Cove"
+MOUNTAIN_MAYHEM = "Mountain Mayhem"
+RAIDICAL_ISLAND = "Raid-ical Island"
+
+
+@dataclass(frozen=True)
+class Policy:
+    """The choices the game leaves to players"""
+    item_use_rate: float = 1.0  # chance to use the oldest held item before a roll
+    shop_buy_rate: float = 0.5  # chance to buy the cheapest affordable offer at a shop
+    charter_rate: float = 0.5  # chance to charter from a dock when a route is affordable
+    region_challenge_rate: float = 0.1  # chance the challenge cleared is the region's (50 coins, a d6)
+
+
+@dataclass
+class SimBoard:
+    tile_names: list[str]
+    next_tiles: np.ndarray  # (tiles, max exits) tile indexes, -1 padded
+    next_count: np.ndarray  # (tiles,)
+    tile_region: np.ndarray  # (tiles,) region index, -1 for none
+    is_shop: np.ndarray
+    is_dock: np.ndarray
+    star_candidates: np.ndarray  # tile indexes a star may be moved to: on an island, not shops or docks
+    region_names: list[str]
+    region_hotspot: np.ndarray  # (regions,)
+    region_start: np.ndarray  # (regions,) island start tile index, -1 for none
+    charter_cost: np.ndarray  # (regions, regions) coins, -1 where there is no route
+    star_tiles: np.ndarray  # tile indexes holding a star at the start
+
+    def hotspot(self, name: str) -> int:
+        """Index of the hotspot region called name, -1 if the board has none"""
+        for i, region_name in enumerate(self.region_names):
+            if region_name == name and self.region_hotspot[i]:
+                return i
+        return -1
+
+
+@dataclass
+class ItemTable:
+    ids: list[str]
+    names: list[str]
+    rarity: np.ndarray  # index into RARITIES
+    base_price: np.ndarray
+
+    def index(self, item_id: str) -> int:
+        return self.ids.index(item_id) if item_id in self.ids else -1
+
+    def of_rarity(self, *rarities: str) -> np.ndarray:
+        return np.flatnonzero(np.isin(self.rarity, [RARITIES.index(r) for r in rarities]))
+
+
+def item_table() -> ItemTable:
+    items = get_all_items()
+    return ItemTable(
+        ids=[item.id for item in items],
+        names=[item.name for item in items],
+        rarity=np.array([RARITIES.index(item.rarity.lower()) for item in items], dtype=np.int64),
+        base_price=np.array([item.base_price for item in items], dtype=np.int64),
+    )
+
+
+def _as_uuid(value) -> uuid.UUID | None:
+    try:
+        return value if isinstance(value, uuid.UUID) else uuid.UUID(str(value))
+    except ValueError:
+        return None
+
+
+def compile_board(graph: BoardGraph, regions: list[dict]) -> SimBoard:
+    """Flatten a BoardGraph and its regions' data into index arrays."""
+    tile_ids = sorted(graph.tiles, key=str)
+    index = {tile_id: i for i, tile_id in enumerate(tile_ids)}
+    region_index = {_as_uuid(r["id"]): i for i, r in enumerate(regions)}
+
+    exits = [[index[n] for n in graph.next_tiles(tile_id) if n in index] for tile_id in tile_ids]
+    next_tiles = np.full((len(tile_ids), max(map(len, exits), default=0) or 1), -1, dtype=np.int64)
+    for i, tile_exits in enumerate(exits):
+        next_tiles[i, :len(tile_exits)] = tile_exits
+
+    region_start = np.full(len(regions), -1, dtype=np.int64)
+    for region_id, i in region_index.items():
+        start = graph.island_start(region_id)
+        if start is not None:
+            region_start[i] = index[start.id]
+
+    charter_cost = np.full((len(regions), len(regions)), -1, dtype=np.int64)
+    for i, region in enumerate(regions):
+        for destination, cost in ((region.get("data") or {}).get("charter") or {}).items():
+            j = region_index.get(_as_uuid(destination))
+            if j is not None and region_start[j] >= 0:
+                charter_cost[i, j] = int(cost)
+
+    is_shop = np.array([graph.is_shop(t) for t in tile_ids])
+    is_dock = np.array([graph.is_dock(t) for t in tile_ids])
+    tile_region = np.array([region_index.get(graph.tiles[t].region_id, -1) for t in tile_ids], dtype=np.int64)
+    return SimBoard(
+        tile_names=[graph.tiles[t].name for t in tile_ids],
+        next_tiles=next_tiles,
+        next_count=np.array(list(map(len, exits)), dtype=np.int64),
+        tile_region=tile_region,
+        is_shop=is_shop,
+        is_dock=is_dock,
+        star_candidates=np.flatnonzero(~is_shop & ~is_dock & (tile_region >= 0)),
+        region_names=[r["name"] for r in regions],
+        region_hotspot=np.array([bool((r.get("data") or {}).get("isHotspot", False)) for r in regions]),
+        region_start=region_start,
+        charter_cost=charter_cost,
+        star_tiles=np.array(sorted(index[t] for t in graph.star_tiles if t in index), dtype=np.int64),
+    )
+
+
+def board_from_definition(definition: dict) -> SimBoard:
+    """Compile a board from its JSON definition (see the module docstring)."""
+    tiles = [
+        BoardTile(_as_uuid(t["id"]), None, _as_uuid(t["region_id"]) if t.get("region_id") else None,
+                  t["name"], t.get("description"), t.get("data") or {})
+        for t in definition["tiles"]
+    ]
+    return compile_board(BoardGraph(None, tiles, definition.get("star_tiles")), definition["regions"])
+
+
+def load_board_file(path: str) -> SimBoard:
+    with open(path) as f:
+        return board_from_definition(json.load(f))
+
+
+def load_board_from_db(event_id: str) -> SimBoard:
+    """Read an event's board; only SELECTs are issued."""
+    from models.stability_party_3 import SP3Regions
+    from event_handlers.stability_party.board_graph import get_board_graph
+
+    with app.app.app_context():
+        graph = get_board_graph(event_id)
+        regions = [{"id": r.id, "name": r.name, "data": r.data or {}}
+                   for r in SP3Regions.query.filter_by(event_id=event_id).order_by(SP3Regions.name)]
+        app.db.session.rollback()
+    return compile_board(graph, regions)
+
+
+def fixture_definition(tiles_per_region: int = 12) -> dict:
+    """Four looping islands: a shortcut at tile 2, a shop at 5, the dock last, every route 30 coins."""
+    names = [MOONWAKE_COVE, MOUNTAIN_MAYHEM, RAIDICAL_ISLAND, "Lumbridge"]
+    regions, tiles = [], []
+    for r, name in enumerate(names):
+        region_id = str(uuid.UUID(int=1000 * (r + 1)))
+        tile_ids = [str(uuid.UUID(int=1000 * (r + 1) + t + 1)) for t in range(tiles_per_region)]
+        for t, tile_id in enumerate(tile_ids):
+            next_tiles = [tile_ids[(t + 1) % tiles_per_region]]
+            if t == 2:
+                next_tiles.append(tile_ids[6])
+            tiles.append({"id": tile_id, "region_id": region_id, "name": f"{name} {t + 1}", "data": {
+                "nextTiles": next_tiles, "isIslandStart": t == 0, "isShop": t == 5, "isDock": t == tiles_per_region - 1,
+            }})
+        regions.append({"id": region_id, "name": name, "data": {"isHotspot": name != "Lumbridge"}})
+    for region in regions:
+        region["data"]["charter"] = {other["id"]: 30 for other in regions if other is not region}
+    # A star on tile 8 of the first two islands
+    star_tiles = [tiles[r * tiles_per_region + 7]["id"] for r in range(2)]
+    return {"regions": regions, "tiles": tiles, "star_tiles": star_tiles}
+
+
+def fixture_board(tiles_per_region: int = 12) -> SimBoard:
+    return board_from_definition(fixture_definition(tiles_per_region))
+
+
+def shop_rarity_odds(shop_tier: int = 1) -> np.ndarray:
+    """Chance of each of RARITIES per draw, from the alias table generate_shop_inventory uses."""
+    rarities, table = shop_rarity_table(shop_tier)
+    odds = np.zeros(len(RARITIES))
+    for rarity, weight in zip(rarities, table.weights if table else ()):
+        odds[RARITIES.index(rarity)] = weight
+    return odds / odds.sum() if odds.any() else odds
+
+
+def sample_shop_offers(rng: np.random.Generator, items: ItemTable, odds: np.ndarray, visits: int,
+                       count: int = SHOP_ITEM_COUNT) -> np.ndarray:
+    """(visits, count) item indexes, -1 in slots a shop could not fill.
+
+    Draws as generate_shop_inventory does: a rarity by weight, then one of its items not on
+    offer yet, skipping rarities already used up, for at most count * 10 draws.
+    """
+    offers = np.full((visits, count), -1, dtype=np.int64)
+    filled = np.zeros(visits, dtype=np.int64)
+    taken = np.zeros((visits, len(items.ids)), dtype=bool)
+    for _ in range(count * 10):
+        rows = np.flatnonzero(filled < count)
+        if not rows.size:
+            break
+        rarity = rng.choice(len(RARITIES), rows.size, p=odds)
+        available = (items.rarity[None, :] == rarity[:, None]) & ~taken[rows]
+        left = available.sum(axis=1)
+        rows, available, left = rows[left > 0], available[left > 0], left[left > 0]
+        nth = (rng.random(rows.size) * left).astype(np.int64)
+        item = np.argmax(available.cumsum(axis=1) > nth[:, None], axis=1)
+        taken[rows, item] = True
+        offers[rows, filled[rows]] = item
+        filled[rows] += 1
+    return offers
+
+
+def shop_prices(rng: np.random.Generator, items: ItemTable, offers: np.ndarray) -> np.ndarray:
+    base = items.base_price[offers]
+    varied = (base * rng.uniform(0.8, 1.2, offers.shape)).astype(np.int64)
+    return np.where(base >= 10, varied, base)
+
+
+class _Games:
+    """State of a batch of games, one row per team; team j of game g is row g * teams + j."""
+
+    def __init__(self, board: SimBoard, items: ItemTable, games: int, teams: int, policy: Policy, rng: np.random.Generator) -> None:
+        self.board, self.items, self.policy, self.rng = board, items, policy, rng
+        self.games, self.teams = games, teams
+        n = games * teams
+        self.game = np.repeat(np.arange(games), teams)
+        starts = np.flatnonzero(board.region_start >= 0)
+        if not starts.size:
+            raise ValueError("Board has no island start tiles")
+        # The first roll's island choice
+        self.region = rng.choice(starts, n)
+        self.tile = board.region_start[self.region]
+        self.coins = np.zeros(n, dtype=np.int64)
+        self.stars = np.zeros(n, dtype=np.int64)
+        self.laps = np.zeros(n, dtype=np.int64)  # on the current island, as islandLaps
+        self.total_laps = np.zeros(n, dtype=np.int64)
+        self.coins_earned = np.zeros(n, dtype=np.int64)
+        self.coins_spent = np.zeros(n, dtype=np.int64)
+        self.tickets = np.zeros(n, dtype=np.int64)
+        self.dice = np.zeros((n, 2), dtype=np.int64)  # sides per die, 0 for none; no dice rolls a d6
+        self.modifier = np.zeros(n, dtype=np.int64)
+        self.remaining = np.zeros(n, dtype=np.int64)
+        self.inventory = np.full((n, ITEM_SLOTS), -1, dtype=np.int64)  # oldest first
+        self.star_at = np.tile(board.star_tiles, (games, 1))
+
+        self.shop_odds = shop_rarity_odds()
+        self.max_price = int(items.base_price.max() * 1.2) + 1 if len(items.ids) else 1
+        self.offered = np.zeros(len(items.ids), dtype=np.int64)
+        self.price_hist = np.zeros((len(items.ids), self.max_price + 1), dtype=np.int64)
+        self.bought = np.zeros(len(items.ids), dtype=np.int64)
+        self.used = np.zeros(len(items.ids), dtype=np.int64)
+        self.shop_visits = 0
+        self.star_purchases = 0
+        self.charters = 0
+
+        self.mountain = board.hotspot(MOUNTAIN_MAYHEM)
+        self.moonwake = board.hotspot(MOONWAKE_COVE)
+        self.raidical = board.hotspot(RAIDICAL_ISLAND)
+        self.npc_pool = items.of_rarity("common", "uncommon", "rare")
+        self.mystery_pool = items.of_rarity("common", "uncommon", "rare", "epic")
+        self.moonwake_pool = items.of_rarity("common", "uncommon")
+
+    def held(self, rows: np.ndarray) -> np.ndarray:
+        return (self.inventory[rows] >= 0).sum(axis=1)
+
+    def give(self, rows: np.ndarray, item_idx: np.ndarray) -> None:
+        """Append item_idx[i] to row rows[i]'s inventory; rows with no free slot lose it."""
+        while rows.size:
+            # A row can get two items at once (Mystery Box); place one per pass
+            first = np.unique(rows, return_index=True)[1]
+            r, held = rows[first], self.held(rows[first])
+            ok = held < ITEM_SLOTS
+            self.inventory[r[ok], held[ok]] = item_idx[first][ok]
+            rest = np.ones(rows.size, dtype=bool)
+            rest[first] = False
+            rows, item_idx = rows[rest], item_idx[rest]
+
+    def earn(self, rows: np.ndarray, amount) -> None:
+        amount = np.broadcast_to(amount, rows.shape)
+        np.add.at(self.coins, rows, amount)
+        np.add.at(self.coins_earned, rows, amount)
+
+    def spend(self, rows: np.ndarray, amount) -> None:
+        amount = np.broadcast_to(amount, rows.shape)
+        np.add.at(self.coins, rows, -amount)
+        np.add.at(self.coins_spent, rows, amount)
+
+    def play_turn(self) -> None:
+        self.use_items()
+        self.roll()
+        self.move()
+        self.complete_tile()
+
+    def use_items(self) -> None:
+        rng, items = self.rng, self.items
+        n = self.tile.size
+        item = self.inventory[:, 0]
+        use = (item >= 0) & (rng.random(n) < self.policy.item_use_rate)
+        no_dice = (self.dice == 0).all(axis=1)
+        # Jewelry Box has nothing to choose from before the first tile's dice
+        use &= ~((item == items.index("jewelry_box")) & no_dice)
+        rows = np.flatnonzero(use)
+        if not rows.size:
+            return
+        np.add.at(self.used, item[rows], 1)
+        self.inventory[rows, :-1] = self.inventory[rows, 1:]
+        self.inventory[rows, -1] = -1
+
+        def using(item_id):
+            return rows[item[rows] == items.index(item_id)]
+
+        r = using("boots_of_lightness")
+        self.modifier[r] += 1
+        r = using("mini_dice")
+        self.dice[r] = (3, 0)
+        r = using("weighted_die")
+        self.dice[r], self.modifier[r] = (4, 0), 2
+        r = using("double_dice")
+        self.dice[r] = np.where(no_dice[r, None], 4, self.dice[r, :1])
+        r = using("jewelry_box")
+        # Players pick the highest value on offer
+        best = self.dice[r].sum(axis=1) + self.modifier[r]
+        self.dice[r], self.modifier[r] = (1, 0), best - 1
+        r = using("coin_pouch")
+        self.earn(r, rng.integers(40, 81, r.size))
+        r = using("sailing_ticket")
+        self.tickets[r] += 1
+        r = using("npc_contact")
+        if self.npc_pool.size:
+            self.give(r, rng.choice(self.npc_pool, r.size))
+        r = using("mystery_box")
+        if self.mystery_pool.size:
+            self.give(np.repeat(r, 2), rng.choice(self.mystery_pool, r.size * 2))
+        r = using("moonlight_moth_mix")
+        self.earn(r, 20)
+        self.earn(self._other_team(r), 20)
+        r = using("bounty_target_teleport")
+        other = self._other_team(r)
+        self.tile[r], self.region[r] = self.tile[other], self.region[other]
+        r = using("genie_lamp")
+        if r.size and self.star_at.shape[1]:
+            g = self.game[r]
+            self.tile[r] = self.star_at[g, rng.integers(0, self.star_at.shape[1], r.size)]
+            self.region[r] = self.board.tile_region[self.tile[r]]
+            self.buy_stars(r)
+
+    def _other_team(self, rows: np.ndarray) -> np.ndarray:
+        if self.teams < 2:
+            return rows
+        offset = self.rng.integers(1, self.teams, rows.size)
+        return self.game[rows] * self.teams + (rows % self.teams + offset) % self.teams
+
+    def roll(self) -> None:
+        sides = np.where((self.dice == 0).all(axis=1, keepdims=True), np.array([6, 0]), self.dice)
+        results = self.rng.integers(1, np.maximum(sides, 1) + 1) * (sides > 0)
+        self.remaining = results.sum(axis=1) + self.modifier
+        # Mountain Mayhem: every roll is a 1 until the first lap
+        if self.mountain >= 0:
+            self.remaining[(self.region == self.mountain) & (self.laps == 0)] = 1
+
+    def move(self) -> None:
+        board = self.board
+        while True:
+            rows = np.flatnonzero(self.remaining > 0)
+            if not rows.size:
+                return
+            exits = board.next_count[self.tile[rows]]
+            self.remaining[rows[exits == 0]] = 0
+            rows, exits = rows[exits > 0], exits[exits > 0]
+            # Crossroads are chosen at random
+            choice = (self.rng.random(rows.size) * exits).astype(np.int64)
+            self.tile[rows] = board.next_tiles[self.tile[rows], choice]
+            self.remaining[rows] -= 1
+            tile_region = board.tile_region[self.tile[rows]]
+            self.region[rows] = np.where(tile_region >= 0, tile_region, self.region[rows])
+
+            shop = board.is_shop[self.tile[rows]]
+            star = ~shop & (self.star_at[self.game[rows]] == self.tile[rows, None]).any(axis=1)
+            dock = ~shop & ~star & board.is_dock[self.tile[rows]]
+            self.visit_shops(rows[shop])
+            self.buy_stars(rows[star])
+            self.dock(rows[dock])
+
+    def visit_shops(self, rows: np.ndarray) -> None:
+        if not rows.size or not len(self.items.ids):
+            return
+        rng = self.rng
+        self.shop_visits += rows.size
+        offers = sample_shop_offers(rng, self.items, self.shop_odds, rows.size)
+        prices = shop_prices(rng, self.items, offers)
+        on_offer = offers >= 0
+        np.add.at(self.offered, offers[on_offer], 1)
+        np.add.at(self.price_hist, (offers[on_offer], np.clip(prices[on_offer], 0, self.max_price)), 1)
+
+        affordable = on_offer & (prices <= self.coins[rows, None])
+        buy = affordable.any(axis=1) & (self.held(rows) < INVENTORY_LIMIT) & (rng.random(rows.size) < self.policy.shop_buy_rate)
+        pick = np.argmin(np.where(affordable, prices, np.iinfo(np.int64).max), axis=1)[buy]
+        buyers = rows[buy]
+        item, price = offers[buy, pick], prices[buy, pick]
+        self.spend(buyers, price)
+        self.give(buyers, item)
+        np.add.at(self.bought, item, 1)
+
+    def buy_stars(self, rows: np.ndarray) -> None:
+        board = self.board
+        regions = self.region.reshape(self.games, self.teams)
+        # Rare enough to settle one at a time; a star can also move before a later buyer reaches it
+        for row in rows[self.coins[rows] >= STAR_PRICE]:
+            g = self.game[row]
+            held = np.flatnonzero(self.star_at[g] == self.tile[row])
+            if not held.size:
+                continue
+            # Same rule as pick_star_destination: an island no team is on if there is one, else anywhere
+            free = board.star_candidates[~np.isin(board.star_candidates, self.star_at[g])]
+            candidates = free[~np.isin(board.tile_region[free], regions[g])]
+            if not candidates.size:
+                candidates = free
+            if not candidates.size:
+                # The handler refuses the purchase, and takes no coins, when the star has nowhere to go
+                continue
+            self.spend(np.array([row]), STAR_PRICE)
+            self.stars[row] += 1
+            self.star_purchases += 1
+            self.star_at[g, held[0]] = self.rng.choice(candidates)
+
+    def dock(self, rows: np.ndarray) -> None:
+        if not rows.size:
+            return
+        board, rng = self.board, self.rng
+        self.laps[rows] += 1
+        self.total_laps[rows] += 1
+
+        r = rows[(self.region[rows] == self.moonwake) & (self.held(rows) < INVENTORY_LIMIT)]
+        if r.size and self.moonwake_pool.size:
+            self.give(r, rng.choice(self.moonwake_pool, r.size))
+        r = rows[(self.region[rows] == self.mountain) & (self.laps[rows] <= 1)]
+        self.stars[r] += 1
+        r = rows[(self.region[rows] == self.raidical) & (self.laps[rows] < 3)]
+        self.earn(r, 50)
+
+        costs = board.charter_cost[self.region[rows]]
+        ticket = self.tickets[rows] > 0
+        affordable = (costs >= 0) & ((costs <= self.coins[rows, None]) | ticket[:, None])
+        go = affordable.any(axis=1) & (rng.random(rows.size) < self.policy.charter_rate)
+        destination = np.argmax(rng.random(costs.shape) * affordable, axis=1)[go]
+        rows, ticket = rows[go], ticket[go]
+        if not rows.size:
+            return
+        self.spend(rows, np.where(ticket, 0, board.charter_cost[self.region[rows], destination]))
+        self.tickets[rows] -= ticket
+        self.charters += rows.size
+        self.region[rows], self.tile[rows], self.laps[rows] = destination, board.region_start[destination], 0
+        if self.mountain >= 0:
+            self.remaining[rows[destination == self.mountain]] = 1
+        self.remaining[rows] -= 1
+
+    def complete_tile(self) -> None:
+        n = self.tile.size
+        self.dice[:] = 0
+        self.modifier[:] = 0
+        tile_region = self.board.tile_region[self.tile]
+        hotspot = (tile_region >= 0) & self.board.region_hotspot[tile_region]
+        reward = np.where(hotspot, 10, np.maximum(10 - self.laps * 2, 0))
+        region_challenge = self.rng.random(n) < self.policy.region_challenge_rate
+        self.earn(np.arange(n), np.where(region_challenge, 50, reward))
+        self.dice[:, 0] = np.where(region_challenge, 6, 4)
+
+    def results(self) -> dict:
+        return {
+            "laps": self.total_laps, "stars": self.stars, "coins": self.coins,
+            "coins_earned": self.coins_earned, "coins_spent": self.coins_spent,
+            "winner_stars": self.stars.reshape(self.games, self.teams).max(axis=1),
+            "offered": self.offered, "price_hist": self.price_hist, "bought": self.bought, "used": self.used,
+            "shop_visits": self.shop_visits, "star_purchases": self.star_purchases, "charters": self.charters,
+        }
+
+
+def simulate_batch(board: SimBoard, items: ItemTable, games: int, teams: int, turns: int, policy: Policy, seed) -> dict:
+    games_state = _Games(board, items, games, teams, policy, np.random.default_rng(seed))
+    for _ in range(turns):
+        games_state.play_turn()
+    return games_state.results()
+
+
+def _run_batch(args) -> dict:
+    return simulate_batch(*args)
+
+
+def _merge(results: list[dict]) -> dict:
+    merged = {}
+    for key, value in results[0].items():
+        if isinstance(value, np.ndarray) and key not in ("offered", "price_hist", "bought", "used"):
+            merged[key] = np.concatenate([r[key] for r in results])
+        else:
+            merged[key] = sum(r[key] for r in results)
+    return merged
+
+
+def _distribution(values: np.ndarray) -> dict:
+    p10, p50, p90 = np.percentile(values, [10, 50, 90])
+    return {"mean": round(float(values.mean()), 2), "p10": float(p10), "p50": float(p50), "p90": float(p90),
+            "max": int(values.max())}
+
+
+def _hist_distribution(hist: np.ndarray) -> dict | None:
+    total = hist.sum()
+    if not total:
+        return None
+    prices = np.arange(hist.size)
+    cumulative = np.cumsum(hist)
+    p10, p50, p90 = (int(np.searchsorted(cumulative, q * total)) for q in (0.1, 0.5, 0.9))
+    return {"mean": round(float((prices * hist).sum() / total), 2), "p10": p10, "p50": p50, "p90": p90,
+            "max": int(prices[hist > 0].max())}
+
+
+def summarize(merged: dict, items: ItemTable, games: int, teams: int, turns: int) -> dict:
+    visits = merged["shop_visits"]
+    return {
+        "games": games, "teams": teams, "turns": turns,
+        "per_team": {key: _distribution(merged[key]) for key in ("laps", "stars", "coins", "coins_earned", "coins_spent")},
+        "winner_stars": _distribution(merged["winner_stars"]),
+        "shop_visits": int(visits),
+        "star_purchases": int(merged["star_purchases"]),
+        "charters": int(merged["charters"]),
+        "items": {
+            item_id: {
+                "name": items.names[i],
+                "rarity": RARITIES[items.rarity[i]],
+                "base_price": int(items.base_price[i]),
+                "offered": int(merged["offered"][i]),
+                "offer_rate": round(merged["offered"][i] / visits, 4) if visits else 0.0,
+                "bought": int(merged["bought"][i]),
+                "buy_rate": round(merged["bought"][i] / merged["offered"][i], 4) if merged["offered"][i] else 0.0,
+                "used": int(merged["used"][i]),
+                "price": _hist_distribution(merged["price_hist"][i]),
+            }
+            for i, item_id in enumerate(items.ids)
+        },
+    }
+
+
+def simulate(board: SimBoard, games: int = 1000, teams: int = 8, turns: int = 30, policy: Policy = Policy(),
+             seed: int = 0, workers: int = 1, items: ItemTable | None = None) -> dict:
+    """Play games games of turns turns each and summarize them; workers > 1 uses a process pool."""
+    items = items or item_table()
+    workers = max(1, min(workers, games))
+    chunks = [games // workers + (1 if i < games % workers else 0) for i in range(workers)]
+    seeds = np.random.SeedSequence(seed).spawn(workers)
+    batches = [(board, items, chunk, teams, turns, policy, s) for chunk, s in zip(chunks, seeds)]
+    if workers == 1:
+        results = [_run_batch(batches[0])]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_run_batch, batches))
+    return summarize(_merge(results), items, games, teams, turns)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo simulation of Stability Party games")
+    parser.add_argument("--games", type=int, default=10000)
+    parser.add_argument("--teams", type=int, default=8)
+    parser.add_argument("--turns", type=int, default=30)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=0)
+    board_source = parser.add_mutually_exclusive_group()
+    board_source.add_argument("--board", help="Board definition JSON file")
+    board_source.add_argument("--event-id", help="Read the board of this SP3 event from DATABASE_URL")
+    parser.add_argument("--item-use-rate", type=float, default=Policy.item_use_rate)
+    parser.add_argument("--shop-buy-rate", type=float, default=Policy.shop_buy_rate)
+    parser.add_argument("--charter-rate", type=float, default=Policy.charter_rate)
+    parser.add_argument("--region-challenge-rate", type=float, default=Policy.region_challenge_rate)
+    parser.add_argument("--output", help="Write the report as JSON to this file")
+    args = parser.parse_args()
+
+    if args.board:
+        board = load_board_file(args.board)
+    elif args.event_id:
+        board = load_board_from_db(args.event_id)
+    else:
+        board = fixture_board()
+    policy = Policy(args.item_use_rate, args.shop_buy_rate, args.charter_rate, args.region_challenge_rate)
+    report = simulate(board, args.games, args.teams, args.turns, policy, args.seed, args.workers)
+
+    print(f"{args.games} games, {args.teams} teams, {args.turns} turns: {report['shop_visits']} shop visits, "
+          f"{report['star_purchases']} stars bought, {report['charters']} charters")
+    print(f"{'per team':<16}{'mean':>10}{'p10':>8}{'p50':>8}{'p90':>8}{'max':>8}")
+    for name, row in [*report["per_team"].items(), ("winner_stars", report["winner_stars"])]:
+        print(f"{name:<16}{row['mean']:>10.2f}{row['p10']:>8.0f}{row['p50']:>8.0f}{row['p90']:>8.0f}{row['max']:>8}")
+    print(f"\n{'item':<24}{'rarity':<11}{'offered':>9}{'bought':>8}{'used':>8}{'price p10-p90':>15}")
+    for row in report["items"].values():
+        price = f"{row['price']['p10']}-{row['price']['p90']}" if row["price"] else "-"
+        print(f"{row['name']:<24}{row['rarity']:<11}{row['offer_rate']:>9.1%}{row['bought']:>8}{row['used']:>8}{price:>15}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
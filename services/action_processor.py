@@ -1,4 +1,4 @@
-from app import db, firestore_db
+from app import db, firestore_writer
 from models.new_events import (
     Event, Team, TeamMember, Action, Trigger, Challenge, Task, Tile,
     ChallengeStatus, TaskStatus, TileStatus, ChallengeProof
@@ -7,6 +7,7 @@ from models.models import Users
 from services.challenge_evaluator import ChallengeEvaluator
 from services.bingo_service import BingoService
 from services.notification_builder import NotificationBuilder
+from helper.response_cache import invalidate_on_commit
 from event_handlers.event_handler import NotificationResponse
 from sqlalchemy import func
 from datetime import datetime, timezone
@@ -469,6 +470,7 @@ class ActionProcessor:
 
         # Award 3 points for task completion using atomic SQL UPDATE
         from sqlalchemy import text
+        invalidate_on_commit(db.session, f"event:{event.id}")
         db.session.execute(
             text("""
                 UPDATE new_stability.teams
@@ -488,6 +490,7 @@ class ActionProcessor:
         if new_bingos > 0:
             # Award bingo points using atomic SQL UPDATE
             bingo_points = new_bingos * 15
+            invalidate_on_commit(db.session, f"event:{event.id}")
             db.session.execute(
                 text("""
                     UPDATE new_stability.teams
@@ -513,7 +516,8 @@ class ActionProcessor:
     @staticmethod
     def write_action_to_firestore(action: Action, event_id: str, team_id: str):
         """
-        Write action to Firestore for external tracking.
+        Queue action for Firestore for external tracking. The write happens in
+        batches on the background Firestore writer.
         TODO: Evaluate if still needed.
 
         Args:
@@ -521,19 +525,14 @@ class ActionProcessor:
             event_id: The event ID
             team_id: The team ID
         """
-        try:
-            if firestore_db:
-                firestore_db.collection("drops").add({
-                    "action_id": str(action.id),
-                    "event_id": str(event_id),
-                    "team_id": str(team_id),
-                    "player_id": str(action.player_id),
-                    "name": action.name,
-                    "source": action.source,
-                    "quantity": action.quantity,
-                    "date": action.date.isoformat() if action.date else None,
-                    "created_at": action.created_at.isoformat() if action.created_at else None
-                })
-                logging.info(f"Wrote action {action.id} to Firestore")
-        except Exception as e:
-            logging.exception(f"Failed to write action {action.id} to Firestore: {e}")
+        firestore_writer.enqueue("drops", {
+            "action_id": str(action.id),
+            "event_id": str(event_id),
+            "team_id": str(team_id),
+            "player_id": str(action.player_id),
+            "name": action.name,
+            "source": action.source,
+            "quantity": action.quantity,
+            "date": action.date.isoformat() if action.date else None,
+            "created_at": action.created_at.isoformat() if action.created_at else None
+        })
@@ -0,0 +1,104 @@
+"""
+Challenge trees loaded with one recursive CTE instead of walking Challenge.children
+(one lazy load per node), optionally overlaid with a team's ChallengeStatus rows.
+
+Nodes are Challenge.serialize() dicts; a node with children gets a "children" list,
+and with a team every node gets "status": {"quantity", "completed"}.
+"""
+from sqlalchemy import text
+from models.new_events import Challenge
+
+SUBTREE_SQL = text("""
+    WITH RECURSIVE tree AS (
+        SELECT id FROM new_stability.challenges WHERE id = :root_id
+        UNION
+        SELECT c.id FROM new_stability.challenges c
+        JOIN tree ON c.parent_challenge_id = tree.id
+    )
+    SELECT c.* FROM new_stability.challenges c
+    JOIN tree ON tree.id = c.id
+    ORDER BY c.created_at, c.id
+""")
+
+EVENT_TREES_SQL = text("""
+    WITH RECURSIVE tree AS (
+        SELECT c.id FROM new_stability.challenges c
+        JOIN new_stability.tasks tk ON tk.id = c.task_id
+        JOIN new_stability.tiles tl ON tl.id = tk.tile_id
+        WHERE tl.event_id = :event_id AND c.parent_challenge_id IS NULL
+        UNION
+        SELECT c.id FROM new_stability.challenges c
+        JOIN tree ON c.parent_challenge_id = tree.id
+    )
+    SELECT c.* FROM new_stability.challenges c
+    JOIN tree ON tree.id = c.id
+    ORDER BY c.created_at, c.id
+""")
+
+
+def _team_statuses(challenge_ids: list, team_id, session) -> dict:
+    if not challenge_ids:
+        return {}
+    rows = session.execute(text("""
+        SELECT challenge_id, quantity, completed
+        FROM new_stability.challenge_statuses
+        WHERE team_id = :team_id AND challenge_id = ANY(:ids)
+    """), {"team_id": str(team_id), "ids": challenge_ids}).fetchall()
+    return {r.challenge_id: {"quantity": r.quantity, "completed": r.completed} for r in rows}
+
+
+def _build_nodes(challenges: list[Challenge], team_id, session) -> tuple[dict, list]:
+    """Return ({id: node}, root nodes) with each node's children attached, in creation order."""
+    statuses = _team_statuses([c.id for c in challenges], team_id, session) if team_id else None
+    nodes = {}
+    for c in challenges:
+        node = c.serialize()
+        if statuses is not None:
+            node["status"] = statuses.get(c.id, {"quantity": 0, "completed": False})
+        nodes[c.id] = node
+
+    roots = []
+    for c in challenges:
+        parent = nodes.get(c.parent_challenge_id)
+        if parent is None:
+            roots.append(nodes[c.id])
+        else:
+            parent.setdefault("children", []).append(nodes[c.id])
+    return nodes, roots
+
+
+def load_challenge_tree(challenge_id, session, team_id=None) -> dict | None:
+    """The challenge and all its descendants, or None if it does not exist."""
+    challenges = session.query(Challenge).from_statement(SUBTREE_SQL).params(root_id=str(challenge_id)).all()
+    if not challenges:
+        return None
+    nodes, _ = _build_nodes(challenges, team_id, session)
+    return nodes[next(c.id for c in challenges if str(c.id) == str(challenge_id))]
+
+
+def load_event_challenge_trees(event_id, session, team_id=None) -> list[dict]:
+    """Every task of the event, in board order, with its challenge trees under "challenges"."""
+    tasks = session.execute(text("""
+        SELECT tk.id, tk.tile_id, tk.name, tk.require_all, tl.index AS tile_index
+        FROM new_stability.tasks tk
+        JOIN new_stability.tiles tl ON tl.id = tk.tile_id
+        WHERE tl.event_id = :event_id
+        ORDER BY tl.index, tk.created_at, tk.id
+    """), {"event_id": str(event_id)}).fetchall()
+    challenges = session.query(Challenge).from_statement(EVENT_TREES_SQL).params(event_id=str(event_id)).all()
+    _, roots = _build_nodes(challenges, team_id, session)
+
+    roots_by_task = {}
+    for root in roots:
+        roots_by_task.setdefault(root["task_id"], []).append(root)
+    return [
+        {
+            "id": str(t.id),
+            "tile_id": str(t.tile_id),
+            "tile_index": t.tile_index,
+            "name": t.name,
+            "require_all": t.require_all,
+            "challenges": roots_by_task.get(str(t.id), []),
+        }
+        for t in tasks
+    ]
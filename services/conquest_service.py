@@ -2,13 +2,22 @@ import json
 import queue
 import uuid
 import logging
+from datetime import datetime, timedelta, timezone
 from sqlalchemy import text
+from helper.response_cache import invalidate_on_commit
 
 CONQUEST_SCORING = {
     "TERRITORY_OWNED": 3,
     "REGION_OWNED": 20,
 }
 
+# A checkpoint is written once this many event logs have accumulated since the last one,
+# or once this many minutes have passed with at least one new log.
+CHECKPOINT_EVERY_LOGS = 200
+CHECKPOINT_EVERY_MINUTES = 30
+# Logs newer than this are left for the next checkpoint so in-flight transactions can land first.
+CHECKPOINT_SETTLE_SECONDS = 5
+
 # event_id (str) -> set of SimpleQueue instances, one per connected SSE client
 sse_clients: dict[str, set[queue.SimpleQueue]] = {}
 
@@ -238,9 +247,496 @@ def recalculate_team_points(team_id, event_id, session) -> int:
         int(result.regions_controlled) * CONQUEST_SCORING["REGION_OWNED"]
     )
 
+    invalidate_on_commit(session, f"event:{event_id}")
     session.execute(text("""
         UPDATE new_stability.teams SET points = :points, updated_at = NOW() WHERE id = :team_id
     """), {"points": points, "team_id": str(team_id)})
 
     logging.debug(f"[CONQUEST] team={team_id} points recalculated to {points}")
     return points
+
+
+def record_player_action(event_id, team_id, action_id, img_path, session) -> None:
+    """
+    Add one proof's worth of an action to the player's rollup row for this event/team.
+    Called once per recorded ChallengeProof, so an action that proves several leaves
+    counts once per leaf (matching what the proof joins used to produce).
+    Must be called inside an open transaction; does not commit.
+    """
+    session.execute(text("""
+        INSERT INTO new_stability.player_action_rollups
+            (id, event_id, team_id, player_id, action_name, action_source, img_path, quantity, updated_at)
+        SELECT
+            gen_random_uuid(), :event_id, :team_id, a.player_id, a.name, a.source, :img_path, a.quantity, NOW()
+        FROM new_stability.actions a
+        WHERE a.id = :action_id
+        ON CONFLICT (event_id, team_id, player_id, action_name, (COALESCE(action_source, '')))
+        DO UPDATE SET
+            quantity   = player_action_rollups.quantity + EXCLUDED.quantity,
+            img_path   = COALESCE(EXCLUDED.img_path, player_action_rollups.img_path),
+            updated_at = NOW()
+    """), {
+        "event_id": str(event_id),
+        "team_id": str(team_id),
+        "action_id": str(action_id),
+        "img_path": img_path,
+    })
+
+
+def retract_player_action(action_id, session) -> None:
+    """
+    Remove an action's contribution from every rollup it was counted in.
+    Call before deleting the action (its proofs are needed to find the rollups).
+    Must be called inside an open transaction; does not commit.
+    """
+    emptied = session.execute(text("""
+        UPDATE new_stability.player_action_rollups par
+        SET quantity = par.quantity - agg.quantity, updated_at = NOW()
+        FROM (
+            SELECT t.event_id, t.id AS team_id, a.player_id, a.name, a.source, SUM(a.quantity) AS quantity
+            FROM new_stability.challenge_proofs cp
+            JOIN new_stability.challenge_statuses cs ON cs.id = cp.challenge_status_id
+            JOIN new_stability.teams t ON t.id = cs.team_id
+            JOIN new_stability.actions a ON a.id = cp.action_id
+            WHERE cp.action_id = :action_id
+            GROUP BY t.event_id, t.id, a.player_id, a.name, a.source
+        ) agg
+        WHERE par.event_id = agg.event_id
+          AND par.team_id = agg.team_id
+          AND par.player_id = agg.player_id
+          AND par.action_name = agg.name
+          AND COALESCE(par.action_source, '') = COALESCE(agg.source, '')
+        RETURNING par.id, par.quantity
+    """), {"action_id": str(action_id)}).fetchall()
+
+    # Only the rollups this action emptied; other rows are never touched here
+    emptied_ids = [str(r.id) for r in emptied if r.quantity <= 0]
+    if emptied_ids:
+        session.execute(text("""
+            DELETE FROM new_stability.player_action_rollups WHERE id = ANY(CAST(:ids AS uuid[]))
+        """), {"ids": emptied_ids})
+
+
+def rebuild_player_action_rollups(event_id, session) -> int:
+    """
+    Regenerate an event's player_action_rollups from challenge proofs.
+    Only proofs on challenges that belong to one of the event's territories are counted.
+    Must be called inside an open transaction; does not commit.
+    Returns the number of rollup rows written.
+    """
+    session.execute(text("""
+        DELETE FROM new_stability.player_action_rollups WHERE event_id = :event_id
+    """), {"event_id": str(event_id)})
+
+    result = session.execute(text("""
+        INSERT INTO new_stability.player_action_rollups
+            (id, event_id, team_id, player_id, action_name, action_source, img_path, quantity, updated_at)
+        SELECT
+            gen_random_uuid(),
+            t.event_id,
+            t.id,
+            a.player_id,
+            a.name,
+            MAX(a.source),
+            MAX(tr.img_path),
+            SUM(a.quantity),
+            NOW()
+        FROM new_stability.teams t
+        JOIN new_stability.challenge_statuses cs ON cs.team_id = t.id
+        JOIN new_stability.challenge_proofs   cp ON cp.challenge_status_id = cs.id
+        JOIN new_stability.actions             a ON a.id = cp.action_id
+        JOIN new_stability.challenges         ch ON ch.id = cs.challenge_id
+        LEFT JOIN new_stability.triggers      tr ON tr.id = ch.trigger_id
+        WHERE t.event_id = :event_id
+          AND EXISTS (
+              SELECT 1
+              FROM new_stability.territories ter
+              JOIN new_stability.regions r ON r.id = ter.region_id
+              LEFT JOIN new_stability.challenges p ON p.id = ch.parent_challenge_id
+              WHERE r.event_id = t.event_id
+                AND ter.challenge_id IN (ch.id, ch.parent_challenge_id, p.parent_challenge_id)
+          )
+        GROUP BY t.event_id, t.id, a.player_id, a.name, COALESCE(a.source, '')
+    """), {"event_id": str(event_id)})
+
+    logging.info(f"[CONQUEST] rebuilt {result.rowcount} player action rollups for event={event_id}")
+    return result.rowcount
+
+
+def _empty_conquest_state() -> dict:
+    return {"territories": {}, "regions": {}, "green_logs": {}, "points": {}}
+
+
+def _apply_event_logs(state: dict, logs) -> None:
+    """Fold control-changing event logs (oldest first) into a checkpoint state in place."""
+    for log in logs:
+        team_id = str(log.team_id)
+        entity_id = str(log.entity_id)
+        if log.type == 'TERRITORY_CONTROL':
+            state["territories"][entity_id] = team_id
+        elif log.type == 'REGION_CONTROL':
+            state["regions"][entity_id] = team_id
+        elif log.type == 'GREEN_LOG':
+            teams = state["green_logs"].setdefault(entity_id, [])
+            if team_id not in teams:
+                teams.append(team_id)
+
+
+def _score_conquest_state(state: dict) -> dict:
+    """Team points implied by a state, using the same rules as recalculate_team_points."""
+    points: dict[str, int] = {}
+    for team_id in state["territories"].values():
+        if team_id:
+            points[team_id] = points.get(team_id, 0) + CONQUEST_SCORING["TERRITORY_OWNED"]
+    for team_id in state["regions"].values():
+        if team_id:
+            points[team_id] = points.get(team_id, 0) + CONQUEST_SCORING["REGION_OWNED"]
+    return points
+
+
+def _latest_checkpoint(event_id, at, session):
+    return session.execute(text("""
+        SELECT as_of, log_count, state
+        FROM new_stability.conquest_checkpoints
+        WHERE event_id = :event_id AND as_of <= :at
+        ORDER BY as_of DESC
+        LIMIT 1
+    """), {"event_id": str(event_id), "at": at}).fetchone()
+
+
+def _control_logs_between(event_id, after, until, session):
+    return session.execute(text("""
+        SELECT team_id, type, entity_id, created_at
+        FROM new_stability.event_logs
+        WHERE event_id = :event_id
+          AND (CAST(:after AS timestamptz) IS NULL OR created_at > :after)
+          AND created_at <= :until
+          AND type IN ('TERRITORY_CONTROL', 'REGION_CONTROL', 'GREEN_LOG')
+        ORDER BY created_at, id
+    """), {"event_id": str(event_id), "after": after, "until": until}).fetchall()
+
+
+def load_conquest_state_at(event_id, at: datetime, session) -> dict:
+    """
+    Reconstruct territory/region controllers, green logs and team points as of `at`.
+    Starts from the nearest checkpoint at or before `at` and replays only the logs after it.
+    Returns {state, checkpoint_as_of, logs_applied}.
+    """
+    checkpoint = _latest_checkpoint(event_id, at, session)
+    if checkpoint:
+        state = checkpoint.state
+        after = checkpoint.as_of
+    else:
+        state = _empty_conquest_state()
+        after = None
+
+    logs = _control_logs_between(event_id, after, at, session)
+    _apply_event_logs(state, logs)
+    state["points"] = _score_conquest_state(state)
+
+    return {
+        "state": state,
+        "checkpoint_as_of": after,
+        "logs_applied": len(logs),
+    }
+
+
+def maybe_write_conquest_checkpoint(event_id, session) -> bool:
+    """
+    Write a new checkpoint if enough logs or time have accumulated since the last one.
+    Called after the handler commits. Must be called inside an open transaction; does not commit.
+    Returns True if a checkpoint was added.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=CHECKPOINT_SETTLE_SECONDS)
+    checkpoint = _latest_checkpoint(event_id, cutoff, session)
+    after = checkpoint.as_of if checkpoint else None
+
+    pending = session.execute(text("""
+        SELECT COUNT(*) AS count, MIN(created_at) AS first_at
+        FROM new_stability.event_logs
+        WHERE event_id = :event_id
+          AND (CAST(:after AS timestamptz) IS NULL OR created_at > :after)
+          AND created_at <= :cutoff
+    """), {"event_id": str(event_id), "after": after, "cutoff": cutoff}).fetchone()
+
+    if not pending.count:
+        return False
+
+    since = after or pending.first_at
+    if pending.count < CHECKPOINT_EVERY_LOGS and cutoff - since < timedelta(minutes=CHECKPOINT_EVERY_MINUTES):
+        return False
+
+    state = checkpoint.state if checkpoint else _empty_conquest_state()
+    _apply_event_logs(state, _control_logs_between(event_id, after, cutoff, session))
+    state["points"] = _score_conquest_state(state)
+
+    _insert_checkpoint(event_id, cutoff, (checkpoint.log_count if checkpoint else 0) + int(pending.count), state, session)
+    logging.debug(f"[CONQUEST] checkpoint written for event={event_id} as_of={cutoff.isoformat()}")
+    return True
+
+
+def rebuild_conquest_checkpoints(event_id, session) -> int:
+    """
+    Replace an event's checkpoints with a fresh series built from its full event log,
+    one every CHECKPOINT_EVERY_LOGS logs. Must be called inside an open transaction; does not commit.
+    Returns the number of checkpoints written.
+    """
+    session.execute(text("""
+        DELETE FROM new_stability.conquest_checkpoints WHERE event_id = :event_id
+    """), {"event_id": str(event_id)})
+
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=CHECKPOINT_SETTLE_SECONDS)
+    logs = session.execute(text("""
+        SELECT team_id, type, entity_id, created_at
+        FROM new_stability.event_logs
+        WHERE event_id = :event_id AND created_at <= :cutoff
+        ORDER BY created_at, id
+    """), {"event_id": str(event_id), "cutoff": cutoff}).fetchall()
+
+    state = _empty_conquest_state()
+    written = 0
+    since_last = 0
+    for i, log in enumerate(logs):
+        _apply_event_logs(state, [log])
+        since_last += 1
+        # Never split logs that share a timestamp across two checkpoints
+        boundary = i + 1 == len(logs) or logs[i + 1].created_at != log.created_at
+        if since_last >= CHECKPOINT_EVERY_LOGS and boundary:
+            state["points"] = _score_conquest_state(state)
+            _insert_checkpoint(event_id, log.created_at, i + 1, state, session)
+            written += 1
+            since_last = 0
+
+    logging.info(f"[CONQUEST] rebuilt {written} checkpoints from {len(logs)} logs for event={event_id}")
+    return written
+
+
+def _insert_checkpoint(event_id, as_of, log_count, state, session) -> None:
+    session.execute(text("""
+        INSERT INTO new_stability.conquest_checkpoints (id, event_id, as_of, log_count, state, created_at)
+        VALUES (gen_random_uuid(), :event_id, :as_of, :log_count, CAST(:state AS jsonb), NOW())
+    """), {"event_id": str(event_id), "as_of": as_of, "log_count": log_count, "state": json.dumps(state)})
+
+
+# Shared CTEs for the whole-map recompute: every territory in the event with its capture
+# threshold, and every (territory, team) completion score over its leaf challenges.
+# Same formulas as update_territory_control / check_green_log.
+_EVENT_TERRITORY_SCORES_CTE = """
+    event_territories AS (
+        SELECT
+            terr.id,
+            terr.region_id,
+            terr.challenge_id,
+            terr.controlling_team_id,
+            CASE WHEN root.trigger_id IS NULL AND root.quantity > 1 THEN root.quantity ELSE 1 END AS min_completions
+        FROM new_stability.territories terr
+        JOIN new_stability.regions r ON r.id = terr.region_id
+        LEFT JOIN new_stability.challenges root ON root.id = terr.challenge_id
+        WHERE r.event_id = :event_id
+    ),
+    territory_scores AS (
+        SELECT
+            et.id AS territory_id,
+            t.id  AS team_id,
+            SUM(COALESCE(leaf.value, 1) * FLOOR(COALESCE(cs.quantity, 0)::numeric / leaf.quantity)) AS completions
+        FROM event_territories et
+        JOIN new_stability.teams t ON t.event_id = :event_id
+        JOIN new_stability.challenges leaf
+            ON leaf.trigger_id IS NOT NULL AND (
+                leaf.id = et.challenge_id
+                OR leaf.parent_challenge_id = et.challenge_id
+                OR leaf.parent_challenge_id IN (
+                    SELECT id FROM new_stability.challenges
+                    WHERE parent_challenge_id = et.challenge_id
+                )
+            )
+        LEFT JOIN new_stability.challenge_statuses cs
+            ON cs.challenge_id = leaf.id AND cs.team_id = t.id
+        GROUP BY et.id, t.id
+    )
+"""
+
+
+def recompute_event_control(event_id, session) -> dict:
+    """
+    Re-evaluate every territory controller, region controller, green log and team total
+    for an event in a handful of set-based statements, e.g. after admin corrections.
+    Applies the same strict tie-break as the per-entity functions (a challenger must
+    strictly exceed the current holder) and writes an EventLog for every change.
+    Must be called inside an open transaction; does not commit.
+    Returns {territories_changed, regions_changed, green_logs_awarded, teams_updated, log_ids}.
+    """
+    now = datetime.now(timezone.utc)
+    params = {"event_id": str(event_id), "now": now}
+
+    territory_log_ids = [r.id for r in session.execute(text(f"""
+        WITH {_EVENT_TERRITORY_SCORES_CTE},
+        ranked AS (
+            SELECT
+                territory_id, team_id, completions,
+                ROW_NUMBER() OVER (PARTITION BY territory_id ORDER BY completions DESC NULLS LAST, team_id) AS rn
+            FROM territory_scores
+        ),
+        decided AS (
+            SELECT
+                et.id                  AS territory_id,
+                et.controlling_team_id AS previous_team_id,
+                CASE
+                    WHEN COALESCE(leader.completions, 0) < et.min_completions THEN et.controlling_team_id
+                    WHEN et.controlling_team_id IS NULL THEN leader.team_id
+                    WHEN leader.completions > COALESCE(holder.completions, 0) THEN leader.team_id
+                    ELSE et.controlling_team_id
+                END AS new_team_id
+            FROM event_territories et
+            LEFT JOIN ranked leader
+                ON leader.territory_id = et.id AND leader.rn = 1
+            LEFT JOIN territory_scores holder
+                ON holder.territory_id = et.id AND holder.team_id = et.controlling_team_id
+        ),
+        changed AS (
+            UPDATE new_stability.territories terr
+            SET controlling_team_id = d.new_team_id
+            FROM decided d
+            WHERE terr.id = d.territory_id
+              AND d.new_team_id IS DISTINCT FROM d.previous_team_id
+            RETURNING terr.id, d.previous_team_id, d.new_team_id
+        )
+        INSERT INTO new_stability.event_logs (id, event_id, team_id, type, entity_type, entity_id, meta, created_at)
+        SELECT
+            gen_random_uuid(), :event_id, new_team_id, 'TERRITORY_CONTROL', 'territory', id,
+            jsonb_build_object('previousTeamId', previous_team_id, 'recompute', true), :now
+        FROM changed
+        RETURNING id
+    """), params).fetchall()]
+
+    # Separate statement so the region counts see the territory updates above
+    region_log_ids = [r.id for r in session.execute(text("""
+        WITH counts AS (
+            SELECT terr.region_id, terr.controlling_team_id AS team_id, COUNT(*) AS count
+            FROM new_stability.territories terr
+            JOIN new_stability.regions r ON r.id = terr.region_id
+            WHERE r.event_id = :event_id AND terr.controlling_team_id IS NOT NULL
+            GROUP BY terr.region_id, terr.controlling_team_id
+        ),
+        ranked AS (
+            SELECT
+                region_id, team_id, count,
+                ROW_NUMBER() OVER (PARTITION BY region_id ORDER BY count DESC, team_id) AS rn
+            FROM counts
+        ),
+        decided AS (
+            SELECT
+                r.id                  AS region_id,
+                r.controlling_team_id AS previous_team_id,
+                CASE
+                    WHEN leader.team_id IS NULL THEN r.controlling_team_id
+                    WHEN r.controlling_team_id IS NULL THEN leader.team_id
+                    WHEN leader.count > COALESCE(holder.count, 0) THEN leader.team_id
+                    ELSE r.controlling_team_id
+                END AS new_team_id
+            FROM new_stability.regions r
+            LEFT JOIN ranked leader
+                ON leader.region_id = r.id AND leader.rn = 1
+            LEFT JOIN counts holder
+                ON holder.region_id = r.id AND holder.team_id = r.controlling_team_id
+            WHERE r.event_id = :event_id
+        ),
+        changed AS (
+            UPDATE new_stability.regions r
+            SET controlling_team_id = d.new_team_id
+            FROM decided d
+            WHERE r.id = d.region_id
+              AND d.new_team_id IS DISTINCT FROM d.previous_team_id
+            RETURNING r.id, d.previous_team_id, d.new_team_id
+        )
+        INSERT INTO new_stability.event_logs (id, event_id, team_id, type, entity_type, entity_id, meta, created_at)
+        SELECT
+            gen_random_uuid(), :event_id, new_team_id, 'REGION_CONTROL', 'region', id,
+            jsonb_build_object('previousTeamId', previous_team_id, 'recompute', true), :now
+        FROM changed
+        RETURNING id
+    """), params).fetchall()]
+
+    # Green logs are append-only: only teams not already listed can be awarded
+    green_log_ids = [r.id for r in session.execute(text(f"""
+        WITH {_EVENT_TERRITORY_SCORES_CTE},
+        region_progress AS (
+            SELECT
+                et.region_id,
+                t.id AS team_id,
+                COUNT(*) AS total,
+                COUNT(*) FILTER (WHERE COALESCE(ts.completions, 0) >= et.min_completions) AS completed
+            FROM event_territories et
+            JOIN new_stability.teams t ON t.event_id = :event_id
+            LEFT JOIN territory_scores ts
+                ON ts.territory_id = et.id AND ts.team_id = t.id
+            WHERE et.challenge_id IS NOT NULL
+            GROUP BY et.region_id, t.id
+        ),
+        awards AS (
+            SELECT rp.region_id, rp.team_id
+            FROM region_progress rp
+            JOIN new_stability.regions r ON r.id = rp.region_id
+            WHERE rp.total > 0
+              AND rp.total = rp.completed
+              AND NOT (rp.team_id = ANY(r.green_logged_teams))
+        ),
+        awarded AS (
+            UPDATE new_stability.regions r
+            SET green_logged_teams = r.green_logged_teams || a.team_ids
+            FROM (
+                SELECT region_id, array_agg(team_id ORDER BY team_id) AS team_ids
+                FROM awards
+                GROUP BY region_id
+            ) a
+            WHERE r.id = a.region_id
+            RETURNING r.id
+        )
+        INSERT INTO new_stability.event_logs (id, event_id, team_id, type, entity_type, entity_id, meta, created_at)
+        SELECT
+            gen_random_uuid(), :event_id, a.team_id, 'GREEN_LOG', 'region', a.region_id,
+            jsonb_build_object('recompute', true), :now
+        FROM awards a
+        WHERE a.region_id IN (SELECT id FROM awarded)
+        RETURNING id
+    """), params).fetchall()]
+
+    invalidate_on_commit(session, f"event:{event_id}")
+    teams_updated = session.execute(text("""
+        UPDATE new_stability.teams t
+        SET points = p.points, updated_at = NOW()
+        FROM (
+            SELECT
+                tm.id,
+                (
+                    SELECT COUNT(*)
+                    FROM new_stability.territories terr
+                    JOIN new_stability.regions r ON r.id = terr.region_id
+                    WHERE r.event_id = :event_id AND terr.controlling_team_id = tm.id
+                ) * :territory_points
+                + (
+                    SELECT COUNT(*)
+                    FROM new_stability.regions r
+                    WHERE r.event_id = :event_id AND r.controlling_team_id = tm.id
+                ) * :region_points AS points
+            FROM new_stability.teams tm
+            WHERE tm.event_id = :event_id
+        ) p
+        WHERE t.id = p.id AND t.points IS DISTINCT FROM p.points
+    """), {
+        **params,
+        "territory_points": CONQUEST_SCORING["TERRITORY_OWNED"],
+        "region_points": CONQUEST_SCORING["REGION_OWNED"],
+    }).rowcount
+
+    logging.info(
+        f"[CONQUEST] recompute event={event_id}: territories={len(territory_log_ids)} "
+        f"regions={len(region_log_ids)} green_logs={len(green_log_ids)} teams={teams_updated}"
+    )
+    return {
+        "territories_changed": len(territory_log_ids),
+        "regions_changed": len(region_log_ids),
+        "green_logs_awarded": len(green_log_ids),
+        "teams_updated": teams_updated,
+        "log_ids": territory_log_ids + region_log_ids + green_log_ids,
+    }
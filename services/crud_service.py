@@ -1,8 +1,44 @@
 from app import db
 from typing import Type, Optional, Dict, Any, List
+from sqlalchemy import inspect, literal, text, tuple_
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+from helper.helpers import decode_cursor, encode_cursor
+from datetime import date, datetime
+import uuid
 import logging
 
+TOTAL_MODES = ('exact', 'estimate', 'none')
+
+
+class _Explain(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) of a statement, executed with the statement's own bind processing"""
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(_Explain, 'postgresql')
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+def _cursor_value(attr, value):
+    """Turn a value decoded from a cursor back into the column's python type"""
+    python_type = attr.type.python_type
+    if value is None:
+        return None
+    if issubclass(python_type, datetime):
+        return datetime.fromisoformat(value)
+    if issubclass(python_type, date):
+        return date.fromisoformat(value)
+    if issubclass(python_type, uuid.UUID):
+        return uuid.UUID(value)
+    return value
+
+
 class CRUDService:
     """Generic CRUD service for database operations"""
 
@@ -56,21 +92,60 @@ class CRUDService:
         filters: Optional[Dict[str, Any]] = None,
         page: int = 1,
         per_page: int = 50,
-        order_by: Optional[str] = None
-    ) -> tuple[List[db.Model], int]:
+        order_by: Optional[str] = None,
+        cursor: Optional[str] = None,
+        total_mode: str = 'exact'
+    ) -> tuple[List[db.Model], Optional[int], Optional[str]]:
         """
-        Get all records with optional filtering and pagination
+        Get all records with optional filtering and offset or keyset pagination
+
+        Rows are ordered by (order_by field, id). Every page that has a successor returns
+        a cursor; passing it back continues from the last row returned with an indexed
+        range scan instead of OFFSET, so deep pages cost the same as the first one. The
+        sort field must be non-nullable to be used with a cursor, and should be indexed;
+        pages ordered by a nullable field have no cursor and are walked with page.
 
         Args:
             model_class: The SQLAlchemy model class
             filters: Dictionary of field:value pairs to filter by
-            page: Page number (1-indexed)
+            page: Page number (1-indexed), ignored when cursor is given
             per_page: Number of records per page
             order_by: Field name to order by (prefix with '-' for descending)
+            cursor: next_cursor from the previous page
+            total_mode: 'exact' (COUNT(*)), 'estimate' (planner row estimate) or 'none'
 
         Returns:
-            Tuple of (records list, total count)
+            Tuple of (records list, total count or None, cursor for the next page or None,
+            always None when ordering by a nullable field)
+
+        Raises:
+            ValueError: for an unknown total_mode, or a cursor that is malformed or
+                used with a nullable sort field
         """
+        if total_mode not in TOTAL_MODES:
+            raise ValueError(f"total must be one of {', '.join(TOTAL_MODES)}")
+
+        columns = inspect(model_class).columns
+        descending = bool(order_by) and order_by.startswith('-')
+        field_name = order_by[1:] if descending else order_by
+        sort_column = columns.get(field_name) if field_name and field_name != 'id' else None
+        key_attrs = [getattr(model_class, field_name)] if sort_column is not None else []
+        key_attrs.append(model_class.id)
+
+        after = None
+        if cursor:
+            if sort_column is not None and sort_column.nullable:
+                raise ValueError(f"Cannot paginate by cursor on nullable field '{field_name}'")
+            values = decode_cursor(cursor)
+            if len(values) != len(key_attrs):
+                raise ValueError("Invalid cursor")
+            try:
+                after = tuple_(*(
+                    literal(_cursor_value(attr, value), type_=attr.type) for attr, value in zip(key_attrs, values)
+                ))
+            except (TypeError, ValueError, AttributeError):
+                raise ValueError("Invalid cursor")
+
         try:
             query = model_class.query
 
@@ -81,25 +156,53 @@ class CRUDService:
                         query = query.filter(getattr(model_class, key) == value)
 
             # Get total count before pagination
-            total = query.count()
-
-            # Apply ordering
-            if order_by:
-                if order_by.startswith('-'):
-                    field_name = order_by[1:]
-                    if hasattr(model_class, field_name):
-                        query = query.order_by(getattr(model_class, field_name).desc())
-                else:
-                    if hasattr(model_class, order_by):
-                        query = query.order_by(getattr(model_class, order_by))
-
-            # Apply pagination
-            records = query.paginate(page=page, per_page=per_page, error_out=False).items
-
-            return records, total
+            if total_mode == 'exact':
+                total = query.count()
+            elif total_mode == 'estimate':
+                total = CRUDService._estimate_count(model_class, query, filtered=bool(filters))
+            else:
+                total = None
+
+            # Apply ordering, with id as the tie-breaker so the order is total
+            if after is not None:
+                query = query.filter(tuple_(*key_attrs) < after if descending else tuple_(*key_attrs) > after)
+            query = query.order_by(*(attr.desc() if descending else attr for attr in key_attrs))
+
+            # Apply pagination, fetching one extra row to know whether there is a next page
+            if after is None:
+                query = query.offset(max(page - 1, 0) * per_page)
+            records = query.limit(per_page + 1).all()
+
+            next_cursor = None
+            if len(records) > per_page:
+                records = records[:per_page]
+                # A NULL sort value has no place in the (field, id) range comparison, so a
+                # nullable field gets no cursor rather than one that skips or repeats rows
+                if sort_column is None or not sort_column.nullable:
+                    next_cursor = encode_cursor(*(getattr(records[-1], attr.key) for attr in key_attrs))
+
+            return records, total, next_cursor
         except Exception as e:
             logging.error(f"Error getting all {model_class.__name__}: {e}")
-            return [], 0
+            return [], 0, None
+
+    @staticmethod
+    def _estimate_count(model_class: Type[db.Model], query, filtered: bool) -> int:
+        """
+        Approximate row count: pg_class.reltuples for the whole table, or the planner's
+        row estimate for a filtered query. Falls back to COUNT(*) for a table that has
+        never been analyzed.
+        """
+        if filtered:
+            plan = db.session.execute(_Explain(query.statement)).scalar()
+            return int(plan[0]["Plan"]["Plan Rows"])
+        estimate = db.session.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:table AS regclass)"),
+            {"table": model_class.__table__.fullname}
+        ).scalar()
+        if estimate is None or estimate < 0:
+            return query.count()
+        return int(estimate)
 
     @staticmethod
     def update(model_class: Type[db.Model], id: str, data: Dict[str, Any]) -> Optional[db.Model]:
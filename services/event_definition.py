@@ -0,0 +1,553 @@
+"""
+Export and import of an event's whole definition (board and map) as one document.
+
+    {
+      "version": 1,
+      "event": {"name", "type", "start_date", "end_date", "release_date"},
+      "triggers": [{"ref", "name", "source", "type", "img_path", "wiki_id"}],
+      "tiles": [{"name", "img_src", "index", "tasks": [{"name", "require_all", "challenges": [CHALLENGE]}]}],
+      "regions": [{"name", "image_url", "offset_x", "offset_y",
+                   "territories": [{"name", "tier", "display_order", "offset_x", "offset_y",
+                                    "polygon_points", "challenge": CHALLENGE | null}]}]
+    }
+
+    CHALLENGE = {"trigger": ref | {"name", "source", "type"} | null, "require_all", "quantity",
+                 "value", "count_per_action", "children": [CHALLENGE]}
+
+"event" is informational and ignored on import. Trigger refs only link challenges to
+the triggers list within a document: on import every trigger is matched by (name,
+source) against the existing triggers and only created when missing, so a document
+exported from one database imports into another unchanged.
+
+Import replaces the event's tiles and regions wholesale in the caller's transaction,
+with preassigned ids and one multi-row INSERT per table.
+
+clone_event copies the same subtree from one event to a new one without the document
+round trip: rows never leave Postgres.
+"""
+import uuid
+import logging
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import text
+from helper.response_cache import invalidate_on_commit
+from models.new_events import Challenge, Region, Task, Territory, Tile
+
+DEFINITION_VERSION = 1
+
+CHALLENGE_TREE_SQL = text("""
+    WITH RECURSIVE tree AS (
+        SELECT c.id FROM new_stability.challenges c
+        JOIN new_stability.tasks tk ON tk.id = c.task_id
+        JOIN new_stability.tiles tl ON tl.id = tk.tile_id
+        WHERE tl.event_id = :event_id
+        UNION
+        SELECT terr.challenge_id FROM new_stability.territories terr
+        JOIN new_stability.regions r ON r.id = terr.region_id
+        WHERE r.event_id = :event_id AND terr.challenge_id IS NOT NULL
+        UNION
+        SELECT c.id FROM new_stability.challenges c
+        JOIN tree ON c.parent_challenge_id = tree.id
+    )
+    SELECT c.id, c.task_id, c.parent_challenge_id, c.trigger_id, c.require_all,
+           c.quantity, c.value, c.count_per_action
+    FROM new_stability.challenges c
+    JOIN tree ON tree.id = c.id
+    ORDER BY c.created_at, c.id
+""")
+
+
+class DefinitionError(ValueError):
+    """The document is malformed; nothing has been written."""
+
+
+def event_has_progress(event_id, session) -> bool:
+    """Whether any team has progress that replacing the definition would discard."""
+    return session.execute(text("""
+        SELECT EXISTS (
+            SELECT 1 FROM new_stability.challenge_statuses cs
+            JOIN new_stability.teams t ON t.id = cs.team_id
+            WHERE t.event_id = :event_id
+        ) OR EXISTS (
+            SELECT 1 FROM new_stability.tile_statuses ts
+            JOIN new_stability.teams t ON t.id = ts.team_id
+            WHERE t.event_id = :event_id
+        )
+    """), {"event_id": str(event_id)}).scalar()
+
+
+# ---------------------------------------------------------------------------
+# Export
+# ---------------------------------------------------------------------------
+
+def export_event_definition(event, session) -> dict:
+    """Build the definition document for event in a fixed number of queries."""
+    params = {"event_id": str(event.id)}
+    tiles = session.execute(text("""
+        SELECT id, name, img_src, index FROM new_stability.tiles
+        WHERE event_id = :event_id ORDER BY index
+    """), params).fetchall()
+    tasks = session.execute(text("""
+        SELECT tk.id, tk.tile_id, tk.name, tk.require_all
+        FROM new_stability.tasks tk
+        JOIN new_stability.tiles tl ON tl.id = tk.tile_id
+        WHERE tl.event_id = :event_id
+        ORDER BY tk.created_at, tk.id
+    """), params).fetchall()
+    regions = session.execute(text("""
+        SELECT id, name, image_url, offset_x, offset_y FROM new_stability.regions
+        WHERE event_id = :event_id ORDER BY created_at, id
+    """), params).fetchall()
+    territories = session.execute(text("""
+        SELECT terr.region_id, terr.name, terr.tier, terr.display_order, terr.offset_x, terr.offset_y,
+               terr.polygon_points, terr.challenge_id
+        FROM new_stability.territories terr
+        JOIN new_stability.regions r ON r.id = terr.region_id
+        WHERE r.event_id = :event_id
+        ORDER BY terr.display_order NULLS LAST, terr.created_at, terr.id
+    """), params).fetchall()
+    challenges = session.execute(CHALLENGE_TREE_SQL, params).fetchall()
+
+    trigger_ids = list({c.trigger_id for c in challenges if c.trigger_id})
+    triggers = session.execute(text("""
+        SELECT id, name, source, type, img_path, wiki_id FROM new_stability.triggers
+        WHERE id = ANY(:ids) ORDER BY name, source
+    """), {"ids": trigger_ids}).fetchall() if trigger_ids else []
+
+    children: dict = {}
+    task_roots: dict = {}
+    by_id = {}
+    for c in challenges:
+        by_id[c.id] = c
+        if c.parent_challenge_id:
+            children.setdefault(c.parent_challenge_id, []).append(c)
+        elif c.task_id:
+            task_roots.setdefault(c.task_id, []).append(c)
+
+    def challenge_doc(c) -> dict:
+        return {
+            "trigger": str(c.trigger_id) if c.trigger_id else None,
+            "require_all": c.require_all,
+            "quantity": c.quantity,
+            "value": c.value,
+            "count_per_action": c.count_per_action,
+            "children": [challenge_doc(child) for child in children.get(c.id, [])],
+        }
+
+    tasks_by_tile: dict = {}
+    for t in tasks:
+        tasks_by_tile.setdefault(t.tile_id, []).append({
+            "name": t.name,
+            "require_all": t.require_all,
+            "challenges": [challenge_doc(c) for c in task_roots.get(t.id, [])],
+        })
+    territories_by_region: dict = {}
+    for t in territories:
+        territories_by_region.setdefault(t.region_id, []).append({
+            "name": t.name,
+            "tier": t.tier,
+            "display_order": t.display_order,
+            "offset_x": t.offset_x,
+            "offset_y": t.offset_y,
+            "polygon_points": t.polygon_points,
+            "challenge": challenge_doc(by_id[t.challenge_id]) if t.challenge_id in by_id else None,
+        })
+
+    return {
+        "version": DEFINITION_VERSION,
+        "event": {
+            "name": event.name,
+            "type": event.type,
+            "start_date": event.start_date.isoformat() if event.start_date else None,
+            "end_date": event.end_date.isoformat() if event.end_date else None,
+            "release_date": event.release_date.isoformat() if event.release_date else None,
+        },
+        "triggers": [
+            {"ref": str(t.id), "name": t.name, "source": t.source, "type": t.type,
+             "img_path": t.img_path, "wiki_id": t.wiki_id}
+            for t in triggers
+        ],
+        "tiles": [
+            {"name": t.name, "img_src": t.img_src, "index": t.index, "tasks": tasks_by_tile.get(t.id, [])}
+            for t in tiles
+        ],
+        "regions": [
+            {"name": r.name, "image_url": r.image_url, "offset_x": r.offset_x, "offset_y": r.offset_y,
+             "territories": territories_by_region.get(r.id, [])}
+            for r in regions
+        ],
+    }
+
+
+# ---------------------------------------------------------------------------
+# Import
+# ---------------------------------------------------------------------------
+
+def _list(obj: dict, key: str, path: str) -> list:
+    value = obj.get(key) or []
+    if not isinstance(value, list):
+        raise DefinitionError(f"{path}.{key} must be a list")
+    return value
+
+
+def _name(obj, path: str) -> str:
+    if not isinstance(obj, dict):
+        raise DefinitionError(f"{path} must be an object")
+    if not obj.get("name"):
+        raise DefinitionError(f"{path}: missing required field: name")
+    return obj["name"]
+
+
+def _int(obj: dict, key: str, path: str, default: int | None = None, nullable: bool = True) -> int | None:
+    value = obj.get(key, default)
+    if value is None and nullable:
+        return None
+    # bool is an int subclass, but true is not a quantity
+    if not isinstance(value, int) or isinstance(value, bool):
+        raise DefinitionError(f"{path}.{key} must be an integer")
+    return value
+
+
+def _bool(obj: dict, key: str, path: str) -> bool:
+    value = obj.get(key, False)
+    if not isinstance(value, bool):
+        raise DefinitionError(f"{path}.{key} must be true or false")
+    return value
+
+
+def _str(obj: dict, key: str, path: str) -> str | None:
+    value = obj.get(key)
+    if value is not None and not isinstance(value, str):
+        raise DefinitionError(f"{path}.{key} must be a string")
+    return value
+
+
+def _trigger_key(spec: dict) -> tuple:
+    # Same matching as triggers_unique_name_source, with a missing source equal to ''
+    return spec["name"], spec.get("source") or ""
+
+
+def _resolve_triggers(specs: list[dict], session) -> tuple[dict, int]:
+    """
+    Map each (name, source) in specs to a trigger id, inserting the ones that do not
+    exist yet. Returns ({key: id}, number created).
+    """
+    keys = {_trigger_key(s): s for s in specs}
+    if not keys:
+        return {}, 0
+
+    def lookup() -> dict:
+        rows = session.execute(text("""
+            SELECT DISTINCT ON (name, COALESCE(source, '')) id, name, COALESCE(source, '') AS source
+            FROM new_stability.triggers
+            WHERE name = ANY(:names)
+            ORDER BY name, COALESCE(source, ''), created_at
+        """), {"names": list({name for name, _ in keys})}).fetchall()
+        return {(r.name, r.source): r.id for r in rows if (r.name, r.source) in keys}
+
+    found = lookup()
+    missing = [keys[k] for k in keys if k not in found]
+    if missing:
+        now = datetime.now(timezone.utc)
+        session.execute(text("""
+            INSERT INTO new_stability.triggers (id, name, source, type, img_path, wiki_id, created_at, updated_at)
+            VALUES (:id, :name, :source, :type, :img_path, :wiki_id, :now, :now)
+            ON CONFLICT ON CONSTRAINT triggers_unique_name_source DO NOTHING
+        """), [{
+            "id": str(uuid.uuid4()), "name": s["name"], "source": s.get("source"), "type": s.get("type") or "DROP",
+            "img_path": s.get("img_path"), "wiki_id": s.get("wiki_id"), "now": now,
+        } for s in missing])
+        found = lookup()
+    return found, len(missing)
+
+
+def import_event_definition(event_id, document: dict, session) -> dict:
+    """
+    Replace the event's tiles, tasks, challenges, regions and territories with the
+    ones in document. Team progress on the old definition is deleted with it (see
+    event_has_progress). Does not commit.
+
+    Raises DefinitionError if the document is malformed.
+    Returns counts of what was written.
+    """
+    if not isinstance(document, dict):
+        raise DefinitionError("Definition must be an object")
+    if document.get("version", DEFINITION_VERSION) != DEFINITION_VERSION:
+        raise DefinitionError(f"Unsupported definition version: {document.get('version')}")
+
+    # Triggers referenced by ref, or inline on a challenge
+    trigger_specs = {}
+    for i, spec in enumerate(_list(document, "triggers", "definition")):
+        _name(spec, f"triggers[{i}]")
+        if spec.get("ref") is None:
+            raise DefinitionError(f"triggers[{i}]: missing required field: ref")
+        trigger_specs[str(spec["ref"])] = spec
+    inline_specs = []
+
+    tiles, tasks, challenges, regions, territories = [], [], [], [], []
+    challenge_triggers = []  # (challenge row, trigger spec) resolved once all triggers are known
+
+    def add_challenge(node, path: str, task_id, parent_id) -> uuid.UUID:
+        if not isinstance(node, dict):
+            raise DefinitionError(f"{path} must be an object")
+        trigger = node.get("trigger")
+        if isinstance(trigger, dict):
+            _name(trigger, f"{path}.trigger")
+            inline_specs.append(trigger)
+        elif trigger is not None:
+            if str(trigger) not in trigger_specs:
+                raise DefinitionError(f"{path}: unknown trigger ref {trigger!r}")
+            trigger = trigger_specs[str(trigger)]
+        row = {
+            "id": uuid.uuid4(),
+            "task_id": task_id,
+            "parent_challenge_id": parent_id,
+            "trigger_id": None,
+            "require_all": _bool(node, "require_all", path),
+            "quantity": _int(node, "quantity", path, default=1),
+            "value": _int(node, "value", path, default=1, nullable=False),
+            "count_per_action": _int(node, "count_per_action", path),
+        }
+        # Parents before children, so each batch's foreign keys are already satisfied
+        challenges.append(row)
+        challenge_triggers.append((row, trigger))
+        for i, child in enumerate(_list(node, "children", path)):
+            add_challenge(child, f"{path}.children[{i}]", task_id, row["id"])
+        return row["id"]
+
+    seen_indexes = set()
+    for i, tile in enumerate(_list(document, "tiles", "definition")):
+        path = f"tiles[{i}]"
+        _name(tile, path)
+        if not isinstance(tile.get("index"), int) or tile["index"] in seen_indexes:
+            raise DefinitionError(f"{path}: index must be an integer unique within the event")
+        seen_indexes.add(tile["index"])
+        tile_id = uuid.uuid4()
+        tiles.append({"id": tile_id, "event_id": event_id, "name": tile["name"],
+                      "img_src": tile.get("img_src"), "index": tile["index"]})
+        for j, task in enumerate(_list(tile, "tasks", path)):
+            task_path = f"{path}.tasks[{j}]"
+            _name(task, task_path)
+            task_id = uuid.uuid4()
+            tasks.append({"id": task_id, "tile_id": tile_id, "name": task["name"],
+                          "require_all": _bool(task, "require_all", task_path)})
+            for k, node in enumerate(_list(task, "challenges", task_path)):
+                add_challenge(node, f"{task_path}.challenges[{k}]", task_id, None)
+
+    for i, region in enumerate(_list(document, "regions", "definition")):
+        path = f"regions[{i}]"
+        _name(region, path)
+        region_id = uuid.uuid4()
+        regions.append({"id": region_id, "event_id": event_id, "name": region["name"],
+                        "image_url": region.get("image_url"), "offset_x": _int(region, "offset_x", path),
+                        "offset_y": _int(region, "offset_y", path)})
+        for j, territory in enumerate(_list(region, "territories", path)):
+            terr_path = f"{path}.territories[{j}]"
+            _name(territory, terr_path)
+            node = territory.get("challenge")
+            territories.append({
+                "id": uuid.uuid4(), "region_id": region_id, "name": territory["name"],
+                "tier": _str(territory, "tier", terr_path),
+                "display_order": _int(territory, "display_order", terr_path),
+                "offset_x": _int(territory, "offset_x", terr_path), "offset_y": _int(territory, "offset_y", terr_path),
+                "polygon_points": territory.get("polygon_points"),
+                "challenge_id": add_challenge(node, f"{terr_path}.challenge", None, None) if node else None,
+            })
+
+    trigger_ids, created = _resolve_triggers([*trigger_specs.values(), *inline_specs], session)
+    for row, spec in challenge_triggers:
+        if spec is not None:
+            row["trigger_id"] = trigger_ids[_trigger_key(spec)]
+
+    params = {"event_id": str(event_id)}
+    # Territory challenges hang off no task; their children go with them via parent_challenge_id
+    session.execute(text("""
+        DELETE FROM new_stability.challenges WHERE id IN (
+            SELECT terr.challenge_id FROM new_stability.territories terr
+            JOIN new_stability.regions r ON r.id = terr.region_id
+            WHERE r.event_id = :event_id
+        )
+    """), params)
+    session.execute(text("DELETE FROM new_stability.regions WHERE event_id = :event_id"), params)
+    session.execute(text("DELETE FROM new_stability.tiles WHERE event_id = :event_id"), params)
+    # Checkpoints refer to the territories that were just deleted
+    session.execute(text("DELETE FROM new_stability.conquest_checkpoints WHERE event_id = :event_id"), params)
+
+    now = datetime.now(timezone.utc)
+    for model, rows in ((Tile, tiles), (Task, tasks), (Challenge, challenges), (Region, regions), (Territory, territories)):
+        # Strictly increasing created_at keeps document order, the only sibling order tasks and challenges have
+        for i, row in enumerate(rows):
+            row["created_at"] = now + timedelta(microseconds=i)
+        if rows:
+            session.execute(model.__table__.insert(), rows)
+
+    invalidate_on_commit(session, "tiles", "tasks", "challenges", "triggers", f"event:{event_id}")
+    logging.info(f"[DEFINITION] event {event_id}: {len(tiles)} tiles, {len(tasks)} tasks, {len(challenges)} challenges, "
+                 f"{len(regions)} regions, {len(territories)} territories, {created} new triggers")
+    return {
+        "tiles": len(tiles),
+        "tasks": len(tasks),
+        "challenges": len(challenges),
+        "regions": len(regions),
+        "territories": len(territories),
+        "triggers_created": created,
+        "triggers_matched": len(trigger_ids) - created,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Clone
+# ---------------------------------------------------------------------------
+
+# Every copied row's old id -> new id, filled before the copies so children can
+# look up their parents' new ids in the same INSERT ... SELECT
+CLONE_MAP_SQL = text("""
+    CREATE TEMP TABLE IF NOT EXISTS clone_id_map (
+        old_id uuid PRIMARY KEY,
+        new_id uuid NOT NULL DEFAULT gen_random_uuid()
+    ) ON COMMIT DROP
+""")
+
+CLONE_STEPS = [
+    # Map
+    """
+    INSERT INTO clone_id_map (old_id)
+    SELECT id FROM new_stability.tiles WHERE event_id = :source_id
+    UNION ALL
+    SELECT tk.id FROM new_stability.tasks tk
+    JOIN new_stability.tiles tl ON tl.id = tk.tile_id WHERE tl.event_id = :source_id
+    UNION ALL
+    SELECT id FROM new_stability.regions WHERE event_id = :source_id
+    UNION ALL
+    SELECT terr.id FROM new_stability.territories terr
+    JOIN new_stability.regions r ON r.id = terr.region_id WHERE r.event_id = :source_id
+    """,
+    # Same tree as CHALLENGE_TREE_SQL: task challenges, territory challenges and their descendants
+    """
+    INSERT INTO clone_id_map (old_id)
+    WITH RECURSIVE tree AS (
+        SELECT c.id FROM new_stability.challenges c
+        JOIN new_stability.tasks tk ON tk.id = c.task_id
+        JOIN new_stability.tiles tl ON tl.id = tk.tile_id
+        WHERE tl.event_id = :source_id
+        UNION
+        SELECT terr.challenge_id FROM new_stability.territories terr
+        JOIN new_stability.regions r ON r.id = terr.region_id
+        WHERE r.event_id = :source_id AND terr.challenge_id IS NOT NULL
+        UNION
+        SELECT c.id FROM new_stability.challenges c
+        JOIN tree ON c.parent_challenge_id = tree.id
+    )
+    SELECT id FROM tree
+    """,
+    # Copy. created_at is carried over to keep sibling order, as on import
+    """
+    INSERT INTO new_stability.tiles (id, event_id, name, img_src, index, created_at, updated_at)
+    SELECT m.new_id, :new_id, t.name, t.img_src, t.index, t.created_at, NOW()
+    FROM new_stability.tiles t
+    JOIN clone_id_map m ON m.old_id = t.id
+    """,
+    """
+    INSERT INTO new_stability.tasks (id, tile_id, name, require_all, created_at, updated_at)
+    SELECT m.new_id, tile_map.new_id, t.name, t.require_all, t.created_at, NOW()
+    FROM new_stability.tasks t
+    JOIN clone_id_map m ON m.old_id = t.id
+    JOIN clone_id_map tile_map ON tile_map.old_id = t.tile_id
+    """,
+    # Parents and children land in the same statement, so the self-reference is satisfied when it is checked
+    """
+    INSERT INTO new_stability.challenges (id, task_id, parent_challenge_id, trigger_id, require_all,
+                                          quantity, value, count_per_action, created_at, updated_at)
+    SELECT m.new_id, task_map.new_id, parent_map.new_id, c.trigger_id, c.require_all,
+           c.quantity, c.value, c.count_per_action, c.created_at, NOW()
+    FROM new_stability.challenges c
+    JOIN clone_id_map m ON m.old_id = c.id
+    LEFT JOIN clone_id_map task_map ON task_map.old_id = c.task_id
+    LEFT JOIN clone_id_map parent_map ON parent_map.old_id = c.parent_challenge_id
+    """,
+    """
+    INSERT INTO new_stability.regions (id, event_id, name, image_url, offset_x, offset_y, created_at)
+    SELECT m.new_id, :new_id, r.name, r.image_url, r.offset_x, r.offset_y, r.created_at
+    FROM new_stability.regions r
+    JOIN clone_id_map m ON m.old_id = r.id
+    """,
+    """
+    INSERT INTO new_stability.territories (id, region_id, name, tier, challenge_id, display_order,
+                                           offset_x, offset_y, polygon_points, created_at)
+    SELECT m.new_id, region_map.new_id, t.name, t.tier, challenge_map.new_id, t.display_order,
+           t.offset_x, t.offset_y, t.polygon_points, t.created_at
+    FROM new_stability.territories t
+    JOIN clone_id_map m ON m.old_id = t.id
+    JOIN clone_id_map region_map ON region_map.old_id = t.region_id
+    LEFT JOIN clone_id_map challenge_map ON challenge_map.old_id = t.challenge_id
+    """,
+]
+
+CLONE_TEAM_STEPS = [
+    """
+    INSERT INTO clone_id_map (old_id)
+    SELECT id FROM new_stability.teams WHERE event_id = :source_id
+    """,
+    """
+    INSERT INTO new_stability.teams (id, event_id, name, image_url, color, points, created_at, updated_at)
+    SELECT m.new_id, :new_id, t.name, t.image_url, t.color, 0, NOW(), NOW()
+    FROM new_stability.teams t
+    JOIN clone_id_map m ON m.old_id = t.id
+    """,
+]
+
+CLONE_MEMBER_STEPS = [
+    """
+    INSERT INTO new_stability.team_members (id, team_id, user_id, created_at, updated_at)
+    SELECT gen_random_uuid(), team_map.new_id, tm.user_id, NOW(), NOW()
+    FROM new_stability.team_members tm
+    JOIN clone_id_map team_map ON team_map.old_id = tm.team_id
+    """,
+]
+
+
+def clone_event(source_id, session, name: str | None = None, start_date: str | None = None,
+                end_date: str | None = None, release_date: str | None = None,
+                include_teams: bool = False, include_members: bool = False):
+    """
+    Copy an event's definition (tiles, tasks, challenge trees, regions, territories)
+    into a new event, optionally with its teams (points reset) and their members.
+    Progress, control and the Discord thread are not copied. Everything happens in
+    Postgres with INSERT ... SELECT through a temporary id map. Does not commit.
+
+    Dates default to the source's, moved by however far start_date moves the start.
+    Returns the new event's id, or None if the source event does not exist.
+    """
+    if include_members and not include_teams:
+        raise ValueError("include_members requires include_teams")
+
+    new_id = session.execute(text("""
+        INSERT INTO new_stability.events (id, name, type, start_date, end_date, release_date, created_at, updated_at)
+        SELECT gen_random_uuid(),
+               COALESCE(:name, e.name || ' (copy)'),
+               e.type,
+               e.start_date + shift.by,
+               COALESCE(CAST(:end_date AS timestamptz), e.end_date + shift.by),
+               COALESCE(CAST(:release_date AS timestamptz), e.release_date + shift.by),
+               NOW(), NOW()
+        FROM new_stability.events e
+        CROSS JOIN LATERAL (
+            SELECT COALESCE(CAST(:start_date AS timestamptz) - e.start_date, INTERVAL '0') AS by
+        ) shift
+        WHERE e.id = :source_id
+        RETURNING id
+    """), {"source_id": str(source_id), "name": name, "start_date": start_date,
+           "end_date": end_date, "release_date": release_date}).scalar()
+    if new_id is None:
+        return None
+
+    session.execute(CLONE_MAP_SQL)
+    session.execute(text("TRUNCATE clone_id_map"))
+    steps = CLONE_STEPS + (CLONE_TEAM_STEPS if include_teams else []) + (CLONE_MEMBER_STEPS if include_members else [])
+    params = {"source_id": str(source_id), "new_id": str(new_id)}
+    for step in steps:
+        session.execute(text(step), params)
+    session.execute(text("TRUNCATE clone_id_map"))
+
+    invalidate_on_commit(session, "events", "tiles", "tasks", "challenges", "teams", "team_members")
+    logging.info(f"[DEFINITION] cloned event {source_id} into {new_id} (teams={include_teams}, members={include_members})")
+    return new_id
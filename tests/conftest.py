@@ -2,9 +2,10 @@
 Pytest configuration file
 This runs once before all tests to set up the database schema
 """
+from contextlib import contextmanager
 import pytest
 from app import app, db
-from sqlalchemy import text
+from sqlalchemy import event, text
 
 
 @pytest.fixture(scope="session", autouse=True)
@@ -23,3 +24,28 @@ def setup_database_schema():
         with db.engine.connect() as conn:
             conn.execute(text("DROP SCHEMA IF EXISTS new_stability CASCADE"))
             conn.commit()
+
+
+@pytest.fixture
+def capture_statements():
+    """
+    Context manager collecting the SQL of every statement executed inside it, for tests
+    that match on what was run. Tests that only count queries use helper.query_stats.track_queries.
+    """
+    with app.app_context():
+        engine = db.engine
+
+    @contextmanager
+    def capture():
+        statements = []
+
+        def before(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", before)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, "before_cursor_execute", before)
+
+    return capture
@@ -0,0 +1,75 @@
+import json
+from app import app, db
+from benchmarks.workload import load_workload, synthesize_workload, write_workload
+from benchmarks.seed import reset_events, seed_events
+from benchmarks.replay import compare_reports, percentile, run_replay
+from helper.submission_capture import anonymize_submission, capture_submission
+from models.new_events import Event
+
+
+def setup_module(module):
+    with app.app_context():
+        db.create_all()
+
+
+def teardown_module(module):
+    with app.app_context():
+        reset_events()
+        db.session.remove()
+        db.drop_all()
+
+
+def test_capture_and_anonymize(tmp_path):
+    path = tmp_path / "capture.ndjson"
+    payload = {"rsn": "Some Player", "id": "123456789", "trigger": "Bones", "source": "Goblin",
+               "quantity": 1, "img_path": "https://example.com/x.png", "request_id": "abc"}
+    capture_submission(payload, path=str(path), anonymize=True)
+    capture_submission(dict(payload, rsn="SOME PLAYER"), path=str(path), anonymize=True)
+
+    captured = load_workload(str(path))
+    assert len(captured) == 2
+    assert captured[0]["rsn"] == captured[1]["rsn"] != "Some Player"
+    assert captured[0]["id"].isdigit() and captured[0]["id"] != "123456789"
+    assert captured[0]["img_path"] is None
+    assert captured[0]["trigger"] == "Bones"
+    assert anonymize_submission(payload, salt="a")["rsn"] != anonymize_submission(payload, salt="b")["rsn"]
+
+
+def test_percentile_and_compare():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 95) == 95
+    assert percentile(values, 100) == 100
+
+    baseline = {"latency_ms": {"p50": 10, "p95": 20, "p99": 30}, "queries_per_submission": {"mean": 10}}
+    current = {"latency_ms": {"p50": 10, "p95": 25, "p99": 30}, "queries_per_submission": {"mean": 9}}
+    rows, regressed = compare_reports(current, baseline, max_regression_pct=10)
+    assert regressed
+    assert {r["metric"]: r["change_pct"] for r in rows}["latency_ms.p95"] == 25.0
+    _, regressed = compare_reports(current, baseline, max_regression_pct=30)
+    assert not regressed
+
+
+def test_seed_and_replay(tmp_path):
+    path = tmp_path / "workload.ndjson"
+    write_workload(str(path), synthesize_workload(submissions=60, players=24, triggers=30, seed=1))
+    workload = load_workload(str(path))
+
+    with app.app_context():
+        summary = seed_events(workload, teams=4, seed=1)
+        assert summary["players"] == len({p["rsn"] for p in workload})
+        assert Event.query.filter(Event.name.startswith("[bench]")).count() == 2
+
+    report = run_replay(workload)
+    json.dumps(report)
+    assert report["submissions"] == 60
+    assert report["errors"] == 0
+    assert report["throughput_per_second"] > 0
+    assert report["queries_per_submission"]["mean"] > 0
+    assert report["commits_per_submission"]["mean"] >= 1
+    assert report["handlers"]["bingo_handler"]["calls"] == 60
+    assert report["handlers"]["conquest_handler"]["queries_per_call"] > 0
+
+    with app.app_context():
+        assert reset_events() == 3
+        assert Event.query.filter(Event.name.startswith("[bench]")).count() == 0
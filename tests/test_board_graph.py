@@ -0,0 +1,88 @@
+import re
+import uuid
+from datetime import datetime, timezone
+from sqlalchemy.orm.attributes import flag_modified
+from app import app, db
+from models.models import Events
+from models.stability_party_3 import SP3EventTiles, SP3Regions
+from event_handlers.stability_party.board_graph import get_board_graph, invalidate_board_graph
+from event_handlers.stability_party.save_data import RollState, SaveData
+from event_handlers.stability_party.stability_party_handler import _process_next_move, is_shop_tile, is_star_tile
+
+RING_SIZE = 16
+ids = {}
+
+
+def setup_module(module):
+    with app.app_context():
+        db.create_all()
+        now = datetime.now(timezone.utc)
+        ev = Events(name="Board Graph", type="STABILITY_PARTY", start_time=now, end_time=now, data={}, timestamp=now)
+        db.session.add(ev)
+        db.session.flush()
+        region = SP3Regions(event_id=ev.id, name="Ring", data={})
+        db.session.add(region)
+        db.session.flush()
+        tiles = [SP3EventTiles(id=uuid.uuid4(), event_id=ev.id, region_id=region.id, name=f"Tile {i}") for i in range(RING_SIZE)]
+        for i, tile in enumerate(tiles):
+            tile.data = {"nextTiles": [str(tiles[(i + 1) % RING_SIZE].id)], "isIslandStart": i == 0}
+        tiles[-1].data["isShop"] = True
+        db.session.add_all(tiles)
+        ev.data = {"star_tiles": [str(tiles[-2].id)]}
+        db.session.commit()
+        ids.update(event=ev.id, region=region.id, tiles=[t.id for t in tiles])
+
+
+def teardown_module(module):
+    invalidate_board_graph()
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+
+def test_twelve_step_roll_takes_no_tile_queries(capture_statements):
+    with app.app_context():
+        board = get_board_graph(ids["event"])
+        assert board.island_start(ids["region"]).id == ids["tiles"][0]
+        assert board.next_tiles(ids["tiles"][-1]) == (ids["tiles"][0],)
+
+        save = SaveData.from_dict({"currentTile": str(ids["tiles"][0]), "islandId": str(ids["region"])})
+        save.roll_state = RollState(ids["event"], uuid.uuid4(), 12, save.currentTile)
+        with capture_statements() as statements:
+            result = _process_next_move(ids["event"], uuid.uuid4(), save)
+        assert not [s for s in statements if re.search(r"\b(sp3_event_tiles|events)\b", s)]
+        assert save.currentTile == ids["tiles"][12]
+        assert result["action_data"]["path_taken_this_turn"] == [f"Tile {i}" for i in range(13)]
+
+
+def test_star_move_invalidates_on_commit():
+    old_star, new_star = ids["tiles"][-2], ids["tiles"][5]
+    with app.app_context():
+        assert is_star_tile(old_star) and not is_star_tile(new_star)
+        ev = db.session.get(Events, ids["event"])
+        ev.data["star_tiles"] = [str(new_star)]
+        flag_modified(ev, "data")
+        db.session.flush()
+        # Not visible until the move is committed
+        assert is_star_tile(old_star)
+        db.session.commit()
+        assert is_star_tile(new_star) and not is_star_tile(old_star)
+        assert get_board_graph(ids["event"]).region_has_star(ids["tiles"][0])
+
+
+def test_tile_edits_invalidate_and_rollbacks_do_not():
+    shop = ids["tiles"][-1]
+    with app.app_context():
+        assert is_shop_tile(shop)
+        before = get_board_graph(ids["event"])
+        tile = db.session.get(SP3EventTiles, shop)
+        tile.data = {**tile.data, "isShop": False}
+        db.session.flush()
+        db.session.rollback()
+        assert get_board_graph(ids["event"]) is before
+
+        tile = db.session.get(SP3EventTiles, shop)
+        tile.data = {**tile.data, "isShop": False}
+        db.session.commit()
+        assert not is_shop_tile(shop)
+        assert get_board_graph(ids["event"]) is not before
@@ -0,0 +1,92 @@
+import json
+from app import app, db
+from helper.query_stats import track_queries
+from models.new_events import Challenge, ChallengeStatus, Event, Task, Team, Tile, Trigger
+from datetime import datetime, timezone
+
+ids = {}
+
+
+def setup_module(module):
+    with app.app_context():
+        db.create_all()
+        ev = Event(name="Trees", start_date=datetime(2026, 1, 1, tzinfo=timezone.utc),
+                   end_date=datetime(2026, 2, 1, tzinfo=timezone.utc))
+        trigger = Trigger(name="Tree Bones", type="DROP")
+        db.session.add_all([ev, trigger])
+        db.session.flush()
+        team = Team(event_id=ev.id, name="Oak")
+        tiles = [Tile(event_id=ev.id, name=f"Tile {i}", index=i) for i in (1, 0)]
+        db.session.add_all([team, *tiles])
+        db.session.flush()
+        tasks = [Task(tile_id=tile.id, name=f"Task {tile.index}") for tile in tiles]
+        db.session.add_all(tasks)
+        db.session.flush()
+
+        # Task 1 (tile index 1): root -> (leaf, middle -> leaf); task 0 (tile index 0): one leaf
+        root = Challenge(task_id=tasks[0].id, require_all=True)
+        db.session.add(root)
+        db.session.flush()
+        leaf = Challenge(task_id=tasks[0].id, parent_challenge_id=root.id, trigger_id=trigger.id, quantity=2)
+        db.session.add(leaf)
+        db.session.flush()
+        middle = Challenge(task_id=tasks[0].id, parent_challenge_id=root.id)
+        db.session.add(middle)
+        db.session.flush()
+        deep = Challenge(task_id=tasks[0].id, parent_challenge_id=middle.id, trigger_id=trigger.id)
+        other = Challenge(task_id=tasks[1].id, trigger_id=trigger.id)
+        db.session.add_all([deep, other])
+        db.session.flush()
+        db.session.add(ChallengeStatus(team_id=team.id, challenge_id=leaf.id, quantity=2, completed=True))
+        db.session.commit()
+        ids.update(event=str(ev.id), team=str(team.id), root=str(root.id), leaf=str(leaf.id),
+                   middle=str(middle.id), deep=str(deep.id), other=str(other.id))
+
+
+def teardown_module(module):
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+
+def _shape(node: dict) -> tuple:
+    return node["id"], [_shape(child) for child in node.get("children", [])]
+
+
+def test_tree_is_one_query():
+    client = app.test_client()
+    with track_queries("test") as stats:
+        tree = json.loads(client.get(f"/v2/challenges/{ids['root']}/tree").get_data())
+    assert _shape(tree) == (ids["root"], [(ids["leaf"], []), (ids["middle"], [(ids["deep"], [])])])
+    assert tree["require_all"] is True and "status" not in tree
+    assert stats.count == 1
+
+    subtree = json.loads(client.get(f"/v2/challenges/{ids['middle']}/tree").get_data())
+    assert _shape(subtree) == (ids["middle"], [(ids["deep"], [])])
+
+
+def test_team_status_overlay():
+    client = app.test_client()
+    with track_queries("test") as stats:
+        tree = json.loads(client.get(f"/v2/challenges/{ids['root']}/tree?team_id={ids['team']}").get_data())
+    assert stats.count == 2
+    assert tree["status"] == {"quantity": 0, "completed": False}
+    assert tree["children"][0]["status"] == {"quantity": 2, "completed": True}
+
+
+def test_event_trees_in_board_order():
+    client = app.test_client()
+    with track_queries("test") as stats:
+        data = json.loads(client.get(f"/v2/challenges/trees?event_id={ids['event']}&team_id={ids['team']}").get_data())["data"]
+    assert stats.count == 3
+    assert [t["tile_index"] for t in data] == [0, 1]
+    assert [_shape(c) for c in data[0]["challenges"]] == [(ids["other"], [])]
+    assert _shape(data[1]["challenges"][0])[0] == ids["root"]
+
+
+def test_bad_ids():
+    client = app.test_client()
+    assert client.get("/v2/challenges/not-a-uuid/tree").status_code == 404
+    assert client.get("/v2/challenges/00000000-0000-0000-0000-000000000000/tree").status_code == 404
+    assert client.get(f"/v2/challenges/{ids['root']}/tree?team_id=nope").status_code == 400
+    assert client.get("/v2/challenges/trees").status_code == 400
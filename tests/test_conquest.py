@@ -13,16 +13,24 @@ Covers:
   - Idempotency (duplicate request_id)
   - Unknown user and teamless user edge cases
   - Green log is awarded only once per team/region
+  - Player-action rollups match a full rebuild from proofs
+  - Point-in-time state from checkpoints matches live state
+  - Territory proof feed: keyset pages, team filter, NDJSON stream
+  - Whole-map recompute restores control after manual corrections
 """
 
 import datetime
+import json
 import sys
 import uuid
 from datetime import timedelta, timezone
 
 from app import app, db
+from helper.helpers import encode_cursor
 from event_handlers.event_handler import EventSubmission
 from event_handlers.conquest.conquest import conquest_handler
+from services import conquest_service
+from services.conquest_service import rebuild_conquest_checkpoints, rebuild_player_action_rollups
 from models.models import Users
 from models.new_events import (
     Action, Challenge, ChallengeStatus, Event,
@@ -625,6 +633,178 @@ def run():
             check(str(red_team.id) in region_data["green_logged_teams"],
                   "S14: Region green_logged_teams contains red_team")
 
+            # ================================================================
+            # S15 — Player actions served from rollups
+            # ================================================================
+            print("\n── S15: Player-action rollups ───────────────────────────────")
+
+            r = client.get(f"/v2/events/{cid}/player-actions")
+            check(r.status_code == 200,                                 "S15: GET /player-actions → 200")
+            by_team = {t["team_id"]: t for t in r.get_json()["data"]}
+            red_players = {p["player_name"]: p["actions"] for p in by_team[str(red_team.id)]["players"]}
+            blue_players = {p["player_name"]: p["actions"] for p in by_team[str(blue_team.id)]["players"]}
+            red_qty = {a["name"]: a["quantity"] for a in red_players.get(rsn_red, [])}
+            blue_qty = {a["name"]: a["quantity"] for a in blue_players.get(rsn_blue, [])}
+
+            # Red: goblin S3(1) + S7(2) + S9(1) + S11(1, duplicate ignored) = 5, bones 3, coins 1
+            check(red_qty.get(goblin_t.name) == 5,                      f"S15: Red goblin quantity = 5 (got {red_qty.get(goblin_t.name)})")
+            check(red_qty.get(bones_t.name) == 3,                       f"S15: Red bones quantity = 3 (got {red_qty.get(bones_t.name)})")
+            check(red_qty.get(coins_t.name) == 1,                       f"S15: Red coins quantity = 1 (got {red_qty.get(coins_t.name)})")
+            check(blue_qty.get(goblin_t.name) == 2,                     f"S15: Blue goblin quantity = 2 (got {blue_qty.get(goblin_t.name)})")
+            check(rsn_lone not in red_players and rsn_lone not in blue_players,
+                  "S15: Teamless player not listed")
+
+            rebuild_player_action_rollups(conquest.id, db.session)
+            db.session.commit()
+            r2 = client.get(f"/v2/events/{cid}/player-actions")
+            check(r2.get_json() == r.get_json(),                        "S15: Rebuilt rollups match incrementally maintained rollups")
+
+            # ================================================================
+            # S16 — Point-in-time state reconstruction
+            # ================================================================
+            print("\n── S16: Point-in-time state ─────────────────────────────────")
+
+            def state_summary(body):
+                return (
+                    {t["id"]: t["controlling_team_id"] for t in body["territories"]},
+                    {rg["id"]: (rg["controlling_team_id"], rg["green_logged_teams"]) for rg in body["regions"]},
+                    {t["id"]: t["points"] for t in body["teams"]},
+                )
+
+            r = client.get(f"/v2/events/{bid}/conquest/state")
+            check(r.status_code == 400,                                 "S16: non-conquest event → 400")
+            r = client.get(f"/v2/events/{cid}/conquest/state?at=not-a-date")
+            check(r.status_code == 400,                                 "S16: invalid at → 400")
+
+            r = client.get(f"/v2/events/{cid}/conquest/state")
+            check(r.status_code == 200,                                 "S16: GET /conquest/state → 200")
+            live = r.get_json()
+            territories_now, regions_now, points_now = state_summary(live)
+            check(territories_now[str(terr_a.id)] == str(red_team.id),  "S16: now — Territory A → Red")
+            check(regions_now[str(region.id)] == (str(red_team.id), [str(red_team.id)]),
+                  "S16: now — Region → Red with Red green log")
+            check(points_now[str(red_team.id)] == fresh(Team, red_team.id).points,
+                  "S16: now — Red points match teams.points")
+
+            first_tc = EventLog.query.filter_by(
+                event_id=conquest.id, type="TERRITORY_CONTROL"
+            ).order_by(EventLog.created_at).first()
+            before = (first_tc.created_at - timedelta(microseconds=1)).isoformat()
+            r = client.get(f"/v2/events/{cid}/conquest/state", query_string={"at": before})
+            territories_then, _, points_then = state_summary(r.get_json())
+            check(all(v is None for v in territories_then.values()),   "S16: before first capture — no controllers")
+            check(all(v == 0 for v in points_then.values()),           "S16: before first capture — no points")
+
+            r = client.get(f"/v2/events/{cid}/conquest/state", query_string={"at": first_tc.created_at.isoformat()})
+            territories_then, _, _ = state_summary(r.get_json())
+            check(territories_then[str(terr_a.id)] == str(red_team.id), "S16: at first capture — Territory A → Red")
+
+            every, settle = conquest_service.CHECKPOINT_EVERY_LOGS, conquest_service.CHECKPOINT_SETTLE_SECONDS
+            conquest_service.CHECKPOINT_EVERY_LOGS, conquest_service.CHECKPOINT_SETTLE_SECONDS = 5, 0
+            try:
+                written = rebuild_conquest_checkpoints(conquest.id, db.session)
+                db.session.commit()
+            finally:
+                conquest_service.CHECKPOINT_EVERY_LOGS, conquest_service.CHECKPOINT_SETTLE_SECONDS = every, settle
+            check(written > 0,                                          f"S16: checkpoints written (got {written})")
+
+            r = client.get(f"/v2/events/{cid}/conquest/state")
+            body = r.get_json()
+            check(body["checkpoint_as_of"] is not None,                 "S16: state starts from a checkpoint")
+            check(body["logs_applied"] < live["logs_applied"],          "S16: fewer logs replayed with checkpoints")
+            check(state_summary(body) == state_summary(live),           "S16: checkpointed state matches full replay")
+
+            # ================================================================
+            # S17 — Territory proof feed
+            # ================================================================
+            print("\n── S17: Territory proof feed ────────────────────────────────")
+
+            r = client.get(f"/v2/territories/{terr_a.id}/proofs")
+            check(r.status_code == 200,                                 "S17: GET /proofs → 200")
+            full = r.get_json()
+            # Goblin proofs: Red 5 (S3, S7×2, S9, S11), Blue 2 (S4, S5)
+            check(len(full["data"]) == 7,                               f"S17: 7 proofs on Territory A (got {len(full['data'])})")
+            check(full["next_cursor"] is None,                          "S17: single page has no next_cursor")
+            stamps = [p["created_at"] for p in full["data"]]
+            check(stamps == sorted(stamps, reverse=True),               "S17: proofs ordered newest first")
+            check(all(p["action"]["player"]["runescape_name"] in (rsn_red, rsn_blue) for p in full["data"]),
+                  "S17: proofs carry action and player")
+
+            paged, cursor = [], None
+            while True:
+                qs = {"limit": 2}
+                if cursor:
+                    qs["cursor"] = cursor
+                body = client.get(f"/v2/territories/{terr_a.id}/proofs", query_string=qs).get_json()
+                check(len(body["data"]) <= 2,                           "S17: page respects limit")
+                paged.extend(body["data"])
+                cursor = body["next_cursor"]
+                if not cursor:
+                    break
+            check([p["id"] for p in paged] == [p["id"] for p in full["data"]],
+                  "S17: keyset pages concatenate to the full feed")
+
+            body = client.get(f"/v2/territories/{terr_a.id}/proofs?team_id={blue_team.id}").get_json()
+            check(len(body["data"]) == 2 and all(p["team_id"] == str(blue_team.id) for p in body["data"]),
+                  "S17: team_id filter returns only Blue's 2 proofs")
+
+            r = client.get(f"/v2/territories/{terr_a.id}/proofs?cursor=garbage")
+            check(r.status_code == 400,                                 "S17: invalid cursor → 400")
+            bad = encode_cursor("yesterday", "x")
+            r = client.get(f"/v2/territories/{terr_a.id}/proofs?cursor={bad}")
+            check(r.status_code == 400,                                 "S17: well-formed cursor with bad values → 400")
+            r = client.get(f"/v2/territories/{terr_a.id}/proofs?cursor={bad}&format=ndjson")
+            check(r.status_code == 400,                                 "S17: bad cursor → 400 before streaming")
+            r = client.get(f"/v2/territories/{terr_a.id}/proofs?team_id=blue")
+            check(r.status_code == 400,                                 "S17: invalid team_id → 400")
+
+            r = client.get(f"/v2/territories/{terr_a.id}/proofs?format=ndjson")
+            check(r.mimetype == "application/x-ndjson",                 "S17: NDJSON content type")
+            lines = [json.loads(line) for line in r.get_data(as_text=True).splitlines() if line]
+            check([p["id"] for p in lines] == [p["id"] for p in full["data"]],
+                  "S17: NDJSON stream matches the paged feed")
+
+            # ================================================================
+            # S18 — Whole-map recompute
+            # ================================================================
+            print("\n── S18: Whole-map recompute ─────────────────────────────────")
+
+            r = client.post(f"/v2/events/{cid}/conquest/recompute")
+            check(r.status_code == 200,                                 "S18: POST /conquest/recompute → 200")
+            body = r.get_json()
+            check(body["territories_changed"] == 0 and body["regions_changed"] == 0 and body["green_logs_awarded"] == 0,
+                  "S18: consistent map → no changes")
+
+            # Simulate a bad manual correction: wipe Territory A/C control, the region and Red's points
+            db.session.execute(text("UPDATE new_stability.territories SET controlling_team_id = NULL WHERE id IN (:a, :c)"),
+                               {"a": str(terr_a.id), "c": str(terr_c.id)})
+            db.session.execute(text("UPDATE new_stability.regions SET controlling_team_id = :blue WHERE id = :r"),
+                               {"blue": str(blue_team.id), "r": str(region.id)})
+            db.session.execute(text("UPDATE new_stability.teams SET points = 0 WHERE id = :t"), {"t": str(red_team.id)})
+            db.session.commit()
+
+            logs_before = EventLog.query.filter_by(event_id=conquest.id).count()
+            r = client.post(f"/v2/events/{cid}/conquest/recompute")
+            body = r.get_json()
+            check(body["territories_changed"] == 2,                     f"S18: 2 territories re-assigned (got {body['territories_changed']})")
+            check(body["regions_changed"] == 1,                         f"S18: region re-assigned (got {body['regions_changed']})")
+            check(fresh(Territory, terr_a.id).controlling_team_id == red_team.id,
+                  "S18: Territory A → Red (5 vs 2 completions)")
+            check(fresh(Territory, terr_c.id).controlling_team_id == red_team.id,
+                  "S18: Territory C → Red (only team past the threshold)")
+            check(fresh(Region, region.id).controlling_team_id == red_team.id,
+                  "S18: Region: Red (3 territories) strictly beats holder Blue (0)")
+            check(fresh(Team, red_team.id).points == 3 * 3 + 20,        f"S18: Red points restored (got {fresh(Team, red_team.id).points})")
+            check(EventLog.query.filter_by(event_id=conquest.id).count() == logs_before + 3,
+                  "S18: one EventLog per change")
+            check(all(l["meta"].get("recompute") for l in body["logs"]), "S18: logs flagged as recompute")
+            tc = next(l for l in body["logs"] if l["type"] == "REGION_CONTROL")
+            check(tc["meta"]["previousTeamId"] == str(blue_team.id),    "S18: REGION_CONTROL.previousTeamId = blue_team")
+
+            body = client.post(f"/v2/events/{cid}/conquest/recompute").get_json()
+            check(body["territories_changed"] + body["regions_changed"] + body["green_logs_awarded"] == 0,
+                  "S18: second recompute is a no-op")
+
         finally:
             print("\n── Cleanup ──────────────────────────────────────────────────")
             _cleanup(
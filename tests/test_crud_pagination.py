@@ -0,0 +1,79 @@
+from app import app, db
+from helper.helpers import encode_cursor
+from models.new_events import Event, Trigger
+from services.crud_service import CRUDService
+from datetime import datetime, timedelta, timezone
+
+
+def setup_module(module):
+    with app.app_context():
+        db.create_all()
+        # Duplicate names so the id tie-breaker decides page boundaries
+        for i in range(7):
+            db.session.add(Trigger(name=f"Page {i // 2}", type="PAGE"))
+        start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        for i in range(5):
+            db.session.add(Event(name=f"Paged {i}", start_date=start, end_date=start + timedelta(days=1),
+                                 created_at=start + timedelta(hours=i)))
+        db.session.commit()
+
+
+def teardown_module(module):
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+
+def _walk(model_class, **kwargs) -> list:
+    seen, cursor = [], None
+    while True:
+        records, _, cursor = CRUDService.get_all(model_class, per_page=3, cursor=cursor, **kwargs)
+        seen.extend(records)
+        if cursor is None:
+            return seen
+
+
+def test_cursor_pages_match_offset_order():
+    with app.app_context():
+        for order_by in ("name", "-name", None):
+            expected, total, _ = CRUDService.get_all(Trigger, filters={"type": "PAGE"}, per_page=50, order_by=order_by)
+            assert total == 7
+            walked = _walk(Trigger, filters={"type": "PAGE"}, order_by=order_by)
+            assert [t.id for t in walked] == [t.id for t in expected]
+
+        events = _walk(Event, order_by="-created_at")
+        assert [e.name for e in events] == [f"Paged {i}" for i in reversed(range(5))]
+
+
+def test_total_modes():
+    with app.app_context():
+        db.session.execute(db.text("ANALYZE new_stability.triggers"))
+        _, total, _ = CRUDService.get_all(Trigger, total_mode="none")
+        assert total is None
+        _, total, _ = CRUDService.get_all(Trigger, total_mode="estimate")
+        assert total == 7
+        _, total, _ = CRUDService.get_all(Trigger, filters={"type": "PAGE"}, total_mode="estimate")
+        assert isinstance(total, int) and total >= 1
+
+
+def test_invalid_cursors_are_rejected():
+    client = app.test_client()
+    assert client.get("/v2/triggers?cursor=not-a-cursor").status_code == 400
+    assert client.get(f"/v2/triggers?cursor={encode_cursor('Page 0')}").status_code == 400
+    assert client.get(f"/v2/events?cursor={encode_cursor('yesterday', 'x')}").status_code == 400
+    assert client.get("/v2/triggers?total=sometimes").status_code == 400
+
+
+def test_nullable_sort_fields_have_no_cursor():
+    with app.app_context():
+        records, _, cursor = CRUDService.get_all(Trigger, filters={"type": "PAGE"}, per_page=3, order_by="source")
+        assert len(records) == 3 and cursor is None
+
+
+def test_list_endpoint_returns_next_cursor():
+    client = app.test_client()
+    first = client.get("/v2/triggers?type=PAGE&per_page=4&total=none").get_json()
+    assert len(first["data"]) == 4 and first["total"] is None and first["next_cursor"]
+    second = client.get(f"/v2/triggers?type=PAGE&per_page=4&cursor={first['next_cursor']}").get_json()
+    assert len(second["data"]) == 3 and second["next_cursor"] is None and second["total"] == 7
+    assert not {t["id"] for t in first["data"]} & {t["id"] for t in second["data"]}
@@ -0,0 +1,202 @@
+from flask import Response
+from app import app, db, discord_outbox
+from sqlalchemy import text
+from helper.discord_outbox import OutboxWorker, RateLimiter, _persist_orphaned_outbox_rows, enqueue_bot_call, enqueue_webhook
+from models.new_events import DiscordOutbox
+
+
+class FakeResponse:
+    def __init__(self, status_code: int, headers: dict | None = None) -> None:
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.text = f"status {status_code}"
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    def json(self) -> dict:
+        return {}
+
+
+class FakeHttp:
+    """Stands in for the worker's requests.Session; replies with the queued status codes, then 204."""
+
+    def __init__(self, statuses: list[int] | None = None, headers: dict | None = None) -> None:
+        self.statuses = list(statuses or [])
+        self.headers = headers
+        self.calls = []
+
+    def request(self, method, url, json=None, timeout=None):
+        self.calls.append((method, url, json, timeout))
+        return FakeResponse(self.statuses.pop(0) if self.statuses else 204, self.headers)
+
+
+def setup_module(module):
+    # Keep the app's own worker from picking rows up behind the tests' backs
+    discord_outbox._ensure_started = lambda: None
+    with app.app_context():
+        db.create_all()
+
+
+def teardown_module(module):
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+
+def setup_function(function):
+    with app.app_context():
+        db.session.execute(text("DELETE FROM new_stability.discord_outbox"))
+        db.session.commit()
+
+
+def _worker(http, **kwargs) -> OutboxWorker:
+    with app.app_context():
+        return OutboxWorker(db.engine, http=http, **kwargs)
+
+
+def _rows() -> list[DiscordOutbox]:
+    with app.app_context():
+        rows = DiscordOutbox.query.order_by(DiscordOutbox.id).all()
+        db.session.expunge_all()
+        return rows
+
+
+def _make_due() -> None:
+    with app.app_context():
+        db.session.execute(text("UPDATE new_stability.discord_outbox SET next_attempt_at = NOW()"))
+        db.session.commit()
+
+
+def test_enqueue_follows_caller_transaction():
+    with app.app_context():
+        enqueue_bot_call("/1/roles/add", {"roles": ["Guest"]})
+        db.session.rollback()
+        enqueue_bot_call("/1/roles/add", {"roles": ["Member"]})
+        enqueue_webhook("https://discord.com/api/webhooks/1/secret", {"embeds": []})
+        db.session.commit()
+
+    rows = _rows()
+    assert [r.payload for r in rows] == [{"roles": ["Member"]}, {"embeds": []}]
+    assert rows[0].rate_key == "bot:roles/add"
+    assert rows[1].rate_key.startswith("webhook:") and "secret" not in rows[1].rate_key
+
+
+def _request_ending(status: int, enqueue) -> None:
+    """Run enqueue as a handler would after its last commit, then end the request with status."""
+    with app.test_request_context("/teams", method="POST"):
+        enqueue()
+        _persist_orphaned_outbox_rows(db, Response(status=status))
+        db.session.remove()
+
+
+def test_orphaned_rows_are_persisted_after_request():
+    def enqueue():
+        enqueue_bot_call("/dm", {"user_id": "1", "message": "committed"})
+        db.session.commit()
+        enqueue_bot_call("/dm", {"user_id": "1", "message": "first"})
+        # Autoflushes the first row out of session.new
+        DiscordOutbox.query.count()
+        enqueue_bot_call("/dm", {"user_id": "1", "message": "second"})
+
+    _request_ending(200, enqueue)
+    assert [r.payload["message"] for r in _rows()] == ["committed", "first", "second"]
+
+
+def test_orphaned_rows_of_failed_requests_are_dropped():
+    def enqueue():
+        enqueue_bot_call("/dm", {"user_id": "1", "message": "flushed"})
+        DiscordOutbox.query.count()
+        enqueue_bot_call("/dm", {"user_id": "1", "message": "rejected"})
+
+    _request_ending(400, enqueue)
+    assert _rows() == []
+
+
+def test_delivers_in_order_with_token(monkeypatch):
+    monkeypatch.setenv("DISCORD_BOT_API", "http://bot")
+    monkeypatch.setenv("DISCORD_BOT_API_TOKEN", "tok")
+    with app.app_context():
+        enqueue_bot_call("/1/roles/add", {"roles": ["Member"]})
+        enqueue_bot_call("/1/roles/remove", {"roles": ["Guest"]})
+        enqueue_webhook("https://discord.com/api/webhooks/1/secret", {"embeds": []})
+        db.session.commit()
+
+    http = FakeHttp()
+    assert _worker(http).drain_once() == 3
+    assert [c[1] for c in http.calls] == ["http://bot/1/roles/add", "http://bot/1/roles/remove", "https://discord.com/api/webhooks/1/secret"]
+    assert http.calls[0][2] == {"roles": ["Member"], "token": "tok"}
+    assert http.calls[2][2] == {"embeds": []}
+    assert all(c[3] is not None for c in http.calls)
+    assert all(r.status == "sent" and r.sent_at and r.attempts == 1 for r in _rows())
+    assert "tok" not in str(_rows()[0].payload)
+
+
+def test_retries_then_dead_letters():
+    with app.app_context():
+        enqueue_bot_call("/dm", {"user_id": "1", "message": "hi"})
+        db.session.commit()
+
+    http = FakeHttp([500, 502, 503])
+    worker = _worker(http, max_attempts=3, backoff_base=60)
+    worker.drain_once()
+    row = _rows()[0]
+    assert row.status == "pending" and row.attempts == 1 and row.last_error.startswith("500")
+    assert worker.drain_once() == 0  # backing off
+
+    _make_due()
+    worker.drain_once()
+    _make_due()
+    worker.drain_once()
+    row = _rows()[0]
+    assert row.status == "dead" and row.attempts == 3 and len(http.calls) == 3
+
+    client = app.test_client()
+    listing = client.get("/discord/outbox").get_json()
+    assert listing["counts"]["dead"] == 1 and listing["data"][0]["id"] == row.id
+    assert client.post(f"/discord/outbox/{row.id}/retry").status_code == 200
+    assert worker.drain_once() == 1
+    assert _rows()[0].status == "sent"
+    assert client.post(f"/discord/outbox/{row.id}/retry").status_code == 404
+
+
+def test_client_errors_are_not_retried():
+    with app.app_context():
+        enqueue_bot_call("/1/set-nickname", {"user_id": "1", "nickname": "x"})
+        db.session.commit()
+
+    _worker(FakeHttp([404])).drain_once()
+    row = _rows()[0]
+    assert row.status == "dead" and row.attempts == 1
+
+
+def test_rate_limits_do_not_consume_attempts():
+    with app.app_context():
+        for i in range(3):
+            enqueue_bot_call(f"/{i}/roles/add", {"roles": ["Member"]})
+        enqueue_bot_call("/dm", {"user_id": "1", "message": "hi"})
+        db.session.commit()
+
+    http = FakeHttp()
+    worker = _worker(http, limiter=RateLimiter({"bot": (2, 60.0)}))
+    worker.drain_once()
+    rows = _rows()
+    # Buckets are per endpoint: the DM is not held up by the role calls
+    assert [r.status for r in rows] == ["sent", "sent", "pending", "sent"]
+    assert rows[2].attempts == 0
+
+    # Discord's own 429 is honoured the same way
+    _make_due()
+    http = FakeHttp([429], headers={"Retry-After": "30"})
+    _worker(http).drain_once()
+    row = _rows()[2]
+    assert row.status == "pending" and row.attempts == 0 and row.last_error.startswith("429")
+    assert _worker(http).drain_once() == 0
+
+
+def test_rate_limiter_refills():
+    limiter = RateLimiter({"webhook": (1, 0.05)})
+    assert limiter.acquire("webhook:a") == 0
+    assert 0 < limiter.acquire("webhook:a") <= 0.05
+    assert limiter.acquire("webhook:b") == 0
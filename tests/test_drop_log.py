@@ -0,0 +1,68 @@
+import json
+from datetime import datetime, timezone
+from app import app, db
+from models.models import Events
+from event_handlers.stability_party.drop_log import DropLogCounters, drop_log_counters, event_drop_logs, record_drop
+
+ids = {}
+
+
+def setup_module(module):
+    with app.app_context():
+        db.create_all()
+        now = datetime.now(timezone.utc)
+        events = [Events(name=name, type="STABILITY_PARTY", start_time=now, end_time=now, data={"note": name}, timestamp=now)
+                  for name in ("Drops", "Buffered")]
+        db.session.add_all(events)
+        db.session.commit()
+        ids.update(event=events[0].id, buffered=events[1].id)
+
+
+def teardown_module(module):
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+
+def _upserts(statements: list) -> list:
+    return [s for s in statements if "sp3_trigger_totals" in s and s.lstrip().startswith("INSERT")]
+
+
+def test_drops_are_upserted_and_served_as_the_event_log():
+    with app.app_context():
+        record_drop(ids["event"], "Abyssal whip", 1500000, 1, db.session)
+        record_drop(ids["event"], "Abyssal whip", 1500000, 1, db.session)
+        record_drop(ids["event"], "Bones", None, 3, db.session)
+        db.session.commit()
+        assert event_drop_logs([ids["event"]], db.session)[ids["event"]] == {
+            "Abyssal whip": {"value": 3000000, "quantity": 2},
+            "Bones": {"value": 0, "quantity": 3},
+        }
+        assert "log" not in db.session.get(Events, ids["event"]).data
+
+    listed = {e["id"]: e for e in json.loads(app.test_client().get("/events").data)}
+    assert listed[str(ids["event"])]["data"] == {"note": "Drops", "log": {"Abyssal whip": {"value": 3000000, "quantity": 2},
+                                                                          "Bones": {"value": 0, "quantity": 3}}}
+    assert listed[str(ids["buffered"])]["data"]["log"] == {}
+
+
+def test_buffered_drops_are_flushed_in_one_batch(capture_statements):
+    with app.app_context():
+        counters = DropLogCounters(db.engine, flush_interval=3600)
+        with capture_statements() as statements:
+            for _ in range(5):
+                counters.record(ids["buffered"], "Dragon bones", 3000, 1, db.session)
+            counters.record(ids["buffered"], "Rune scimitar", 15000, 1, db.session)
+            assert _upserts(statements) == []
+            assert counters.pending(ids["buffered"])["Dragon bones"] == {"value": 15000, "quantity": 5}
+
+            assert counters.flush() == 2
+            assert len(_upserts(statements)) == 1
+        counters.stop()
+
+        assert counters.pending(ids["buffered"]) == {}
+        assert event_drop_logs([ids["buffered"]], db.session)[ids["buffered"]] == {
+            "Dragon bones": {"value": 15000, "quantity": 5},
+            "Rune scimitar": {"value": 15000, "quantity": 1},
+        }
+        assert not drop_log_counters().buffered
@@ -0,0 +1,178 @@
+import json
+from app import app, db
+from models.models import Users
+from models.new_events import Challenge, ChallengeStatus, Event, Region, Task, Team, TeamMember, Territory, Tile, Trigger
+from datetime import datetime, timezone
+
+
+def setup_module(module):
+    with app.app_context():
+        db.create_all()
+
+
+def teardown_module(module):
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+
+def _event(name: str, type: str = "bingo") -> str:
+    with app.app_context():
+        event = Event(name=name, type=type, start_date=datetime(2026, 1, 1, tzinfo=timezone.utc),
+                      end_date=datetime(2026, 2, 1, tzinfo=timezone.utc))
+        db.session.add(event)
+        db.session.commit()
+        return str(event.id)
+
+
+def _build_source_event() -> str:
+    event_id = _event("Source")
+    with app.app_context():
+        bones = Trigger.query.filter_by(name="Bones", source="Goblin").first() or Trigger(name="Bones", source="Goblin", type="DROP")
+        quest = Trigger.query.filter_by(name="Dragon Slayer").first() or Trigger(name="Dragon Slayer", type="QUEST")
+        db.session.add_all([bones, quest])
+        tile = Tile(event_id=event_id, name="Starter", index=0)
+        db.session.add(tile)
+        db.session.flush()
+        task = Task(tile_id=tile.id, name="Either", require_all=False)
+        db.session.add(task)
+        db.session.flush()
+        parent = Challenge(task_id=task.id, require_all=False, quantity=1)
+        db.session.add(parent)
+        db.session.flush()
+        db.session.add_all([
+            Challenge(task_id=task.id, parent_challenge_id=parent.id, trigger_id=bones.id, quantity=5),
+            Challenge(task_id=task.id, parent_challenge_id=parent.id, trigger_id=quest.id, quantity=1),
+        ])
+        region = Region(event_id=event_id, name="Misthalin")
+        db.session.add(region)
+        root = Challenge(task_id=None, trigger_id=bones.id, quantity=3, value=2)
+        db.session.add(root)
+        db.session.flush()
+        db.session.add(Territory(region_id=region.id, name="Lumbridge", challenge_id=root.id, display_order=1,
+                                 polygon_points=[[0, 0], [1, 1]]))
+        db.session.commit()
+    return event_id
+
+
+def _strip_event(document: dict) -> dict:
+    return {k: v for k, v in document.items() if k != "event"}
+
+
+def test_export_then_import_round_trips():
+    client = app.test_client()
+    source_id = _build_source_event()
+    exported = client.get(f"/v2/events/{source_id}/definition").get_json()
+    assert [t["name"] for t in exported["triggers"]] == ["Bones", "Dragon Slayer"]
+    task = exported["tiles"][0]["tasks"][0]
+    assert len(task["challenges"]) == 1 and len(task["challenges"][0]["children"]) == 2
+    assert exported["regions"][0]["territories"][0]["challenge"]["value"] == 2
+
+    target_id = _event("Target")
+    response = client.put(f"/v2/events/{target_id}/definition", json=exported)
+    assert response.status_code == 200
+    summary = response.get_json()
+    assert summary == {"tiles": 1, "tasks": 1, "challenges": 4, "regions": 1, "territories": 1,
+                       "triggers_created": 0, "triggers_matched": 2}
+
+    reexported = client.get(f"/v2/events/{target_id}/definition").get_json()
+    assert _strip_event(reexported) == _strip_event(exported)
+
+    # Importing again replaces rather than appends
+    assert client.put(f"/v2/events/{target_id}/definition", json=exported).status_code == 200
+    with app.app_context():
+        assert Tile.query.filter_by(event_id=target_id).count() == 1
+        assert Region.query.filter_by(event_id=target_id).count() == 1
+        assert Challenge.query.count() == 8
+
+
+def test_inline_triggers_are_created_once():
+    client = app.test_client()
+    event_id = _event("Inline")
+    document = {"tiles": [{"name": "Pets", "index": 0, "tasks": [{"name": "Any pet", "challenges": [
+        {"trigger": {"name": "Pet chaos elemental", "source": "Chaos Elemental"}},
+        {"trigger": {"name": "Bones", "source": "Goblin"}},
+    ]}]}]}
+    assert client.put(f"/v2/events/{event_id}/definition", json=document).get_json()["triggers_created"] == 1
+    assert client.put(f"/v2/events/{event_id}/definition", json=document).get_json()["triggers_created"] == 0
+    with app.app_context():
+        assert Trigger.query.filter_by(name="Pet chaos elemental").count() == 1
+
+
+def test_malformed_documents_write_nothing():
+    client = app.test_client()
+    event_id = _event("Malformed")
+    bad_documents = [
+        {"tiles": [{"name": "A", "index": 0}, {"name": "B", "index": 0}]},
+        {"tiles": [{"index": 0}]},
+        {"tiles": [{"name": "A", "index": 0, "tasks": [{"name": "T", "challenges": [{"trigger": "missing"}]}]}]},
+        {"version": 2},
+        {"tiles": [{"name": "A", "index": 0, "tasks": [{"name": "T", "challenges": [{"quantity": "five"}]}]}]},
+        {"tiles": [{"name": "A", "index": 0, "tasks": [{"name": "T", "require_all": "yes"}]}]},
+        {"regions": [{"name": "R", "territories": [{"name": "T", "display_order": 1.5}]}]},
+    ]
+    for document in bad_documents:
+        assert client.put(f"/v2/events/{event_id}/definition", json=document).status_code == 400
+    with app.app_context():
+        assert Tile.query.filter_by(event_id=event_id).count() == 0
+
+
+def test_progress_requires_force():
+    client = app.test_client()
+    event_id = _build_source_event()
+    document = client.get(f"/v2/events/{event_id}/definition").get_json()
+    with app.app_context():
+        team = Team(event_id=event_id, name="Red")
+        db.session.add(team)
+        db.session.flush()
+        challenge = Challenge.query.join(Task).join(Tile).filter(Tile.event_id == event_id).first()
+        db.session.add(ChallengeStatus(team_id=team.id, challenge_id=challenge.id, quantity=1))
+        db.session.commit()
+
+    assert client.put(f"/v2/events/{event_id}/definition", json=document).status_code == 409
+    assert client.put(f"/v2/events/{event_id}/definition?force=true", json=document).status_code == 200
+    with app.app_context():
+        assert ChallengeStatus.query.count() == 0
+    assert client.get("/v2/events/00000000-0000-0000-0000-000000000000/definition").status_code == 404
+    assert json.loads(client.put(f"/v2/events/{event_id}/definition", json={}).get_data())["error"]
+
+
+def test_clone_copies_definition_and_optionally_teams():
+    client = app.test_client()
+    source_id = _build_source_event()
+    with app.app_context():
+        team = Team(event_id=source_id, name="Blue", points=40)
+        user = Users(discord_id="clone-member", runescape_name="Clone Member")
+        db.session.add_all([team, user])
+        db.session.flush()
+        db.session.add(TeamMember(team_id=team.id, user_id=user.id))
+        db.session.commit()
+        team_id, user_id = team.id, user.id
+
+    response = client.post(f"/v2/events/{source_id}/clone", json={"start_date": "2026-03-01T00:00:00Z"})
+    assert response.status_code == 201
+    clone = json.loads(response.get_data())
+    assert clone["name"] == "Source (copy)" and clone["end_date"].startswith("2026-04-01")
+
+    source_doc = client.get(f"/v2/events/{source_id}/definition").get_json()
+    clone_doc = client.get(f"/v2/events/{clone['id']}/definition").get_json()
+    assert _strip_event(clone_doc) == _strip_event(source_doc)
+    with app.app_context():
+        assert Team.query.filter_by(event_id=clone["id"]).count() == 0
+        # Rows were copied, not shared
+        assert not {t.id for t in Tile.query.filter_by(event_id=clone["id"])} & {t.id for t in Tile.query.filter_by(event_id=source_id)}
+
+    response = client.post(f"/v2/events/{source_id}/clone", json={"name": "With teams", "include_teams": True})
+    with app.app_context():
+        teams = Team.query.filter_by(event_id=json.loads(response.get_data())["id"]).all()
+        assert [(t.name, t.points) for t in teams] == [("Blue", 0)] and teams[0].id != team_id
+        assert TeamMember.query.filter_by(team_id=teams[0].id).count() == 0
+
+    response = client.post(f"/v2/events/{source_id}/clone", json={"include_teams": True, "include_members": True})
+    with app.app_context():
+        team = Team.query.filter_by(event_id=json.loads(response.get_data())["id"]).one()
+        assert [m.user_id for m in TeamMember.query.filter_by(team_id=team.id)] == [user_id]
+
+    assert client.post(f"/v2/events/{source_id}/clone", json={"include_members": True}).status_code == 400
+    assert client.post(f"/v2/events/{source_id}/clone", json={"start_date": "soon"}).status_code == 400
+    assert client.post("/v2/events/00000000-0000-0000-0000-000000000000/clone").status_code == 404
@@ -0,0 +1,111 @@
+import threading
+from helper.firestore_writer import FirestoreWriter
+from helper.metrics import FIRESTORE_BACKLOG
+
+
+class FakeDocument:
+    def __init__(self, collection: str, doc_id: int) -> None:
+        self.collection = collection
+        self.id = doc_id
+
+
+class FakeBatch:
+    def __init__(self, client: "FakeFirestore") -> None:
+        self.client = client
+        self.writes = []
+
+    def set(self, ref: FakeDocument, data: dict) -> None:
+        self.writes.append((ref, data))
+
+    def commit(self) -> None:
+        with self.client.lock:
+            if self.client.failures_remaining:
+                self.client.failures_remaining -= 1
+                raise RuntimeError("UNAVAILABLE")
+            self.client.batch_sizes.append(len(self.writes))
+            for ref, data in self.writes:
+                self.client.collections.setdefault(ref.collection, {})[ref.id] = data
+
+
+class FakeCollection:
+    def __init__(self, client: "FakeFirestore", name: str) -> None:
+        self.client = client
+        self.name = name
+
+    def document(self) -> FakeDocument:
+        with self.client.lock:
+            self.client.next_id += 1
+            return FakeDocument(self.name, self.client.next_id)
+
+
+class FakeFirestore:
+    """In-memory stand-in for firestore.Client supporting batched writes."""
+
+    def __init__(self, failures: int = 0) -> None:
+        self.lock = threading.Lock()
+        self.collections: dict[str, dict] = {}
+        self.batch_sizes: list[int] = []
+        self.failures_remaining = failures
+        self.next_id = 0
+
+    def batch(self) -> FakeBatch:
+        return FakeBatch(self)
+
+    def collection(self, name: str) -> FakeCollection:
+        return FakeCollection(self, name)
+
+
+def test_groups_documents_into_batches():
+    client = FakeFirestore()
+    writer = FirestoreWriter(client, batch_size=50, linger=0.2)
+    for i in range(120):
+        assert writer.enqueue("drops_a" if i % 2 else "drops_b", {"id": str(i)})
+
+    assert writer.flush(timeout=5)
+    writer.shutdown()
+    assert len(client.collections["drops_a"]) == 60
+    assert len(client.collections["drops_b"]) == 60
+    assert sum(client.batch_sizes) == 120
+    assert max(client.batch_sizes) <= 50
+    assert len(client.batch_sizes) < 120
+    assert writer.backlog == 0
+    assert FIRESTORE_BACKLOG.value() == 0
+
+
+def test_retries_failed_commits():
+    client = FakeFirestore(failures=2)
+    writer = FirestoreWriter(client, backoff_base=0.01, linger=0)
+    writer.enqueue("drops", {"id": "1"})
+    assert writer.flush(timeout=5)
+    writer.shutdown()
+    assert client.collections["drops"] and writer.written == 1 and writer.dropped == 0
+
+
+def test_gives_up_after_max_retries():
+    client = FakeFirestore(failures=10)
+    writer = FirestoreWriter(client, max_retries=1, backoff_base=0.01, linger=0)
+    writer.enqueue("drops", {"id": "1"})
+    assert writer.flush(timeout=5)
+    writer.shutdown()
+    assert writer.dropped == 1 and client.collections == {}
+
+
+def test_bounded_queue_and_disabled_client():
+    assert FirestoreWriter(None).enqueue("drops", {"id": "1"}) is False
+
+    client = FakeFirestore()
+    writer = FirestoreWriter(client, max_queue=1)
+    writer._ensure_started = lambda: None  # keep the worker from draining the queue
+    assert writer.enqueue("drops", {"id": "1"})
+    assert writer.enqueue("drops", {"id": "2"}) is False
+    assert writer.dropped == 1 and writer.backlog == 1
+
+
+def test_shutdown_flushes_pending_documents():
+    client = FakeFirestore()
+    writer = FirestoreWriter(client, linger=0.5)
+    for i in range(10):
+        writer.enqueue("drops", {"id": str(i)})
+    writer.shutdown(timeout=5)
+    assert len(client.collections["drops"]) == 10
+    assert writer.enqueue("drops", {"id": "late"}) is False
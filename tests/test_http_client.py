@@ -0,0 +1,99 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+import requests
+from helper.http_client import HttpClient
+from helper.metrics import OUTBOUND_LATENCY, OUTBOUND_RETRIES
+
+server = None
+replies = {}  # path -> status codes to answer with, in order, then 200
+peers = []
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, so reused connections are visible
+
+    def _reply(self):
+        peers.append(self.client_address)
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if self.path == "/slow":
+            time.sleep(0.5)
+        queued = replies.get(self.path)
+        status = queued.pop(0) if queued else 200
+        body = b'{"ok": true}'
+        self.send_response(status)
+        if status == 429:
+            self.send_header("Retry-After", "0")
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = _reply
+
+    def log_message(self, *args):
+        pass
+
+
+def setup_module(module):
+    global server
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+
+def teardown_module(module):
+    server.shutdown()
+    server.server_close()
+
+
+def setup_function(function):
+    replies.clear()
+    peers.clear()
+
+
+def _url(path: str) -> str:
+    return f"http://127.0.0.1:{server.server_address[1]}{path}"
+
+
+def test_connections_are_reused_and_timed():
+    client = HttpClient()
+    host = f"127.0.0.1:{server.server_address[1]}"
+    before = OUTBOUND_LATENCY.count(host=host, method="GET", outcome="2xx")
+    for _ in range(5):
+        assert client.get(_url("/ping")).json() == {"ok": True}
+    assert len(set(peers)) == 1
+    assert OUTBOUND_LATENCY.count(host=host, method="GET", outcome="2xx") == before + 5
+
+
+def test_idempotent_calls_are_retried_with_backoff():
+    client = HttpClient(retries=2, backoff_base=0.01)
+    host = f"127.0.0.1:{server.server_address[1]}"
+    retries = OUTBOUND_RETRIES.value(host=host, reason="503")
+    replies["/flaky"] = [503, 503]
+    assert client.get(_url("/flaky")).status_code == 200
+    assert OUTBOUND_RETRIES.value(host=host, reason="503") == retries + 2
+
+    # Out of retries: the last response is the caller's to handle
+    replies["/flaky"] = [503, 503, 503]
+    assert client.get(_url("/flaky")).status_code == 503
+
+
+def test_posts_are_only_retried_when_not_processed():
+    client = HttpClient(retries=2, backoff_base=0.01)
+    replies["/create"] = [503]
+    assert client.post(_url("/create"), json={"a": 1}).status_code == 503
+    assert len(peers) == 1
+
+    replies["/create"] = [429]
+    assert client.post(_url("/create"), json={"a": 1}).status_code == 200
+    assert len(peers) == 3
+
+
+def test_calls_never_wait_past_the_timeout():
+    client = HttpClient(timeout=(1, 0.1), retries=0)
+    started = time.perf_counter()
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        client.get(_url("/slow"))
+    assert time.perf_counter() - started < 0.4
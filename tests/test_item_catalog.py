@@ -0,0 +1,34 @@
+import random
+from collections import Counter
+import pytest
+from event_handlers.stability_party.item_definitions import get_items_by_rarity, get_items_by_type, item_catalog, register_item
+from event_handlers.stability_party.item_system import AliasTable, generate_shop_inventory, shop_rarity_table
+
+
+def test_registry_is_frozen_with_precomputed_indexes():
+    catalog = item_catalog()
+    assert get_items_by_rarity("legendary") is catalog.by_rarity["legendary"]
+    assert {item.id for item in get_items_by_rarity("common")} == {"boots_of_lightness", "mini_dice"}
+    assert len(get_items_by_type("consumable")) == len(catalog.items)
+    assert get_items_by_rarity("mythic") == ()
+    with pytest.raises(RuntimeError):
+        register_item(id="late_item", name="Late", description="", item_type="consumable", rarity="common", base_price=1)
+
+
+def test_alias_table_matches_weights():
+    table = AliasTable([50, 30, 15, 4, 1])
+    rng = random.Random(0)
+    counts = Counter(table.draw(rng) for _ in range(100000))
+    for i, weight in enumerate(table.weights):
+        assert abs(counts[i] / 100000 - weight / 100) < 0.01
+
+
+def test_higher_tier_shops_lean_rarer():
+    assert shop_rarity_table(1) is shop_rarity_table(1)
+    rarities, tier_1 = shop_rarity_table(1)
+    _, tier_4 = shop_rarity_table(4)
+    assert tier_4.weights[rarities.index("common")] < tier_1.weights[rarities.index("common")]
+
+    random.seed(1)
+    shop = generate_shop_inventory("event", shop_tier=4, item_count=3)
+    assert len({item["id"] for item in shop}) == 3
@@ -0,0 +1,73 @@
+from app import app
+from helper.metrics import Counter, Gauge, Histogram, Registry, HANDLER_LATENCY, SUBMISSION_OUTCOMES, mark_submission_matched
+from event_handlers.event_handler import EventHandler, EventSubmission
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = Registry()
+    histogram = registry.register(Histogram("test_seconds", "Test.", ("handler",), buckets=(0.1, 1.0)))
+    histogram.observe(0.05, handler="a")
+    histogram.observe(0.5, handler="a")
+    histogram.observe(2, handler="a")
+
+    text = registry.render()
+    assert "# TYPE test_seconds histogram" in text
+    assert 'test_seconds_bucket{handler="a",le="0.1"} 1' in text
+    assert 'test_seconds_bucket{handler="a",le="1"} 2' in text
+    assert 'test_seconds_bucket{handler="a",le="+Inf"} 3' in text
+    assert 'test_seconds_sum{handler="a"} 2.55' in text
+    assert 'test_seconds_count{handler="a"} 3' in text
+
+
+def test_counter_and_callback_gauge():
+    registry = Registry()
+    counter = registry.register(Counter("test_total", "Test.", ("outcome",)))
+    registry.register(Gauge("test_gauge", "Test.", ("state",), callback=lambda: {("idle",): 4}))
+    counter.inc(outcome='say "hi"')
+    counter.inc(2, outcome='say "hi"')
+
+    text = registry.render()
+    assert 'test_total{outcome="say \\"hi\\""} 3' in text
+    assert 'test_gauge{state="idle"} 4' in text
+
+
+def test_metrics_endpoint_reports_routes_handlers_and_pool():
+    client = app.test_client()
+    before = HANDLER_LATENCY.count(handler="bingo_handler")
+
+    with app.app_context():
+        EventHandler.handle_event(EventSubmission(
+            rsn="nobody", id=None, trigger="Nothing", source=None, quantity=1,
+            totalValue=0, img_path=None, type="DROP"))
+    client.get("/metrics")
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.mimetype == "text/plain"
+    text = response.get_data(as_text=True)
+    assert HANDLER_LATENCY.count(handler="bingo_handler") == before + 1
+    assert 'http_request_duration_seconds_count{method="GET",route="/metrics",status="200"}' in text
+    assert 'db_pool_connections{state="size"} 10' in text
+    assert "db_pool_checkout_wait_seconds_count" in text
+    assert "firestore_write_backlog 0" in text
+
+
+def test_each_submission_has_one_outcome(monkeypatch):
+    def matched_handler(submission: EventSubmission) -> list:
+        mark_submission_matched()
+        return []
+
+    def failing_handler(submission: EventSubmission) -> list:
+        mark_submission_matched()
+        raise RuntimeError("after matching")
+
+    def outcomes(handler):
+        return {o: SUBMISSION_OUTCOMES.value(handler=handler.__name__, outcome=o) for o in ("matched", "error")}
+
+    monkeypatch.setattr(EventHandler, "handlers", [matched_handler, failing_handler])
+    with app.app_context():
+        EventHandler.handle_event(EventSubmission(
+            rsn="nobody", id=None, trigger="Nothing", source=None, quantity=1,
+            totalValue=0, img_path=None, type="DROP"))
+    assert outcomes(matched_handler) == {"matched": 1, "error": 0}
+    assert outcomes(failing_handler) == {"matched": 0, "error": 1}
@@ -0,0 +1,66 @@
+import logging
+from app import app, db
+from sqlalchemy import text
+from helper.query_stats import QueryStats, check_budget, query_budget, track_queries
+
+
+@app.route("/_test/query-stats", methods=['GET'])
+@query_budget(max_queries=1)
+def _query_stats_test_route():
+    db.session.execute(text("SELECT 1"))
+    db.session.execute(text("SELECT 2"))
+    return "ok"
+
+
+def test_track_queries_nests_scopes():
+    with app.app_context():
+        with track_queries("outer") as outer:
+            db.session.execute(text("SELECT 1"))
+            with track_queries("inner") as inner:
+                db.session.execute(text("SELECT pg_sleep(0.01)"))
+        db.session.execute(text("SELECT 1"))
+
+    assert outer.count == 2
+    assert outer.commits == 0
+    assert inner.count == 1
+    assert inner.slowest_statement == "SELECT pg_sleep(0.01)"
+    assert outer.slowest_statement == "SELECT pg_sleep(0.01)"
+    assert outer.total_ms >= inner.total_ms >= 10
+
+
+def test_track_queries_counts_commits():
+    with app.app_context():
+        with track_queries("commits") as stats:
+            db.session.execute(text("SELECT 1"))
+            db.session.commit()
+            db.session.commit()  # nothing pending: no transaction, no COMMIT
+    assert stats.commits == 1
+
+
+def test_check_budget():
+    stats = QueryStats("test")
+    stats.record("SELECT 1", 5.0)
+    stats.record("SELECT 2", 7.0)
+    assert check_budget(stats, None) == []
+    assert check_budget(stats, {"max_queries": 2, "max_ms": None}) == []
+    assert check_budget(stats, {"max_queries": 1, "max_ms": 10}) == ["queries 2 > 1", "db_ms 12.0 > 10"]
+
+
+def test_request_headers_and_budget_warning(caplog):
+    client = app.test_client()
+
+    response = client.get("/_test/query-stats")
+    assert "X-Query-Count" not in response.headers
+
+    app.config["QUERY_STATS_HEADERS"] = True
+    try:
+        with caplog.at_level(logging.WARNING):
+            response = client.get("/_test/query-stats")
+    finally:
+        app.config["QUERY_STATS_HEADERS"] = False
+
+    assert response.status_code == 200
+    assert response.headers["X-Query-Count"] == "2"
+    assert response.headers["X-Commit-Count"] == "0"
+    assert float(response.headers["X-Query-Time-Ms"]) > 0
+    assert any("budget exceeded" in r.getMessage() and "queries 2 > 1" in r.getMessage() for r in caplog.records)
@@ -0,0 +1,107 @@
+import json
+import time
+from sqlalchemy import text
+from app import app, db
+from helper.response_cache import LRUResponseCache, invalidate_on_commit, response_cache
+from models.new_events import Team
+
+
+def setup_module(module):
+    response_cache.clear()
+    with app.app_context():
+        db.create_all()
+
+
+def teardown_module(module):
+    response_cache.clear()
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+
+def test_lru_limits_and_stats():
+    cache = LRUResponseCache(max_entries=2, max_bytes=10)
+    cache.set("a", b"1234", 200, [], ["x"], ttl=60)
+    cache.set("b", b"1234", 200, [], ["y"], ttl=60)
+    assert cache.get("a") is not None  # a is now most recently used
+    cache.set("c", b"1234", 200, [], ["y"], ttl=60)
+    assert cache.get("b") is None and cache.get("a") is not None
+    assert cache.stats()["evictions"] == 1 and cache.bytes == 8
+
+    cache.set("d", b"12345678", 200, [], ["z"], ttl=60)  # over max_bytes: evicts down to fit
+    assert cache.bytes <= 10 and cache.get("d") is not None
+    assert cache.set("huge", b"x" * 11, 200, [], [], ttl=60) is False
+
+    stats = cache.stats()
+    assert stats["hits"] == 3 and stats["misses"] == 1 and stats["hit_rate"] == 0.75
+
+
+def test_ttl_and_invalidation_race():
+    cache = LRUResponseCache()
+    cache.set("a", b"1", 200, [], ["x"], ttl=0.01)
+    time.sleep(0.02)
+    assert cache.get("a") is None
+
+    since = cache.sequence()
+    cache.invalidate("x")  # a write commits while the response is being built
+    assert cache.set("a", b"stale", 200, [], ["x"], ttl=60, since=since) is False
+    assert cache.set("a", b"fresh", 200, [], ["x"], ttl=60, since=cache.sequence()) is True
+    assert cache.invalidate("x") == 1 and cache.get("a") is None
+
+
+def test_event_reads_are_cached_until_written():
+    client = app.test_client()
+    created = client.post("/v2/events", json={
+        "name": "Cached", "start_date": "2026-01-01T00:00:00Z", "end_date": "2026-02-01T00:00:00Z"})
+    event_id = json.loads(created.get_data())["id"]
+
+    first = client.get(f"/v2/events/{event_id}")
+    second = client.get(f"/v2/events/{event_id}")
+    assert first.headers["X-Cache"] == "MISS" and second.headers["X-Cache"] == "HIT"
+    assert first.get_data() == second.get_data()
+
+    # CRUDService write: the event's tag is invalidated on commit
+    client.put(f"/v2/events/{event_id}", json={"name": "Renamed"})
+    response = client.get(f"/v2/events/{event_id}")
+    assert response.headers["X-Cache"] == "MISS" and json.loads(response.get_data())["name"] == "Renamed"
+
+    # ORM write to a model belonging to the event
+    with app.app_context():
+        team = Team(event_id=event_id, name="Red")
+        db.session.add(team)
+        db.session.commit()
+    assert client.get(f"/v2/events/{event_id}").headers["X-Cache"] == "MISS"
+    assert client.get(f"/v2/events/{event_id}").headers["X-Cache"] == "HIT"
+
+    # Raw-SQL write: only invalidated once the transaction commits
+    with app.app_context():
+        invalidate_on_commit(db.session, f"event:{event_id}")
+        db.session.execute(text("UPDATE new_stability.teams SET points = 5 WHERE event_id = :id"), {"id": event_id})
+        db.session.rollback()
+    assert client.get(f"/v2/events/{event_id}").headers["X-Cache"] == "HIT"
+    with app.app_context():
+        invalidate_on_commit(db.session, f"event:{event_id}")
+        db.session.execute(text("UPDATE new_stability.teams SET points = 5 WHERE event_id = :id"), {"id": event_id})
+        db.session.commit()
+    response = client.get(f"/v2/events/{event_id}")
+    assert response.headers["X-Cache"] == "MISS" and json.loads(response.get_data())["teams"][0]["points"] == 5
+
+    # 404s are not cached
+    missing = "00000000-0000-0000-0000-000000000000"
+    assert client.get(f"/v2/events/{missing}").status_code == 404
+    assert client.get(f"/v2/events/{missing}").headers["X-Cache"] == "MISS"
+
+
+def test_list_keys_include_query_string_and_writes_invalidate():
+    client = app.test_client()
+    assert client.get("/v2/triggers?type=DROP").headers["X-Cache"] == "MISS"
+    assert client.get("/v2/triggers?type=DROP").headers["X-Cache"] == "HIT"
+    assert client.get("/v2/triggers").headers["X-Cache"] == "MISS"
+
+    assert client.post("/v2/triggers", json={"name": "Cache Bones", "type": "DROP"}).status_code == 201
+    response = client.get("/v2/triggers?type=DROP")
+    assert response.headers["X-Cache"] == "MISS"
+    assert "Cache Bones" in [t["name"] for t in response.get_json()["data"]]
+
+    stats = client.get("/metrics/cache").get_json()
+    assert stats["hits"] >= 1 and stats["invalidations"] >= 1
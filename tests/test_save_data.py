@@ -0,0 +1,115 @@
+import copy
+import uuid
+from datetime import datetime, timezone
+from app import app, db
+from models.models import Events, EventTeams
+from benchmarks.save_data import LegacySaveData, build_blobs, run_benchmark
+from event_handlers.stability_party.save_data import SaveData, save_team_data
+from event_handlers.stability_party.team_positions import invalidate_team_positions
+
+ids = {}
+TILES = [str(uuid.uuid4()) for _ in range(2)]
+
+
+def setup_module(module):
+    with app.app_context():
+        db.create_all()
+        now = datetime.now(timezone.utc)
+        ev = Events(name="Save Data", type="STABILITY_PARTY", start_time=now, end_time=now, data={}, timestamp=now)
+        db.session.add(ev)
+        db.session.flush()
+        team = EventTeams(event_id=ev.id, name="Racers", data={
+            "currentTile": TILES[0], "coins": 50, "stars": 1, "tileProgress": {}, "itemList": [], "legacyKey": "kept",
+        })
+        db.session.add(team)
+        db.session.commit()
+        ids.update(event=ev.id, team=team.id)
+
+
+def teardown_module(module):
+    invalidate_team_positions()
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+
+def _load() -> tuple[EventTeams, SaveData]:
+    team = db.session.get(EventTeams, ids["team"])
+    return team, SaveData.from_dict(team.data)
+
+
+def test_concurrent_saves_keep_each_others_changes(capture_statements):
+    with app.app_context():
+        team, roll = _load()
+        # Loaded before the roll below is saved, as a drop arriving at the same time would be
+        drop = SaveData.from_dict(copy.deepcopy(team.data))
+        roll.currentTile, roll.coins = uuid.UUID(TILES[1]), roll.coins - 20
+        drop.tileProgress["challenge"] = {"task": 3}
+        drop.coins += 10
+        drop.stars += 1
+
+        with capture_statements() as statements:
+            save_team_data(team, roll)
+        updates = [s for s in statements if s.lstrip().startswith("UPDATE")]
+        assert len(updates) == 1
+
+        save_team_data(team, drop)
+        assert (drop.coins, drop.stars) == (40, 2)
+
+        data = db.session.get(EventTeams, ids["team"]).data
+        assert data["currentTile"] == TILES[1]
+        assert data["tileProgress"] == {"challenge": {"task": 3}}
+        assert (data["coins"], data["stars"]) == (40, 2)
+        assert data["legacyKey"] == "kept"
+
+
+def test_absolute_fields_store_the_value_as_set():
+    with app.app_context():
+        team, moderation = _load()
+        roll = SaveData.from_dict(copy.deepcopy(team.data))
+        roll.coins += 25
+        roll.stars += 1
+        save_team_data(team, roll)
+
+        # Loaded before the roll was saved: the absolute coins replace the roll's, stars still add up
+        moderation.coins, moderation.stars = 100, moderation.stars - 1
+        save_team_data(team, moderation, absolute=("coins",))
+        data = db.session.get(EventTeams, ids["team"]).data
+        assert data["coins"] == 100 and data["stars"] == roll.stars - 1
+
+
+def test_unchanged_save_writes_nothing_and_fresh_save_writes_whole_blob(capture_statements):
+    with app.app_context():
+        team, save = _load()
+        with capture_statements() as statements:
+            save_team_data(team, save)
+        assert not [s for s in statements if s.lstrip().startswith("UPDATE")]
+
+        team = db.session.get(EventTeams, ids["team"])
+        fresh = SaveData()
+        fresh.coins = 7
+        save_team_data(team, fresh)
+        data = db.session.get(EventTeams, ids["team"]).data
+        assert data["coins"] == 7 and "legacyKey" not in data
+
+
+def test_lazy_fields_match_eager_decoding():
+    blob = build_blobs(1)[0]
+    assert SaveData.from_dict(blob).to_dict() == LegacySaveData.from_dict(copy.deepcopy(blob)).to_dict()
+
+    save = SaveData.from_dict(blob)
+    assert save.coins == blob["coins"] and save.currentTile == uuid.UUID(blob["currentTile"])
+    assert "tileProgress" not in save._values and "roll_state" not in save._values
+    assert save.roll_state.path_taken_this_turn[-1] == save.currentTile
+    assert save.changed_fields() == {}
+
+    # Nested edits are seen as changes and never reach the loaded blob
+    save.buffs[0]["uses"] -= 1
+    save.roll_state.action_data["message"] = "Moved"
+    assert set(save.changed_fields()) == {"buffs", "roll_state"}
+    assert blob["buffs"][0]["uses"] == 1 and blob["roll_state"]["action_data"]["message"] != "Moved"
+
+
+def test_save_data_benchmark_runs():
+    report = run_benchmark(teams=10, repeat=1)
+    assert set(report["results"]) == {"progress_read", "submission", "round_trip"}
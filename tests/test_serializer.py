@@ -0,0 +1,44 @@
+import decimal
+import json
+import uuid
+from datetime import date, datetime, timezone
+from flask.json.provider import DefaultJSONProvider
+from app import app
+from benchmarks.serializer import build_rows, legacy_serialize
+from helper.helpers import FastJSONProvider, ModelEncoder, Serializer, dumps_json
+from models.models import Users
+from models.new_events import Event
+
+
+def test_compiled_serializer_matches_mapper_walk():
+    users = build_rows(3) + [Users(runescape_name="Sparse")]
+    assert [u.serialize() for u in users] == [legacy_serialize(u) for u in users]
+    assert Users in Serializer._compiled
+
+    event = Event(id=uuid.uuid4(), name="Event", type="BINGO", start_date=datetime.now(timezone.utc),
+                  end_date=datetime.now(timezone.utc))
+    serialized = event.serialize()
+    assert serialized == legacy_serialize(event)
+    assert isinstance(serialized["id"], str) and isinstance(serialized["start_date"], str)
+
+
+def test_fast_provider_matches_default_provider():
+    payload = {
+        "b": [{"id": uuid.uuid4(), "when": datetime(2026, 10, 19, 12, 30, tzinfo=timezone.utc), "day": date(2026, 10, 19)}],
+        "a": {"points": decimal.Decimal("12.50"), "nested": {"z": None, "y": True}},
+        "name": "Ünïcode",
+    }
+    fast, default = FastJSONProvider(app), DefaultJSONProvider(app)
+    with app.app_context():
+        assert json.loads(fast.dumps(payload)) == json.loads(default.dumps(payload))
+        assert list(json.loads(fast.dumps(payload))) == ["a", "b", "name"]
+        # Falls back to the stdlib for values orjson rejects
+        assert fast.dumps({"big": 2 ** 70}) == default.dumps({"big": 2 ** 70})
+        response = fast.response(payload)
+    assert response.mimetype == "application/json"
+    assert json.loads(response.get_data()) == json.loads(default.dumps(payload))
+
+
+def test_dumps_json_matches_model_encoder():
+    payload = [u.serialize() for u in build_rows(5)]
+    assert json.loads(dumps_json(payload)) == json.loads(json.dumps(payload, cls=ModelEncoder))
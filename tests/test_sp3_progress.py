@@ -0,0 +1,90 @@
+import json
+from datetime import datetime, timezone
+from app import app, db
+from helper.query_stats import track_queries
+from models.models import Events, EventChallenges, EventTasks, EventTeams, EventTriggers
+from models.stability_party_3 import SP3EventTileChallengeMapping, SP3EventTiles, SP3Regions
+from event_handlers.stability_party.board_graph import invalidate_board_graph
+from event_handlers.stability_party.save_data import SaveData, save_team_data
+from event_handlers.stability_party.team_positions import invalidate_team_positions
+
+ids = {}
+
+
+def setup_module(module):
+    with app.app_context():
+        db.create_all()
+        now = datetime.now(timezone.utc)
+        ev = Events(name="Progress", type="STABILITY_PARTY", start_time=now, end_time=now, data={"star_tiles": []}, timestamp=now)
+        triggers = [EventTriggers(trigger="Zulrah", type="KC"), EventTriggers(trigger="Tanzanite fang", source="Zulrah"),
+                    EventTriggers(trigger="Onyx", type="DROP")]
+        db.session.add_all([ev, *triggers])
+        db.session.flush()
+        tasks = [EventTasks(triggers=[str(triggers[0].id), str(triggers[1].id)], quantity=50),
+                 EventTasks(triggers=[str(triggers[2].id)], quantity=1)]
+        db.session.add_all(tasks)
+        db.session.flush()
+        challenges = [EventChallenges(tasks=[str(tasks[0].id)]), EventChallenges(tasks=[str(tasks[1].id)])]
+        db.session.add_all(challenges)
+        db.session.flush()
+        region = SP3Regions(event_id=ev.id, name="Zul-Andra", description="Swamp", challenges=[str(challenges[1].id)], data={})
+        db.session.add(region)
+        db.session.flush()
+        tile = SP3EventTiles(event_id=ev.id, region_id=region.id, name="Shrine", description="Snakes", data={})
+        db.session.add(tile)
+        db.session.flush()
+        db.session.add(SP3EventTileChallengeMapping(tile_id=tile.id, challenge_id=challenges[0].id, type="TILE"))
+        teams = [EventTeams(event_id=ev.id, name=name, data={"currentTile": str(tile.id), "islandId": str(region.id),
+                                                             "stars": stars, "coins": coins, "tileProgress": progress})
+                 for name, stars, coins, progress in (("Alpha", 1, 5, {str(challenges[0].id): {str(tasks[0].id): 12}}),
+                                                      ("Bravo", 1, 9, {}), ("Charlie", 2, 0, {}))]
+        db.session.add_all(teams)
+        db.session.commit()
+        ids.update(event=ev.id, teams=[t.id for t in teams], region=region.id)
+
+
+def teardown_module(module):
+    invalidate_team_positions()
+    invalidate_board_graph()
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+
+def test_tile_progress_is_rendered_from_one_batch():
+    client = app.test_client()
+    url = f"/events/{ids['event']}/teams/{ids['teams'][0]}/tile-progress"
+    with track_queries("test") as stats:
+        response = client.get(url)
+    assert response.status_code == 200
+    body = json.loads(response.data)
+    assert body["tile_progress"] == ["12/50 Zulrah KC OR Tanzanite fang from Zulrah"]
+    assert body["region_progress"] == ["0/1 Onyx"]
+    assert (body["current_tile"], body["current_region"], body["tile_description"]) == ("Shrine", "Zul-Andra", "Snakes")
+    # Event, team, board graph (tiles, stars, regions), then mappings, challenges, tasks and triggers
+    assert stats.count == 9
+
+    with track_queries("test") as stats:
+        assert json.loads(client.get(url).data) == body
+    assert stats.count == 6
+
+
+def test_standings_are_served_from_memory_and_follow_writes():
+    client = app.test_client()
+    url = f"/events/{ids['event']}/progress"
+    standings = json.loads(client.get(url).data)["team_standings"]
+    assert [(t["team_name"], t["rank"]) for t in standings] == [("Charlie", 1), ("Bravo", 2), ("Alpha", 3)]
+    assert standings[0]["current_region"] == "Zul-Andra"
+
+    with track_queries("test") as stats:
+        body = json.loads(client.get(url).data)
+    assert stats.count == 1  # The event itself
+    assert body["total_teams"] == 3 and [r["name"] for r in body["regions"]] == ["Zul-Andra"]
+
+    with app.app_context():
+        team = db.session.get(EventTeams, ids["teams"][0])
+        save = SaveData.from_dict(team.data)
+        save.stars = 3
+        save_team_data(team, save)
+    standings = json.loads(client.get(url).data)["team_standings"]
+    assert [(t["team_name"], t["stars"]) for t in standings][0] == ("Alpha", 3)
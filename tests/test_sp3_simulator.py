@@ -0,0 +1,38 @@
+import numpy as np
+from scripts.simulate_stability_party import (
+    Policy, RARITIES, fixture_board, item_table, sample_shop_offers, shop_rarity_odds, simulate, simulate_batch,
+)
+
+
+def test_shop_offers_are_distinct_and_follow_rarity_weights():
+    items = item_table()
+    odds = shop_rarity_odds()
+    offers = sample_shop_offers(np.random.default_rng(0), items, odds, 20000)
+    assert offers.shape == (20000, 3) and (offers >= 0).all()
+    assert all(len(set(row)) == 3 for row in offers[:500])
+
+    # The first slot is a rarity by weight, then any item of it
+    counts = np.bincount(items.rarity, minlength=len(RARITIES))
+    expected = odds[items.rarity] / counts[items.rarity]
+    first_slot = np.bincount(offers[:, 0], minlength=len(items.ids)) / len(offers)
+    assert np.allclose(first_slot, expected, atol=0.01)
+
+
+def test_batch_keeps_the_books_balanced():
+    board, items = fixture_board(), item_table()
+    results = simulate_batch(board, items, games=50, teams=4, turns=20, policy=Policy(), seed=1)
+    assert (results["coins"] == results["coins_earned"] - results["coins_spent"]).all()
+    assert (results["coins"] >= 0).all()
+    assert results["star_purchases"] <= results["stars"].sum()
+    assert results["bought"].sum() <= results["offered"].sum() and results["used"].sum() > 0
+
+
+def test_simulate_is_reproducible_and_runs_in_a_pool():
+    board = fixture_board()
+    report = simulate(board, games=40, teams=4, turns=15, seed=3)
+    assert report == simulate(board, games=40, teams=4, turns=15, seed=3)
+    assert set(report["per_team"]) == {"laps", "stars", "coins", "coins_earned", "coins_spent"}
+    assert report["items"]["boots_of_lightness"]["price"]["max"] <= 12
+
+    pooled = simulate(board, games=40, teams=4, turns=15, seed=3, workers=2)
+    assert pooled["games"] == 40 and pooled["per_team"]["laps"]["mean"] > 0
@@ -0,0 +1,100 @@
+from datetime import datetime, timezone
+from app import app, db
+from models.models import Events, EventTeams
+from models.stability_party_3 import SP3EventTiles, SP3Regions
+from event_handlers.stability_party.board_graph import invalidate_board_graph
+from event_handlers.stability_party.item_definitions import genie_lamp_selection_handler
+from event_handlers.stability_party.save_data import RollState, SaveData
+from event_handlers.stability_party.stability_party_handler import roll_dice_progression
+from event_handlers.stability_party.team_positions import invalidate_team_positions
+
+ids = {}
+
+
+def setup_module(module):
+    with app.app_context():
+        db.create_all()
+        now = datetime.now(timezone.utc)
+        ev = Events(name="Stars", type="STABILITY_PARTY", start_time=now, end_time=now, data={}, timestamp=now)
+        db.session.add(ev)
+        db.session.flush()
+        regions = [SP3Regions(event_id=ev.id, name=name, data={}) for name in ("North", "South")]
+        db.session.add_all(regions)
+        db.session.flush()
+        tiles = {
+            "star": SP3EventTiles(event_id=ev.id, region_id=regions[0].id, name="North Star", data={}),
+            "north": SP3EventTiles(event_id=ev.id, region_id=regions[0].id, name="North Field", data={}),
+            "shop": SP3EventTiles(event_id=ev.id, region_id=regions[1].id, name="South Shop", data={"isShop": True}),
+            "south": SP3EventTiles(event_id=ev.id, region_id=regions[1].id, name="South Field", data={}),
+        }
+        db.session.add_all(tiles.values())
+        db.session.flush()
+        ev.data = {"star_tiles": [str(tiles["star"].id)]}
+        # Every island has a team on it
+        teams = [EventTeams(event_id=ev.id, name="Alpha", data={}),
+                 EventTeams(event_id=ev.id, name="Bravo", data={"currentTile": str(tiles["south"].id),
+                                                                "islandId": str(regions[1].id)})]
+        db.session.add_all(teams)
+        db.session.commit()
+        ids.update(event=ev.id, regions=[r.id for r in regions], tiles={k: t.id for k, t in tiles.items()}, team=teams[0].id)
+
+
+def teardown_module(module):
+    invalidate_team_positions()
+    invalidate_board_graph()
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+
+def _at_star(star_tiles: list) -> None:
+    """Put Alpha on the star with 150 coins, mid-roll, and set the event's star tiles."""
+    event = db.session.get(Events, ids["event"])
+    event.data = {"star_tiles": [str(t) for t in star_tiles]}
+    team = db.session.get(EventTeams, ids["team"])
+    roll_state = RollState(ids["event"], ids["team"], 0, ids["tiles"]["star"])
+    team.data = {"currentTile": str(ids["tiles"]["star"]), "previousTile": str(ids["tiles"]["north"]),
+                 "islandId": str(ids["regions"][0]), "coins": 150, "stars": 0, "isRolling": True,
+                 "roll_state": roll_state.to_dict()}
+    db.session.commit()
+    invalidate_board_graph(ids["event"])
+    invalidate_team_positions(ids["event"])
+
+
+def test_star_moves_to_an_occupied_island_when_every_island_is_occupied():
+    tiles = ids["tiles"]
+    with app.app_context():
+        _at_star([tiles["star"]])
+        response, status = roll_dice_progression(str(ids["event"]), str(ids["team"]), {"action": "buy"}, action_type="star")
+        assert status == 200 and "error" not in response
+
+        team = SaveData.from_dict(db.session.get(EventTeams, ids["team"]).data)
+        assert (team.coins, team.stars) == (50, 1)
+        star_tiles = db.session.get(Events, ids["event"]).data["star_tiles"]
+        assert len(star_tiles) == 1 and star_tiles[0] in (str(tiles["north"]), str(tiles["south"]))
+
+
+def test_purchase_is_refused_without_charge_when_the_star_has_nowhere_to_go():
+    tiles = ids["tiles"]
+    with app.app_context():
+        _at_star([tiles["star"], tiles["north"], tiles["south"]])
+        response, status = roll_dice_progression(str(ids["event"]), str(ids["team"]), {"action": "buy"}, action_type="star")
+        assert status == 400 and "error" in response
+
+        team = SaveData.from_dict(db.session.get(EventTeams, ids["team"]).data)
+        assert (team.coins, team.stars) == (150, 0)
+
+        save = SaveData.from_dict(db.session.get(EventTeams, ids["team"]).data)
+        assert "error" in genie_lamp_selection_handler(ids["event"], ids["team"], save, {}, "buy")
+        assert (save.coins, save.stars) == (150, 0)
+
+
+def test_genie_lamp_moves_the_star_when_every_island_is_occupied():
+    tiles = ids["tiles"]
+    with app.app_context():
+        _at_star([tiles["star"]])
+        save = SaveData.from_dict(db.session.get(EventTeams, ids["team"]).data)
+        result = genie_lamp_selection_handler(ids["event"], ids["team"], save, {}, "buy")
+        assert "error" not in result and (save.coins, save.stars) == (50, 1)
+        star_tiles = db.session.get(Events, ids["event"]).data["star_tiles"]
+        assert star_tiles[0] in (str(tiles["north"]), str(tiles["south"]))
@@ -0,0 +1,106 @@
+import json
+from datetime import datetime, timezone
+from sqlalchemy import text
+from app import app, db
+from models.models import Events, EventTeams
+from models.stability_party_3 import SP3TeamHistory
+from event_handlers.stability_party import team_history
+from event_handlers.stability_party.save_data import SaveData, save_team_data
+from event_handlers.stability_party.team_history import apply_patch, diff_state, team_state_at, team_versions
+from event_handlers.stability_party.team_positions import invalidate_team_positions
+
+ids = {}
+
+
+def setup_module(module):
+    with app.app_context():
+        db.create_all()
+        now = datetime.now(timezone.utc)
+        ev = Events(name="History", type="STABILITY_PARTY", start_time=now, end_time=now, data={}, timestamp=now)
+        db.session.add(ev)
+        db.session.flush()
+        team = EventTeams(event_id=ev.id, name="Alpha", data={"coins": 0, "stars": 0, "legacyKey": "kept"})
+        db.session.add(team)
+        db.session.commit()
+        ids.update(event=ev.id, team=team.id)
+
+
+def teardown_module(module):
+    invalidate_team_positions()
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+
+def _save(**fields):
+    team = db.session.get(EventTeams, ids["team"])
+    save = SaveData.from_dict(team.data)
+    reason = fields.pop("reason", None)
+    for key, value in fields.items():
+        setattr(save, key, value)
+    save_team_data(team, save, reason=reason)
+    return db.session.get(EventTeams, ids["team"]).data
+
+
+def test_patches_round_trip():
+    before, after = {"a": 1, "b/c": [1], "gone": True}, {"a": 2, "b/c": [1], "new": None}
+    ops = diff_state(before, after)
+    assert {op["op"] for op in ops} == {"replace", "add", "remove"}
+    assert apply_patch(before, ops) == after and before["a"] == 1
+
+
+def test_every_save_is_a_version_rebuilt_from_the_nearest_snapshot(monkeypatch):
+    monkeypatch.setattr(team_history, "SNAPSHOT_EVERY", 3)
+    states = {}
+    with app.app_context():
+        for coins in range(1, 8):
+            states[coins] = _save(coins=coins * 10, reason="roll" if coins == 5 else None)
+        # Nothing changed, so no version
+        _save()
+
+        versions = team_versions(db.session, ids["team"], limit=100)
+        # Version 1 holds the state written before any history (untracked), then one per save
+        assert [v["version"] for v in versions] == list(range(8, 0, -1))
+        assert versions[-1]["reason"] == "untracked" and versions[2]["reason"] == "roll"
+        assert [v["version"] for v in versions if v["snapshot"]] == [7, 4, 1]
+
+        for coins, state in states.items():
+            assert team_state_at(db.session, ids["team"], coins + 1) == state
+        assert team_state_at(db.session, ids["team"], 1)["legacyKey"] == "kept"
+        assert team_state_at(db.session, ids["team"], 99) is None
+
+
+def test_writes_outside_save_team_data_are_snapshotted():
+    with app.app_context():
+        db.session.execute(text("UPDATE event_teams SET data = data || '{\"stars\": 9}' WHERE id = :id"), {"id": str(ids["team"])})
+        db.session.commit()
+        after = _save(coins=1)
+        latest, untracked = team_versions(db.session, ids["team"], limit=2)
+        assert untracked["reason"] == "untracked" and untracked["snapshot"]
+        assert team_state_at(db.session, ids["team"], untracked["version"])["stars"] == 9
+        assert team_state_at(db.session, ids["team"], latest["version"]) == after
+
+
+def test_undo_roll_and_restore_endpoints():
+    client = app.test_client()
+    base = f"/events/{ids['event']}/moderation/teams/{ids['team']}"
+    with app.app_context():
+        rows = db.session.query(SP3TeamHistory).filter_by(team_id=ids["team"]).count()
+        before_roll = _save(coins=100)
+        _save(coins=150, isRolling=True, reason="roll")
+        _save(coins=10, reason="use_item")
+
+    response = client.post(f"{base}/undo-roll")
+    assert response.status_code == 200
+    with app.app_context():
+        assert db.session.get(EventTeams, ids["team"]).data == before_roll
+
+    history = json.loads(client.get(f"{base}/history?limit=2").data)["versions"]
+    assert history[0]["reason"] == f"undo-roll:{rows + 2}" and history[1]["reason"] == "use_item"
+
+    state = json.loads(client.get(f"{base}/history/{rows + 3}").data)["data"]
+    assert state["coins"] == 10
+    assert client.post(f"{base}/history/{rows + 3}/restore").status_code == 200
+    assert client.post(f"{base}/history/999/restore").status_code == 404
+    with app.app_context():
+        assert db.session.get(EventTeams, ids["team"]).data == state
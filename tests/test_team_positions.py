@@ -0,0 +1,87 @@
+import re
+import uuid
+from datetime import datetime, timezone
+from app import app, db
+from models.models import Events, EventTeams
+from models.stability_party_3 import SP3EventTiles, SP3Regions
+from event_handlers.stability_party.board_graph import invalidate_board_graph
+from event_handlers.stability_party.item_definitions import bounty_target_teleport, moonlight_moth_mix_handler
+from event_handlers.stability_party.save_data import SaveData, save_team_data
+from event_handlers.stability_party.stability_party_handler import is_region_populated
+from event_handlers.stability_party.team_positions import invalidate_team_positions, team_positions, teams_in_region
+
+ids = {}
+
+
+def setup_module(module):
+    with app.app_context():
+        db.create_all()
+        now = datetime.now(timezone.utc)
+        ev = Events(name="Positions", type="STABILITY_PARTY", start_time=now, end_time=now, data={}, timestamp=now)
+        db.session.add(ev)
+        db.session.flush()
+        regions = [SP3Regions(event_id=ev.id, name=name, data={}) for name in ("North", "South")]
+        db.session.add_all(regions)
+        db.session.flush()
+        tiles = [SP3EventTiles(event_id=ev.id, region_id=r.id, name=f"{r.name} Dock", data={}) for r in regions]
+        db.session.add_all(tiles)
+        db.session.flush()
+        teams = [
+            EventTeams(event_id=ev.id, name=name, data={"currentTile": str(tiles[0].id), "islandId": str(regions[0].id), "coins": coins})
+            for name, coins in (("Alpha", 10), ("Bravo", 20))
+        ]
+        db.session.add_all(teams)
+        db.session.commit()
+        ids.update(event=ev.id, regions=[r.id for r in regions], tiles=[t.id for t in tiles], teams=[t.id for t in teams])
+
+
+def teardown_module(module):
+    invalidate_team_positions()
+    invalidate_board_graph()
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+
+def test_moves_are_applied_without_reloading(capture_statements):
+    north, south = ids["regions"]
+    alpha, bravo = ids["teams"]
+    with app.app_context():
+        assert teams_in_region(ids["event"], north) == {alpha, bravo}
+        assert is_region_populated(ids["tiles"][0]) and not is_region_populated(ids["tiles"][1])
+
+        team = db.session.get(EventTeams, alpha)
+        save = SaveData.from_dict(team.data)
+        save.currentTile, save.islandId = ids["tiles"][1], south
+        with capture_statements() as statements:
+            save_team_data(team, save)
+            assert teams_in_region(ids["event"], north) == {bravo}
+            assert teams_in_region(ids["event"], south) == {alpha}
+            assert is_region_populated(ids["tiles"][1])
+        # Reloading the refreshed team's own row after commit is fine; scanning the event's teams is not
+        assert not [s for s in statements if re.search(r"FROM event_teams\s+WHERE (event_teams\.)?event_id", s)]
+
+
+def test_item_options_come_from_the_index():
+    alpha, bravo = ids["teams"]
+    with app.app_context():
+        options = bounty_target_teleport(ids["event"], str(bravo), None, {})["options"]
+        assert options == [{"name": "Alpha", "description": "Current Tile: South Dock in South", "value": str(alpha)}]
+        options = moonlight_moth_mix_handler(ids["event"], str(alpha), None, {})["options"]
+        assert [o["description"] for o in options] == ["0 stars, 20 coins"]
+
+
+def test_rollback_and_delete():
+    north = ids["regions"][0]
+    bravo = ids["teams"][1]
+    with app.app_context():
+        team = db.session.get(EventTeams, bravo)
+        team.data = {**team.data, "islandId": str(ids["regions"][1])}
+        db.session.flush()
+        db.session.rollback()
+        assert teams_in_region(ids["event"], north) == {bravo}
+
+        db.session.delete(db.session.get(EventTeams, bravo))
+        db.session.commit()
+        assert teams_in_region(ids["event"], north) == frozenset()
+        assert [p.name for p in team_positions(ids["event"])] == ["Alpha"]